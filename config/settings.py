@@ -6,6 +6,8 @@ del sistema de gestión de contactos.
 """
 
 from typing import List
+from urllib.parse import urlparse
+
 from pydantic_settings import BaseSettings, SettingsConfigDict
 
 
@@ -20,7 +22,36 @@ class Settings(BaseSettings):
     # TELEGRAM CONFIGURATION
     # ========================================
     TELEGRAM_BOT_TOKEN: str
-    TELEGRAM_ALLOWED_USERS: str = ""  # Lista separada por comas
+    TELEGRAM_ALLOWED_USERS: str = ""  # Lista separada por comas (solo puebla la BD)
+    ALLOWLIST_REFRESH_INTERVAL: float = 30.0  # segundos entre verificaciones de versión
+    # Recepción de updates: "polling" (getUpdates) o "webhook"
+    TELEGRAM_UPDATE_MODE: str = "polling"
+    WEBHOOK_URL: str = ""  # URL pública https registrada con setWebhook
+    WEBHOOK_LISTEN: str = "0.0.0.0"
+    WEBHOOK_PORT: int = 8443
+    WEBHOOK_SECRET_TOKEN: str = ""  # 1-256 caracteres: A-Z, a-z, 0-9, _ y -
+    UPDATE_WORKERS: int = 8  # updates procesados a la vez (en orden dentro de cada chat)
+    DROP_PENDING_UPDATES: bool = True  # descartar los updates pendientes al iniciar
+    # Límites de envío de Telegram (envíos por segundo); con 429 se respeta retry_after
+    TELEGRAM_GLOBAL_SEND_RATE: float = 30.0
+    TELEGRAM_CHAT_SEND_RATE: float = 1.0
+    TELEGRAM_CHAT_SEND_BURST: int = 3
+    TELEGRAM_GROUP_SEND_RATE: float = 0.33  # 20 por minuto
+    # Entrega del contacto guardado: "contact" (sendContact, sin subir archivos),
+    # "document" (vCard .vcf) o "both"
+    TELEGRAM_CONTACT_DELIVERY: str = "contact"
+    TELEGRAM_FILE_ID_CACHE_SIZE: int = 1024  # archivos subidos que se reenvían por file_id
+    UPDATE_DEDUP_WINDOW: float = 3600.0  # segundos que se recuerda cada update_id
+    UPDATE_DEDUP_MAX_SIZE: int = 10000  # update_id recordados como máximo
+    # Contactos pendientes de confirmación: "memory" o "database" (sobreviven reinicios)
+    PENDING_CONFIRMATION_BACKEND: str = "database"
+    PENDING_CONFIRMATION_TTL: int = 900  # segundos que se espera la confirmación
+    PENDING_CONFIRMATION_SWEEP_INTERVAL: float = 60.0  # segundos entre barridos
+    CONFIRMATION_WORKERS: int = 4  # contactos confirmados que se guardan a la vez
+    CONFIRMATION_QUEUE_SIZE: int = 256  # guardados encolados como máximo
+    # Secreto para firmar el callback_data de los botones (vacío = token del bot);
+    # debe ser el mismo en todos los workers
+    CALLBACK_SIGNING_KEY: str = ""
 
     # ========================================
     # GOOGLE GEMINI CONFIGURATION
@@ -28,6 +59,18 @@ class Settings(BaseSettings):
     GEMINI_API_KEY: str
     GEMINI_MODEL: str = "gemini-1.5-flash"
     GEMINI_TIMEOUT: int = 30
+    # Cuotas de tokens del LLM por periodo (0 = sin límite)
+    LLM_USER_TOKEN_QUOTA: int = 50000
+    LLM_GLOBAL_TOKEN_QUOTA: int = 2000000
+    LLM_QUOTA_PERIOD: float = 86400.0  # segundos (1 día, desde las 00:00 UTC)
+    LLM_QUOTA_SYNC_INTERVAL: float = 5.0  # segundos entre sincronizaciones con la BD
+
+    # ========================================
+    # LOCAL EXTRACTOR CONFIGURATION
+    # ========================================
+    LOCAL_EXTRACTOR_MODEL_PATH: str = "data/extractor_model.json"
+    LOCAL_EXTRACTOR_MIN_CONFIDENCE: float = 0.9
+    TRAINING_DATA_PATH: str = "data/training_examples.jsonl"
 
     # ========================================
     # DATABASE CONFIGURATION (PostgreSQL)
@@ -46,6 +89,41 @@ class Settings(BaseSettings):
     # ========================================
     RATE_LIMIT_REQUESTS: int = 10
     RATE_LIMIT_WINDOW: int = 60  # segundos
+    RATE_LIMIT_BACKEND: str = "memory"  # "memory" o "redis" (compartido)
+    REDIS_URL: str = "redis://localhost:6379/0"
+    RATE_LIMIT_FAIL_OPEN: bool = True  # si el backend falla, dejar pasar
+    SECURITY_STATE_SYNC_INTERVAL: float = 2.0  # segundos entre sincronizaciones
+    FAILED_ATTEMPTS_MAX_TRACKED: int = 10000  # conteos exactos en memoria
+    FAILED_ATTEMPTS_TTL: float = 86400.0  # segundos sin fallas para olvidar
+    FAILED_ATTEMPTS_HALF_LIFE: float = 21600.0  # segundos para reducir a la mitad
+    # Verificaciones previas a la extracción, en orden (separadas por comas)
+    SECURITY_PIPELINE_CHECKS: str = "origin,message_format,content,rate_limit"
+    # Detector de abuso: rechazos por usuario/patrón en una ventana deslizante
+    ABUSE_WINDOW_SECONDS: float = 300.0
+    ABUSE_THRESHOLD: int = 20  # eventos en la ventana para marcar una clave
+    ABUSE_AUTO_BLOCK: bool = False  # bloquear a los usuarios marcados
+
+    # ========================================
+    # RETRY CONFIGURATION
+    # ========================================
+    RETRY_MAX_ATTEMPTS: int = 3
+    RETRY_BASE_DELAY: float = 0.2  # segundos
+    RETRY_MAX_DELAY: float = 5.0  # segundos
+    RETRY_BUDGET_RATIO: float = 0.2  # reintentos por llamada original
+    RETRY_BUDGET_MIN_PER_SECOND: float = 1.0
+
+    # ========================================
+    # DEADLINE CONFIGURATION
+    # ========================================
+    REQUEST_DEADLINE: float = 25.0  # segundos por mensaje/confirmación
+    DATABASE_TIMEOUT: float = 10.0  # segundos por operación de BD
+    TELEGRAM_SEND_TIMEOUT: float = 15.0  # segundos por envío
+
+    # ========================================
+    # HEALTH CHECK CONFIGURATION
+    # ========================================
+    HEALTH_CHECK_TIMEOUT: float = 5.0  # segundos por probe
+    HEALTH_CHECK_INTERVAL: float = 30.0  # segundos entre refrescos
 
     # ========================================
     # LOGGING CONFIGURATION
@@ -89,6 +167,47 @@ class Settings(BaseSettings):
         except ValueError:
             return []
 
+    def get_security_pipeline_checks(self) -> List[str]:
+        """
+        Convierte la lista de verificaciones del pipeline a lista.
+
+        Returns:
+            Nombres de las verificaciones en orden de ejecución.
+
+        Example:
+            >>> settings.SECURITY_PIPELINE_CHECKS = "origin, rate_limit"
+            >>> settings.get_security_pipeline_checks()
+            ['origin', 'rate_limit']
+        """
+        return [
+            check.strip()
+            for check in self.SECURITY_PIPELINE_CHECKS.split(",")
+            if check.strip()
+        ]
+
+    def get_callback_signing_key(self) -> str:
+        """
+        Obtiene el secreto para firmar el callback_data.
+
+        Returns:
+            CALLBACK_SIGNING_KEY, o el token del bot si no está configurado.
+        """
+        return self.CALLBACK_SIGNING_KEY or self.TELEGRAM_BOT_TOKEN
+
+    def get_webhook_path(self) -> str:
+        """
+        Ruta local del webhook, tomada de WEBHOOK_URL.
+
+        Returns:
+            Ruta del webhook ("/" si la URL no tiene ruta).
+
+        Example:
+            >>> settings.WEBHOOK_URL = "https://bot.example.com/telegram"
+            >>> settings.get_webhook_path()
+            '/telegram'
+        """
+        return urlparse(self.WEBHOOK_URL).path or "/"
+
 
 # Instancia global de configuración
 settings = Settings()
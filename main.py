@@ -6,25 +6,50 @@ y maneja el bot de Telegram.
 """
 
 import asyncio
-from typing import Optional
+import os
+import signal
+from time import time
+from typing import Any, Dict, Optional, Tuple
 
 from telegram import Update, InlineKeyboardMarkup, InlineKeyboardButton
 from telegram.ext import (
     Application,
+    ApplicationHandlerStop,
     CommandHandler,
     MessageHandler,
     CallbackQueryHandler,
     filters,
-    ContextTypes
+    ContextTypes,
+    TypeHandler
 )
 
 from config.settings import settings
-from src.services.gemini_service import GeminiService
-from src.services.contacts_api import ContactsAPIClient
-from src.services.telegram_service import TelegramService
+from src.services.gemini_service import GeminiService, is_transient_llm_error
+from src.services.contacts_api import ContactsAPIClient, is_transient_db_error
+from src.services.telegram_service import TelegramService, is_transient_telegram_error
+from src.services.local_extractor import LocalContactExtractor
+from src.services.training_store import TrainingExampleStore
+from src.services.security_state import SQLSecurityStateStore
+from src.services.allowlist import SQLAllowlistStore
+from src.services.token_quota import SQLTokenQuotaStore
+from src.services.update_dedup import SQLUpdateDeduplicator
+from src.services.pending_store import create_pending_store
+from src.services.send_scheduler import SendPriority, SendScheduler
+from src.services.update_processor import ChatOrderedUpdateProcessor
+from src.services.webhook_server import WebhookServer
+from src.services.worker_pool import WorkerPool
 from src.agents.security_agent import SecurityAgent
 from src.agents.persistence_agent import PersistenceAgent
+from src.utils.abuse_detector import AbuseDetector
+from src.utils.callback_data import CallbackCodec, InvalidCallbackData
+from src.utils.deadline import Deadline
+from src.utils.failure_tracker import FailedAttemptsTracker
+from src.utils.health import HealthMonitor, HealthStatus
 from src.utils.logger import configure_logging, get_logger
+from src.utils.metrics import metrics
+from src.utils.helpers import truncate_text
+from src.utils.rate_limit_backend import create_rate_limit_backend
+from src.utils.retry import RetryPolicy, configure_retry_budget
 
 # Configurar logging
 configure_logging(log_level=settings.LOG_LEVEL, log_format=settings.LOG_FORMAT)
@@ -42,9 +67,16 @@ class ContactsOrchestrator:
         gemini_service: Servicio de Google Gemini.
         contacts_client: Cliente de PostgreSQL.
         telegram_service: Servicio de Telegram.
+        send_scheduler: Planificador de envíos a Telegram.
+        confirmation_workers: Pool que guarda los contactos confirmados
+            en segundo plano.
+        training_store: Almacén de confirmaciones para entrenar el extractor local.
+        pending_store: Contactos pendientes de confirmación.
+        callback_codec: Firma del callback_data de los botones.
         security_agent: Agente de seguridad.
         persistence_agent: Agente de persistencia.
         application: Aplicación de python-telegram-bot.
+        webhook_server: Servidor del webhook (solo en modo webhook).
     """
 
     def __init__(self):
@@ -54,18 +86,27 @@ class ContactsOrchestrator:
             environment=settings.ENVIRONMENT
         )
 
+        # Presupuesto global de reintentos (compartido por todos los servicios)
+        configure_retry_budget(
+            ratio=settings.RETRY_BUDGET_RATIO,
+            min_per_second=settings.RETRY_BUDGET_MIN_PER_SECOND
+        )
+
         # Inicializar servicios
         self.gemini_service = GeminiService(
             api_key=settings.GEMINI_API_KEY,
             model_name=settings.GEMINI_MODEL,
-            timeout=settings.GEMINI_TIMEOUT
+            timeout=settings.GEMINI_TIMEOUT,
+            retry_policy=self._retry_policy("llm", is_transient_llm_error)
         )
 
         self.contacts_client = ContactsAPIClient(
             database_url=settings.DATABASE_URL,
             legacy_api_url=settings.CONTACTS_API_URL if settings.CONTACTS_API_URL else None,
             legacy_api_key=settings.CONTACTS_API_KEY if settings.CONTACTS_API_KEY else None,
-            timeout=settings.CONTACTS_API_TIMEOUT
+            timeout=settings.CONTACTS_API_TIMEOUT,
+            retry_policy=self._retry_policy("database", is_transient_db_error),
+            db_timeout=settings.DATABASE_TIMEOUT
         )
 
         # Crear tablas en PostgreSQL si no existen
@@ -76,16 +117,110 @@ class ContactsOrchestrator:
             logger.error("failed_to_create_tables", error=str(e))
             raise
 
+        # Todos los envíos a Telegram pasan por el planificador (límites y prioridades)
+        self.send_scheduler = SendScheduler(
+            global_rate=settings.TELEGRAM_GLOBAL_SEND_RATE,
+            chat_rate=settings.TELEGRAM_CHAT_SEND_RATE,
+            chat_burst=settings.TELEGRAM_CHAT_SEND_BURST,
+            group_rate=settings.TELEGRAM_GROUP_SEND_RATE
+        )
+
         self.telegram_service = TelegramService(
-            bot_token=settings.TELEGRAM_BOT_TOKEN
+            bot_token=settings.TELEGRAM_BOT_TOKEN,
+            retry_policy=self._retry_policy("telegram", is_transient_telegram_error),
+            timeout=settings.TELEGRAM_SEND_TIMEOUT,
+            scheduler=self.send_scheduler,
+            contact_delivery=settings.TELEGRAM_CONTACT_DELIVERY,
+            file_id_cache_size=settings.TELEGRAM_FILE_ID_CACHE_SIZE
+        )
+
+        # Los contactos confirmados se guardan en segundo plano: el botón
+        # responde de inmediato
+        self.confirmation_workers = WorkerPool(
+            "confirmations",
+            workers=settings.CONFIRMATION_WORKERS,
+            max_pending=settings.CONFIRMATION_QUEUE_SIZE
+        )
+
+        self.training_store = TrainingExampleStore(settings.TRAINING_DATA_PATH)
+
+        # Bloqueos e intentos fallidos compartidos entre workers y reinicios
+        self.security_state = SQLSecurityStateStore(
+            session_factory=self.contacts_client.SessionLocal,
+            sync_interval=settings.SECURITY_STATE_SYNC_INTERVAL,
+            failed_attempts=FailedAttemptsTracker(
+                max_tracked=settings.FAILED_ATTEMPTS_MAX_TRACKED,
+                ttl_seconds=settings.FAILED_ATTEMPTS_TTL,
+                half_life_seconds=settings.FAILED_ATTEMPTS_HALF_LIFE
+            )
         )
+        self.security_state.load()
+
+        # Whitelist en la BD: se recarga sin reiniciar (versión periódica o SIGHUP)
+        self.allowlist = SQLAllowlistStore(
+            session_factory=self.contacts_client.SessionLocal,
+            refresh_interval=settings.ALLOWLIST_REFRESH_INTERVAL,
+            seed=settings.get_allowed_users()
+        )
+        self.allowlist.load()
+
+        # Cuotas de tokens del LLM persistidas (sobreviven reinicios)
+        self.token_quota = SQLTokenQuotaStore(
+            session_factory=self.contacts_client.SessionLocal,
+            user_limit=settings.LLM_USER_TOKEN_QUOTA,
+            global_limit=settings.LLM_GLOBAL_TOKEN_QUOTA,
+            period_seconds=settings.LLM_QUOTA_PERIOD,
+            sync_interval=settings.LLM_QUOTA_SYNC_INTERVAL
+        )
+        self.token_quota.load()
+
+        # Updates concurrentes entre chats, en orden dentro de cada chat
+        self.update_processor = ChatOrderedUpdateProcessor(workers=settings.UPDATE_WORKERS)
+
+        # update_id ya procesados (la marca de agua sobrevive reinicios y
+        # no pasa a los updates que esperan el lock de su chat)
+        self.update_deduplicator = SQLUpdateDeduplicator(
+            session_factory=self.contacts_client.SessionLocal,
+            window_seconds=settings.UPDATE_DEDUP_WINDOW,
+            max_size=settings.UPDATE_DEDUP_MAX_SIZE,
+            waiting=self.update_processor.lowest_waiting_update_id
+        )
+        self.update_deduplicator.load()
+
+        # Contactos pendientes de confirmación (id corto en el callback_data)
+        self.pending_store = create_pending_store(
+            backend=settings.PENDING_CONFIRMATION_BACKEND,
+            session_factory=self.contacts_client.SessionLocal,
+            ttl_seconds=settings.PENDING_CONFIRMATION_TTL,
+            sweep_interval=settings.PENDING_CONFIRMATION_SWEEP_INTERVAL
+        )
+        self.pending_store.load()
+
+        # callback_data firmado: cualquier worker resuelve la confirmación
+        self.callback_codec = CallbackCodec(settings.get_callback_signing_key())
 
         # Inicializar agentes
         self.security_agent = SecurityAgent(
             gemini_service=self.gemini_service,
-            allowed_users=settings.get_allowed_users(),
+            allowlist=self.allowlist,
             max_requests=settings.RATE_LIMIT_REQUESTS,
-            window_seconds=settings.RATE_LIMIT_WINDOW
+            window_seconds=settings.RATE_LIMIT_WINDOW,
+            local_extractor=self._load_local_extractor(),
+            rate_limit_backend=create_rate_limit_backend(
+                backend=settings.RATE_LIMIT_BACKEND,
+                max_requests=settings.RATE_LIMIT_REQUESTS,
+                window_seconds=settings.RATE_LIMIT_WINDOW,
+                redis_url=settings.REDIS_URL
+            ),
+            security_state=self.security_state,
+            checks=settings.get_security_pipeline_checks(),
+            abuse_detector=AbuseDetector(
+                window_seconds=settings.ABUSE_WINDOW_SECONDS,
+                threshold=settings.ABUSE_THRESHOLD
+            ),
+            auto_block_abusers=settings.ABUSE_AUTO_BLOCK,
+            token_quota=self.token_quota,
+            rate_limit_fail_open=settings.RATE_LIMIT_FAIL_OPEN
         )
 
         self.persistence_agent = PersistenceAgent(
@@ -93,21 +228,83 @@ class ContactsOrchestrator:
             telegram_service=self.telegram_service
         )
 
+        # Probes de salud concurrentes con caché refrescada en segundo plano
+        self.health_monitor = HealthMonitor(
+            probes={
+                "telegram": self.telegram_service.health_check,
+                "llm": self.gemini_service.health_check,
+                "database": self.contacts_client.health_check,
+            },
+            timeout=settings.HEALTH_CHECK_TIMEOUT,
+            refresh_interval=settings.HEALTH_CHECK_INTERVAL
+        )
+
         # Crear aplicación de Telegram
-        self.application = Application.builder().token(
-            settings.TELEGRAM_BOT_TOKEN
-        ).build()
+        self.application = (
+            Application.builder()
+            .token(settings.TELEGRAM_BOT_TOKEN)
+            .concurrent_updates(self.update_processor)
+            .build()
+        )
 
         # Registrar handlers
         self._register_handlers()
 
+        self.webhook_server: Optional[WebhookServer] = None
+
         logger.info(
             "contacts_orchestrator_initialized",
-            allowed_users=len(settings.get_allowed_users())
+            allowed_users=len(self.allowlist)
+        )
+
+    def _retry_policy(self, name: str, is_retryable) -> RetryPolicy:
+        """
+        Crea una política de reintentos con la configuración global.
+
+        Args:
+            name: Nombre de la operación (etiqueta de métricas).
+            is_retryable: Función que indica si un error es transitorio.
+
+        Returns:
+            Instancia de RetryPolicy.
+        """
+        return RetryPolicy(
+            name=name,
+            is_retryable=is_retryable,
+            max_attempts=settings.RETRY_MAX_ATTEMPTS,
+            base_delay=settings.RETRY_BASE_DELAY,
+            max_delay=settings.RETRY_MAX_DELAY
         )
 
+    def _load_local_extractor(self) -> Optional[LocalContactExtractor]:
+        """
+        Carga el extractor local si existe un modelo entrenado.
+
+        Returns:
+            Instancia de LocalContactExtractor o None.
+        """
+        model_path = settings.LOCAL_EXTRACTOR_MODEL_PATH
+        if not model_path or not os.path.exists(model_path):
+            logger.info("local_extractor_disabled", model_path=model_path)
+            return None
+
+        try:
+            return LocalContactExtractor.load(
+                model_path,
+                min_confidence=settings.LOCAL_EXTRACTOR_MIN_CONFIDENCE
+            )
+        except (OSError, ValueError) as e:
+            logger.warning("failed_to_load_local_extractor", error=str(e))
+            return None
+
     def _register_handlers(self) -> None:
         """Registra los handlers del bot de Telegram."""
+        # Antes que todos los demás: descartar updates duplicados
+        self.application.add_handler(
+            TypeHandler(Update, self.drop_duplicate_update),
+            group=-1
+        )
+
         # Handler para comando /start
         self.application.add_handler(
             CommandHandler("start", self.start_command)
@@ -123,9 +320,14 @@ class ContactsOrchestrator:
             CommandHandler("health", self.health_command)
         )
 
+        # Handler para comando /metrics
+        self.application.add_handler(
+            CommandHandler("metrics", self.metrics_command)
+        )
+
         # Handler para callbacks de confirmación
         self.application.add_handler(
-            CallbackQueryHandler(self.handle_confirmation, pattern="^(confirm|reject)_")
+            CallbackQueryHandler(self.handle_confirmation, pattern="^[cx][ir]")
         )
 
         # Handler para mensajes de texto (procesamiento de contactos)
@@ -138,6 +340,24 @@ class ContactsOrchestrator:
 
         logger.info("telegram_handlers_registered")
 
+    async def drop_duplicate_update(
+        self,
+        update: Update,
+        context: ContextTypes.DEFAULT_TYPE
+    ) -> None:
+        """
+        Detiene el procesamiento de un update ya visto.
+
+        Args:
+            update: Update de Telegram.
+            context: Contexto de la conversación.
+
+        Raises:
+            ApplicationHandlerStop: Si el update es un duplicado.
+        """
+        if self.update_deduplicator.is_duplicate(update.update_id):
+            raise ApplicationHandlerStop
+
     async def start_command(
         self,
         update: Update,
@@ -175,10 +395,7 @@ Ejemplo:
 
 Usa /help para más información."""
 
-        await context.bot.send_message(
-            chat_id=chat_id,
-            text=welcome_message
-        )
+        await self._send_message(context, chat_id, welcome_message)
 
     async def help_command(
         self,
@@ -210,21 +427,19 @@ O más informal:
 /start - Mensaje de bienvenida
 /help - Muestra esta ayuda
 /health - Verifica el estado del sistema
+/metrics - Métricas internas (reintentos, latencias)
 
 ✅ El sistema te enviará:
 1. Confirmación del contacto guardado
-2. Archivo vCard (.vcf) para descargar
-3. Botón para agregar directamente a tus contactos
+2. El contacto listo para agregarlo a tu libreta con un toque
+3. Opcionalmente, el archivo vCard (.vcf) para descargar
 
 💡 Consejos:
 - El formato puede ser flexible
 - Incluye el código de país (+57) o se agregará automáticamente
 - El sistema detecta automáticamente nombre, teléfono y referido"""
 
-        await context.bot.send_message(
-            chat_id=chat_id,
-            text=help_message
-        )
+        await self._send_message(context, chat_id, help_message)
 
     async def health_command(
         self,
@@ -243,39 +458,93 @@ O más informal:
 
         # Solo permitir a usuarios autorizados
         if user_id not in self.security_agent.allowed_users:
-            await context.bot.send_message(
-                chat_id=chat_id,
-                text="❌ No tienes autorización para usar este comando."
+            await self._send_message(
+                context, chat_id, "❌ No tienes autorización para usar este comando."
             )
             return
 
         logger.info("health_check_requested", user_id=user_id)
 
-        # Verificar salud de componentes
-        gemini_health = await self.gemini_service.health_check()
-        db_health = await self.contacts_client.health_check()
-        telegram_health = await self.telegram_service.health_check()
-        persistence_health = await self.persistence_agent.health_check()
+        # Resultado cacheado por el monitor (los probes corren en paralelo)
+        statuses = await self.health_monitor.get_status()
 
-        status_emoji = {
-            True: "✅",
-            False: "❌"
-        }
+        telegram_health = statuses["telegram"]
+        db_health = statuses["database"]
+        # La persistencia depende de la BD y de Telegram: no se vuelve a probar
+        persistence_health = telegram_health.healthy and db_health.healthy
 
         health_message = f"""🏥 Estado del Sistema
 
-📡 Telegram Bot: {status_emoji[telegram_health]}
-🤖 Google Gemini: {status_emoji[gemini_health]}
-🗄️ PostgreSQL: {status_emoji[db_health]}
-💾 Persistencia: {status_emoji[persistence_health]}
+📡 Telegram Bot: {self._format_health(telegram_health)}
+🤖 Google Gemini: {self._format_health(statuses["llm"])}
+🗄️ PostgreSQL: {self._format_health(db_health)}
+💾 Persistencia: {"✅" if persistence_health else "❌"}
 
 🌐 Entorno: {settings.ENVIRONMENT}
 📊 Usuarios autorizados: {len(self.security_agent.allowed_users)}"""
 
-        await context.bot.send_message(
-            chat_id=chat_id,
-            text=health_message
-        )
+        await self._send_message(context, chat_id, health_message)
+
+    @staticmethod
+    def _format_health(status: HealthStatus) -> str:
+        """
+        Formatea el estado de un componente para /health.
+
+        Args:
+            status: Resultado del probe.
+
+        Returns:
+            Emoji de estado con la latencia del probe.
+        """
+        emoji = "✅" if status.healthy else "❌"
+        return f"{emoji} ({status.latency_ms:.0f} ms)"
+
+    async def metrics_command(
+        self,
+        update: Update,
+        context: ContextTypes.DEFAULT_TYPE
+    ) -> None:
+        """
+        Handler para el comando /metrics.
+
+        Args:
+            update: Update de Telegram.
+            context: Contexto de la conversación.
+        """
+        chat_id = update.effective_chat.id
+        user_id = update.effective_user.id
+
+        # Solo permitir a usuarios autorizados
+        if user_id not in self.security_agent.allowed_users:
+            await self._send_message(
+                context, chat_id, "❌ No tienes autorización para usar este comando."
+            )
+            return
+
+        snapshot = metrics.snapshot()
+        lines = ["📊 Métricas"]
+
+        for name, value in sorted(snapshot["counters"].items()):
+            lines.append(f"{name}: {value:g}")
+        for name, value in sorted(snapshot["gauges"].items()):
+            lines.append(f"{name}: {value:g}")
+        for name, timing in sorted(snapshot["timings"].items()):
+            lines.append(
+                f"{name}: n={timing['count']} "
+                f"avg={timing['avg'] * 1000:.0f}ms max={timing['max'] * 1000:.0f}ms"
+            )
+
+        detector = self.security_agent.abuse_detector
+        for kind in detector.kinds:
+            hitters = detector.heavy_hitters(kind, limit=5)
+            if hitters:
+                top = ", ".join(f"{key} ({count})" for key, count in hitters)
+                lines.append(f"abuse {kind}: {top}")
+
+        if len(lines) == 1:
+            lines.append("Sin datos todavía.")
+
+        await self._send_message(context, chat_id, truncate_text("\n".join(lines), 4096))
 
     async def handle_message(
         self,
@@ -311,8 +580,14 @@ O más informal:
             "username": user.username
         }
 
+        # Deadline de la solicitud: se propaga por todo el pipeline
+        deadline = Deadline(settings.REQUEST_DEADLINE)
+
         # Procesar con SecurityAgent (validación y extracción)
-        security_result = await self.security_agent.process_request(message_data)
+        security_result = await self.security_agent.process_request(
+            message_data,
+            deadline=deadline
+        )
 
         if not security_result["success"]:
             # Enviar error al usuario
@@ -345,30 +620,116 @@ O más informal:
         confirmation_message = self._format_contact_for_confirmation(contact_data)
 
         # Crear botones de confirmación
-        keyboard = [
+        reply_markup = await self._confirmation_keyboard(
+            user_id=user.id,
+            chat_id=chat_id,
+            contact_data=contact_data,
+            text=security_result["text"]
+        )
+
+        # Enviar mensaje de confirmación como respuesta al mensaje original
+        # (con payload inline, el texto original se recupera de ahí)
+        await self._send_message(
+            context,
+            chat_id,
+            confirmation_message,
+            priority=SendPriority.CONFIRMATION,
+            reply_markup=reply_markup,
+            reply_to_message_id=update.message.message_id
+        )
+
+    async def _confirmation_keyboard(
+        self,
+        user_id: int,
+        chat_id: int,
+        contact_data: dict,
+        text: str
+    ) -> InlineKeyboardMarkup:
+        """
+        Crea los botones de confirmación con callback_data firmado.
+
+        Si el contacto cabe en el callback_data va inline (sin estado);
+        si no, se guarda en el store compartido y los botones llevan su id.
+
+        Args:
+            user_id: Usuario que debe confirmar.
+            chat_id: Chat donde se pide la confirmación.
+            contact_data: Datos del contacto extraído.
+            text: Mensaje original.
+
+        Returns:
+            Teclado con los botones de confirmar y cancelar.
+        """
+        codec = self.callback_codec
+        expires_at = int(time()) + settings.PENDING_CONFIRMATION_TTL
+        confirm_data = codec.encode_inline("confirm", user_id, contact_data, expires_at)
+
+        if confirm_data is not None:
+            reject_data = codec.encode_inline("reject", user_id, {}, expires_at)
+            metrics.increment("confirmation_callbacks_total", kind="inline")
+        else:
+            pending = await self.pending_store.add(
+                user_id=user_id,
+                chat_id=chat_id,
+                contact=contact_data,
+                text=text
+            )
+            confirm_data = codec.encode_reference(
+                "confirm", user_id, pending.id, pending.expires_at
+            )
+            reject_data = codec.encode_reference(
+                "reject", user_id, pending.id, pending.expires_at
+            )
+            metrics.increment("confirmation_callbacks_total", kind="reference")
+
+        return InlineKeyboardMarkup([
             [
-                InlineKeyboardButton("✅ Sí, agregarlo", callback_data=f"confirm_{user.id}_{chat_id}"),
-                InlineKeyboardButton("❌ No, cancelar", callback_data=f"reject_{user.id}_{chat_id}")
+                InlineKeyboardButton("✅ Sí, agregarlo", callback_data=confirm_data),
+                InlineKeyboardButton("❌ No, cancelar", callback_data=reject_data)
             ]
-        ]
-        reply_markup = InlineKeyboardMarkup(keyboard)
+        ])
 
-        # Guardar la información del contacto en el contexto del usuario
-        if not hasattr(context, "user_data"):
-            context.user_data = {}
-        
-        context.user_data[f"pending_contact_{user.id}"] = {
-            "contact": contact_data,
-            "chat_id": chat_id,
-            "user_id": user.id
-        }
+    async def _resolve_confirmation(
+        self,
+        query,
+        user_id: int
+    ) -> Optional[Tuple[str, Optional[Dict[str, Any]], Optional[str]]]:
+        """
+        Verifica el callback_data y obtiene el contacto pendiente.
 
-        # Enviar mensaje de confirmación
-        await context.bot.send_message(
-            chat_id=chat_id,
-            text=confirmation_message,
-            reply_markup=reply_markup
-        )
+        Args:
+            query: CallbackQuery del botón presionado.
+            user_id: Usuario que presionó el botón.
+
+        Returns:
+            Tupla (acción, contacto, texto original), o None si el
+            callback_data es inválido, venció o ya se usó. En un rechazo
+            inline el contacto es None; el texto original es None si no
+            se puede recuperar.
+        """
+        try:
+            callback = self.callback_codec.decode(query.data, user_id)
+        except InvalidCallbackData as e:
+            logger.warning("invalid_confirmation_callback", user_id=user_id, reason=str(e))
+            return None
+
+        if callback.is_reference:
+            # Retirar el contacto pendiente (un segundo clic ya no lo encuentra)
+            pending = await self.pending_store.take(callback.confirmation_id, user_id)
+            if pending is None:
+                return None
+            return callback.action, pending.contact, pending.text
+
+        if callback.action == "reject":
+            return callback.action, None, None
+
+        # Botón inline: se reclama su firma para guardarlo una sola vez
+        if not await self.pending_store.claim(callback.tag, user_id, callback.expires_at):
+            return None
+
+        original = query.message.reply_to_message
+        text = original.text if original is not None else None
+        return callback.action, callback.contact, text
 
     def _format_contact_for_confirmation(self, contact_data: dict) -> str:
         """
@@ -402,6 +763,15 @@ O más informal:
         """
         Handler para la confirmación o rechazo del contacto.
 
+        Responde al botón de inmediato: el answerCallbackQuery muestra el
+        "Guardando..." y el guardado se encola en confirmation_workers, que
+        edita el mensaje con el resultado (también quita los botones). El
+        handler no espera la BD, la API legacy ni el envío del contacto.
+
+        Usa el mínimo de llamadas a la Bot API: un contacto confirmado
+        cuesta 3 llamadas (aviso, contacto y edición); un error o un
+        rechazo, 2.
+
         Args:
             update: Update de Telegram.
             context: Contexto de la conversación.
@@ -411,18 +781,14 @@ O más informal:
         chat_id = query.message.chat_id
         
         # Obtener los datos del contacto pendiente
-        pending_key = f"pending_contact_{user_id}"
-        if pending_key not in context.user_data:
+        resolved = await self._resolve_confirmation(query, user_id)
+        if resolved is None:
             await query.answer("❌ La sesión expiró. Por favor intenta de nuevo.", show_alert=True)
             return
 
-        pending_contact = context.user_data[pending_key]
-        contact_data = pending_contact["contact"]
-
-        # Confirmar presión del botón
-        await query.answer()
+        action, contact_data, text = resolved
 
-        if query.data.startswith("confirm_"):
+        if action == "confirm":
             # Usuario confirmó - guardar contacto
             logger.info(
                 "contact_confirmation_accepted",
@@ -430,49 +796,203 @@ O más informal:
                 contact_nombre=contact_data["nombre"]
             )
 
-            # Actualizar el mensaje a "Guardando..."
-            await query.edit_message_text(
-                text="⏳ Guardando contacto en tu libreta..."
-            )
+            # Confirmar presión del botón con el aviso de "Guardando..."
+            await query.answer("⏳ Guardando contacto en tu libreta...")
 
-            # Guardar en la BD
-            persistence_result = await self.persistence_agent.save_and_notify(
-                contact_data=contact_data,
-                chat_id=chat_id
+            # Con la cola llena espera un lugar (el usuario ya tiene el aviso)
+            await self.confirmation_workers.submit(
+                lambda: self._save_confirmed_contact(query, user_id, contact_data, text),
+                on_error=lambda error: self._report_confirmation_failure(query, user_id, error)
             )
 
-            if not persistence_result["success"]:
-                logger.error(
-                    "persistence_failed",
-                    user_id=user_id,
-                    error=persistence_result.get("error")
-                )
-                await context.bot.send_message(
-                    chat_id=chat_id,
-                    text=f"❌ Error al guardar: {persistence_result.get('error')}"
-                )
-                return
+        else:
+            # Usuario rechazó - cancelar
+            logger.info("contact_confirmation_rejected", user_id=user_id)
 
-            # Después de guardar exitosamente, actualizar mensaje
-            await query.edit_message_text(
-                text=f"✅ ¡Contacto guardado exitosamente!\n\n👤 {contact_data['nombre']}\n📞 {contact_data['telefono']}\n👥 Recomendado por: {contact_data['quien_lo_recomendo']}"
-            )
+            await query.answer()
+            await self._edit_message(query, "❌ Contacto cancelado. No fue agregado a tu libreta.")
 
-        elif query.data.startswith("reject_"):
-            # Usuario rechazó - cancelar
-            logger.info(
-                "contact_confirmation_rejected",
+    async def _save_confirmed_contact(
+        self,
+        query,
+        user_id: int,
+        contact_data: dict,
+        text: Optional[str]
+    ) -> None:
+        """
+        Guarda un contacto confirmado y edita el mensaje con el resultado.
+
+        Corre en confirmation_workers. Los errores que lanza los informa
+        _report_confirmation_failure.
+
+        Args:
+            query: CallbackQuery del botón presionado.
+            user_id: ID del usuario que confirmó.
+            contact_data: Datos del contacto confirmado.
+            text: Texto original del mensaje (None si no está disponible).
+        """
+        # Guardar en la BD (con deadline propio de la confirmación); el
+        # error se informa abajo, en la edición del mensaje
+        persistence_result = await self.persistence_agent.save_and_notify(
+            contact_data=contact_data,
+            chat_id=query.message.chat_id,
+            deadline=Deadline(settings.REQUEST_DEADLINE),
+            notify_errors=False
+        )
+
+        if not persistence_result["success"]:
+            logger.error(
+                "persistence_failed",
                 user_id=user_id,
-                contact_nombre=contact_data["nombre"]
+                error=persistence_result.get("error")
             )
+            await self._edit_message(
+                query,
+                f"❌ Error al guardar: {persistence_result.get('error')}"
+            )
+            return
 
-            await query.edit_message_text(
-                text="❌ Contacto cancelado. No fue agregado a tu libreta."
+        edit = self._edit_message(
+            query,
+            f"✅ ¡Contacto guardado exitosamente!\n\n👤 {contact_data['nombre']}\n📞 {contact_data['telefono']}\n👥 Recomendado por: {contact_data['quien_lo_recomendo']}"
+        )
+
+        if not text:
+            await edit
+            return
+
+        # La confirmación aceptada es un ejemplo para el extractor local;
+        # se escribe en un hilo mientras se edita el mensaje
+        await asyncio.gather(
+            edit,
+            asyncio.to_thread(self.training_store.add_example, text=text, contact=contact_data)
+        )
+
+    async def _report_confirmation_failure(
+        self,
+        query,
+        user_id: int,
+        error: BaseException
+    ) -> None:
+        """
+        Avisa al usuario que el guardado en segundo plano no terminó.
+
+        Edita el mensaje de confirmación; si la edición falla, envía un
+        mensaje de error aparte.
+
+        Args:
+            query: CallbackQuery del botón presionado.
+            user_id: ID del usuario que confirmó.
+            error: Excepción del guardado (CancelledError si se detuvo el bot).
+        """
+        logger.error(
+            "confirmation_save_failed",
+            user_id=user_id,
+            error=str(error),
+            error_type=type(error).__name__
+        )
+
+        # El contacto pudo quedar guardado antes del error
+        message = "❌ No se pudo confirmar el guardado del contacto. Revisa tu libreta antes de intentarlo de nuevo."
+
+        try:
+            await self._edit_message(query, message)
+        except Exception as e:
+            logger.warning("confirmation_failure_edit_failed", user_id=user_id, error=str(e))
+            await self.telegram_service.send_error_message(
+                chat_id=query.message.chat_id,
+                error=message.removeprefix("❌ ")
             )
 
-        # Limpiar datos del contacto pendiente
-        if pending_key in context.user_data:
-            del context.user_data[pending_key]
+    async def _send_message(
+        self,
+        context: ContextTypes.DEFAULT_TYPE,
+        chat_id: int,
+        text: str,
+        priority: SendPriority = SendPriority.INFO,
+        **kwargs
+    ) -> None:
+        """
+        Envía un mensaje a través del planificador de envíos.
+
+        Args:
+            context: Contexto de la conversación.
+            chat_id: Chat de destino.
+            text: Texto del mensaje.
+            priority: Prioridad del envío (default: INFO).
+            **kwargs: Argumentos extra de send_message (reply_markup, ...).
+        """
+        await self.send_scheduler.submit(
+            chat_id,
+            lambda: context.bot.send_message(chat_id=chat_id, text=text, **kwargs),
+            priority=priority
+        )
+
+    async def _edit_message(self, query, text: str) -> None:
+        """
+        Edita el mensaje de confirmación a través del planificador de envíos.
+
+        Args:
+            query: CallbackQuery del botón presionado.
+            text: Texto nuevo del mensaje.
+        """
+        await self.send_scheduler.submit(
+            query.message.chat_id,
+            lambda: query.edit_message_text(text=text),
+            priority=SendPriority.CONFIRMATION
+        )
+
+    async def _start_receiving_updates(self) -> None:
+        """
+        Empieza a recibir updates por long polling o por webhook.
+
+        Raises:
+            ValueError: Si TELEGRAM_UPDATE_MODE no es "polling" ni
+                "webhook", o falta la configuración del webhook.
+        """
+        mode = settings.TELEGRAM_UPDATE_MODE
+
+        if mode == "polling":
+            # start_polling elimina el webhook registrado, si lo hay
+            await self.application.updater.start_polling(
+                drop_pending_updates=settings.DROP_PENDING_UPDATES
+            )
+        elif mode == "webhook":
+            if not settings.WEBHOOK_URL:
+                raise ValueError("TELEGRAM_UPDATE_MODE=webhook requiere WEBHOOK_URL")
+
+            self.webhook_server = WebhookServer(
+                handler=self._enqueue_update,
+                secret_token=settings.WEBHOOK_SECRET_TOKEN,
+                path=settings.get_webhook_path(),
+                listen=settings.WEBHOOK_LISTEN,
+                port=settings.WEBHOOK_PORT
+            )
+            await self.webhook_server.start()
+            await self.application.bot.set_webhook(
+                url=settings.WEBHOOK_URL,
+                secret_token=settings.WEBHOOK_SECRET_TOKEN,
+                allowed_updates=Update.ALL_TYPES,
+                drop_pending_updates=settings.DROP_PENDING_UPDATES
+            )
+        else:
+            raise ValueError(f"TELEGRAM_UPDATE_MODE inválido: {mode}")
+
+        logger.info("receiving_updates", mode=mode)
+
+    async def _enqueue_update(self, data: dict) -> None:
+        """
+        Encola un update recibido por webhook.
+
+        Los handlers lo procesan desde la cola de la aplicación, igual que
+        con polling; el webhook responde sin esperar el procesamiento.
+
+        Args:
+            data: Update en JSON (tal como lo envía Telegram).
+        """
+        await self.application.update_queue.put(
+            Update.de_json(data, self.application.bot)
+        )
 
     async def run(self) -> None:
         """Inicia el bot de Telegram."""
@@ -489,16 +1009,81 @@ O más informal:
         # Iniciar el bot
         await self.application.initialize()
         await self.application.start()
-        await self.application.updater.start_polling(drop_pending_updates=True)
+        await self._start_receiving_updates()
+
+        # Refresco de salud y barrido del rate limiter en segundo plano
+        self.health_monitor.start()
+        self.security_agent.rate_limit_backend.start()
+        self.security_state.start()
+        self.allowlist.start()
+        self.token_quota.start()
+        self.update_deduplicator.start()
+        self.pending_store.start()
+        self.send_scheduler.start()
+        self.confirmation_workers.start()
+
+        # SIGHUP recarga la whitelist de inmediato; SIGINT y SIGTERM
+        # detienen el bot (no disponible en Windows)
+        stop_event = asyncio.Event()
+        loop = asyncio.get_running_loop()
+        try:
+            loop.add_signal_handler(signal.SIGHUP, self.allowlist.notify)
+            for sig in (signal.SIGINT, signal.SIGTERM):
+                loop.add_signal_handler(sig, stop_event.set)
+        except (AttributeError, NotImplementedError):
+            pass
 
         logger.info("telegram_bot_running")
 
-        # Mantener el bot corriendo
+        # Mantener el bot corriendo hasta una señal (o una cancelación)
         try:
-            await asyncio.Event().wait()
-        except (KeyboardInterrupt, SystemExit):
-            logger.info("shutting_down_telegram_bot")
-            await self.application.stop()
+            await stop_event.wait()
+        finally:
+            await self.shutdown()
+
+    async def shutdown(self) -> None:
+        """
+        Detiene el bot y sus componentes en segundo plano.
+
+        Primero deja de recibir updates y termina los handlers en curso;
+        después vacía los guardados y envíos pendientes, y al final
+        detiene los almacenes de estado, que escriben su último estado en
+        la BD. Un paso que falla se registra y no impide los siguientes.
+        """
+        logger.info("shutting_down_telegram_bot")
+
+        steps = []
+        if self.application.updater is not None and self.application.updater.running:
+            steps.append(("updater", self.application.updater.stop))
+        if self.webhook_server is not None:
+            steps.append(("webhook_server", self.webhook_server.stop))
+        steps += [
+            ("application", self.application.stop),
+            # Después de la Application: los handlers en curso aún envían,
+            # y los guardados pendientes editan sus mensajes
+            ("confirmation_workers", self.confirmation_workers.stop),
+            ("send_scheduler", self.send_scheduler.stop),
+            ("security_state", self.security_state.stop),
+            ("token_quota", self.token_quota.stop),
+            ("update_deduplicator", self.update_deduplicator.stop),
+            ("pending_store", self.pending_store.stop),
+            ("allowlist", self.allowlist.stop),
+            ("rate_limit_backend", self.security_agent.rate_limit_backend.stop),
+            ("health_monitor", self.health_monitor.stop),
+        ]
+
+        for component, stop in steps:
+            try:
+                await stop()
+            except Exception as e:
+                logger.error(
+                    "shutdown_step_failed",
+                    component=component,
+                    error=str(e),
+                    error_type=type(e).__name__
+                )
+
+        logger.info("telegram_bot_stopped")
 
 
 async def main() -> None:
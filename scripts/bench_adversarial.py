@@ -0,0 +1,204 @@
+#!/usr/bin/env python3
+"""
+Benchmark de peor caso con entradas adversariales.
+
+Genera un corpus de mensajes diseñados para provocar backtracking o
+trabajo cuadrático en cada etapa del pipeline (validación, sanitización,
+extracción local, normalización de teléfonos, validación del contacto
+y parseo de la respuesta del LLM) y mide el peor tiempo de cada etapa.
+Cada etapa tiene un presupuesto por mensaje; si el peor caso lo supera,
+el benchmark termina con código de salida 1.
+
+Uso:
+    python scripts/bench_adversarial.py [--repeat 5] [--scale 1.0]
+"""
+
+import argparse
+import sys
+import time
+from pathlib import Path
+from typing import Callable, Dict, List, Tuple
+
+# Agregar directorio raíz al path
+root_dir = Path(__file__).parent.parent
+sys.path.insert(0, str(root_dir))
+
+from src.utils.logger import configure_logging
+from src.utils.helpers import DataSanitizer
+from src.utils.phone import parse_phone
+from src.services.gemini_service import GeminiService
+from src.services.local_extractor import LocalContactExtractor
+from src.validators.contact_validator import ContactValidator
+from src.validators.message_validator import MessageValidator
+
+configure_logging(log_level="CRITICAL", log_format="console")
+
+# Límite de Telegram para un mensaje de texto
+TELEGRAM_MAX_LENGTH = 4096
+# Respuesta máxima del LLM (max_tokens=1024, ~4 caracteres por token)
+LLM_MAX_LENGTH = 4096
+
+# Presupuesto de peor caso por mensaje, en milisegundos
+BUDGETS_MS = {
+    "message_validator": 0.5,
+    "sanitizer": 3.0,
+    # Mismo presupuesto por carácter que sanitizer (mensajes de 4096)
+    "sanitizer_raw": 12.0,
+    "local_extractor": 60.0,
+    "phone_parser": 0.5,
+    "contact_validator": 1.0,
+    "llm_json_parser": 2.0,
+}
+
+# Prefijos que abren un patrón sin cerrarlo: cada repetición es un
+# nuevo punto de partida para el motor de regex
+UNCLOSED = [
+    "<script", "<script>", "<SCRIPT x>", "${", "{{", "{{}", "${{", "{", "on", "onx",
+    "onclick ", "javascript", "<iframe", "<", "$", "```", "\"", "\\",
+]
+# Cierre de todos los patrones: obliga a recorrer todo antes de coincidir
+CLOSE = "}}</script>="
+
+
+def _repeat_to(piece: str, length: int) -> str:
+    """Repite un fragmento hasta la longitud indicada."""
+    return (piece * (length // len(piece) + 1))[:length]
+
+
+def message_corpus(length: int) -> List[Tuple[str, str]]:
+    """Mensajes adversariales de la longitud indicada."""
+    corpus = []
+    for piece in UNCLOSED:
+        corpus.append((f"repeat {piece!r}", _repeat_to(piece, length)))
+        corpus.append((
+            f"repeat {piece!r} + close",
+            _repeat_to(piece, length - len(CLOSE)) + CLOSE
+        ))
+    corpus.extend([
+        ("digits", _repeat_to("3", length)),
+        ("digit groups", _repeat_to("300 ", length)),
+        ("plus digits", _repeat_to("+5", length)),
+        ("words", _repeat_to("Juan ", length)),
+        ("accents", _repeat_to("ñáéíóú ", length)),
+        ("punctuation", _repeat_to(".,;-()", length)),
+        ("whitespace", " " * (length - 1) + "x"),
+        ("newlines", _repeat_to("<script>\n", length)),
+        ("emoji", _repeat_to("📞", length)),
+    ])
+    return corpus
+
+
+def llm_corpus(length: int) -> List[Tuple[str, str]]:
+    """Respuestas del LLM adversariales (JSON inválido o truncado)."""
+    return [
+        ("open braces", _repeat_to("{", length)),
+        ("open braces + close", _repeat_to("{", length - 1) + "}"),
+        ("nested", _repeat_to("{\"a\":", length)),
+        ("fences", "```json\n" + _repeat_to("{\"a\": ", length - 12) + "\n```"),
+        ("text then brace", _repeat_to("texto ", length - 1) + "{"),
+        ("quotes", _repeat_to("\"", length)),
+    ]
+
+
+def _trained_extractor() -> LocalContactExtractor:
+    """Extractor entrenado con ejemplos sintéticos."""
+    nombres = ["Juan Pérez", "Ana Ruiz", "Carlos Gómez", "Luisa Díaz"]
+    telefonos = ["3001234567", "315 789 4561", "320-555-1234"]
+    plantillas = ["{n} {p} recomendado por {r}", "{n} tel {p} ref {r}"]
+    examples = []
+    for i, plantilla in enumerate(plantillas):
+        for j, nombre in enumerate(nombres):
+            telefono = telefonos[(i + j) % len(telefonos)]
+            referido = nombres[(j + 1) % len(nombres)]
+            examples.append({
+                "text": plantilla.format(n=nombre, p=telefono, r=referido),
+                "nombre": nombre,
+                "telefono": "+57" + "".join(c for c in telefono if c.isdigit()),
+                "quien_lo_recomendo": referido,
+            })
+    extractor = LocalContactExtractor()
+    extractor.train(examples, iterations=3)
+    return extractor
+
+
+def build_stages() -> Dict[str, Tuple[Callable[[str], object], List[Tuple[str, str]]]]:
+    """Etapas a medir con su corpus."""
+    message_validator = MessageValidator()
+    contact_validator = ContactValidator()
+    extractor = _trained_extractor()
+    llm = GeminiService(api_key="bench")
+
+    max_length = message_validator.max_length
+    # El validador recibe el mensaje tal como llega de Telegram; el resto
+    # de etapas solo ve mensajes que el validador aceptó. Sin el check
+    # message_format (SecurityAgent.CHECKS es configurable) el sanitizador
+    # recibe el mensaje completo: sanitizer_raw
+    raw = message_corpus(TELEGRAM_MAX_LENGTH)
+    accepted = message_corpus(max_length)
+
+    def validate(text):
+        return message_validator.validate({"text": text, "user_id": 1, "chat_id": 1})
+
+    def validate_contact(text):
+        return contact_validator.validate({
+            "nombre": text[:255],
+            "telefono": text[:20],
+            "quien_lo_recomendo": text[:255],
+        })
+
+    return {
+        "message_validator": (validate, raw),
+        "sanitizer": (DataSanitizer.inspect, accepted),
+        "sanitizer_raw": (DataSanitizer.inspect, raw),
+        "local_extractor": (extractor.extract, accepted),
+        "phone_parser": (parse_phone, accepted),
+        "contact_validator": (validate_contact, accepted),
+        "llm_json_parser": (llm._parse_json_response, llm_corpus(LLM_MAX_LENGTH)),
+    }
+
+
+def worst_case(
+    func: Callable[[str], object],
+    corpus: List[Tuple[str, str]],
+    repeat: int
+) -> Tuple[float, str]:
+    """Peor tiempo (ms, mejor de `repeat` por entrada) y la entrada que lo causó."""
+    worst, worst_name = 0.0, ""
+    for name, text in corpus:
+        best = float("inf")
+        for _ in range(repeat):
+            started = time.perf_counter()
+            func(text)
+            best = min(best, time.perf_counter() - started)
+        if best > worst:
+            worst, worst_name = best, name
+    return worst * 1000, worst_name
+
+
+def main() -> int:
+    """Ejecuta el benchmark; retorna 1 si alguna etapa excede su presupuesto."""
+    parser = argparse.ArgumentParser(description="Benchmark de peor caso")
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument(
+        "--scale", type=float, default=1.0,
+        help="Multiplica los presupuestos (máquinas lentas o CI)"
+    )
+    args = parser.parse_args()
+
+    failed = False
+    print(f"{'etapa':<20} {'peor caso':>10} {'presupuesto':>12}  entrada")
+    for stage, (func, corpus) in build_stages().items():
+        elapsed_ms, name = worst_case(func, corpus, args.repeat)
+        budget_ms = BUDGETS_MS[stage] * args.scale
+        status = "OK" if elapsed_ms <= budget_ms else "EXCEDIDO"
+        failed = failed or elapsed_ms > budget_ms
+        print(
+            f"{stage:<20} {elapsed_ms:8.3f}ms {budget_ms:10.3f}ms  "
+            f"{name} [{status}]"
+        )
+
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,165 @@
+#!/usr/bin/env python3
+"""
+Entrega de un contacto guardado: sendContact vs vCard como documento.
+
+Levanta una API de Telegram falsa en localhost y envía el mismo contacto
+con TelegramService en cada modo de entrega ("contact", "document" y
+"both"). La API falsa cuenta los bytes de cada request (headers y
+cuerpo) y simula la red: RTT/2 en cada sentido más el tiempo de subida
+del request con el ancho de banda indicado.
+
+Mide por modo: bytes enviados por contacto, requests por contacto y la
+latencia p50/p99 de send_contact_with_vcard_and_button.
+
+Uso:
+    python scripts/bench_contact_delivery.py [--n 200] [--rtt-ms 40] [--uplink-kbps 1000]
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import sys
+import time
+from pathlib import Path
+
+# Agregar directorio raíz al path
+root_dir = Path(__file__).parent.parent
+sys.path.insert(0, str(root_dir))
+
+import structlog
+from telegram import Bot
+
+from src.services.telegram_service import CONTACT_DELIVERY_MODES, TelegramService
+from src.services.webhook_server import read_request, write_response
+from src.utils.logger import configure_logging
+
+configure_logging(log_level="WARNING", log_format="json")
+structlog.configure(logger_factory=structlog.PrintLoggerFactory(open(os.devnull, "w")))
+
+TOKEN = "123456:bench"
+CHAT = {"id": 1, "type": "private"}
+CONTACT = {
+    "nombre": "Juan Sebastián Pérez García",
+    "telefono": "+573001234567",
+    "quien_lo_recomendo": "María Fernanda López",
+}
+
+
+class FakeTelegramAPI:
+    """API de Telegram mínima que cuenta bytes y simula RTT y ancho de banda."""
+
+    def __init__(self, one_way_delay, uplink_bytes_per_second):
+        self.one_way_delay = one_way_delay
+        self.uplink_bytes_per_second = uplink_bytes_per_second
+        self.requests = 0
+        self.bytes_received = 0
+        self._server = None
+        self.port = None
+
+    async def start(self):
+        self._server = await asyncio.start_server(self._handle, "127.0.0.1", 0)
+        self.port = self._server.sockets[0].getsockname()[1]
+
+    async def stop(self):
+        self._server.close()
+
+    def reset(self):
+        self.requests = 0
+        self.bytes_received = 0
+
+    @staticmethod
+    def _result(method):
+        if method == "getMe":
+            return {"id": 123456, "is_bot": True, "first_name": "Bench", "username": "bench_bot"}
+        message = {"message_id": 1, "date": int(time.time()), "chat": CHAT}
+        if method == "sendContact":
+            message["contact"] = {"phone_number": "573001234567", "first_name": "Juan"}
+        elif method == "sendDocument":
+            message["document"] = {"file_id": "BQAC", "file_unique_id": "AgAD"}
+        return message
+
+    async def _handle(self, reader, writer):
+        try:
+            while True:
+                request = await read_request(reader)
+                if request is None:
+                    break
+
+                size = len(request.body) + sum(
+                    len(name) + len(value) + 4 for name, value in request.headers.items()
+                )
+                self.requests += 1
+                self.bytes_received += size
+
+                # El request viaja (y se sube) del bot a Telegram
+                await asyncio.sleep(self.one_way_delay + size / self.uplink_bytes_per_second)
+
+                method = request.path.rsplit("/", 1)[-1]
+                body = json.dumps({"ok": True, "result": self._result(method)}).encode()
+
+                # La respuesta viaja de Telegram al bot
+                await asyncio.sleep(self.one_way_delay)
+                await write_response(writer, 200, body, content_type="application/json")
+        except (ConnectionError, asyncio.IncompleteReadError, asyncio.CancelledError):
+            pass
+        finally:
+            writer.close()
+
+
+async def run_mode(api, mode, n):
+    """Latencias (s) de entregar `n` veces el contacto en un modo."""
+    service = TelegramService(bot_token=TOKEN, contact_delivery=mode)
+    service.bot = Bot(TOKEN, base_url=f"http://127.0.0.1:{api.port}/bot")
+    await service.bot.initialize()
+
+    # Calentar la conexión (no se mide)
+    await service.send_contact_with_vcard_and_button(1, **CONTACT, confirmation_message="")
+    api.reset()
+
+    latencies = []
+    for _ in range(n):
+        started = time.perf_counter()
+        sent = await service.send_contact_with_vcard_and_button(
+            1, **CONTACT, confirmation_message=""
+        )
+        latencies.append(time.perf_counter() - started)
+        assert sent
+
+    await service.bot.shutdown()
+    return latencies
+
+
+def percentile(values, q):
+    values = sorted(values)
+    return values[min(len(values) - 1, int(q * len(values)))]
+
+
+async def main() -> None:
+    """Ejecuta el benchmark e imprime bytes y latencias por modo."""
+    parser = argparse.ArgumentParser(description="Benchmark de entrega de contactos")
+    parser.add_argument("--n", type=int, default=200)
+    parser.add_argument("--rtt-ms", type=float, default=40.0)
+    parser.add_argument("--uplink-kbps", type=float, default=1000.0)
+    args = parser.parse_args()
+
+    api = FakeTelegramAPI(args.rtt_ms / 2000, args.uplink_kbps * 1000 / 8)
+    await api.start()
+
+    print(f"RTT {args.rtt_ms:g} ms, subida {args.uplink_kbps:g} kbit/s, {args.n} contactos")
+    print(f"{'modo':<10} {'requests':>9} {'bytes':>8} {'p50':>9} {'p99':>9}")
+    for mode in CONTACT_DELIVERY_MODES:
+        latencies = await run_mode(api, mode, args.n)
+        print(
+            f"{mode:<10} "
+            f"{api.requests / args.n:>9.1f} "
+            f"{api.bytes_received / args.n:>8.0f} "
+            f"{percentile(latencies, 0.5) * 1000:>7.1f}ms "
+            f"{percentile(latencies, 0.99) * 1000:>7.1f}ms"
+        )
+
+    await api.stop()
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
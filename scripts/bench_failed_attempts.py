@@ -0,0 +1,115 @@
+#!/usr/bin/env python3
+"""
+Benchmark de flood de intentos fallidos.
+
+Simula un flood no autenticado desde millones de cuentas aleatorias y
+mide la memoria retenida por el `defaultdict(int)` anterior frente a
+FailedAttemptsTracker (LRU acotado + count-min sketch). La memoria del
+tracker se mide en varios puntos del flood para mostrar que se estabiliza
+en su techo teórico en lugar de crecer con el número de IDs.
+
+Uso:
+    python scripts/bench_failed_attempts.py [--ids 2000000]
+"""
+
+import argparse
+import gc
+import random
+import sys
+import tracemalloc
+from collections import defaultdict
+from pathlib import Path
+from time import perf_counter
+
+# Agregar directorio raíz al path
+root_dir = Path(__file__).parent.parent
+sys.path.insert(0, str(root_dir))
+
+from src.utils.logger import configure_logging
+from src.utils.failure_tracker import FailedAttemptsTracker
+
+configure_logging(log_level="WARNING", log_format="console")
+
+CHECKPOINTS = 4
+
+
+def flood_ids(count: int, seed: int = 42):
+    """IDs aleatorios de Telegram (64 bits positivos)."""
+    rng = random.Random(seed)
+    return [rng.randrange(1, 2**52) for _ in range(count)]
+
+
+def run(name: str, factory, ids):
+    """
+    Ejecuta el flood dos veces sobre instancias nuevas: una sin tracemalloc
+    para medir el tiempo por intento y otra con tracemalloc para reportar
+    la memoria retenida en cada checkpoint.
+    """
+    record = factory()
+    gc.collect()
+    started = perf_counter()
+    for user_id in ids:
+        record(user_id)
+    elapsed = perf_counter() - started
+    del record
+
+    record = factory()
+    gc.collect()
+    tracemalloc.start()
+    step = len(ids) // CHECKPOINTS
+
+    readings = []
+    for index, user_id in enumerate(ids, start=1):
+        record(user_id)
+        if index % step == 0:
+            current, _ = tracemalloc.get_traced_memory()
+            readings.append(f"{index:>10,} ids: {current / 2**20:7.1f} MiB")
+
+    tracemalloc.stop()
+
+    print(f"{name} ({elapsed * 1e9 / len(ids):.0f} ns/intento)")
+    for reading in readings:
+        print(f"  {reading}")
+    return record
+
+
+def main() -> None:
+    """Ejecuta el benchmark e imprime los resultados."""
+    parser = argparse.ArgumentParser(description="Benchmark de flood")
+    parser.add_argument("--ids", type=int, default=2_000_000)
+    parser.add_argument("--max-tracked", type=int, default=10_000)
+    args = parser.parse_args()
+
+    ids = flood_ids(args.ids)
+    print(f"Flood de {args.ids:,} IDs distintos (tracemalloc activo)\n")
+
+    def legacy_factory():
+        legacy = defaultdict(int)
+
+        def record(user_id):
+            legacy[user_id] += 1
+        return record
+
+    run("legacy defaultdict(int)", legacy_factory, ids)
+    gc.collect()
+
+    # El tracker se crea antes de medir: su sketch es memoria fija
+    sketch_mib = FailedAttemptsTracker().sketch.memory_bytes / 2**20
+    run(
+        "FailedAttemptsTracker.add_unknown",
+        lambda: FailedAttemptsTracker(max_tracked=args.max_tracked).add_unknown,
+        ids
+    )
+    print(f"  + sketch preasignado: {sketch_mib:.1f} MiB (fijo)")
+
+    # Peor caso para el LRU: IDs conocidos todos distintos
+    record = run(
+        "FailedAttemptsTracker.add (LRU)",
+        lambda: FailedAttemptsTracker(max_tracked=args.max_tracked).add,
+        ids
+    )
+    tracked = len(record.__self__)
+    print(f"  entradas en el LRU: {tracked:,} (máximo {args.max_tracked:,})")
+
+if __name__ == "__main__":
+    main()
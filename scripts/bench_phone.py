@@ -0,0 +1,75 @@
+#!/usr/bin/env python3
+"""
+Microbenchmark de normalización de teléfonos.
+
+Compara la implementación anterior basada en regex (la que usaban
+Contact, ContactValidator y GeminiService) con src.utils.phone, tanto
+número a número como en lote. Antes cada mensaje pasaba por las tres
+implementaciones; ahora el resultado de una sola normalización es
+equivalente para las tres.
+
+Uso:
+    python scripts/bench_phone.py [--n 200000]
+"""
+
+import argparse
+import re
+import sys
+import timeit
+from pathlib import Path
+
+# Agregar directorio raíz al path
+root_dir = Path(__file__).parent.parent
+sys.path.insert(0, str(root_dir))
+
+from src.utils.logger import configure_logging
+from src.utils.phone import parse_phone, normalize_phones
+
+configure_logging(log_level="WARNING", log_format="console")
+
+SAMPLES = [
+    "3001234567",
+    "300 123 4567",
+    "300-123-4567",
+    "+57 315-789-4561",
+    "(601) 234 5678",
+    "+1 (212) 555-1234",
+]
+
+
+def legacy_validate_and_normalize(value: str) -> str:
+    """Implementación anterior: validación + normalización con regex."""
+    cleaned = re.sub(r"[^\d+]", "", value)
+    digits_only = cleaned.replace("+", "")
+    if len(digits_only) < 10 or len(digits_only) > 15:
+        raise ValueError("longitud inválida")
+    if not cleaned.startswith("+"):
+        cleaned = "+57" + cleaned
+    return cleaned
+
+
+def main() -> None:
+    """Ejecuta el benchmark e imprime ns por número."""
+    parser = argparse.ArgumentParser(description="Benchmark de normalización")
+    parser.add_argument("--n", type=int, default=200_000)
+    args = parser.parse_args()
+
+    batch = SAMPLES * (args.n // len(SAMPLES))
+    # Lote sin repetidos para no medir solo la caché de normalize_phones
+    unique_batch = [f"3{i:09d}" for i in range(len(batch))]
+
+    cases = {
+        "legacy regex (por número)": lambda: [legacy_validate_and_normalize(v) for v in batch],
+        "parse_phone (por número)": lambda: [parse_phone(v) for v in batch],
+        "normalize_phones (lote)": lambda: normalize_phones(unique_batch),
+        "normalize_phones (lote, repetidos)": lambda: normalize_phones(batch),
+    }
+
+    print(f"{len(batch)} números por corrida\n")
+    for name, func in cases.items():
+        best = min(timeit.repeat(func, number=1, repeat=3))
+        print(f"{name:<36} {best * 1e9 / len(batch):8.0f} ns/número")
+
+
+if __name__ == "__main__":
+    main()
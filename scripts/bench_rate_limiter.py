@@ -0,0 +1,107 @@
+#!/usr/bin/env python3
+"""
+Benchmark del rate limiter con millones de usuarios distintos.
+
+Compara la implementación anterior (lista de timestamps por usuario en
+un defaultdict) con el limitador GCRA de src.utils.rate_limiter:
+tiempo por verificación, memoria retenida y costo del barrido de
+usuarios inactivos.
+
+Uso:
+    python scripts/bench_rate_limiter.py [--users 2000000]
+"""
+
+import argparse
+import asyncio
+import gc
+import sys
+import tracemalloc
+from collections import defaultdict
+from pathlib import Path
+from time import perf_counter, time
+
+# Agregar directorio raíz al path
+root_dir = Path(__file__).parent.parent
+sys.path.insert(0, str(root_dir))
+
+from src.utils.logger import configure_logging
+from src.utils.rate_limiter import RateLimiter
+
+configure_logging(log_level="WARNING", log_format="console")
+
+
+class LegacyRateLimiter:
+    """Implementación anterior: ventana deslizante con listas."""
+
+    def __init__(self, max_requests: int = 10, window_seconds: int = 60):
+        self.max_requests = max_requests
+        self.window_seconds = window_seconds
+        self.requests = defaultdict(list)
+
+    def is_allowed(self, user_id: int) -> bool:
+        now = time()
+        window_start = now - self.window_seconds
+        self.requests[user_id] = [
+            timestamp for timestamp in self.requests[user_id]
+            if timestamp > window_start
+        ]
+        if len(self.requests[user_id]) >= self.max_requests:
+            return False
+        self.requests[user_id].append(now)
+        return True
+
+
+def measure(limiter, user_ids, calls_per_user: int):
+    """Ejecuta is_allowed y devuelve (ns por llamada, MiB retenidos)."""
+    gc.collect()
+    tracemalloc.start()
+    started = perf_counter()
+    for _ in range(calls_per_user):
+        for user_id in user_ids:
+            limiter.is_allowed(user_id)
+    elapsed = perf_counter() - started
+    retained, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    calls = len(user_ids) * calls_per_user
+    return elapsed * 1e9 / calls, retained / 2**20
+
+
+def main() -> None:
+    """Ejecuta el benchmark e imprime los resultados."""
+    parser = argparse.ArgumentParser(description="Benchmark del rate limiter")
+    parser.add_argument("--users", type=int, default=2_000_000)
+    parser.add_argument("--calls-per-user", type=int, default=3)
+    args = parser.parse_args()
+
+    user_ids = range(10**9, 10**9 + args.users)
+    print(
+        f"{args.users:,} usuarios distintos x {args.calls_per_user} "
+        "requests (tracemalloc activo: los tiempos son relativos)\n"
+    )
+
+    for name, limiter in (
+        ("legacy (listas)", LegacyRateLimiter()),
+        ("gcra (un float)", RateLimiter()),
+    ):
+        ns_per_call, mib = measure(limiter, user_ids, args.calls_per_user)
+        print(f"{name:<18} {ns_per_call:8.0f} ns/llamada {mib:10.1f} MiB retenidos")
+        del limiter
+        gc.collect()
+
+    # Barrido de inactivos: todas las entradas vencidas
+    limiter = RateLimiter(window_seconds=1)
+    for user_id in user_ids:
+        limiter.is_allowed(user_id)
+    limiter.tat.update((user_id, 0.0) for user_id in user_ids)
+
+    started = perf_counter()
+    evicted = asyncio.run(limiter._evict_incrementally())
+    elapsed = perf_counter() - started
+    print(
+        f"\nbarrido incremental: {evicted:,} entradas en {elapsed:.2f}s "
+        f"({limiter.eviction_batch_size:,} por paso del event loop)"
+    )
+
+
+if __name__ == "__main__":
+    main()
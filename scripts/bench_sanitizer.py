@@ -0,0 +1,85 @@
+#!/usr/bin/env python3
+"""
+Microbenchmark de sanitización de mensajes.
+
+Compara la implementación anterior de SecurityAgent (html.escape seguido
+de 8 re.sub sin compilar, más un re.search por patrón sobre el texto
+original) con DataSanitizer.inspect, que detecta y remueve en una sola
+pasada con una regex combinada precompilada.
+
+Uso:
+    python scripts/bench_sanitizer.py [--n 20000]
+"""
+
+import argparse
+import html
+import re
+import sys
+import timeit
+from pathlib import Path
+
+# Agregar directorio raíz al path
+root_dir = Path(__file__).parent.parent
+sys.path.insert(0, str(root_dir))
+
+from src.utils.logger import configure_logging
+from src.utils.helpers import DataSanitizer
+
+configure_logging(log_level="ERROR", log_format="console")
+
+REALISTIC = [
+    "Juan Pérez 3001234567 recomendado por María López",
+    "Te paso el contacto del plomero: Carlos Ruiz, +57 315-789-4561. Me lo recomendó Ana",
+    "Electricista Pedro Gómez (601) 234 5678, referido por el vecino del 502",
+]
+
+# Mensajes de longitud máxima (1000 caracteres), seguro e inseguro
+MAX_SAFE = ("Juan Pérez 3001234567 recomendado por María López. " * 20)[:1000]
+MAX_UNSAFE = (MAX_SAFE[:900] + "<script>alert(1)</script>" + MAX_SAFE)[:1000]
+
+
+def legacy_process(text: str):
+    """Implementación anterior: sanitize() + is_safe() por separado."""
+    sanitized = html.escape(text)
+    for pattern in DataSanitizer.DANGEROUS_PATTERNS:
+        sanitized = re.sub(pattern, '', sanitized, flags=re.IGNORECASE)
+    sanitized = sanitized[:1000].strip()
+
+    safe = True
+    for pattern in DataSanitizer.DANGEROUS_PATTERNS:
+        if re.search(pattern, text, re.IGNORECASE):
+            safe = False
+            break
+    return sanitized, safe
+
+
+def main() -> None:
+    """Ejecuta el benchmark e imprime µs por mensaje."""
+    parser = argparse.ArgumentParser(description="Benchmark de sanitización")
+    parser.add_argument("--n", type=int, default=20_000)
+    args = parser.parse_args()
+
+    cases = {
+        "realistas": REALISTIC,
+        "1000 chars, seguro": [MAX_SAFE],
+        "1000 chars, inseguro": [MAX_UNSAFE],
+    }
+
+    print(f"{args.n} mensajes por corrida (mejor de 3)\n")
+    print(f"{'caso':<22} {'legacy':>10} {'inspect':>10} {'speedup':>8}")
+    for name, samples in cases.items():
+        batch = samples * (args.n // len(samples))
+        legacy = min(timeit.repeat(
+            lambda: [legacy_process(text) for text in batch], number=1, repeat=3
+        ))
+        combined = min(timeit.repeat(
+            lambda: [DataSanitizer.inspect(text) for text in batch], number=1, repeat=3
+        ))
+        print(
+            f"{name:<22} {legacy * 1e6 / len(batch):8.2f}µs "
+            f"{combined * 1e6 / len(batch):8.2f}µs {legacy / combined:7.1f}x"
+        )
+
+
+if __name__ == "__main__":
+    main()
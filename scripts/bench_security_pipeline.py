@@ -0,0 +1,107 @@
+#!/usr/bin/env python3
+"""
+Costo de CPU por mensaje del pipeline de SecurityAgent.
+
+Usa como carga los fixtures de tests/conftest.py (mensaje de Telegram y
+respuestas de Gemini) más los casos de rechazo de los tests unitarios
+(usuario no autorizado, bloqueado, mensaje corto, patrón peligroso y
+falla de extracción). Gemini se reemplaza por un stub que retorna el
+fixture de inmediato, así que solo se mide el trabajo propio del
+pipeline, con logging INFO en JSON (como en producción) hacia /dev/null.
+
+Uso:
+    python scripts/bench_security_pipeline.py [--n 20000]
+"""
+
+import argparse
+import asyncio
+import os
+import sys
+import time
+from pathlib import Path
+
+# Agregar directorio raíz al path
+root_dir = Path(__file__).parent.parent
+sys.path.insert(0, str(root_dir))
+
+import structlog
+
+from src.agents.security_agent import SecurityAgent
+from src.utils.logger import configure_logging
+from tests import conftest
+
+configure_logging(log_level="INFO", log_format="json")
+structlog.configure(logger_factory=structlog.PrintLoggerFactory(open(os.devnull, "w")))
+
+AUTHORIZED = conftest.sample_telegram_message.__wrapped__()["user_id"]
+BLOCKED = 111111111
+
+
+class StubGemini:
+    """Stub de GeminiService que retorna un fixture sin I/O."""
+
+    def __init__(self, response):
+        self.response = response
+
+    async def extract_contact_info(self, text, deadline=None):
+        return self.response
+
+
+def workload():
+    """Casos (nombre, mensaje, respuesta de Gemini) de los tests unitarios."""
+    message = conftest.sample_telegram_message.__wrapped__()
+    success = conftest.mock_gemini_response_success.__wrapped__()
+    failure = conftest.mock_gemini_response_failure.__wrapped__()
+
+    def variant(**changes):
+        return {**message, **changes}
+
+    return [
+        ("exitoso", message, success),
+        ("falla de extracción", message, failure),
+        ("no autorizado", variant(user_id=999999999, text="Test message"), success),
+        ("bloqueado", variant(user_id=BLOCKED, text="Test message"), success),
+        ("mensaje corto", variant(text="Hi"), success),
+        ("patrón peligroso", variant(text="Juan <script>x</script> 3001234567"), success),
+    ]
+
+
+async def measure(name, message, response, n):
+    """CPU por mensaje (µs) procesando `n` veces el mismo caso."""
+    agent = SecurityAgent(
+        gemini_service=StubGemini(response),
+        allowed_users=[AUTHORIZED, BLOCKED],
+        # Sin rate limit efectivo: se mide el pipeline completo
+        max_requests=10 * n,
+        max_failed_attempts=10 * n
+    )
+    agent.block_user(BLOCKED)
+
+    started = time.process_time()
+    for _ in range(n):
+        await agent.process_request(message)
+    elapsed = time.process_time() - started
+
+    return elapsed * 1e6 / n
+
+
+async def main() -> None:
+    """Ejecuta el benchmark e imprime µs de CPU por mensaje."""
+    parser = argparse.ArgumentParser(description="Benchmark del pipeline de seguridad")
+    parser.add_argument("--n", type=int, default=20_000)
+    args = parser.parse_args()
+
+    cases = workload()
+    results = []
+    for name, message, response in cases:
+        results.append((name, await measure(name, message, response, args.n)))
+
+    print(f"{args.n} mensajes por caso (CPU de proceso)\n")
+    for name, micros in results:
+        print(f"{name:<22} {micros:8.1f} µs/mensaje")
+    mean = sum(micros for _, micros in results) / len(results)
+    print(f"{'promedio':<22} {mean:8.1f} µs/mensaje")
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,306 @@
+#!/usr/bin/env python3
+"""
+Latencia de recepción de updates: long polling vs webhook.
+
+Levanta una API de Telegram falsa en localhost que entrega updates de
+dos formas:
+
+- polling: responde el getUpdates pendiente (long polling de
+  python-telegram-bot contra la API falsa).
+- webhook: hace un POST al WebhookServer del bot por conexiones
+  keep-alive (hasta 40, como max_connections de setWebhook).
+
+La red entre Telegram y el bot se simula con un retardo de RTT/2 en cada
+sentido. En ambos modos el update termina en la cola de la Application
+y lo recibe un handler; se mide desde que el update "llega a Telegram"
+hasta que el handler lo recibe, en dos escenarios:
+
+- sueltos: un update por vez (siempre hay un getUpdates esperando).
+- flujo: un update cada --interval-ms; con polling, los que llegan
+  mientras no hay un getUpdates pendiente esperan al siguiente ciclo.
+
+Uso:
+    python scripts/bench_update_ingestion.py [--n 300] [--rtt-ms 40] [--interval-ms 5]
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import sys
+import time
+from pathlib import Path
+from urllib.parse import parse_qs
+
+# Agregar directorio raíz al path
+root_dir = Path(__file__).parent.parent
+sys.path.insert(0, str(root_dir))
+
+import structlog
+from telegram import Update
+from telegram.ext import Application, TypeHandler
+
+from src.services.webhook_server import WebhookServer, read_request, write_response
+from src.utils.logger import configure_logging
+
+configure_logging(log_level="WARNING", log_format="json")
+structlog.configure(logger_factory=structlog.PrintLoggerFactory(open(os.devnull, "w")))
+
+TOKEN = "123456:bench"
+SECRET = "bench-secret"
+BOT_USER = {"id": 123456, "is_bot": True, "first_name": "Bench", "username": "bench_bot"}
+
+
+def make_update(update_id):
+    """Update de mensaje de texto con el formato de la Bot API."""
+    return {
+        "update_id": update_id,
+        "message": {
+            "message_id": update_id,
+            "date": int(time.time()),
+            "chat": {"id": 1, "type": "private"},
+            "from": {"id": 1, "is_bot": False, "first_name": "Juan"},
+            "text": "Juan Pérez 3001234567 ref María",
+        },
+    }
+
+
+class FakeTelegramAPI:
+    """API de Telegram mínima: getMe, getUpdates (long polling) y el resto en True."""
+
+    def __init__(self, one_way_delay):
+        self.one_way_delay = one_way_delay
+        self.updates = []
+        self._new_update = asyncio.Event()
+        self._server = None
+        self.port = None
+
+    async def start(self):
+        self._server = await asyncio.start_server(self._handle, "127.0.0.1", 0)
+        self.port = self._server.sockets[0].getsockname()[1]
+
+    async def stop(self):
+        self._server.close()
+
+    def emit(self, update):
+        """Deja un update disponible para el getUpdates pendiente."""
+        self.updates.append(update)
+        self._new_update.set()
+
+    async def _get_updates(self, params):
+        offset = int(params.get("offset", 0))
+        timeout = float(params.get("timeout", 0))
+        self.updates = [update for update in self.updates if update["update_id"] >= offset]
+
+        if not self.updates and timeout:
+            self._new_update.clear()
+            try:
+                await asyncio.wait_for(self._new_update.wait(), timeout)
+            except asyncio.TimeoutError:
+                pass
+
+        return list(self.updates)
+
+    async def _handle(self, reader, writer):
+        try:
+            while True:
+                request = await read_request(reader)
+                if request is None:
+                    break
+                # El request viaja del bot a Telegram
+                await asyncio.sleep(self.one_way_delay)
+
+                method = request.path.rsplit("/", 1)[-1]
+                params = {
+                    key: values[0]
+                    for key, values in parse_qs(request.body.decode()).items()
+                }
+
+                if method == "getMe":
+                    result = BOT_USER
+                elif method == "getUpdates":
+                    result = await self._get_updates(params)
+                else:
+                    result = True
+
+                # La respuesta viaja de Telegram al bot
+                await asyncio.sleep(self.one_way_delay)
+                body = json.dumps({"ok": True, "result": result}).encode()
+                await write_response(writer, 200, body, content_type="application/json")
+        except (ConnectionError, asyncio.IncompleteReadError, asyncio.CancelledError):
+            # CancelledError: getUpdates pendiente al terminar el benchmark
+            pass
+        finally:
+            writer.close()
+
+
+class WebhookSender:
+    """Lado de Telegram del webhook: POSTs por conexiones keep-alive."""
+
+    def __init__(self, port, one_way_delay, connections=40):
+        self.port = port
+        self.one_way_delay = one_way_delay
+        self.connections = connections
+        self._idle = asyncio.Queue()
+        self._opened = 0
+        self._tasks = set()
+
+    async def _connection(self):
+        if self._idle.empty() and self._opened < self.connections:
+            self._opened += 1
+            return await asyncio.open_connection("127.0.0.1", self.port)
+        return await self._idle.get()
+
+    async def _post(self, update):
+        body = json.dumps(update).encode()
+        head = (
+            "POST /telegram HTTP/1.1\r\n"
+            "Host: bot\r\n"
+            "Content-Type: application/json\r\n"
+            f"X-Telegram-Bot-Api-Secret-Token: {SECRET}\r\n"
+            f"Content-Length: {len(body)}\r\n\r\n"
+        ).encode()
+
+        reader, writer = await self._connection()
+        # El POST viaja de Telegram al bot
+        await asyncio.sleep(self.one_way_delay)
+        writer.write(head + body)
+        await writer.drain()
+
+        response = await reader.readuntil(b"\r\n\r\n")
+        length = int(response.lower().split(b"content-length:")[1].split(b"\r\n")[0])
+        await reader.readexactly(length)
+        self._idle.put_nowait((reader, writer))
+
+    def emit(self, update):
+        task = asyncio.ensure_future(self._post(update))
+        self._tasks.add(task)
+        task.add_done_callback(self._tasks.discard)
+
+    async def close(self):
+        while not self._idle.empty():
+            _, writer = self._idle.get_nowait()
+            writer.close()
+
+
+class Receiver:
+    """Handler que registra cuándo llega cada update."""
+
+    def __init__(self):
+        self.received = {}
+        self.expected = 0
+        self.done = asyncio.Event()
+
+    def expect(self, count):
+        self.expected = len(self.received) + count
+        self.done.clear()
+
+    async def __call__(self, update, context):
+        self.received[update.update_id] = time.perf_counter()
+        if len(self.received) >= self.expected:
+            self.done.set()
+
+
+async def run_mode(mode, n, one_way_delay, interval):
+    """Latencias (s) de updates sueltos y en flujo para un modo."""
+    api = FakeTelegramAPI(one_way_delay)
+    await api.start()
+
+    application = (
+        Application.builder()
+        .token(TOKEN)
+        .base_url(f"http://127.0.0.1:{api.port}/bot")
+        .build()
+    )
+    receiver = Receiver()
+    application.add_handler(TypeHandler(Update, receiver))
+    await application.initialize()
+    await application.start()
+
+    webhook = None
+    sender = None
+    if mode == "polling":
+        await application.updater.start_polling(poll_interval=0.0, timeout=10)
+        deliver = api.emit
+    else:
+        async def enqueue(data):
+            await application.update_queue.put(Update.de_json(data, application.bot))
+
+        webhook = WebhookServer(enqueue, secret_token=SECRET, listen="127.0.0.1", port=0)
+        await webhook.start()
+        sender = WebhookSender(webhook.bound_port, one_way_delay)
+        deliver = sender.emit
+
+    # Que el primer getUpdates ya esté esperando
+    await asyncio.sleep(4 * one_way_delay + 0.1)
+
+    emitted = {}
+    update_id = 1
+
+    single = []
+    for _ in range(n // 3):
+        receiver.expect(1)
+        emitted[update_id] = time.perf_counter()
+        deliver(make_update(update_id))
+        await receiver.done.wait()
+        single.append(update_id)
+        update_id += 1
+        # Dar tiempo a que el siguiente getUpdates esté pendiente
+        await asyncio.sleep(4 * one_way_delay)
+
+    stream = []
+    receiver.expect(n)
+    for _ in range(n):
+        emitted[update_id] = time.perf_counter()
+        deliver(make_update(update_id))
+        stream.append(update_id)
+        update_id += 1
+        await asyncio.sleep(interval)
+    await receiver.done.wait()
+
+    if mode == "polling":
+        await application.updater.stop()
+    else:
+        await sender.close()
+        await webhook.stop()
+    await application.stop()
+    await application.shutdown()
+    await api.stop()
+
+    def latencies(ids):
+        return [receiver.received[i] - emitted[i] for i in ids]
+
+    return latencies(single), latencies(stream)
+
+
+def percentile(values, q):
+    values = sorted(values)
+    return values[min(len(values) - 1, int(q * len(values)))]
+
+
+async def main() -> None:
+    """Ejecuta el benchmark e imprime latencias por modo."""
+    parser = argparse.ArgumentParser(description="Benchmark de recepción de updates")
+    parser.add_argument("--n", type=int, default=300)
+    parser.add_argument("--rtt-ms", type=float, default=40.0)
+    parser.add_argument("--interval-ms", type=float, default=5.0)
+    args = parser.parse_args()
+
+    one_way_delay = args.rtt_ms / 2000
+    interval = args.interval_ms / 1000
+
+    print(f"RTT {args.rtt_ms:g} ms, flujo de {args.n} updates cada {args.interval_ms:g} ms")
+    print(f"{'modo':<10} {'sueltos p50':>12} {'p99':>8} {'flujo p50':>11} {'p99':>8}")
+    for mode in ("polling", "webhook"):
+        single, stream = await run_mode(mode, args.n, one_way_delay, interval)
+        print(
+            f"{mode:<10} "
+            f"{percentile(single, 0.5) * 1000:>10.1f}ms "
+            f"{percentile(single, 0.99) * 1000:>6.1f}ms "
+            f"{percentile(stream, 0.5) * 1000:>9.1f}ms "
+            f"{percentile(stream, 0.99) * 1000:>6.1f}ms"
+        )
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
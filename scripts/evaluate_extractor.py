@@ -0,0 +1,156 @@
+#!/usr/bin/env python3
+"""
+Evalúa el extractor local frente al LLM.
+
+Separa las confirmaciones guardadas en entrenamiento y prueba, entrena
+el extractor local (o carga un modelo con --model) y reporta exactitud
+y latencia sobre el conjunto de prueba. Con --llm también evalúa el
+LLM configurado (requiere red y credenciales en .env).
+
+Uso:
+    python scripts/evaluate_extractor.py --data data/training_examples.jsonl
+    python scripts/evaluate_extractor.py --model data/extractor_model.json --llm
+"""
+
+import argparse
+import asyncio
+import random
+import statistics
+import sys
+import time
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+
+# Agregar directorio raíz al path
+root_dir = Path(__file__).parent.parent
+sys.path.insert(0, str(root_dir))
+
+from src.services.local_extractor import LocalContactExtractor
+from src.services.training_store import TrainingExampleStore
+from src.utils.logger import configure_logging
+
+configure_logging(log_level="WARNING", log_format="console")
+
+FIELDS = ("nombre", "telefono", "quien_lo_recomendo")
+
+
+def _same(field: str, predicted: str, expected: str) -> bool:
+    """Compara un campo ignorando mayúsculas y formato del teléfono."""
+    if field == "telefono":
+        digits = lambda value: "".join(ch for ch in value if ch.isdigit())
+        return digits(predicted)[-10:] == digits(expected)[-10:]
+    return " ".join(predicted.lower().split()) == " ".join(expected.lower().split())
+
+
+def _report(
+    name: str,
+    examples: List[Dict[str, Any]],
+    predictions: List[Optional[Dict[str, Any]]],
+    latencies: List[float]
+) -> None:
+    """Imprime exactitud por campo, exactitud total y latencias."""
+    total = len(examples)
+    answered = sum(1 for prediction in predictions if prediction)
+    field_hits = dict.fromkeys(FIELDS, 0)
+    full_hits = 0
+
+    for example, prediction in zip(examples, predictions):
+        if not prediction:
+            continue
+        hits = [
+            _same(field, prediction.get(field, ""), example[field])
+            for field in FIELDS
+        ]
+        for field, hit in zip(FIELDS, hits):
+            field_hits[field] += hit
+        full_hits += all(hits)
+
+    latencies_ms = sorted(latency * 1000 for latency in latencies)
+    p95 = latencies_ms[max(0, int(len(latencies_ms) * 0.95) - 1)]
+
+    print(f"\n== {name} ==")
+    print(f"  Respondidos:       {answered}/{total} ({answered / total:.1%})")
+    for field in FIELDS:
+        print(f"  Exactitud {field:<19} {field_hits[field] / total:.1%}")
+    print(f"  Exactitud total:   {full_hits / total:.1%}")
+    if answered:
+        print(f"  Exactitud (respondidos): {full_hits / answered:.1%}")
+    print(
+        f"  Latencia p50/p95/max: {statistics.median(latencies_ms):.2f} / "
+        f"{p95:.2f} / {latencies_ms[-1]:.2f} ms"
+    )
+
+
+def _run_local(
+    extractor: LocalContactExtractor,
+    examples: List[Dict[str, Any]]
+) -> None:
+    """Evalúa el extractor local (solo predicciones con confianza)."""
+    predictions, latencies = [], []
+    for example in examples:
+        start = time.perf_counter()
+        prediction = extractor.extract(example["text"])
+        latencies.append(time.perf_counter() - start)
+        predictions.append(prediction if extractor.is_confident(prediction) else None)
+
+    _report("Extractor local", examples, predictions, latencies)
+
+
+async def _run_llm(examples: List[Dict[str, Any]]) -> None:
+    """Evalúa el LLM configurado en .env."""
+    from config.settings import settings
+    from src.services.gemini_service import GeminiService
+
+    service = GeminiService(
+        api_key=settings.GEMINI_API_KEY,
+        model_name=settings.GEMINI_MODEL,
+        timeout=settings.GEMINI_TIMEOUT
+    )
+
+    predictions, latencies = [], []
+    for example in examples:
+        start = time.perf_counter()
+        result = await service.extract_contact_info(example["text"])
+        latencies.append(time.perf_counter() - start)
+        predictions.append(result["data"] if result["success"] else None)
+
+    _report("LLM", examples, predictions, latencies)
+
+
+def main() -> int:
+    """Punto de entrada del script."""
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--data", default="data/training_examples.jsonl")
+    parser.add_argument("--model", help="Modelo ya entrenado (omite el entrenamiento)")
+    parser.add_argument("--test-ratio", type=float, default=0.2)
+    parser.add_argument("--min-confidence", type=float, default=0.9)
+    parser.add_argument("--seed", type=int, default=7)
+    parser.add_argument("--llm", action="store_true", help="Evaluar también el LLM")
+    args = parser.parse_args()
+
+    examples = list(TrainingExampleStore(args.data).iter_examples())
+    if not examples:
+        print(f"\n❌ No hay ejemplos en {args.data}")
+        return 1
+
+    if args.model:
+        extractor = LocalContactExtractor.load(args.model, args.min_confidence)
+        test_set = examples
+    else:
+        random.Random(args.seed).shuffle(examples)
+        split = max(1, int(len(examples) * args.test_ratio))
+        test_set, train_set = examples[:split], examples[split:]
+        extractor = LocalContactExtractor(min_confidence=args.min_confidence)
+        extractor.train(train_set)
+        print(f"Entrenamiento: {len(train_set)} ejemplos, prueba: {len(test_set)}")
+
+    _run_local(extractor, test_set)
+
+    if args.llm:
+        asyncio.run(_run_llm(test_set))
+
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
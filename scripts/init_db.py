@@ -13,6 +13,12 @@ root_dir = Path(__file__).parent.parent
 sys.path.insert(0, str(root_dir))
 
 from src.services.contacts_api import ContactsAPIClient
+# Registrar las tablas de estado (seguridad, whitelist, cuotas, updates) en el metadata compartido
+import src.services.security_state  # noqa: F401
+import src.services.allowlist  # noqa: F401
+import src.services.token_quota  # noqa: F401
+import src.services.update_dedup  # noqa: F401
+import src.services.pending_store  # noqa: F401
 from config.settings import settings
 from src.utils.logger import configure_logging, get_logger
 
@@ -40,6 +46,13 @@ def init_database():
         print(f"📍 URL: {settings.DATABASE_URL.split('@')[-1]}")
         print("\nTablas creadas:")
         print("  - contacts")
+        print("  - security_state")
+        print("  - security_state_changes")
+        print("  - allowed_users")
+        print("  - allowlist_version")
+        print("  - llm_token_usage")
+        print("  - telegram_update_state")
+        print("  - pending_confirmations")
 
         return True
 
@@ -54,6 +54,94 @@ CREATE TRIGGER update_contacts_updated_at
     FOR EACH ROW
     EXECUTE FUNCTION update_updated_at_column();
 
+-- ================================================
+-- Tablas: security_state / security_state_changes
+-- Bloqueos e intentos fallidos compartidos entre workers
+-- ================================================
+
+CREATE TABLE IF NOT EXISTS security_state (
+    user_id BIGINT PRIMARY KEY,
+    blocked BOOLEAN NOT NULL DEFAULT FALSE,
+    failed_attempts INTEGER NOT NULL DEFAULT 0,
+    reason VARCHAR(255),
+    updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+);
+
+CREATE TABLE IF NOT EXISTS security_state_changes (
+    id SERIAL PRIMARY KEY,
+    user_id BIGINT NOT NULL,
+    event VARCHAR(16) NOT NULL,
+    amount INTEGER NOT NULL DEFAULT 0,
+    reason VARCHAR(255),
+    worker_id VARCHAR(36) NOT NULL,
+    created_at TIMESTAMP NOT NULL DEFAULT CURRENT_TIMESTAMP
+);
+
+CREATE INDEX IF NOT EXISTS ix_security_state_changes_created_at
+    ON security_state_changes(created_at);
+
+-- ================================================
+-- Tablas: allowed_users / allowlist_version
+-- Whitelist recargable sin reiniciar (incrementar la versión
+-- en cada cambio; scripts/manage_allowlist.py lo hace)
+-- ================================================
+
+CREATE TABLE IF NOT EXISTS allowed_users (
+    user_id BIGINT PRIMARY KEY,
+    username VARCHAR(255),
+    added_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+);
+
+CREATE TABLE IF NOT EXISTS allowlist_version (
+    id INTEGER PRIMARY KEY,
+    version INTEGER NOT NULL DEFAULT 0,
+    updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+);
+
+-- ================================================
+-- Tabla: llm_token_usage
+-- Tokens del LLM consumidos por usuario y periodo
+-- (user_id 0 = consumo global del despliegue)
+-- ================================================
+
+CREATE TABLE IF NOT EXISTS llm_token_usage (
+    user_id BIGINT NOT NULL,
+    period INTEGER NOT NULL,
+    tokens BIGINT NOT NULL DEFAULT 0,
+    updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+    PRIMARY KEY (user_id, period)
+);
+
+-- ================================================
+-- Tabla: telegram_update_state
+-- Mayor update_id procesado (fila única id = 1); los updates con
+-- update_id menor o igual se descartan como duplicados
+-- ================================================
+
+CREATE TABLE IF NOT EXISTS telegram_update_state (
+    id INTEGER PRIMARY KEY,
+    last_update_id BIGINT NOT NULL DEFAULT 0,
+    updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+);
+
+-- ================================================
+-- Tabla: pending_confirmations
+-- Contactos extraídos que esperan la confirmación del usuario (el id va
+-- en el callback_data); las vencidas (expires_at, epoch) se barren
+-- ================================================
+
+CREATE TABLE IF NOT EXISTS pending_confirmations (
+    id VARCHAR(16) PRIMARY KEY,
+    user_id BIGINT NOT NULL,
+    chat_id BIGINT NOT NULL,
+    payload TEXT NOT NULL,
+    expires_at INTEGER NOT NULL,
+    created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+);
+
+CREATE INDEX IF NOT EXISTS idx_pending_confirmations_expires_at
+    ON pending_confirmations(expires_at);
+
 -- ================================================
 -- Grants (ajustar según el usuario de la aplicación)
 -- ================================================
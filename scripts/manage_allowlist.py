@@ -0,0 +1,61 @@
+#!/usr/bin/env python3
+"""
+Administra la whitelist de usuarios autorizados.
+
+Modifica la tabla allowed_users e incrementa su versión; los workers en
+ejecución recargan el snapshot en la próxima verificación
+(ALLOWLIST_REFRESH_INTERVAL) o de inmediato con `kill -HUP <pid>`.
+
+Uso:
+    python scripts/manage_allowlist.py list
+    python scripts/manage_allowlist.py add 123456789 [--username juan]
+    python scripts/manage_allowlist.py remove 123456789
+"""
+
+import argparse
+import sys
+from pathlib import Path
+
+# Agregar directorio raíz al path
+root_dir = Path(__file__).parent.parent
+sys.path.insert(0, str(root_dir))
+
+from config.settings import settings
+from src.services.allowlist import SQLAllowlistStore
+from src.services.contacts_api import ContactsAPIClient
+from src.utils.logger import configure_logging
+
+configure_logging(log_level="WARNING", log_format="console")
+
+
+def main() -> int:
+    """Ejecuta el comando indicado."""
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    subparsers = parser.add_subparsers(dest="command", required=True)
+    subparsers.add_parser("list")
+    add = subparsers.add_parser("add")
+    add.add_argument("user_id", type=int)
+    add.add_argument("--username")
+    remove = subparsers.add_parser("remove")
+    remove.add_argument("user_id", type=int)
+    args = parser.parse_args()
+
+    client = ContactsAPIClient(database_url=settings.DATABASE_URL)
+    client.create_tables()
+    store = SQLAllowlistStore(client.SessionLocal)
+
+    if args.command == "add":
+        store.add(args.user_id, username=args.username)
+        print(f"✅ Usuario {args.user_id} autorizado (versión {store.version})")
+    elif args.command == "remove":
+        store.remove(args.user_id)
+        print(f"✅ Usuario {args.user_id} removido (versión {store.version})")
+    else:
+        for user_id, username, added_at in store.list_users():
+            print(f"{user_id}\t{username or '-'}\t{added_at:%Y-%m-%d %H:%M}")
+
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
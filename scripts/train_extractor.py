@@ -0,0 +1,59 @@
+#!/usr/bin/env python3
+"""
+Entrena el extractor local de contactos.
+
+Lee las confirmaciones aceptadas (JSONL) y guarda el modelo entrenado.
+Corre en CPU y sin conexión de red.
+
+Uso:
+    python scripts/train_extractor.py \\
+        --data data/training_examples.jsonl \\
+        --output data/extractor_model.json
+"""
+
+import argparse
+import sys
+from pathlib import Path
+
+# Agregar directorio raíz al path
+root_dir = Path(__file__).parent.parent
+sys.path.insert(0, str(root_dir))
+
+from src.services.local_extractor import LocalContactExtractor
+from src.services.training_store import TrainingExampleStore
+from src.utils.logger import configure_logging, get_logger
+
+configure_logging(log_level="INFO", log_format="console")
+logger = get_logger(__name__)
+
+
+def main() -> int:
+    """Entrena y guarda el modelo."""
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--data", default="data/training_examples.jsonl")
+    parser.add_argument("--output", default="data/extractor_model.json")
+    parser.add_argument("--iterations", type=int, default=10)
+    parser.add_argument("--min-examples", type=int, default=50)
+    args = parser.parse_args()
+
+    examples = list(TrainingExampleStore(args.data).iter_examples())
+
+    if len(examples) < args.min_examples:
+        print(
+            f"\n❌ Se necesitan al menos {args.min_examples} ejemplos "
+            f"(encontrados: {len(examples)})"
+        )
+        return 1
+
+    extractor = LocalContactExtractor()
+    stats = extractor.train(examples, iterations=args.iterations)
+    extractor.save(args.output)
+
+    print(f"\n✅ Modelo guardado en {args.output}")
+    print(f"   Ejemplos usados: {stats['used']}")
+    print(f"   Ejemplos descartados: {stats['skipped']}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -1,6 +1,13 @@
 """Módulo de agentes."""
 
 from .security_agent import SecurityAgent
+from .security_pipeline import PipelineStage, RequestContext, SecurityPipeline
 from .persistence_agent import PersistenceAgent
 
-__all__ = ["SecurityAgent", "PersistenceAgent"]
+__all__ = [
+    "SecurityAgent",
+    "PipelineStage",
+    "RequestContext",
+    "SecurityPipeline",
+    "PersistenceAgent"
+]
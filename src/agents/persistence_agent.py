@@ -8,11 +8,13 @@ Este módulo implementa el agente encargado de:
 - Crear botón inline de Telegram
 """
 
-from typing import Dict, Any
+import asyncio
+from typing import Dict, Any, Optional
 
 from ..models.contact import Contact
 from ..services.contacts_api import ContactsAPIClient
 from ..services.telegram_service import TelegramService
+from ..utils.deadline import Deadline
 from ..utils.logger import get_logger
 from ..utils.helpers import format_contact_message
 
@@ -59,7 +61,9 @@ class PersistenceAgent:
     async def save_and_notify(
         self,
         contact_data: Dict[str, Any],
-        chat_id: int
+        chat_id: int,
+        deadline: Optional[Deadline] = None,
+        notify_errors: bool = True
     ) -> Dict[str, Any]:
         """
         Guarda un contacto y notifica al usuario con vCard y botón.
@@ -67,14 +71,20 @@ class PersistenceAgent:
         Este es el método principal que implementa la funcionalidad CRÍTICA
         del sistema:
         1. Guarda el contacto en PostgreSQL
-        2. Envía confirmación al usuario
-        3. Envía archivo vCard (.vcf) para descarga
-        4. Envía botón inline de Telegram para agregar contacto
+        2. Envía el contacto al usuario (mensaje de contacto y/o vCard)
+           y, en paralelo, lo copia a la API legacy si está configurada
 
         Args:
             contact_data: Diccionario con datos del contacto
                 (nombre, telefono, quien_lo_recomendo).
             chat_id: ID del chat de Telegram para notificaciones.
+            deadline: Deadline de la solicitud; acota el guardado y el
+                envío del vCard. Los mensajes de error usan su propio
+                timeout para que el usuario siempre reciba respuesta
+                (opcional).
+            notify_errors: Si es False no se envían mensajes de error: el
+                llamador informa el error con su propio mensaje (default:
+                True).
 
         Returns:
             dict con keys:
@@ -114,8 +124,12 @@ class PersistenceAgent:
                 source="telegram"
             )
 
-            # 2. Guardar en PostgreSQL
-            save_result = await self.contacts_client.save_contact(contact)
+            # 2. Guardar en PostgreSQL (la copia a la API legacy va en el paso 4)
+            save_result = await self.contacts_client.save_contact(
+                contact,
+                deadline=deadline,
+                mirror_legacy=False
+            )
 
             if not save_result["success"]:
                 logger.error(
@@ -124,11 +138,12 @@ class PersistenceAgent:
                 )
 
                 # Notificar error al usuario
-                await self.telegram_service.send_error_message(
-                    chat_id=chat_id,
-                    error="No se pudo guardar el contacto",
-                    details=save_result.get("error")
-                )
+                if notify_errors:
+                    await self.telegram_service.send_error_message(
+                        chat_id=chat_id,
+                        error="No se pudo guardar el contacto",
+                        details=save_result.get("error")
+                    )
 
                 return save_result
 
@@ -148,14 +163,19 @@ class PersistenceAgent:
                 contact_id=contact_id
             )
 
-            # 4. Enviar confirmación + vCard + botón de Telegram
+            # 4. Enviar el contacto al usuario y copiarlo a la API legacy a la vez:
+            # ninguno depende del otro, solo del guardado en la BD
             # Esta es la funcionalidad CRÍTICA del sistema
-            notification_sent = await self.telegram_service.send_contact_with_vcard_and_button(
-                chat_id=chat_id,
-                nombre=contact.nombre,
-                telefono=contact.telefono,
-                quien_lo_recomendo=contact.quien_lo_recomendo,
-                confirmation_message=confirmation_message
+            notification_sent, _ = await asyncio.gather(
+                self.telegram_service.send_contact_with_vcard_and_button(
+                    chat_id=chat_id,
+                    nombre=contact.nombre,
+                    telefono=contact.telefono,
+                    quien_lo_recomendo=contact.quien_lo_recomendo,
+                    confirmation_message=confirmation_message,
+                    deadline=deadline
+                ),
+                self.contacts_client.save_to_legacy_api(contact, deadline=deadline)
             )
 
             if not notification_sent:
@@ -188,11 +208,12 @@ class PersistenceAgent:
             )
 
             # Notificar error de validación al usuario
-            await self.telegram_service.send_error_message(
-                chat_id=chat_id,
-                error="Datos inválidos",
-                details=str(e)
-            )
+            if notify_errors:
+                await self.telegram_service.send_error_message(
+                    chat_id=chat_id,
+                    error="Datos inválidos",
+                    details=str(e)
+                )
 
             return {
                 "success": False,
@@ -208,11 +229,12 @@ class PersistenceAgent:
             )
 
             # Notificar error al usuario
-            await self.telegram_service.send_error_message(
-                chat_id=chat_id,
-                error="Error inesperado al guardar el contacto",
-                details=str(e)
-            )
+            if notify_errors:
+                await self.telegram_service.send_error_message(
+                    chat_id=chat_id,
+                    error="Error inesperado al guardar el contacto",
+                    details=str(e)
+                )
 
             return {
                 "success": False,
@@ -238,8 +260,10 @@ class PersistenceAgent:
         Returns:
             True si todos los servicios están operativos, False en caso contrario.
         """
-        db_health = await self.contacts_client.health_check()
-        telegram_health = await self.telegram_service.health_check()
+        db_health, telegram_health = await asyncio.gather(
+            self.contacts_client.health_check(),
+            self.telegram_service.health_check()
+        )
 
         is_healthy = db_health and telegram_health
 
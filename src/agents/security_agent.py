@@ -10,14 +10,27 @@ encargado de:
 - Procesamiento con Gemini
 """
 
-from typing import Dict, Any, List, Set
-from collections import defaultdict
+from typing import Dict, Any, FrozenSet, Iterable, Optional, Sequence, Set
 
+from ..services.allowlist import Allowlist
 from ..services.gemini_service import GeminiService
+from ..services.local_extractor import LocalContactExtractor
+from ..services.security_state import SecurityState, SecurityStateChange
+from ..services.token_quota import QuotaDecision, TokenQuota
+from .security_pipeline import (
+    PipelineStage,
+    RequestContext,
+    SecurityPipeline,
+    StageResult
+)
 from ..validators.message_validator import MessageValidator
 from ..validators.contact_validator import ContactValidator
+from ..utils.abuse_detector import AbuseDetector, AbuseFlag
+from ..utils.deadline import Deadline
+from ..utils.failure_tracker import FailedAttemptsTracker
 from ..utils.logger import get_logger, SecurityLogger
-from ..utils.rate_limiter import RateLimiter
+from ..utils.metrics import metrics
+from ..utils.rate_limit_backend import RateLimitBackend, MemoryRateLimitBackend
 from ..utils.helpers import DataSanitizer
 
 logger = get_logger(__name__)
@@ -28,41 +41,103 @@ class SecurityAgent:
     """
     Agente de seguridad para validación y procesamiento de mensajes.
 
-    Este agente coordina:
+    Este agente coordina, como un pipeline de etapas con salida temprana:
     1. Autenticación de usuarios (whitelist)
-    2. Rate limiting
-    3. Validación de mensajes
-    4. Sanitización de datos
-    5. Extracción de contactos con Gemini
+    2. Validación de mensajes
+    3. Sanitización de datos
+    4. Rate limiting
+    5. Extracción de contactos (extractor local o Gemini)
     6. Validación de datos extraídos
 
+    El orden de las verificaciones 1-4 es configurable (ver CHECKS).
+
     Attributes:
-        allowed_users: Set de user IDs autorizados.
+        allowlist: Whitelist de usuarios (en memoria o en la BD).
+        allowed_users: Snapshot inmutable de user IDs autorizados.
         blocked_users: Set de user IDs bloqueados.
         gemini_service: Servicio de extracción con Gemini.
+        local_extractor: Extractor local entrenado (opcional).
         message_validator: Validador de mensajes.
         contact_validator: Validador de contactos.
-        rate_limiter: Limitador de frecuencia de requests.
+        rate_limit_backend: Backend del rate limiting (memoria o Redis).
         failed_attempts: Contador de intentos fallidos por usuario.
+        security_state: Estado de bloqueos e intentos fallidos (en
+            memoria o compartido entre workers).
+        pipeline: Etapas que procesa cada solicitud.
+        abuse_detector: Vista agregada de rechazos por usuario y patrón.
+        auto_block_abusers: Si se bloquea a los heavy hitters marcados.
+        token_quota: Cuotas de tokens del LLM (opcional).
     """
 
+    # Verificaciones previas a la extracción, de la más barata a la más
+    # cara: búsquedas en sets, longitud, una pasada de regex y por último
+    # el rate limit (con Redis es un round trip de red). Un mensaje
+    # inválido o sospechoso no consume cuota del rate limit, pero sí
+    # cuenta como intento fallido.
+    CHECKS = ("origin", "message_format", "content", "rate_limit")
+
+    # Tipos de evento del detector de abuso cuya clave es un user ID y que
+    # justifican un bloqueo automático. Los demás solo se observan:
+    # "unauthorized" son IDs desconocidos (ya rechazados; bloquearlos
+    # crecería blocked_users con cada flood), "blocked" ya está bloqueado
+    # y "suspicious_pattern" se indexa por patrón, no por usuario.
+    AUTO_BLOCK_KINDS = ("rate_limited", "suspicious")
+
     def __init__(
         self,
         gemini_service: GeminiService,
-        allowed_users: List[int],
+        allowed_users: Iterable[int] = (),
         max_requests: int = 10,
         window_seconds: int = 60,
-        max_failed_attempts: int = 5
+        max_failed_attempts: int = 5,
+        local_extractor: Optional[LocalContactExtractor] = None,
+        rate_limit_backend: Optional[RateLimitBackend] = None,
+        security_state: Optional[SecurityState] = None,
+        checks: Optional[Sequence[str]] = None,
+        allowlist: Optional[Allowlist] = None,
+        abuse_detector: Optional[AbuseDetector] = None,
+        auto_block_abusers: bool = False,
+        token_quota: Optional[TokenQuota] = None,
+        rate_limit_fail_open: bool = True
     ):
         """
         Inicializa el agente de seguridad.
 
         Args:
             gemini_service: Instancia de GeminiService.
-            allowed_users: Lista de user IDs autorizados.
+            allowed_users: User IDs autorizados (se ignora si se pasa
+                `allowlist`).
             max_requests: Máximo de requests por ventana de tiempo.
             window_seconds: Duración de la ventana en segundos.
             max_failed_attempts: Intentos fallidos antes de bloquear.
+            local_extractor: Extractor local a intentar antes de Gemini
+                (opcional).
+            rate_limit_backend: Backend del rate limiting (default: en
+                memoria con max_requests/window_seconds).
+            security_state: Estado de seguridad (default: en memoria).
+                Con SQLSecurityStateStore los bloqueos se comparten entre
+                workers y sobreviven reinicios.
+            checks: Verificaciones previas a la extracción, en orden de
+                ejecución (default: CHECKS). Debe incluir "origin".
+            allowlist: Whitelist a usar (default: en memoria con
+                `allowed_users`). Con SQLAllowlistStore se recarga sin
+                reiniciar.
+            abuse_detector: Detector de abuso alimentado por los rechazos
+                de origen, rate limit y contenido (default: ventana de 5
+                minutos y umbral de 20 eventos).
+            auto_block_abusers: Bloquear a los usuarios que el detector
+                marca como heavy hitters (default: False, solo se registran).
+            token_quota: Cuotas de tokens por usuario y globales; cada
+                llamada al LLM reserva un estimado y se ajusta al uso real
+                (default: sin cuotas).
+            rate_limit_fail_open: Si el backend del rate limiting falla
+                (p. ej. Redis caído), dejar pasar el request (True,
+                default) o rechazarlo (False). Dejarlo pasar mantiene el
+                bot respondiendo a usuarios ya autorizados; las cuotas
+                de tokens siguen acotando el gasto en el LLM.
+
+        Raises:
+            ValueError: Si `checks` es inválido.
 
         Example:
             >>> gemini = GeminiService(api_key="key")
@@ -71,48 +146,75 @@ class SecurityAgent:
             ...     allowed_users=[123456789]
             ... )
         """
-        self.allowed_users: Set[int] = set(allowed_users)
-        self.blocked_users: Set[int] = set()
+        # Una whitelist vacía es falsy (__len__): comparar con None
+        self.allowlist = allowlist if allowlist is not None else Allowlist(allowed_users)
+        self.security_state = security_state or SecurityState()
+        # Vistas del snapshot en memoria: las consultas no hacen I/O
+        self.blocked_users: Set[int] = self.security_state.blocked_users
+        self.failed_attempts: FailedAttemptsTracker = self.security_state.failed_attempts
+        self.security_state.subscribe(self._on_security_state_change)
         self.gemini_service = gemini_service
+        self.local_extractor = local_extractor
         self.message_validator = MessageValidator()
         self.contact_validator = ContactValidator()
-        self.rate_limiter = RateLimiter(
+        self.rate_limit_backend = rate_limit_backend or MemoryRateLimitBackend(
             max_requests=max_requests,
             window_seconds=window_seconds
         )
-        self.failed_attempts: Dict[int, int] = defaultdict(int)
         self.max_failed_attempts = max_failed_attempts
+        self.abuse_detector = abuse_detector or AbuseDetector()
+        self.auto_block_abusers = auto_block_abusers
+        self.token_quota = token_quota
+        self.rate_limit_fail_open = rate_limit_fail_open
+        self.pipeline = self._build_pipeline(tuple(checks or self.CHECKS))
 
         logger.info(
             "security_agent_initialized",
-            allowed_users_count=len(self.allowed_users),
+            allowed_users_count=len(self.allowlist),
             max_requests=max_requests,
-            window_seconds=window_seconds
+            window_seconds=window_seconds,
+            pipeline=list(self.pipeline.names)
         )
 
-    async def process_request(self, message: Dict[str, Any]) -> Dict[str, Any]:
+    @property
+    def allowed_users(self) -> FrozenSet[int]:
+        """Snapshot actual de la whitelist (sin I/O)."""
+        return self.allowlist.users
+
+    async def process_request(
+        self,
+        message: Dict[str, Any],
+        deadline: Optional[Deadline] = None
+    ) -> Dict[str, Any]:
         """
         Procesa una solicitud de mensaje de Telegram.
 
-        Flujo de procesamiento:
-        1. Validar origen (usuario autorizado)
-        2. Verificar rate limit
-        3. Validar formato del mensaje
-        4. Sanitizar datos
-        5. Extraer contacto con Gemini
+        Flujo de procesamiento (con el orden por defecto de verificaciones):
+        1. Validar origen (usuario bloqueado o fuera de la whitelist)
+        2. Validar formato del mensaje (longitud)
+        3. Sanitizar y detectar patrones peligrosos (una sola pasada)
+        4. Verificar rate limit
+        5. Extraer contacto (extractor local, con Gemini como respaldo)
         6. Validar datos extraídos
 
+        El pipeline se detiene en la primera etapa que rechaza.
+
         Args:
             message: Diccionario con keys:
                 - text: str - Contenido del mensaje
                 - user_id: int - ID del usuario de Telegram
                 - chat_id: int - ID del chat
                 - username: str (opcional) - Username de Telegram
+            deadline: Deadline de la solicitud; se propaga a Gemini y la
+                extracción no se intenta si ya se agotó (opcional).
 
         Returns:
             dict: Resultado del procesamiento
                 - success: bool
                 - contact: dict (si success=True)
+                - text: str - Texto sanitizado usado en la extracción
+                  (si success=True)
+                - extractor: str - "local" o "llm" (si success=True)
                 - error: str (si success=False)
                 - error_type: str (si success=False)
 
@@ -126,67 +228,187 @@ class SecurityAgent:
             >>> result["success"]
             True
         """
-        user_id = message.get("user_id")
-        username = message.get("username", "unknown")
+        context = RequestContext(
+            message=message,
+            user_id=message.get("user_id"),
+            username=message.get("username", "unknown"),
+            deadline=deadline
+        )
+
+        rejection = await self.pipeline.run(context)
+        if rejection is not None:
+            return rejection
+
+        # Resetear contador de intentos fallidos
+        self.security_state.reset_failures(context.user_id)
 
         logger.info(
-            "processing_request",
-            user_id=user_id,
-            username=username
+            "request_processed_successfully",
+            user_id=context.user_id,
+            contact_nombre=context.contact["nombre"],
+            extractor=context.extractor
         )
 
-        # 1. Validar origen (autenticación)
-        auth_result = self._validate_origin(user_id, username)
-        if not auth_result["valid"]:
-            return {
-                "success": False,
-                "error": auth_result["error"],
-                "error_type": "unauthorized"
-            }
+        return {
+            "success": True,
+            "contact": context.contact,
+            "text": context.text,
+            "extractor": context.extractor
+        }
 
-        # 2. Verificar rate limit
-        rate_limit_result = self._check_rate_limit(user_id, username)
-        if not rate_limit_result["valid"]:
-            return {
-                "success": False,
-                "error": rate_limit_result["error"],
-                "error_type": "rate_limit_exceeded"
-            }
+    def _build_pipeline(self, checks: Sequence[str]) -> SecurityPipeline:
+        """
+        Arma el pipeline con las verificaciones indicadas, en ese orden.
 
-        # 3. Validar formato del mensaje
-        validation_result = self.message_validator.validate(message)
-        if not validation_result["valid"]:
-            self.failed_attempts[user_id] += 1
-            return {
-                "success": False,
-                "error": validation_result["error"],
-                "error_type": "invalid_message_format"
-            }
+        La extracción y la validación del contacto siempre van al final.
 
-        # 4. Sanitizar datos
-        sanitized_text = DataSanitizer.sanitize(message["text"])
+        Args:
+            checks: Nombres de las verificaciones (ver CHECKS).
 
-        if not DataSanitizer.is_safe(message["text"]):
-            security_logger.log_suspicious_input(
-                user_id=user_id,
-                input_type="dangerous_pattern"
-            )
+        Returns:
+            SecurityPipeline listo para usar.
 
-            self.failed_attempts[user_id] += 1
+        Raises:
+            ValueError: Si hay verificaciones desconocidas o repetidas, o
+                falta "origin" (la autenticación no es opcional).
+        """
+        available = {
+            "origin": PipelineStage("origin", self._stage_origin),
+            "message_format": PipelineStage("message_format", self._stage_message_format),
+            "content": PipelineStage("content", self._stage_content),
+            "rate_limit": PipelineStage("rate_limit", self._stage_rate_limit, is_async=True),
+        }
 
-            return {
-                "success": False,
-                "error": "El mensaje contiene patrones sospechosos",
-                "error_type": "suspicious_input"
-            }
+        unknown = [name for name in checks if name not in available]
+        if unknown:
+            raise ValueError(f"Verificaciones desconocidas: {', '.join(unknown)}")
+        if len(set(checks)) != len(checks):
+            raise ValueError("Verificaciones repetidas en el pipeline")
+        if "origin" not in checks:
+            raise ValueError("El pipeline debe incluir la verificación 'origin'")
+
+        return SecurityPipeline([
+            *(available[name] for name in checks),
+            PipelineStage("extraction", self._stage_extraction, is_async=True),
+            PipelineStage("contact_validation", self._stage_contact_validation),
+        ])
+
+    def _stage_origin(self, context: RequestContext) -> StageResult:
+        """Rechaza usuarios bloqueados o fuera de la whitelist."""
+        auth_result = self._validate_origin(context.user_id, context.username)
+        if auth_result["valid"]:
+            return None
+
+        return {
+            "success": False,
+            "error": auth_result["error"],
+            "error_type": "unauthorized"
+        }
+
+    def _stage_message_format(self, context: RequestContext) -> StageResult:
+        """Rechaza mensajes con formato o longitud inválidos."""
+        validation_result = self.message_validator.validate(context.message)
+        if validation_result["valid"]:
+            return None
 
-        # 5. Extraer contacto con Gemini
-        extraction_result = await self.gemini_service.extract_contact_info(
-            sanitized_text
+        self.security_state.record_failure(context.user_id)
+        return {
+            "success": False,
+            "error": validation_result["error"],
+            "error_type": "invalid_message_format"
+        }
+
+    def _stage_content(self, context: RequestContext) -> StageResult:
+        """Sanitiza el texto y rechaza patrones peligrosos (una sola pasada)."""
+        inspection = DataSanitizer.inspect(context.message["text"])
+        if inspection.safe:
+            context.text = inspection.text
+            return None
+
+        security_logger.log_suspicious_input(
+            user_id=context.user_id,
+            input_type="dangerous_pattern",
+            details=inspection.pattern
         )
+        self.security_state.record_failure(context.user_id)
+        self._record_abuse("suspicious", context.user_id)
+        if inspection.pattern is not None:
+            # Un mismo patrón repetido, aunque venga de usuarios distintos
+            self.abuse_detector.record("suspicious_pattern", inspection.pattern)
+
+        return {
+            "success": False,
+            "error": "El mensaje contiene patrones sospechosos",
+            "error_type": "suspicious_input"
+        }
+
+    async def _stage_rate_limit(self, context: RequestContext) -> StageResult:
+        """Rechaza usuarios que excedieron el rate limit."""
+        rate_limit_result = await self._check_rate_limit(context.user_id, context.username)
+        if rate_limit_result["valid"]:
+            return None
+
+        return {
+            "success": False,
+            "error": rate_limit_result["error"],
+            "error_type": rate_limit_result.get("error_type", "rate_limit_exceeded")
+        }
+
+    async def _stage_extraction(self, context: RequestContext) -> StageResult:
+        """Extrae el contacto (local primero, Gemini como respaldo)."""
+        # Si la etapa de contenido no está configurada, sanitizar aquí
+        text = context.text or DataSanitizer.sanitize(context.message["text"])
+        context.text = text
+
+        contact_data = self._extract_locally(text)
+        if contact_data is not None:
+            context.contact = contact_data
+            context.extractor = "local"
+            return None
+
+        context.extractor = "llm"
+        user_id = context.user_id
+        deadline = context.deadline
+
+        # Sin tiempo restante no tiene sentido llamar al LLM.
+        # Un timeout no es culpa del usuario: no cuenta como intento fallido
+        if deadline is not None and deadline.expired:
+            return self._deadline_exceeded(user_id, stage="llm")
+
+        # La cuota se verifica con un estimado antes de la llamada y se
+        # ajusta con los tokens consumidos (los que reporta la API, o el
+        # estimado por cada intento que quedó sin respuesta)
+        quota = None
+        if self.token_quota is not None:
+            quota = self.token_quota.reserve(
+                user_id,
+                self.gemini_service.estimate_tokens(text)
+            )
+            if not quota.allowed:
+                return self._quota_exceeded(quota)
+
+        extraction_result: Dict[str, Any] = {}
+        try:
+            extraction_result = await self.gemini_service.extract_contact_info(
+                text,
+                deadline=deadline
+            )
+        finally:
+            if quota is not None:
+                # Sin resultado (p. ej. cancelada a mitad de la llamada) no
+                # se sabe cuánto se consumió: se cobra la reserva
+                tokens_used = (
+                    extraction_result.get("tokens_used")
+                    if extraction_result
+                    else quota.reservation.tokens
+                )
+                self.token_quota.settle(quota.reservation, tokens_used)
+
+        if extraction_result.get("error_type") == "timeout":
+            return self._deadline_exceeded(user_id, stage="llm")
 
         if not extraction_result["success"]:
-            self.failed_attempts[user_id] += 1
+            self.security_state.record_failure(user_id)
             logger.warning(
                 "gemini_extraction_failed",
                 user_id=user_id,
@@ -199,40 +421,124 @@ class SecurityAgent:
                 "error_type": "extraction_failed"
             }
 
-        # 6. Validar datos extraídos
-        contact_data = extraction_result["data"]
-        contact_validation = self.contact_validator.validate(contact_data)
+        context.contact = extraction_result["data"]
+        return None
+
+    def _stage_contact_validation(self, context: RequestContext) -> StageResult:
+        """Rechaza contactos extraídos incompletos o inválidos."""
+        # El extractor local ya valida antes de aceptar su predicción
+        if context.extractor == "local":
+            return None
+
+        contact_validation = self.contact_validator.validate(context.contact)
+        if contact_validation["valid"]:
+            return None
+
+        self.security_state.record_failure(context.user_id)
+        logger.warning(
+            "contact_validation_failed",
+            user_id=context.user_id,
+            error=contact_validation.get("error"),
+            missing_fields=contact_validation.get("missing_fields", [])
+        )
 
-        if not contact_validation["valid"]:
-            self.failed_attempts[user_id] += 1
-            logger.warning(
-                "contact_validation_failed",
-                user_id=user_id,
-                error=contact_validation.get("error"),
-                missing_fields=contact_validation.get("missing_fields", [])
-            )
+        return {
+            "success": False,
+            "error": contact_validation["error"],
+            "error_type": "invalid_contact_data",
+            "missing_fields": contact_validation.get("missing_fields", [])
+        }
 
-            return {
-                "success": False,
-                "error": contact_validation["error"],
-                "error_type": "invalid_contact_data",
-                "missing_fields": contact_validation.get("missing_fields", [])
-            }
+    def _deadline_exceeded(self, user_id: int, stage: str) -> Dict[str, Any]:
+        """
+        Construye la respuesta para una solicitud sin tiempo restante.
 
-        # Resetear contador de intentos fallidos
-        self.failed_attempts[user_id] = 0
+        Args:
+            user_id: ID del usuario de Telegram.
+            stage: Etapa en la que se agotó el tiempo.
 
-        logger.info(
-            "request_processed_successfully",
+        Returns:
+            dict con success=False y error_type="deadline_exceeded".
+        """
+        logger.warning(
+            "request_deadline_exceeded",
             user_id=user_id,
-            contact_nombre=contact_data["nombre"]
+            stage=stage
         )
 
         return {
-            "success": True,
-            "contact": contact_data
+            "success": False,
+            "error": "El procesamiento tardó demasiado. Por favor, intenta de nuevo.",
+            "error_type": "deadline_exceeded"
         }
 
+    @staticmethod
+    def _quota_exceeded(quota: QuotaDecision) -> Dict[str, Any]:
+        """
+        Construye la respuesta para una solicitud sin cuota de tokens.
+
+        Args:
+            quota: Decisión de la cuota (rechazada).
+
+        Returns:
+            dict con success=False y error_type="quota_exceeded".
+        """
+        hours = max(1, round(quota.retry_after / 3600))
+        if quota.scope == "global":
+            error = f"El servicio alcanzó su límite de uso. Intenta de nuevo en {hours} h."
+        else:
+            error = f"Alcanzaste tu límite de uso. Intenta de nuevo en {hours} h."
+
+        return {
+            "success": False,
+            "error": error,
+            "error_type": "quota_exceeded"
+        }
+
+    def _extract_locally(self, text: str) -> Optional[Dict[str, Any]]:
+        """
+        Intenta extraer el contacto con el extractor local.
+
+        Solo se acepta la extracción si supera la confianza mínima y
+        pasa la validación de contacto; en otro caso se usa Gemini.
+
+        Args:
+            text: Texto sanitizado del mensaje.
+
+        Returns:
+            dict con nombre, telefono y quien_lo_recomendo, o None.
+        """
+        if self.local_extractor is None:
+            return None
+
+        try:
+            prediction = self.local_extractor.extract(text)
+        except Exception as e:
+            logger.warning("local_extraction_error", error=str(e))
+            return None
+
+        if not self.local_extractor.is_confident(prediction):
+            logger.debug(
+                "local_extraction_low_confidence",
+                confidence=prediction["confidence"] if prediction else None
+            )
+            return None
+
+        contact_data = {
+            field: prediction[field]
+            for field in ContactValidator.REQUIRED_FIELDS
+        }
+
+        if not self.contact_validator.validate(contact_data)["valid"]:
+            return None
+
+        logger.info(
+            "local_extraction_used",
+            confidence=prediction["confidence"]
+        )
+
+        return contact_data
+
     def _validate_origin(
         self,
         user_id: int,
@@ -248,66 +554,97 @@ class SecurityAgent:
         Returns:
             dict con valid y error (si aplica).
         """
-        # Verificar si está bloqueado
+        # Verificar si está en whitelist (snapshot inmutable, sin locks)
+        if user_id not in self.allowlist.users:
+            return self._reject_unknown(user_id, username)
+
+        # Un usuario autorizado puede estar bloqueado (manualmente o por abuso)
         if user_id in self.blocked_users:
-            security_logger.log_access_attempt(
-                user_id=user_id,
-                authorized=False,
-                username=username
-            )
+            return self._reject_blocked(user_id, username)
 
-            logger.warning(
-                "blocked_user_attempt",
-                user_id=user_id,
-                username=username
-            )
+        # Usuario autorizado
+        security_logger.log_access_attempt(
+            user_id=user_id,
+            authorized=True,
+            username=username
+        )
 
-            return {
-                "valid": False,
-                "error": "Usuario bloqueado. Contacta al administrador."
-            }
+        return {"valid": True}
 
-        # Verificar si está en whitelist
-        if user_id not in self.allowed_users:
-            security_logger.log_access_attempt(
-                user_id=user_id,
-                authorized=False,
-                username=username
-            )
+    def _reject_blocked(self, user_id: int, username: Optional[str]) -> Dict[str, Any]:
+        """Rechaza a un usuario bloqueado."""
+        security_logger.log_access_attempt(
+            user_id=user_id,
+            authorized=False,
+            username=username
+        )
 
-            # Incrementar intentos fallidos
-            self.failed_attempts[user_id] += 1
+        logger.warning(
+            "blocked_user_attempt",
+            user_id=user_id,
+            username=username
+        )
+        self.abuse_detector.record("blocked", user_id)
 
-            # Bloquear si excede intentos
-            if self.failed_attempts[user_id] >= self.max_failed_attempts:
-                self.blocked_users.add(user_id)
-                security_logger.log_user_blocked(
-                    user_id=user_id,
-                    reason=f"{self.max_failed_attempts} intentos fallidos"
-                )
+        return {
+            "valid": False,
+            "error": "Usuario bloqueado. Contacta al administrador."
+        }
 
-            logger.warning(
-                "unauthorized_user",
-                user_id=user_id,
-                username=username,
-                failed_attempts=self.failed_attempts[user_id]
-            )
+    def _reject_unknown(self, user_id: int, username: Optional[str]) -> Dict[str, Any]:
+        """
+        Rechaza a un usuario no autorizado y cuenta el intento.
 
-            return {
-                "valid": False,
-                "error": "No tienes autorización para usar este bot."
-            }
+        Un ID desconocido nunca se bloquea de forma permanente: queda
+        bloqueado mientras su conteo exacto de intentos (en el LRU acotado
+        y con TTL del tracker) alcance el máximo. Así un flood de IDs no
+        crece blocked_users ni escribe en la BD, y un ID que luego se
+        autoriza no queda bloqueado.
+
+        Args:
+            user_id: ID del usuario de Telegram.
+            username: Username de Telegram (opcional).
+
+        Returns:
+            dict con valid=False y el error.
+        """
+        # Bloqueado explícitamente (manual o cargado de la BD)
+        if user_id in self.blocked_users:
+            return self._reject_blocked(user_id, username)
+
+        # Incrementar intentos fallidos (ID desconocido: memoria acotada)
+        failed_attempts = self.security_state.record_failure(user_id, known=False)
+
+        if failed_attempts > self.max_failed_attempts:
+            return self._reject_blocked(user_id, username)
 
-        # Usuario autorizado
         security_logger.log_access_attempt(
             user_id=user_id,
-            authorized=True,
+            authorized=False,
             username=username
         )
 
-        return {"valid": True}
+        if failed_attempts == self.max_failed_attempts:
+            security_logger.log_user_blocked(
+                user_id=user_id,
+                reason=f"{self.max_failed_attempts} intentos fallidos (temporal)"
+            )
+
+        logger.warning(
+            "unauthorized_user",
+            user_id=user_id,
+            username=username,
+            failed_attempts=failed_attempts
+        )
+        # Solo se observa: un ID desconocido no se bloquea automáticamente
+        self.abuse_detector.record("unauthorized", user_id)
 
-    def _check_rate_limit(
+        return {
+            "valid": False,
+            "error": "No tienes autorización para usar este bot."
+        }
+
+    async def _check_rate_limit(
         self,
         user_id: int,
         username: str = None
@@ -319,16 +656,39 @@ class SecurityAgent:
             user_id: ID del usuario de Telegram.
             username: Username de Telegram (opcional).
 
+        Si el backend falla (conexión rechazada, timeout) se aplica
+        `rate_limit_fail_open`.
+
         Returns:
-            dict con valid y error (si aplica).
+            dict con valid, error y error_type (si aplica).
         """
-        if not self.rate_limiter.is_allowed(user_id):
+        try:
+            decision = await self.rate_limit_backend.check(user_id)
+        except Exception as e:
+            metrics.increment("rate_limit_backend_errors_total")
+            logger.error(
+                "rate_limit_backend_failed",
+                user_id=user_id,
+                error=str(e),
+                error_type=type(e).__name__,
+                fail_open=self.rate_limit_fail_open
+            )
+            if self.rate_limit_fail_open:
+                return {"valid": True}
+            return {
+                "valid": False,
+                "error": "El servicio no está disponible en este momento. Intenta en unos minutos.",
+                "error_type": "rate_limit_unavailable"
+            }
+
+        if not decision.allowed:
             security_logger.log_rate_limit_exceeded(
                 user_id=user_id,
                 username=username
             )
+            self._record_abuse("rate_limited", user_id)
 
-            time_until_reset = self.rate_limiter.get_time_until_reset(user_id)
+            time_until_reset = decision.retry_after
 
             return {
                 "valid": False,
@@ -337,6 +697,35 @@ class SecurityAgent:
 
         return {"valid": True}
 
+    def _record_abuse(self, kind: str, user_id: int) -> Optional[AbuseFlag]:
+        """
+        Registra un rechazo en el detector de abuso.
+
+        Si el usuario queda marcado como heavy hitter y la política de
+        bloqueo automático está activa, se bloquea.
+
+        Args:
+            kind: Tipo de evento (uno de AUTO_BLOCK_KINDS).
+            user_id: ID del usuario de Telegram.
+
+        Returns:
+            AbuseFlag si el usuario se marcó con este evento, o None.
+        """
+        flag = self.abuse_detector.record(kind, user_id)
+
+        if (
+            flag is not None
+            and self.auto_block_abusers
+            and kind in self.AUTO_BLOCK_KINDS
+            and user_id in self.allowlist.users
+            and user_id not in self.blocked_users
+        ):
+            reason = f"abuso: {flag.count} eventos {kind} en {flag.window_seconds:g}s"
+            self.security_state.block(user_id, reason=reason)
+            security_logger.log_user_blocked(user_id=user_id, reason=reason)
+
+        return flag
+
     def add_user(self, user_id: int) -> None:
         """
         Agrega un usuario a la whitelist.
@@ -344,7 +733,11 @@ class SecurityAgent:
         Args:
             user_id: ID del usuario de Telegram.
         """
-        self.allowed_users.add(user_id)
+        self.allowlist.add(user_id)
+        # Un bloqueo previo como ID desconocido ya no aplica
+        if user_id in self.blocked_users:
+            self.security_state.unblock(user_id)
+        self.failed_attempts.pop(user_id, None)
         logger.info("user_added_to_whitelist", user_id=user_id)
 
     def remove_user(self, user_id: int) -> None:
@@ -354,7 +747,7 @@ class SecurityAgent:
         Args:
             user_id: ID del usuario de Telegram.
         """
-        self.allowed_users.discard(user_id)
+        self.allowlist.remove(user_id)
         logger.info("user_removed_from_whitelist", user_id=user_id)
 
     def block_user(self, user_id: int) -> None:
@@ -364,7 +757,7 @@ class SecurityAgent:
         Args:
             user_id: ID del usuario de Telegram.
         """
-        self.blocked_users.add(user_id)
+        self.security_state.block(user_id, reason="manual_block")
         security_logger.log_user_blocked(user_id=user_id, reason="manual_block")
 
     def unblock_user(self, user_id: int) -> None:
@@ -374,6 +767,20 @@ class SecurityAgent:
         Args:
             user_id: ID del usuario de Telegram.
         """
-        self.blocked_users.discard(user_id)
-        self.failed_attempts[user_id] = 0
+        self.security_state.unblock(user_id)
         logger.info("user_unblocked", user_id=user_id)
+
+    def _on_security_state_change(self, change: SecurityStateChange) -> None:
+        """
+        Registra los bloqueos decididos por otros workers.
+
+        Args:
+            change: Cambio del estado de seguridad.
+        """
+        if change.remote and change.event in ("block", "unblock"):
+            logger.info(
+                "remote_security_state_change",
+                user_id=change.user_id,
+                event=change.event,
+                reason=change.reason
+            )
@@ -0,0 +1,107 @@
+"""
+Pipeline de etapas del agente de seguridad.
+
+Cada etapa recibe el contexto de la solicitud y retorna None para
+continuar o el dict de rechazo que se devuelve al usuario. El pipeline
+se detiene en el primer rechazo, así que el orden de las etapas define
+cuánto trabajo se hace antes de rechazar: las verificaciones baratas
+van primero.
+"""
+
+from dataclasses import dataclass
+from typing import Any, Awaitable, Callable, Dict, NamedTuple, Optional, Sequence, Union
+
+from ..utils.deadline import Deadline
+from ..utils.logger import get_logger
+from ..utils.metrics import metrics
+
+logger = get_logger(__name__)
+
+StageResult = Optional[Dict[str, Any]]
+
+
+@dataclass
+class RequestContext:
+    """
+    Estado de una solicitud a lo largo del pipeline.
+
+    Attributes:
+        message: Mensaje original de Telegram.
+        user_id: ID del usuario de Telegram.
+        username: Username de Telegram.
+        deadline: Deadline de la solicitud (opcional).
+        text: Texto sanitizado (lo completa la etapa de contenido).
+        contact: Contacto extraído (lo completa la etapa de extracción).
+        extractor: "local" o "llm" según quién extrajo el contacto.
+    """
+
+    message: Dict[str, Any]
+    user_id: Optional[int]
+    username: str
+    deadline: Optional[Deadline] = None
+    text: str = ""
+    contact: Optional[Dict[str, Any]] = None
+    extractor: str = "local"
+
+
+class PipelineStage(NamedTuple):
+    """Etapa del pipeline: nombre, función y si la función es async."""
+
+    name: str
+    run: Callable[[RequestContext], Union[StageResult, Awaitable[StageResult]]]
+    is_async: bool = False
+
+
+class SecurityPipeline:
+    """
+    Secuencia de etapas con salida temprana.
+
+    Las etapas síncronas se llaman directamente (sin crear una corrutina
+    por etapa); solo las async se esperan.
+
+    Attributes:
+        stages: Etapas en orden de ejecución.
+    """
+
+    def __init__(self, stages: Sequence[PipelineStage]):
+        """
+        Inicializa el pipeline.
+
+        Args:
+            stages: Etapas en orden de ejecución.
+
+        Example:
+            >>> pipeline = SecurityPipeline([
+            ...     PipelineStage("origin", agent._stage_origin),
+            ...     PipelineStage("rate_limit", agent._stage_rate_limit, is_async=True),
+            ... ])
+        """
+        self.stages = tuple(stages)
+
+    @property
+    def names(self) -> Sequence[str]:
+        """Nombres de las etapas en orden."""
+        return tuple(stage.name for stage in self.stages)
+
+    async def run(self, context: RequestContext) -> StageResult:
+        """
+        Ejecuta las etapas hasta el primer rechazo.
+
+        Args:
+            context: Contexto de la solicitud (las etapas lo completan).
+
+        Returns:
+            dict de rechazo de la primera etapa que rechazó, o None si
+            todas las etapas pasaron.
+        """
+        for stage in self.stages:
+            if stage.is_async:
+                result = await stage.run(context)
+            else:
+                result = stage.run(context)
+
+            if result is not None:
+                metrics.increment("security_pipeline_rejections_total", stage=stage.name)
+                return result
+
+        return None
@@ -7,11 +7,12 @@ en el sistema de gestión de contactos.
 
 from datetime import datetime
 from typing import Literal, Optional
-import re
 from uuid import uuid4
 
 from pydantic import BaseModel, Field, field_validator
 
+from ..utils.phone import parse_phone
+
 
 class Contact(BaseModel):
     """
@@ -94,35 +95,17 @@ class Contact(BaseModel):
             Número normalizado en formato +57XXXXXXXXXX.
 
         Raises:
-            ValueError: Si el número no tiene entre 10 y 15 dígitos.
+            ValueError: Si el número no tiene entre 10 y 15 dígitos o no
+                cumple la longitud del país.
         """
         if not value:
             raise ValueError("El teléfono no puede estar vacío")
 
-        # Remover todo excepto dígitos y +
-        cleaned = re.sub(r"[^\d+]", "", value)
-
-        # Extraer solo dígitos para validar longitud
-        digits_only = cleaned.replace("+", "")
-
-        if len(digits_only) < 10:
-            raise ValueError(
-                f"El teléfono debe tener al menos 10 dígitos, "
-                f"se encontraron {len(digits_only)}"
-            )
+        result = parse_phone(value)
+        if result.error:
+            raise ValueError(result.error)
 
-        if len(digits_only) > 15:
-            raise ValueError(
-                f"El teléfono no puede tener más de 15 dígitos, "
-                f"se encontraron {len(digits_only)}"
-            )
-
-        # Agregar código de país si no existe
-        if not cleaned.startswith("+"):
-            # Asumir código de país +57 (Colombia)
-            cleaned = "+57" + cleaned
-
-        return cleaned
+        return result.e164
 
     @field_validator("nombre", "quien_lo_recomendo")
     @classmethod
@@ -3,5 +3,42 @@
 from .gemini_service import GeminiService
 from .contacts_api import ContactsAPIClient
 from .telegram_service import TelegramService
+from .local_extractor import LocalContactExtractor
+from .training_store import TrainingExampleStore
+from .security_state import SecurityState, SQLSecurityStateStore
+from .allowlist import Allowlist, SQLAllowlistStore
+from .token_quota import QuotaDecision, SQLTokenQuotaStore, TokenQuota
+from .webhook_server import WebhookServer
+from .update_processor import ChatOrderedUpdateProcessor
+from .update_dedup import SQLUpdateDeduplicator, UpdateDeduplicator
+from .worker_pool import WorkerPool
+from .pending_store import (
+    PendingConfirmation,
+    PendingConfirmationStore,
+    SQLPendingConfirmationStore,
+    create_pending_store
+)
 
-__all__ = ["GeminiService", "ContactsAPIClient", "TelegramService"]
+__all__ = [
+    "GeminiService",
+    "ContactsAPIClient",
+    "TelegramService",
+    "LocalContactExtractor",
+    "TrainingExampleStore",
+    "SecurityState",
+    "SQLSecurityStateStore",
+    "Allowlist",
+    "SQLAllowlistStore",
+    "QuotaDecision",
+    "TokenQuota",
+    "SQLTokenQuotaStore",
+    "WebhookServer",
+    "ChatOrderedUpdateProcessor",
+    "UpdateDeduplicator",
+    "SQLUpdateDeduplicator",
+    "WorkerPool",
+    "PendingConfirmation",
+    "PendingConfirmationStore",
+    "SQLPendingConfirmationStore",
+    "create_pending_store"
+]
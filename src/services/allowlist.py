@@ -0,0 +1,363 @@
+"""
+Whitelist de usuarios autorizados.
+
+La whitelist se consulta en cada mensaje, así que SecurityAgent lee un
+snapshot inmutable (frozenset) sin locks ni I/O. Los cambios construyen
+un frozenset nuevo y lo asignan de una vez: como la asignación de un
+atributo es atómica, quien lee ve el snapshot anterior o el nuevo,
+nunca uno a medio construir.
+
+Con SQLAllowlistStore la whitelist vive en la BD (tabla allowed_users)
+y se puede modificar sin reiniciar el bot. Cada cambio incrementa un
+número de versión (tabla allowlist_version); el proceso recarga el
+snapshot cuando la versión cambia, ya sea en la verificación periódica
+o al recibir una notificación (notify(), p. ej. desde SIGHUP).
+"""
+
+import asyncio
+from datetime import datetime
+from typing import Callable, FrozenSet, Iterable, Iterator, List, Optional, Tuple
+
+from sqlalchemy import BigInteger, Column, DateTime, Integer, String, delete, select, update
+from sqlalchemy.exc import IntegrityError, SQLAlchemyError
+from sqlalchemy.orm import Session
+
+from .contacts_api import Base
+from ..utils.logger import get_logger
+
+logger = get_logger(__name__)
+
+# Fila única de la tabla de versión
+_VERSION_ROW_ID = 1
+
+
+class AllowedUserDB(Base):
+    """
+    Usuario autorizado.
+
+    Tabla: allowed_users
+    """
+    __tablename__ = "allowed_users"
+
+    user_id = Column(BigInteger, primary_key=True, autoincrement=False)
+    username = Column(String(255), nullable=True)
+    added_at = Column(DateTime, default=datetime.utcnow)
+
+
+class AllowlistVersionDB(Base):
+    """
+    Versión de la whitelist (se incrementa con cada cambio).
+
+    Tabla: allowlist_version
+    """
+    __tablename__ = "allowlist_version"
+
+    id = Column(Integer, primary_key=True, autoincrement=False)
+    version = Column(Integer, nullable=False, default=0)
+    updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
+
+
+class Allowlist:
+    """
+    Whitelist en memoria del proceso.
+
+    Es la implementación sin persistencia (lista fija de configuración,
+    un solo worker).
+
+    Attributes:
+        users: Snapshot inmutable de user IDs autorizados. Se reemplaza
+            completo en cada cambio; leerlo no requiere locks.
+        version: Versión del snapshot actual.
+    """
+
+    def __init__(self, user_ids: Iterable[int] = ()):
+        """
+        Inicializa la whitelist.
+
+        Args:
+            user_ids: User IDs autorizados iniciales.
+
+        Example:
+            >>> allowlist = Allowlist([123456789])
+            >>> 123456789 in allowlist
+            True
+        """
+        self.users: FrozenSet[int] = frozenset(user_ids)
+        self.version = 0
+
+    def __contains__(self, user_id: int) -> bool:
+        """Indica si el usuario está autorizado."""
+        return user_id in self.users
+
+    def __len__(self) -> int:
+        """Número de usuarios autorizados."""
+        return len(self.users)
+
+    def __iter__(self) -> Iterator[int]:
+        """Itera sobre el snapshot actual."""
+        return iter(self.users)
+
+    def _swap(self, users: FrozenSet[int], version: int) -> None:
+        """Reemplaza el snapshot (una sola asignación atómica)."""
+        previous = self.users
+        self.users = users
+        self.version = version
+
+        if users != previous:
+            logger.info(
+                "allowlist_reloaded",
+                version=version,
+                allowed_users=len(users),
+                added=len(users - previous),
+                removed=len(previous - users)
+            )
+
+    def add(self, user_id: int, username: Optional[str] = None) -> None:
+        """
+        Autoriza un usuario.
+
+        Args:
+            user_id: ID del usuario de Telegram.
+            username: Username de Telegram (opcional).
+        """
+        self._swap(self.users | {user_id}, self.version + 1)
+
+    def remove(self, user_id: int) -> None:
+        """
+        Quita la autorización de un usuario.
+
+        Args:
+            user_id: ID del usuario de Telegram.
+        """
+        self._swap(self.users - {user_id}, self.version + 1)
+
+    def notify(self) -> None:
+        """Pide recargar el snapshot (no aplica en memoria)."""
+
+    def start(self) -> None:
+        """Inicia la recarga en segundo plano (no aplica en memoria)."""
+
+    async def stop(self) -> None:
+        """Detiene la recarga en segundo plano (no aplica en memoria)."""
+
+
+class SQLAllowlistStore(Allowlist):
+    """
+    Whitelist persistida en la BD, recargable sin reiniciar.
+
+    Attributes:
+        session_factory: Factory de sesiones de SQLAlchemy.
+        refresh_interval: Segundos entre verificaciones de versión.
+        seed: User IDs para poblar la tabla si está vacía.
+    """
+
+    def __init__(
+        self,
+        session_factory: Callable[[], Session],
+        refresh_interval: float = 30.0,
+        seed: Iterable[int] = ()
+    ):
+        """
+        Inicializa el store.
+
+        Args:
+            session_factory: Factory de sesiones (p. ej.
+                ContactsAPIClient.SessionLocal).
+            refresh_interval: Segundos entre verificaciones de versión
+                (default: 30).
+            seed: User IDs con los que se puebla la tabla la primera vez
+                (p. ej. TELEGRAM_ALLOWED_USERS). Si la tabla ya tiene
+                usuarios se ignoran: la BD es la fuente de verdad.
+
+        Example:
+            >>> store = SQLAllowlistStore(contacts_client.SessionLocal, seed=[123])
+            >>> store.load()
+            >>> store.start()
+        """
+        super().__init__()
+        self.session_factory = session_factory
+        self.refresh_interval = refresh_interval
+        self.seed = tuple(seed)
+        self._wakeup: Optional[asyncio.Event] = None
+        self._task: Optional[asyncio.Task] = None
+
+    @staticmethod
+    def _bump_version(db: Session) -> None:
+        """Incrementa la versión de la whitelist."""
+        result = db.execute(
+            update(AllowlistVersionDB)
+            .where(AllowlistVersionDB.id == _VERSION_ROW_ID)
+            .values(
+                version=AllowlistVersionDB.version + 1,
+                updated_at=datetime.utcnow()
+            )
+        )
+
+        if result.rowcount == 0:
+            try:
+                with db.begin_nested():
+                    db.add(AllowlistVersionDB(id=_VERSION_ROW_ID, version=1))
+            except IntegrityError:
+                # Otro worker creó la fila al mismo tiempo
+                db.execute(
+                    update(AllowlistVersionDB)
+                    .where(AllowlistVersionDB.id == _VERSION_ROW_ID)
+                    .values(version=AllowlistVersionDB.version + 1)
+                )
+
+    def _read_version(self, db: Session) -> int:
+        """Versión actual en la BD (0 si nunca hubo cambios)."""
+        version = db.execute(
+            select(AllowlistVersionDB.version)
+            .where(AllowlistVersionDB.id == _VERSION_ROW_ID)
+        ).scalar()
+        return version or 0
+
+    def _fetch_if_changed(self) -> Optional[Tuple[FrozenSet[int], int]]:
+        """
+        Lee la whitelist solo si la versión en la BD cambió.
+
+        Returns:
+            Tupla (usuarios, versión) o None si no hubo cambios.
+        """
+        with self.session_factory() as db:
+            version = self._read_version(db)
+            if version == self.version:
+                return None
+            users = frozenset(db.execute(select(AllowedUserDB.user_id)).scalars())
+        return users, version
+
+    def load(self) -> None:
+        """
+        Carga el snapshot desde la BD (al iniciar el proceso).
+
+        Si la tabla está vacía la puebla con `seed`.
+
+        Raises:
+            SQLAlchemyError: Si falla la lectura o la escritura.
+        """
+        with self.session_factory() as db:
+            has_users = db.execute(select(AllowedUserDB.user_id).limit(1)).first()
+            if not has_users and self.seed:
+                for user_id in self.seed:
+                    db.add(AllowedUserDB(user_id=user_id))
+                self._bump_version(db)
+                db.commit()
+                logger.info("allowlist_seeded", allowed_users=len(self.seed))
+
+            version = self._read_version(db)
+            users = frozenset(db.execute(select(AllowedUserDB.user_id)).scalars())
+
+        self._swap(users, version)
+        logger.info("allowlist_loaded", version=version, allowed_users=len(users))
+
+    def reload(self) -> bool:
+        """
+        Recarga el snapshot si la versión en la BD cambió.
+
+        Returns:
+            True si el snapshot se reemplazó.
+        """
+        changed = self._fetch_if_changed()
+        if changed is None:
+            return False
+        self._swap(*changed)
+        return True
+
+    def add(self, user_id: int, username: Optional[str] = None) -> None:
+        """
+        Autoriza un usuario en la BD y recarga el snapshot local.
+
+        Los demás workers lo ven en su próxima verificación de versión.
+
+        Args:
+            user_id: ID del usuario de Telegram.
+            username: Username de Telegram (opcional).
+
+        Raises:
+            SQLAlchemyError: Si falla la escritura.
+        """
+        with self.session_factory() as db:
+            exists = db.get(AllowedUserDB, user_id)
+            if exists is None:
+                db.add(AllowedUserDB(user_id=user_id, username=username))
+                self._bump_version(db)
+                db.commit()
+        self.reload()
+
+    def remove(self, user_id: int) -> None:
+        """
+        Quita la autorización de un usuario en la BD y recarga el snapshot.
+
+        Args:
+            user_id: ID del usuario de Telegram.
+
+        Raises:
+            SQLAlchemyError: Si falla la escritura.
+        """
+        with self.session_factory() as db:
+            result = db.execute(
+                delete(AllowedUserDB).where(AllowedUserDB.user_id == user_id)
+            )
+            if result.rowcount:
+                self._bump_version(db)
+                db.commit()
+        self.reload()
+
+    def list_users(self) -> List[Tuple[int, Optional[str], Optional[datetime]]]:
+        """
+        Lista los usuarios autorizados en la BD.
+
+        Returns:
+            Lista de tuplas (user_id, username, added_at).
+        """
+        with self.session_factory() as db:
+            rows = db.execute(
+                select(AllowedUserDB.user_id, AllowedUserDB.username, AllowedUserDB.added_at)
+                .order_by(AllowedUserDB.added_at)
+            ).all()
+        return [tuple(row) for row in rows]
+
+    def notify(self) -> None:
+        """Pide recargar el snapshot de inmediato (sin esperar al intervalo)."""
+        if self._wakeup is not None:
+            self._wakeup.set()
+
+    async def _refresh_loop(self) -> None:
+        """Verifica la versión periódicamente o al recibir una notificación."""
+        while True:
+            try:
+                await asyncio.wait_for(self._wakeup.wait(), timeout=self.refresh_interval)
+            except asyncio.TimeoutError:
+                pass
+            self._wakeup.clear()
+
+            try:
+                # La BD se consulta en un hilo; el snapshot se reemplaza
+                # desde el event loop
+                changed = await asyncio.to_thread(self._fetch_if_changed)
+                if changed is not None:
+                    self._swap(*changed)
+            except SQLAlchemyError as e:
+                logger.error("allowlist_refresh_failed", error=str(e))
+
+    def start(self) -> None:
+        """Inicia la recarga en segundo plano (requiere un event loop activo)."""
+        if self._task is None or self._task.done():
+            self._wakeup = asyncio.Event()
+            self._task = asyncio.create_task(self._refresh_loop())
+            logger.info(
+                "allowlist_refresh_started",
+                refresh_interval=self.refresh_interval
+            )
+
+    async def stop(self) -> None:
+        """Detiene la recarga en segundo plano."""
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+            self._wakeup = None
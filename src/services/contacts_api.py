@@ -5,19 +5,27 @@ Este módulo maneja la persistencia de contactos en PostgreSQL
 usando SQLAlchemy ORM, con soporte legacy para API REST externa.
 """
 
+import asyncio
 from typing import Dict, Any, Optional
 from datetime import datetime
 from uuid import uuid4
 
-from sqlalchemy import create_engine, Column, String, DateTime
+from sqlalchemy import create_engine, Column, String, DateTime, text
 from sqlalchemy.ext.declarative import declarative_base
 from sqlalchemy.orm import sessionmaker, Session
-from sqlalchemy.exc import SQLAlchemyError
+from sqlalchemy.exc import (
+    SQLAlchemyError,
+    DisconnectionError,
+    OperationalError,
+    TimeoutError as PoolTimeoutError,
+)
 
 import httpx
 
 from ..models.contact import Contact
+from ..utils.deadline import Deadline, run_with_timeout
 from ..utils.logger import get_logger
+from ..utils.retry import RetryPolicy
 
 logger = get_logger(__name__)
 
@@ -43,6 +51,24 @@ class ContactDB(Base):
     updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
 
 
+def is_transient_db_error(error: BaseException) -> bool:
+    """
+    Indica si un error de base de datos es transitorio.
+
+    Args:
+        error: Excepción lanzada por SQLAlchemy.
+
+    Returns:
+        True para desconexiones, errores operacionales y timeouts del pool.
+    """
+    if getattr(error, "connection_invalidated", False):
+        return True
+    return isinstance(
+        error,
+        (OperationalError, DisconnectionError, PoolTimeoutError)
+    )
+
+
 class ContactsAPIClient:
     """
     Cliente para persistencia de contactos en PostgreSQL.
@@ -53,6 +79,9 @@ class ContactsAPIClient:
         SessionLocal: Factory de sesiones.
         legacy_api_url: URL de API REST externa (opcional).
         legacy_api_key: API key para API externa (opcional).
+        timeout: Timeout para requests HTTP en segundos.
+        db_timeout: Timeout para operaciones de BD en segundos.
+        retry_policy: Política de reintentos para operaciones de BD.
     """
 
     def __init__(
@@ -60,7 +89,9 @@ class ContactsAPIClient:
         database_url: str,
         legacy_api_url: Optional[str] = None,
         legacy_api_key: Optional[str] = None,
-        timeout: int = 10
+        timeout: int = 10,
+        retry_policy: Optional[RetryPolicy] = None,
+        db_timeout: float = 10.0
     ):
         """
         Inicializa el cliente de contactos.
@@ -70,6 +101,9 @@ class ContactsAPIClient:
             legacy_api_url: URL de API REST externa (opcional).
             legacy_api_key: API key para API externa (opcional).
             timeout: Timeout para requests HTTP (default: 10).
+            retry_policy: Política de reintentos para la BD (default: 3
+                intentos con backoff exponencial).
+            db_timeout: Timeout para operaciones de BD (default: 10).
 
         Example:
             >>> client = ContactsAPIClient(
@@ -80,6 +114,11 @@ class ContactsAPIClient:
         self.legacy_api_url = legacy_api_url
         self.legacy_api_key = legacy_api_key
         self.timeout = timeout
+        self.db_timeout = db_timeout
+        self.retry_policy = retry_policy or RetryPolicy(
+            name="database",
+            is_retryable=is_transient_db_error
+        )
 
         # Configurar SQLAlchemy
         self.engine = create_engine(database_url, echo=False)
@@ -110,18 +149,31 @@ class ContactsAPIClient:
             logger.error("failed_to_create_tables", error=str(e))
             raise
 
-    async def save_contact(self, contact: Contact) -> Dict[str, Any]:
+    async def save_contact(
+        self,
+        contact: Contact,
+        deadline: Optional[Deadline] = None,
+        mirror_legacy: bool = True
+    ) -> Dict[str, Any]:
         """
         Guarda un contacto en PostgreSQL.
 
+        La escritura corre en un hilo para no bloquear el event loop y
+        está acotada por `db_timeout` y por el deadline de la solicitud.
+
         Args:
             contact: Instancia del modelo Contact.
+            deadline: Deadline de la solicitud (opcional).
+            mirror_legacy: Si es False no se copia a la API legacy: el
+                llamador usa save_to_legacy_api() por su cuenta, por
+                ejemplo en paralelo con la notificación (default: True).
 
         Returns:
             dict con keys:
                 - success: bool
                 - contact_id: str (UUID del contacto si success=True)
                 - error: str (mensaje de error si success=False)
+                - error_type: "timeout" si se agotó el tiempo
 
         Example:
             >>> client = ContactsAPIClient(database_url="...")
@@ -139,40 +191,50 @@ class ContactsAPIClient:
             telefono=contact.telefono
         )
 
-        db: Session = self.SessionLocal()
-
         try:
-            # Crear registro en base de datos
-            contact_db = ContactDB(
-                id=contact.id,
-                nombre=contact.nombre,
-                telefono=contact.telefono,
-                quien_lo_recomendo=contact.quien_lo_recomendo,
-                timestamp=contact.timestamp,
-                source=contact.source
+            # Cada intento usa una sesión nueva
+            contact_id = await run_with_timeout(
+                self.retry_policy.call(
+                    asyncio.to_thread,
+                    self._insert_contact,
+                    contact,
+                    deadline=deadline
+                ),
+                timeout=self.db_timeout,
+                deadline=deadline,
+                stage="database"
             )
 
-            db.add(contact_db)
-            db.commit()
-            db.refresh(contact_db)
-
             logger.info(
                 "contact_saved_successfully",
-                contact_id=contact_db.id,
-                nombre=contact_db.nombre
+                contact_id=contact_id,
+                nombre=contact.nombre
             )
 
             # Si hay API legacy configurada, también enviar allá
-            if self.legacy_api_url:
-                await self._save_to_legacy_api(contact)
+            if mirror_legacy:
+                await self.save_to_legacy_api(contact, deadline=deadline)
 
             return {
                 "success": True,
-                "contact_id": contact_db.id
+                "contact_id": contact_id
+            }
+
+        except asyncio.TimeoutError:
+            # El hilo puede completar la escritura después del timeout:
+            # se informa como no confirmada para no bloquear la respuesta
+            logger.error(
+                "save_contact_timeout",
+                db_timeout=self.db_timeout,
+                nombre=contact.nombre
+            )
+            return {
+                "success": False,
+                "error": "Tiempo agotado al guardar el contacto",
+                "error_type": "timeout"
             }
 
         except SQLAlchemyError as e:
-            db.rollback()
             logger.error(
                 "failed_to_save_contact",
                 error=str(e),
@@ -183,21 +245,71 @@ class ContactsAPIClient:
                 "error": f"Error al guardar contacto: {str(e)}"
             }
 
+    def _insert_contact(self, contact: Contact) -> str:
+        """
+        Inserta un contacto en una sesión propia.
+
+        Args:
+            contact: Instancia del modelo Contact.
+
+        Returns:
+            ID del contacto guardado.
+
+        Raises:
+            SQLAlchemyError: Si falla la escritura (tras hacer rollback).
+        """
+        db: Session = self.SessionLocal()
+
+        try:
+            # Crear registro en base de datos
+            contact_db = ContactDB(
+                id=contact.id,
+                nombre=contact.nombre,
+                telefono=contact.telefono,
+                quien_lo_recomendo=contact.quien_lo_recomendo,
+                timestamp=contact.timestamp,
+                source=contact.source
+            )
+
+            db.add(contact_db)
+            db.commit()
+
+            return contact.id
+
+        except SQLAlchemyError:
+            db.rollback()
+            raise
+
         finally:
             db.close()
 
-    async def _save_to_legacy_api(self, contact: Contact) -> None:
+    async def save_to_legacy_api(
+        self,
+        contact: Contact,
+        deadline: Optional[Deadline] = None
+    ) -> None:
         """
         Guarda el contacto en la API REST externa (legacy).
 
+        Es best-effort: sin API configurada no hace nada y los errores
+        solo se registran.
+
         Args:
             contact: Instancia del modelo Contact.
+            deadline: Deadline de la solicitud (opcional).
         """
         if not self.legacy_api_url or not self.legacy_api_key:
             return
 
+        timeout = self.timeout
+        if deadline is not None:
+            timeout = min(timeout, deadline.remaining())
+            if timeout <= 0:
+                logger.warning("legacy_api_skipped_deadline")
+                return
+
         try:
-            async with httpx.AsyncClient(timeout=self.timeout) as client:
+            async with httpx.AsyncClient(timeout=timeout) as client:
                 response = await client.post(
                     f"{self.legacy_api_url}/contacts",
                     json={
@@ -230,7 +342,7 @@ class ContactsAPIClient:
         except httpx.TimeoutException:
             logger.warning(
                 "legacy_api_timeout",
-                timeout=self.timeout
+                timeout=timeout
             )
 
         except Exception as e:
@@ -243,6 +355,28 @@ class ContactsAPIClient:
         """
         Obtiene un contacto por su ID.
 
+        Args:
+            contact_id: UUID del contacto.
+
+        Returns:
+            Instancia de Contact o None si no existe.
+        """
+        try:
+            contact = await self.retry_policy.call(self._fetch_contact, contact_id)
+
+        except SQLAlchemyError as e:
+            logger.error("failed_to_get_contact", error=str(e))
+            return None
+
+        if not contact:
+            logger.warning("contact_not_found", contact_id=contact_id)
+
+        return contact
+
+    def _fetch_contact(self, contact_id: str) -> Optional[Contact]:
+        """
+        Lee un contacto en una sesión propia.
+
         Args:
             contact_id: UUID del contacto.
 
@@ -257,11 +391,10 @@ class ContactsAPIClient:
             ).first()
 
             if not contact_db:
-                logger.warning("contact_not_found", contact_id=contact_id)
                 return None
 
             # Convertir a modelo Pydantic
-            contact = Contact(
+            return Contact(
                 id=contact_db.id,
                 nombre=contact_db.nombre,
                 telefono=contact_db.telefono,
@@ -272,12 +405,6 @@ class ContactsAPIClient:
                 updated_at=contact_db.updated_at
             )
 
-            return contact
-
-        except SQLAlchemyError as e:
-            logger.error("failed_to_get_contact", error=str(e))
-            return None
-
         finally:
             db.close()
 
@@ -285,14 +412,16 @@ class ContactsAPIClient:
         """
         Verifica la conexión a la base de datos.
 
+        La consulta corre en un hilo para no bloquear el event loop.
+
         Returns:
             True si la conexión es exitosa, False en caso contrario.
         """
         try:
-            db: Session = self.SessionLocal()
-            # Ejecutar query simple
-            db.execute("SELECT 1")
-            db.close()
+            await asyncio.wait_for(
+                asyncio.to_thread(self._ping),
+                timeout=self.db_timeout
+            )
 
             logger.info("database_health_check_passed")
             return True
@@ -303,3 +432,8 @@ class ContactsAPIClient:
                 error=str(e)
             )
             return False
+
+    def _ping(self) -> None:
+        """Ejecuta SELECT 1 en una conexión del pool."""
+        with self.engine.connect() as connection:
+            connection.execute(text("SELECT 1"))
@@ -7,16 +7,32 @@ usando el modelo GPT de OpenAI.
 
 import json
 import re
-from typing import Dict, Any, Optional
+from typing import Dict, Any, List, Optional
 import asyncio
 
-from openai import AsyncOpenAI
+from openai import (
+    AsyncOpenAI,
+    APIConnectionError,
+    APITimeoutError,
+    InternalServerError,
+    RateLimitError,
+)
 
+from ..utils.deadline import Deadline, DeadlineExceeded, run_with_timeout
 from ..utils.logger import get_logger
+from ..utils.phone import parse_phone
+from ..utils.retry import RetryPolicy
 
 logger = get_logger(__name__)
 
 
+SYSTEM_PROMPT = "You are a JSON extraction assistant. You respond with valid JSON only, no markdown, no explanations."
+
+# Estimación de tokens antes de llamar al LLM (para las cuotas): ~4
+# caracteres por token y una respuesta JSON de una línea
+CHARS_PER_TOKEN = 4
+ESTIMATED_COMPLETION_TOKENS = 64
+
 # Prompt de extracción mejorado para forzar JSON puro
 EXTRACTION_PROMPT = """Extrae la información del siguiente mensaje y responde SOLAMENTE con JSON válido, SIN texto adicional, SIN markdown, SIN explicaciones.
 
@@ -36,6 +52,22 @@ Mensaje: {message}
 JSON:"""
 
 
+def is_transient_llm_error(error: BaseException) -> bool:
+    """
+    Indica si un error del LLM es transitorio y vale la pena reintentar.
+
+    Args:
+        error: Excepción lanzada por el cliente de OpenAI.
+
+    Returns:
+        True para errores de conexión/timeout, 5xx y 429.
+    """
+    return isinstance(
+        error,
+        (APIConnectionError, InternalServerError, RateLimitError)
+    )
+
+
 class GeminiService:
     """
     Servicio para extracción de entidades usando OpenAI GPT.
@@ -45,13 +77,15 @@ class GeminiService:
         model_name: Nombre del modelo a utilizar.
         timeout: Timeout en segundos para las peticiones.
         client: Cliente asíncrono de OpenAI.
+        retry_policy: Política de reintentos para fallas transitorias.
     """
 
     def __init__(
         self,
         api_key: str,
         model_name: str = "gpt-4-mini",
-        timeout: int = 30
+        timeout: int = 30,
+        retry_policy: Optional[RetryPolicy] = None
     ):
         """
         Inicializa el servicio de OpenAI.
@@ -60,6 +94,8 @@ class GeminiService:
             api_key: API key de OpenAI.
             model_name: Nombre del modelo (default: gpt-4-mini).
             timeout: Timeout en segundos (default: 30).
+            retry_policy: Política de reintentos (default: 3 intentos
+                con backoff exponencial).
 
         Example:
             >>> service = GeminiService(api_key="sk-...")
@@ -68,8 +104,14 @@ class GeminiService:
         self.model_name = model_name
         self.timeout = timeout
 
-        # Crear cliente asíncrono de OpenAI
-        self.client = AsyncOpenAI(api_key=api_key)
+        self.retry_policy = retry_policy or RetryPolicy(
+            name="llm",
+            is_retryable=is_transient_llm_error
+        )
+
+        # Crear cliente asíncrono de OpenAI. Los reintentos propios del
+        # cliente se desactivan: los controla retry_policy con su presupuesto
+        self.client = AsyncOpenAI(api_key=api_key, max_retries=0)
 
         logger.info(
             "gemini_service_initialized",
@@ -78,18 +120,27 @@ class GeminiService:
             provider="openai"
         )
 
-    async def extract_contact_info(self, message_text: str) -> Dict[str, Any]:
+    async def extract_contact_info(
+        self,
+        message_text: str,
+        deadline: Optional[Deadline] = None
+    ) -> Dict[str, Any]:
         """
         Extrae información de contacto de un mensaje de texto.
 
         Args:
             message_text: Texto del mensaje a procesar.
+            deadline: Deadline de la solicitud; la llamada usa el menor
+                entre el tiempo restante y `timeout` (opcional).
 
         Returns:
             dict con keys:
                 - success: bool indicando si la extracción fue exitosa
                 - data: dict con nombre, telefono, quien_lo_recomendo
                 - error: str con mensaje de error (si success=False)
+                - error_type: "timeout" si se agotó el tiempo
+                - tokens_used: int con los tokens consumidos, sumando
+                  todos los intentos (ver `_call_metered`)
 
         Example:
             >>> service = GeminiService(api_key="key")
@@ -106,16 +157,31 @@ class GeminiService:
             message_length=len(message_text)
         )
 
+        # Tokens consumidos por cada intento (incluidos los reintentos)
+        usage: List[int] = []
+        estimate = self.estimate_tokens(message_text)
+
         try:
             # Preparar el prompt
             prompt = EXTRACTION_PROMPT.format(message=message_text)
 
             # Llamar a OpenAI API de forma asíncrona con timeout
-            response = await asyncio.wait_for(
-                self._call_openai_async(prompt),
-                timeout=self.timeout
+            # (el timeout cubre también los reintentos)
+            response = await run_with_timeout(
+                self.retry_policy.call(
+                    self._call_metered,
+                    prompt,
+                    estimate,
+                    usage,
+                    deadline=deadline
+                ),
+                timeout=self.timeout,
+                deadline=deadline,
+                stage="llm"
             )
 
+            tokens_used = sum(usage)
+
             # Extraer y parsear la respuesta
             response_text = response.choices[0].message.content.strip()
 
@@ -131,7 +197,8 @@ class GeminiService:
                 logger.error("failed_to_parse_openai_response")
                 return {
                     "success": False,
-                    "error": "No se pudo parsear la respuesta de OpenAI"
+                    "error": "No se pudo parsear la respuesta de OpenAI",
+                    "tokens_used": tokens_used
                 }
 
             # Normalizar teléfono
@@ -149,7 +216,20 @@ class GeminiService:
 
             return {
                 "success": True,
-                "data": contact_data
+                "data": contact_data,
+                "tokens_used": tokens_used
+            }
+
+        except DeadlineExceeded as e:
+            logger.error(
+                "openai_deadline_exceeded",
+                error=str(e)
+            )
+            return {
+                "success": False,
+                "error": "Tiempo agotado al procesar con OpenAI",
+                "error_type": "timeout",
+                "tokens_used": sum(usage)
             }
 
         except asyncio.TimeoutError:
@@ -159,7 +239,9 @@ class GeminiService:
             )
             return {
                 "success": False,
-                "error": f"Timeout al procesar con OpenAI ({self.timeout}s)"
+                "error": f"Timeout al procesar con OpenAI ({self.timeout}s)",
+                "error_type": "timeout",
+                "tokens_used": sum(usage)
             }
 
         except Exception as e:
@@ -170,9 +252,57 @@ class GeminiService:
             )
             return {
                 "success": False,
-                "error": f"Error al procesar con OpenAI: {str(e)}"
+                "error": f"Error al procesar con OpenAI: {str(e)}",
+                "tokens_used": sum(usage)
             }
 
+    def estimate_tokens(self, message_text: str) -> int:
+        """
+        Estima los tokens de una extracción antes de llamar a la API.
+
+        Args:
+            message_text: Texto del mensaje a procesar.
+
+        Returns:
+            Tokens estimados (prompt más respuesta).
+
+        Example:
+            >>> service = GeminiService(api_key="key")
+            >>> service.estimate_tokens("Juan 3001234567 ref María")
+            260
+        """
+        prompt_chars = len(SYSTEM_PROMPT) + len(EXTRACTION_PROMPT) + len(message_text)
+        return -(-prompt_chars // CHARS_PER_TOKEN) + ESTIMATED_COMPLETION_TOKENS
+
+    async def _call_metered(self, prompt: str, estimate: int, usage: List[int]):
+        """
+        Hace un intento de llamada y anota en `usage` los tokens consumidos.
+
+        Se anotan los tokens que reporta la respuesta. Un intento enviado
+        que queda sin respuesta (timeout del cliente, o cancelado por el
+        timeout o el deadline) pudo consumir tokens en el LLM: se anota
+        el estimado, igual que si la respuesta no trae el uso. Un error
+        de la API (conexión rechazada, 4xx, 5xx, 429) falla rápido y no
+        anota nada.
+
+        Args:
+            prompt: Prompt a enviar a OpenAI.
+            estimate: Tokens estimados de la llamada.
+            usage: Lista donde se anotan los tokens de cada intento.
+
+        Returns:
+            Respuesta de OpenAI.
+        """
+        try:
+            response = await self._call_openai_async(prompt)
+        except (APITimeoutError, asyncio.CancelledError):
+            usage.append(estimate)
+            raise
+
+        tokens = getattr(getattr(response, "usage", None), "total_tokens", None)
+        usage.append(estimate if tokens is None else tokens)
+        return response
+
     async def _call_openai_async(self, prompt: str):
         """
         Llama a la API de OpenAI de forma asíncrona.
@@ -188,7 +318,7 @@ class GeminiService:
             messages=[
                 {
                     "role": "system",
-                    "content": "You are a JSON extraction assistant. You respond with valid JSON only, no markdown, no explanations."
+                    "content": SYSTEM_PROMPT
                 },
                 {
                     "role": "user",
@@ -215,7 +345,8 @@ class GeminiService:
         # Remover bloques de código markdown si existen (```json ... ```)
         if cleaned.startswith("```"):
             cleaned = re.sub(r'^```(?:json)?\s*', '', cleaned)
-            cleaned = re.sub(r'\s*```$', '', cleaned)
+            if cleaned.endswith("```"):
+                cleaned = cleaned[:-3]
             cleaned = cleaned.strip()
 
         try:
@@ -228,13 +359,16 @@ class GeminiService:
             # Gemini a veces incluye texto adicional
             logger.debug("attempting_to_extract_json_from_response")
 
-            # Buscar patrón JSON en la respuesta (mejorado para multilínea)
-            # Busca desde { hasta } incluyendo todo el contenido
-            json_match = re.search(r'\{.*?\}', response_text, re.DOTALL)
+            # Extraer desde la primera { hasta la primera } posterior
+            # (lo mismo que re.search(r'\{.*?\}', ..., re.DOTALL)) con
+            # str.find: la regex reintentaba desde cada { y era cuadrática
+            # con respuestas llenas de llaves sin cerrar
+            start = response_text.find("{")
+            end = response_text.find("}", start + 1) if start != -1 else -1
 
-            if json_match:
+            if end != -1:
+                json_str = response_text[start:end + 1]
                 try:
-                    json_str = json_match.group()
                     logger.debug(
                         "extracted_json",
                         json_preview=json_str[:100]
@@ -274,25 +408,23 @@ class GeminiService:
         if not phone:
             return ""
 
-        # Remover todo excepto dígitos y +
-        cleaned = re.sub(r"[^\d+]", "", phone)
-
-        # Si no tiene código de país, agregar +57 (Colombia)
-        if not cleaned.startswith("+"):
-            cleaned = "+57" + cleaned
-
-        return cleaned
+        # Normalización de mejor esfuerzo: la validación estricta
+        # ocurre después en ContactValidator
+        return parse_phone(phone).e164
 
     async def health_check(self) -> bool:
         """
-        Verifica que el servicio de Gemini esté funcionando.
+        Verifica que el servicio de OpenAI esté disponible.
+
+        Consulta los metadatos del modelo configurado: valida la API key
+        y la conectividad sin generar una completion (no consume tokens).
 
         Returns:
             True si el servicio está disponible, False en caso contrario.
         """
         try:
-            response = await asyncio.wait_for(
-                self._call_gemini_async("Test: responde con OK"),
+            await asyncio.wait_for(
+                self.client.models.retrieve(self.model_name),
                 timeout=10
             )
             logger.info("gemini_health_check_passed")
@@ -0,0 +1,480 @@
+"""
+Extractor local de contactos (sin red).
+
+Este módulo implementa un etiquetador de secuencias ligero (perceptrón
+promediado) entrenado con las confirmaciones aceptadas por los usuarios.
+Corre en CPU, en proceso y en milisegundos, de modo que el LLM solo se
+usa como respaldo cuando el extractor local no tiene suficiente confianza.
+"""
+
+import json
+import math
+import random
+import re
+from collections import defaultdict
+from pathlib import Path
+from typing import Dict, Any, Iterable, List, Optional, Tuple
+
+from ..utils.logger import get_logger
+from ..utils.phone import parse_phone
+
+logger = get_logger(__name__)
+
+
+# Etiquetas del etiquetador de secuencias
+LABEL_OTHER = "O"
+LABEL_NOMBRE = "NOM"
+LABEL_TELEFONO = "TEL"
+LABEL_REFERIDO = "REF"
+
+LABELS = (LABEL_OTHER, LABEL_NOMBRE, LABEL_TELEFONO, LABEL_REFERIDO)
+
+FIELD_LABELS = {
+    "nombre": LABEL_NOMBRE,
+    "telefono": LABEL_TELEFONO,
+    "quien_lo_recomendo": LABEL_REFERIDO,
+}
+
+MODEL_VERSION = 1
+
+# Tokens: números (con + opcional), palabras y signos sueltos
+TOKEN_PATTERN = re.compile(r"\+?\d+|\w+|[^\w\s]", re.UNICODE)
+
+# Signos que pueden aparecer dentro de un número de teléfono
+PHONE_SEPARATORS = frozenset("-.()/")
+
+
+def tokenize(text: str) -> List[Tuple[str, int, int]]:
+    """
+    Divide un texto en tokens con su posición.
+
+    Args:
+        text: Texto a tokenizar.
+
+    Returns:
+        Lista de tuplas (token, inicio, fin).
+    """
+    return [
+        (match.group(), match.start(), match.end())
+        for match in TOKEN_PATTERN.finditer(text)
+    ]
+
+
+def _digits(value: str) -> str:
+    """Devuelve solo los dígitos de un texto."""
+    return "".join(ch for ch in value if ch.isdigit())
+
+
+def _shape(token: str) -> str:
+    """Forma abreviada del token (Xx, d, x, ...)."""
+    shape = []
+    for ch in token:
+        if ch.isdigit():
+            kind = "d"
+        elif ch.isupper():
+            kind = "X"
+        elif ch.isalpha():
+            kind = "x"
+        else:
+            kind = ch
+        if not shape or shape[-1] != kind:
+            shape.append(kind)
+    return "".join(shape)
+
+
+def _phone_runs(tokens: List[Tuple[str, int, int]]) -> List[Tuple[int, int]]:
+    """
+    Encuentra secuencias de tokens que forman un número.
+
+    Returns:
+        Lista de rangos [inicio, fin) de índices de tokens.
+    """
+    runs = []
+    i = 0
+    while i < len(tokens):
+        if not _digits(tokens[i][0]):
+            i += 1
+            continue
+
+        j = i + 1
+        while j < len(tokens):
+            token = tokens[j][0]
+            if _digits(token):
+                j += 1
+            elif (
+                token in PHONE_SEPARATORS
+                and j + 1 < len(tokens)
+                and _digits(tokens[j + 1][0])
+            ):
+                j += 1
+            else:
+                break
+
+        runs.append((i, j))
+        i = j
+    return runs
+
+
+def align_example(text: str, contact: Dict[str, Any]) -> Optional[List[str]]:
+    """
+    Etiqueta los tokens de un texto a partir del contacto confirmado.
+
+    Args:
+        text: Texto original del mensaje.
+        contact: Datos confirmados (nombre, telefono, quien_lo_recomendo).
+
+    Returns:
+        Lista de etiquetas por token, o None si algún campo no se
+        encuentra en el texto.
+    """
+    tokens = tokenize(text)
+    labels = [LABEL_OTHER] * len(tokens)
+    lowered = [token.lower() for token, _, _ in tokens]
+
+    # Teléfono: la secuencia numérica cuyos dígitos terminan el número
+    phone_digits = _digits(contact.get("telefono", ""))
+    phone_found = False
+    for start, end in _phone_runs(tokens):
+        run_digits = "".join(_digits(tokens[k][0]) for k in range(start, end))
+        if len(run_digits) >= 7 and phone_digits.endswith(run_digits):
+            for k in range(start, end):
+                labels[k] = LABEL_TELEFONO
+            phone_found = True
+            break
+
+    if not phone_found:
+        return None
+
+    # Nombres: primera coincidencia exacta (sin mayúsculas) aún libre
+    for field in ("nombre", "quien_lo_recomendo"):
+        value_tokens = [token.lower() for token, _, _ in tokenize(contact.get(field, ""))]
+        if not value_tokens:
+            return None
+
+        size = len(value_tokens)
+        for start in range(len(tokens) - size + 1):
+            if lowered[start:start + size] != value_tokens:
+                continue
+            if any(labels[k] != LABEL_OTHER for k in range(start, start + size)):
+                continue
+            for k in range(start, start + size):
+                labels[k] = FIELD_LABELS[field]
+            break
+        else:
+            return None
+
+    return labels
+
+
+def _token_features(
+    tokens: List[Tuple[str, int, int]],
+    index: int,
+    prev_label: str,
+    prev2_label: str,
+    digits_seen: bool
+) -> List[str]:
+    """Genera las features de un token para el perceptrón."""
+    token = tokens[index][0]
+    lower = token.lower()
+    prev_word = tokens[index - 1][0].lower() if index > 0 else "<s>"
+    prev2_word = tokens[index - 2][0].lower() if index > 1 else "<s>"
+    next_word = tokens[index + 1][0].lower() if index + 1 < len(tokens) else "</s>"
+    next2_word = tokens[index + 2][0].lower() if index + 2 < len(tokens) else "</s>"
+
+    return [
+        "bias",
+        f"w={lower}",
+        f"shape={_shape(token)}",
+        f"pre3={lower[:3]}",
+        f"suf3={lower[-3:]}",
+        f"title={token[:1].isupper()}",
+        f"ndigits={min(len(_digits(token)), 11)}",
+        f"w-1={prev_word}",
+        f"w-2={prev2_word}",
+        f"w+1={next_word}",
+        f"w+2={next2_word}",
+        f"w-1,w={prev_word},{lower}",
+        f"t-1={prev_label}",
+        f"t-2,t-1={prev2_label},{prev_label}",
+        f"t-1,w={prev_label},{lower}",
+        f"t-1,shape={prev_label},{_shape(token)}",
+        f"digits_seen={digits_seen}",
+    ]
+
+
+class LocalContactExtractor:
+    """
+    Extractor de contactos basado en un perceptrón promediado.
+
+    Etiqueta cada token del mensaje como nombre, teléfono, referido u
+    otro, con decodificación voraz de izquierda a derecha.
+
+    Attributes:
+        weights: Pesos por feature y etiqueta.
+        min_confidence: Confianza mínima para aceptar una extracción.
+    """
+
+    def __init__(
+        self,
+        weights: Optional[Dict[str, Dict[str, float]]] = None,
+        min_confidence: float = 0.9
+    ):
+        """
+        Inicializa el extractor.
+
+        Args:
+            weights: Pesos previamente entrenados (opcional).
+            min_confidence: Confianza mínima (0-1) para aceptar
+                una extracción (default: 0.9).
+        """
+        self.weights: Dict[str, Dict[str, float]] = weights or {}
+        self.min_confidence = min_confidence
+
+    @property
+    def is_trained(self) -> bool:
+        """Indica si el extractor tiene pesos cargados."""
+        return bool(self.weights)
+
+    def _scores(self, features: List[str]) -> Dict[str, float]:
+        """Calcula el puntaje de cada etiqueta para un token."""
+        scores = dict.fromkeys(LABELS, 0.0)
+        for feature in features:
+            label_weights = self.weights.get(feature)
+            if not label_weights:
+                continue
+            for label, weight in label_weights.items():
+                scores[label] += weight
+        return scores
+
+    def _tag(
+        self,
+        tokens: List[Tuple[str, int, int]]
+    ) -> Tuple[List[str], List[float]]:
+        """
+        Etiqueta una secuencia de tokens.
+
+        Returns:
+            Tupla (etiquetas, probabilidad de cada etiqueta elegida).
+        """
+        labels: List[str] = []
+        probabilities: List[float] = []
+        prev_label = prev2_label = "<s>"
+        digits_seen = False
+
+        for index in range(len(tokens)):
+            features = _token_features(
+                tokens, index, prev_label, prev2_label, digits_seen
+            )
+            scores = self._scores(features)
+            best = max(LABELS, key=lambda label: scores[label])
+
+            # Softmax de los puntajes como medida de confianza
+            top = scores[best]
+            total = sum(math.exp(score - top) for score in scores.values())
+
+            labels.append(best)
+            probabilities.append(1.0 / total)
+
+            prev2_label, prev_label = prev_label, best
+            digits_seen = digits_seen or bool(_digits(tokens[index][0]))
+
+        return labels, probabilities
+
+    def train(
+        self,
+        examples: Iterable[Dict[str, Any]],
+        iterations: int = 10,
+        seed: int = 13
+    ) -> Dict[str, int]:
+        """
+        Entrena el extractor con ejemplos confirmados.
+
+        Args:
+            examples: Iterable de dicts con keys text, nombre, telefono
+                y quien_lo_recomendo.
+            iterations: Número de pasadas sobre los datos (default: 10).
+            seed: Semilla para barajar los ejemplos (default: 13).
+
+        Returns:
+            dict con used (ejemplos utilizados) y skipped (ejemplos
+            descartados por no poder alinearse con el texto).
+        """
+        dataset = []
+        skipped = 0
+        for example in examples:
+            tokens = tokenize(example["text"])
+            labels = align_example(example["text"], example)
+            if labels is None:
+                skipped += 1
+                continue
+            dataset.append((tokens, labels))
+
+        weights: Dict[str, Dict[str, float]] = defaultdict(lambda: defaultdict(float))
+        totals: Dict[Tuple[str, str], float] = defaultdict(float)
+        stamps: Dict[Tuple[str, str], int] = defaultdict(int)
+        instance = 0
+
+        def update(feature: str, label: str, delta: float) -> None:
+            key = (feature, label)
+            totals[key] += (instance - stamps[key]) * weights[feature][label]
+            stamps[key] = instance
+            weights[feature][label] += delta
+
+        rng = random.Random(seed)
+        self.weights = weights
+
+        for _ in range(iterations):
+            rng.shuffle(dataset)
+            for tokens, gold in dataset:
+                prev_label = prev2_label = "<s>"
+                digits_seen = False
+
+                for index in range(len(tokens)):
+                    instance += 1
+                    features = _token_features(
+                        tokens, index, prev_label, prev2_label, digits_seen
+                    )
+                    scores = self._scores(features)
+                    guess = max(LABELS, key=lambda label: scores[label])
+
+                    if guess != gold[index]:
+                        for feature in features:
+                            update(feature, gold[index], 1.0)
+                            update(feature, guess, -1.0)
+
+                    # Teacher forcing: el contexto usa la etiqueta correcta
+                    prev2_label, prev_label = prev_label, gold[index]
+                    digits_seen = digits_seen or bool(_digits(tokens[index][0]))
+
+        # Promediar pesos y descartar los nulos
+        averaged: Dict[str, Dict[str, float]] = {}
+        for feature, label_weights in weights.items():
+            for label, weight in label_weights.items():
+                key = (feature, label)
+                total = totals[key] + (instance - stamps[key]) * weight
+                value = round(total / max(instance, 1), 4)
+                if value:
+                    averaged.setdefault(feature, {})[label] = value
+
+        self.weights = averaged
+
+        logger.info(
+            "local_extractor_trained",
+            examples_used=len(dataset),
+            examples_skipped=skipped,
+            features=len(averaged)
+        )
+
+        return {"used": len(dataset), "skipped": skipped}
+
+    def extract(self, text: str) -> Optional[Dict[str, Any]]:
+        """
+        Extrae nombre, teléfono y referido de un mensaje.
+
+        Args:
+            text: Texto del mensaje (ya sanitizado).
+
+        Returns:
+            dict con nombre, telefono, quien_lo_recomendo y confidence,
+            o None si el modelo no está entrenado o falta algún campo.
+
+        Example:
+            >>> extractor = LocalContactExtractor.load("model.json")
+            >>> extractor.extract("Juan 3001234567 ref María")
+            {'nombre': 'Juan', 'telefono': '+573001234567', ...}
+        """
+        if not self.is_trained:
+            return None
+
+        tokens = tokenize(text)
+        labels, probabilities = self._tag(tokens)
+
+        result: Dict[str, Any] = {}
+        confidence = 1.0
+
+        for field, label in FIELD_LABELS.items():
+            # Tomar la primera secuencia contigua con la etiqueta
+            indexes = [i for i, tag in enumerate(labels) if tag == label]
+            if not indexes:
+                return None
+
+            start = indexes[0]
+            end = start
+            while end + 1 < len(labels) and labels[end + 1] == label:
+                end += 1
+
+            value = text[tokens[start][1]:tokens[end][2]].strip()
+            confidence = min(confidence, min(probabilities[start:end + 1]))
+            result[field] = value
+
+        result["telefono"] = self._normalize_phone(result["telefono"])
+        result["confidence"] = round(confidence, 4)
+
+        return result
+
+    def is_confident(self, prediction: Optional[Dict[str, Any]]) -> bool:
+        """
+        Indica si una predicción supera la confianza mínima.
+
+        Args:
+            prediction: Resultado de extract().
+
+        Returns:
+            True si la predicción puede usarse sin consultar al LLM.
+        """
+        return bool(prediction) and prediction["confidence"] >= self.min_confidence
+
+    def _normalize_phone(self, phone: str) -> str:
+        """
+        Normaliza el teléfono extraído.
+
+        Args:
+            phone: Texto del teléfono tal como aparece en el mensaje.
+
+        Returns:
+            Número en formato E.164 (+57 si no trae código de país).
+        """
+        return parse_phone(phone).e164
+
+    def save(self, path: str) -> None:
+        """
+        Guarda el modelo entrenado en un archivo JSON.
+
+        Args:
+            path: Ruta del archivo de destino.
+        """
+        target = Path(path)
+        target.parent.mkdir(parents=True, exist_ok=True)
+        target.write_text(
+            json.dumps(
+                {"version": MODEL_VERSION, "weights": self.weights},
+                ensure_ascii=False,
+                separators=(",", ":")
+            ),
+            encoding="utf-8"
+        )
+        logger.info("local_extractor_saved", path=path, features=len(self.weights))
+
+    @classmethod
+    def load(cls, path: str, min_confidence: float = 0.9) -> "LocalContactExtractor":
+        """
+        Carga un modelo previamente guardado.
+
+        Args:
+            path: Ruta del archivo JSON del modelo.
+            min_confidence: Confianza mínima para aceptar extracciones.
+
+        Returns:
+            Instancia de LocalContactExtractor.
+
+        Raises:
+            ValueError: Si la versión del modelo no es compatible.
+        """
+        data = json.loads(Path(path).read_text(encoding="utf-8"))
+        if data.get("version") != MODEL_VERSION:
+            raise ValueError(
+                f"Versión de modelo no soportada: {data.get('version')}"
+            )
+
+        logger.info("local_extractor_loaded", path=path, features=len(data["weights"]))
+        return cls(weights=data["weights"], min_confidence=min_confidence)
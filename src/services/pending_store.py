@@ -0,0 +1,557 @@
+"""
+Contactos pendientes de confirmación.
+
+Entre el mensaje con los datos extraídos y el botón "Sí, agregarlo" el
+contacto queda pendiente. Guardarlo en context.user_data tiene tres
+problemas: se pierde al reiniciar el bot ("La sesión expiró"), los que
+nadie confirma nunca se borran y cada usuario solo puede tener uno
+pendiente (el siguiente mensaje pisa al anterior).
+
+PendingConfirmationStore guarda cada contacto pendiente bajo un id corto
+que viaja en el callback_data de los botones, con un vencimiento (TTL)
+y un barrido periódico de los vencidos. SQLPendingConfirmationStore lo
+guarda en la BD (SQLite o PostgreSQL), así que las confirmaciones
+sobreviven reinicios y cualquier worker puede atenderlas.
+
+Los botones con los datos del contacto en el callback_data (ver
+src/utils/callback_data.py) no pasan por el store al crearse; al
+presionarlos se reclama su firma con claim() para que se usen una sola
+vez.
+"""
+
+import asyncio
+import json
+import secrets
+from collections import OrderedDict
+from dataclasses import dataclass
+from datetime import datetime
+from time import time
+from typing import Any, Callable, Dict, Optional
+
+from sqlalchemy import BigInteger, Column, DateTime, Integer, String, Text, delete, func, select
+from sqlalchemy.exc import IntegrityError, SQLAlchemyError
+from sqlalchemy.orm import Session
+
+from .contacts_api import Base
+from ..utils.logger import get_logger
+from ..utils.metrics import metrics
+
+logger = get_logger(__name__)
+
+# Bytes aleatorios del id (8 caracteres en base64 url-safe)
+ID_BYTES = 6
+# Prefijo de los ids de las firmas reclamadas (no es de base64 url-safe)
+CLAIM_PREFIX = "~"
+
+
+class PendingConfirmationDB(Base):
+    """
+    Contacto extraído que espera la confirmación del usuario.
+
+    Tabla: pending_confirmations
+    """
+    __tablename__ = "pending_confirmations"
+
+    id = Column(String(16), primary_key=True)
+    user_id = Column(BigInteger, nullable=False)
+    chat_id = Column(BigInteger, nullable=False)
+    payload = Column(Text, nullable=False)
+    expires_at = Column(Integer, nullable=False, index=True)
+    created_at = Column(DateTime, default=datetime.utcnow)
+
+
+@dataclass(frozen=True)
+class PendingConfirmation:
+    """
+    Contacto pendiente de confirmación.
+
+    Attributes:
+        id: Id corto de la confirmación (va en el callback_data).
+        user_id: Usuario que debe confirmar.
+        chat_id: Chat donde se pidió la confirmación.
+        contact: Datos del contacto extraído.
+        text: Mensaje original (ejemplo para el extractor local).
+        expires_at: Vencimiento (epoch, en segundos).
+    """
+
+    id: str
+    user_id: int
+    chat_id: int
+    contact: Dict[str, Any]
+    text: str
+    expires_at: int
+
+    def dumps(self) -> str:
+        """
+        Serializa el contacto y el mensaje en JSON compacto.
+
+        Returns:
+            JSON sin espacios ni escapes de caracteres no ASCII.
+
+        Example:
+            >>> pending.dumps()
+            '{"c":{"nombre":"Juan Pérez",...},"t":"Juan Pérez 300..."}'
+        """
+        return json.dumps(
+            {"c": self.contact, "t": self.text},
+            separators=(",", ":"),
+            ensure_ascii=False
+        )
+
+    @classmethod
+    def loads(
+        cls,
+        payload: str,
+        id: str,
+        user_id: int,
+        chat_id: int,
+        expires_at: int
+    ) -> "PendingConfirmation":
+        """
+        Reconstruye una confirmación serializada con dumps().
+
+        Args:
+            payload: JSON generado por dumps().
+            id: Id de la confirmación.
+            user_id: Usuario que debe confirmar.
+            chat_id: Chat donde se pidió la confirmación.
+            expires_at: Vencimiento (epoch, en segundos).
+
+        Returns:
+            PendingConfirmation.
+        """
+        data = json.loads(payload)
+        return cls(
+            id=id,
+            user_id=user_id,
+            chat_id=chat_id,
+            contact=data["c"],
+            text=data["t"],
+            expires_at=expires_at
+        )
+
+
+class PendingConfirmationStore:
+    """
+    Contactos pendientes en memoria, con vencimiento y tamaño acotado.
+
+    Es la implementación sin persistencia (un solo worker; se pierden al
+    reiniciar).
+
+    Attributes:
+        ttl_seconds: Tiempo que se espera la confirmación.
+        max_size: Máximo de confirmaciones pendientes.
+        sweep_interval: Segundos entre barridos de las vencidas.
+    """
+
+    def __init__(
+        self,
+        ttl_seconds: int = 900,
+        max_size: int = 10000,
+        sweep_interval: float = 60.0
+    ):
+        """
+        Inicializa el store.
+
+        Args:
+            ttl_seconds: Tiempo que se espera la confirmación
+                (default: 15 minutos).
+            max_size: Máximo de confirmaciones pendientes; al excederlo
+                se descartan las más viejas (default: 10000).
+            sweep_interval: Segundos entre barridos (default: 60).
+
+        Example:
+            >>> store = PendingConfirmationStore(ttl_seconds=900)
+            >>> pending = await store.add(123, 456, contact, text)
+            >>> await store.take(pending.id, user_id=123)
+            PendingConfirmation(id='q3Xz_1Ab', user_id=123, ...)
+        """
+        self.ttl_seconds = ttl_seconds
+        self.max_size = max_size
+        self.sweep_interval = sweep_interval
+        # id -> confirmación (en orden de creación, que es el de vencimiento)
+        self._pending: "OrderedDict[str, PendingConfirmation]" = OrderedDict()
+        # firma reclamada -> vencimiento
+        self._claimed: Dict[str, int] = {}
+        self._task: Optional[asyncio.Task] = None
+
+    def __len__(self) -> int:
+        return len(self._pending)
+
+    @staticmethod
+    def new_id() -> str:
+        """Id corto y no adivinable para el callback_data."""
+        return secrets.token_urlsafe(ID_BYTES)
+
+    def _new(
+        self,
+        user_id: int,
+        chat_id: int,
+        contact: Dict[str, Any],
+        text: str
+    ) -> PendingConfirmation:
+        """Crea la confirmación con id nuevo y vencimiento."""
+        return PendingConfirmation(
+            id=self.new_id(),
+            user_id=user_id,
+            chat_id=chat_id,
+            contact=contact,
+            text=text,
+            expires_at=int(time()) + self.ttl_seconds
+        )
+
+    async def add(
+        self,
+        user_id: int,
+        chat_id: int,
+        contact: Dict[str, Any],
+        text: str
+    ) -> PendingConfirmation:
+        """
+        Guarda un contacto pendiente de confirmación.
+
+        Args:
+            user_id: Usuario que debe confirmar.
+            chat_id: Chat donde se pide la confirmación.
+            contact: Datos del contacto extraído.
+            text: Mensaje original.
+
+        Returns:
+            La confirmación creada (su id va en los botones).
+        """
+        pending = self._new(user_id, chat_id, contact, text)
+        self._pending[pending.id] = pending
+
+        while len(self._pending) > self.max_size:
+            self._pending.popitem(last=False)
+            metrics.increment("pending_confirmations_evicted_total")
+
+        metrics.set_gauge("pending_confirmations", len(self._pending))
+        return pending
+
+    async def take(
+        self,
+        confirmation_id: str,
+        user_id: int
+    ) -> Optional[PendingConfirmation]:
+        """
+        Retira una confirmación pendiente (solo la puede retirar una vez).
+
+        Args:
+            confirmation_id: Id de la confirmación.
+            user_id: Usuario que presionó el botón.
+
+        Returns:
+            La confirmación, o None si no existe, venció o es de otro
+            usuario.
+        """
+        pending = self._pending.get(confirmation_id)
+        if pending is None or pending.user_id != user_id:
+            return None
+
+        del self._pending[confirmation_id]
+        metrics.set_gauge("pending_confirmations", len(self._pending))
+        if pending.expires_at <= time():
+            return None
+        return pending
+
+    async def claim(self, token: str, user_id: int, expires_at: int) -> bool:
+        """
+        Reclama un botón sin estado para usarlo una sola vez.
+
+        Args:
+            token: Firma del callback_data.
+            user_id: Usuario que presionó el botón.
+            expires_at: Vencimiento del callback_data (epoch, en segundos).
+
+        Returns:
+            True si es la primera vez que se reclama.
+        """
+        if token in self._claimed:
+            return False
+        self._claimed[token] = expires_at
+        return True
+
+    def sweep(self) -> int:
+        """
+        Elimina las confirmaciones vencidas.
+
+        Returns:
+            Cantidad de confirmaciones eliminadas.
+        """
+        now = time()
+        self._claimed = {
+            token: expires_at
+            for token, expires_at in self._claimed.items()
+            if expires_at > now
+        }
+        removed = 0
+        while self._pending:
+            pending = next(iter(self._pending.values()))
+            if pending.expires_at > now:
+                break
+            self._pending.popitem(last=False)
+            removed += 1
+
+        metrics.set_gauge("pending_confirmations", len(self._pending))
+        return removed
+
+    async def _sweep(self) -> int:
+        """Ejecuta un barrido (la versión en BD lo hace en un thread)."""
+        return self.sweep()
+
+    async def _sweep_loop(self) -> None:
+        """Barre las confirmaciones vencidas periódicamente."""
+        while True:
+            await asyncio.sleep(self.sweep_interval)
+            removed = await self._sweep()
+            if removed:
+                metrics.increment("pending_confirmations_expired_total", removed)
+                logger.info("pending_confirmations_swept", removed=removed)
+
+    def load(self) -> None:
+        """Carga el estado persistido (no aplica en memoria)."""
+
+    def start(self) -> None:
+        """Inicia el barrido en segundo plano (requiere un event loop activo)."""
+        if self._task is None or self._task.done():
+            self._task = asyncio.create_task(self._sweep_loop())
+
+    async def stop(self) -> None:
+        """Detiene el barrido."""
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+
+class SQLPendingConfirmationStore(PendingConfirmationStore):
+    """
+    Contactos pendientes guardados en la BD.
+
+    Cada operación es una consulta (en un thread, sin bloquear el event
+    loop); no hay estado en memoria, así que los workers comparten las
+    confirmaciones. El tamaño lo acota el TTL: el barrido borra las
+    vencidas de la tabla.
+
+    Attributes:
+        session_factory: Factory de sesiones de SQLAlchemy.
+    """
+
+    def __init__(
+        self,
+        session_factory: Callable[[], Session],
+        ttl_seconds: int = 900,
+        sweep_interval: float = 60.0
+    ):
+        """
+        Inicializa el store.
+
+        Args:
+            session_factory: Factory de sesiones (p. ej.
+                ContactsAPIClient.SessionLocal).
+            ttl_seconds: Tiempo que se espera la confirmación
+                (default: 15 minutos).
+            sweep_interval: Segundos entre barridos (default: 60).
+
+        Example:
+            >>> store = SQLPendingConfirmationStore(contacts_client.SessionLocal)
+            >>> store.start()
+        """
+        super().__init__(ttl_seconds=ttl_seconds, sweep_interval=sweep_interval)
+        self.session_factory = session_factory
+
+    def __len__(self) -> int:
+        with self.session_factory() as db:
+            return db.execute(
+                select(func.count())
+                .select_from(PendingConfirmationDB)
+                .where(PendingConfirmationDB.payload != "")
+            ).scalar()
+
+    def _insert(self, pending: PendingConfirmation) -> None:
+        """Escribe la confirmación en la BD."""
+        with self.session_factory() as db:
+            db.add(PendingConfirmationDB(
+                id=pending.id,
+                user_id=pending.user_id,
+                chat_id=pending.chat_id,
+                payload=pending.dumps(),
+                expires_at=pending.expires_at
+            ))
+            db.commit()
+
+    async def add(
+        self,
+        user_id: int,
+        chat_id: int,
+        contact: Dict[str, Any],
+        text: str
+    ) -> PendingConfirmation:
+        """
+        Guarda un contacto pendiente de confirmación en la BD.
+
+        Args:
+            user_id: Usuario que debe confirmar.
+            chat_id: Chat donde se pide la confirmación.
+            contact: Datos del contacto extraído.
+            text: Mensaje original.
+
+        Returns:
+            La confirmación creada (su id va en los botones).
+
+        Raises:
+            SQLAlchemyError: Si falla la escritura.
+        """
+        pending = self._new(user_id, chat_id, contact, text)
+        await asyncio.to_thread(self._insert, pending)
+        return pending
+
+    def _delete(self, confirmation_id: str, user_id: int) -> Optional[PendingConfirmation]:
+        """Lee y borra la confirmación; None si otro worker la borró antes."""
+        with self.session_factory() as db:
+            row = db.execute(
+                select(PendingConfirmationDB)
+                .where(PendingConfirmationDB.id == confirmation_id)
+                .where(PendingConfirmationDB.user_id == user_id)
+            ).scalar_one_or_none()
+            if row is None:
+                return None
+
+            pending = PendingConfirmation.loads(
+                row.payload,
+                id=row.id,
+                user_id=row.user_id,
+                chat_id=row.chat_id,
+                expires_at=row.expires_at
+            )
+
+            # El DELETE decide quién la retira si dos workers la leyeron
+            result = db.execute(
+                delete(PendingConfirmationDB)
+                .where(PendingConfirmationDB.id == confirmation_id)
+            )
+            db.commit()
+
+        return pending if result.rowcount == 1 else None
+
+    async def take(
+        self,
+        confirmation_id: str,
+        user_id: int
+    ) -> Optional[PendingConfirmation]:
+        """
+        Retira una confirmación pendiente de la BD (solo una vez).
+
+        Args:
+            confirmation_id: Id de la confirmación.
+            user_id: Usuario que presionó el botón.
+
+        Returns:
+            La confirmación, o None si no existe, venció o es de otro
+            usuario.
+
+        Raises:
+            SQLAlchemyError: Si falla la consulta.
+        """
+        pending = await asyncio.to_thread(self._delete, confirmation_id, user_id)
+        if pending is None or pending.expires_at <= time():
+            return None
+        return pending
+
+    def _insert_claim(self, token: str, user_id: int, expires_at: int) -> bool:
+        """Registra la firma; False si ya estaba (otro clic u otro worker)."""
+        with self.session_factory() as db:
+            try:
+                with db.begin_nested():
+                    db.add(PendingConfirmationDB(
+                        id=CLAIM_PREFIX + token,
+                        user_id=user_id,
+                        chat_id=0,
+                        payload="",
+                        expires_at=expires_at
+                    ))
+            except IntegrityError:
+                return False
+            db.commit()
+        return True
+
+    async def claim(self, token: str, user_id: int, expires_at: int) -> bool:
+        """
+        Reclama un botón sin estado para usarlo una sola vez (en la BD,
+        compartido entre workers).
+
+        Args:
+            token: Firma del callback_data.
+            user_id: Usuario que presionó el botón.
+            expires_at: Vencimiento del callback_data (epoch, en segundos).
+
+        Returns:
+            True si es la primera vez que se reclama.
+
+        Raises:
+            SQLAlchemyError: Si falla la escritura.
+        """
+        return await asyncio.to_thread(self._insert_claim, token, user_id, expires_at)
+
+    def sweep(self) -> int:
+        """
+        Elimina de la BD las confirmaciones (y firmas reclamadas) vencidas.
+
+        Returns:
+            Cantidad de confirmaciones eliminadas.
+        """
+        with self.session_factory() as db:
+            result = db.execute(
+                delete(PendingConfirmationDB)
+                .where(PendingConfirmationDB.expires_at <= int(time()))
+            )
+            db.commit()
+        return result.rowcount
+
+    async def _sweep(self) -> int:
+        """Ejecuta un barrido en un thread (un error no detiene el loop)."""
+        try:
+            return await asyncio.to_thread(self.sweep)
+        except SQLAlchemyError as e:
+            logger.error("pending_confirmations_sweep_failed", error=str(e))
+            return 0
+
+
+def create_pending_store(
+    backend: str,
+    session_factory: Optional[Callable[[], Session]] = None,
+    ttl_seconds: int = 900,
+    sweep_interval: float = 60.0
+) -> PendingConfirmationStore:
+    """
+    Crea el store de confirmaciones pendientes configurado.
+
+    Args:
+        backend: "memory" o "database".
+        session_factory: Factory de sesiones (requerida para "database").
+        ttl_seconds: Tiempo que se espera la confirmación.
+        sweep_interval: Segundos entre barridos de las vencidas.
+
+    Returns:
+        Instancia de PendingConfirmationStore.
+
+    Raises:
+        ValueError: Si el backend no existe o falta la factory de sesiones.
+    """
+    if backend == "memory":
+        return PendingConfirmationStore(ttl_seconds=ttl_seconds, sweep_interval=sweep_interval)
+
+    if backend == "database":
+        if session_factory is None:
+            raise ValueError("PENDING_CONFIRMATION_BACKEND=database requiere la BD")
+        return SQLPendingConfirmationStore(
+            session_factory,
+            ttl_seconds=ttl_seconds,
+            sweep_interval=sweep_interval
+        )
+
+    raise ValueError(f"Backend de confirmaciones pendientes desconocido: {backend}")
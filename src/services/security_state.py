@@ -0,0 +1,665 @@
+"""
+Estado de seguridad compartido y persistente.
+
+Este módulo mantiene los usuarios bloqueados y los intentos fallidos en
+un snapshot en memoria (consultas sin I/O desde SecurityAgent) y, con
+SQLSecurityStateStore, lo persiste en la base de datos y lo comparte
+entre workers:
+
+- Cada cambio local se aplica de inmediato en memoria y se encola como
+  evento (failures, reset, block, unblock).
+- Un ciclo en segundo plano escribe los eventos pendientes en la tabla
+  de estado y en un log de cambios, y lee los eventos de otros workers
+  para aplicarlos al snapshot.
+- Los intentos fallidos se registran como incrementos, así que los
+  conteos de varios workers se suman en lugar de pisarse.
+- Los intentos de IDs desconocidos solo van al log de cambios (no a la
+  tabla de estado), agrupados por ID en cada escritura y con a lo sumo
+  `max_unknown_tracked` IDs por escritura. Al iniciar se reconstruyen
+  desde el log: ni otro worker ni un reinicio dan intentos nuevos, y el
+  log los elimina con la retención.
+
+Los id autoincrementales del log no se confirman en orden: una
+transacción de otro worker con un id menor puede confirmarse después de
+que se leyó un id mayor. Por eso la lectura no avanza más allá del
+primer id faltante hasta que aparece o pasa `commit_lag` (una
+transacción revertida nunca aparece), y los id ya aplicados por encima
+de ese punto se descartan al releer.
+"""
+
+import asyncio
+import threading
+from collections import OrderedDict
+from dataclasses import dataclass
+from datetime import datetime, timedelta
+from time import monotonic
+from typing import Callable, Dict, List, Optional, Set, Tuple
+from uuid import uuid4
+
+from sqlalchemy import (
+    BigInteger,
+    Boolean,
+    Column,
+    DateTime,
+    Integer,
+    String,
+    case,
+    delete,
+    func,
+    select,
+    update,
+)
+from sqlalchemy.exc import IntegrityError, SQLAlchemyError
+from sqlalchemy.orm import Session
+
+from .contacts_api import Base
+from ..utils.failure_tracker import FailedAttemptsTracker
+from ..utils.logger import get_logger
+
+logger = get_logger(__name__)
+
+
+class SecurityStateDB(Base):
+    """
+    Estado de seguridad actual por usuario.
+
+    Tabla: security_state
+    """
+    __tablename__ = "security_state"
+
+    user_id = Column(BigInteger, primary_key=True, autoincrement=False)
+    blocked = Column(Boolean, nullable=False, default=False)
+    failed_attempts = Column(Integer, nullable=False, default=0)
+    reason = Column(String(255), nullable=True)
+    updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
+
+
+class SecurityStateChangeDB(Base):
+    """
+    Log de cambios del estado de seguridad (para notificar a otros workers).
+
+    Tabla: security_state_changes
+    """
+    __tablename__ = "security_state_changes"
+
+    id = Column(Integer, primary_key=True, autoincrement=True)
+    user_id = Column(BigInteger, nullable=False)
+    event = Column(String(16), nullable=False)
+    amount = Column(Integer, nullable=False, default=0)
+    reason = Column(String(255), nullable=True)
+    worker_id = Column(String(36), nullable=False)
+    created_at = Column(DateTime, nullable=False, default=datetime.utcnow, index=True)
+
+
+@dataclass(frozen=True)
+class SecurityStateChange:
+    """
+    Cambio del estado de seguridad de un usuario.
+
+    Attributes:
+        user_id: ID del usuario de Telegram.
+        event: "failures", "unknown_failures", "reset", "block" o "unblock".
+        amount: Incremento de intentos fallidos (solo para "failures" y
+            "unknown_failures").
+        reason: Motivo del bloqueo (solo para "block").
+        remote: True si el cambio vino de otro worker.
+    """
+
+    user_id: int
+    event: str
+    amount: int = 0
+    reason: Optional[str] = None
+    remote: bool = False
+
+
+Listener = Callable[[SecurityStateChange], None]
+
+
+class SecurityState:
+    """
+    Estado de seguridad en memoria del proceso.
+
+    Es la implementación sin persistencia (un solo worker). Todas las
+    consultas y cambios son O(1) y sin I/O.
+
+    Attributes:
+        blocked_users: Set de user IDs bloqueados.
+        failed_attempts: Intentos fallidos por usuario (memoria acotada).
+    """
+
+    def __init__(self, failed_attempts: Optional[FailedAttemptsTracker] = None):
+        """
+        Inicializa el estado vacío.
+
+        Args:
+            failed_attempts: Tracker de intentos fallidos (default: uno
+                con la configuración por defecto).
+        """
+        self.blocked_users: Set[int] = set()
+        # Un tracker vacío es falsy (__len__): comparar con None
+        self.failed_attempts = (
+            failed_attempts if failed_attempts is not None else FailedAttemptsTracker()
+        )
+        self._listeners: List[Listener] = []
+
+    def subscribe(self, listener: Listener) -> None:
+        """
+        Registra una función a llamar en cada cambio (local o remoto).
+
+        Args:
+            listener: Función que recibe un SecurityStateChange.
+        """
+        self._listeners.append(listener)
+
+    def _apply(self, change: SecurityStateChange) -> None:
+        """Aplica un cambio al snapshot y notifica a los suscriptores."""
+        user_id = change.user_id
+
+        if change.event == "failures":
+            self.failed_attempts.add(user_id, change.amount)
+        elif change.event == "unknown_failures":
+            self.failed_attempts.add_unknown(user_id, change.amount)
+        elif change.event == "reset":
+            self.failed_attempts.pop(user_id, None)
+        elif change.event == "block":
+            self.blocked_users.add(user_id)
+        elif change.event == "unblock":
+            self.blocked_users.discard(user_id)
+            self.failed_attempts.pop(user_id, None)
+
+        for listener in self._listeners:
+            try:
+                listener(change)
+            except Exception as e:
+                logger.warning("security_state_listener_failed", error=str(e))
+
+    def _record(self, change: SecurityStateChange) -> None:
+        """Aplica un cambio local (las subclases además lo persisten)."""
+        self._apply(change)
+
+    def _record_unknown(self, user_id: int) -> int:
+        """Cuenta un intento de un ID desconocido (las subclases además lo comparten)."""
+        return self.failed_attempts.add_unknown(user_id)
+
+    def record_failure(self, user_id: int, known: bool = True) -> int:
+        """
+        Registra un intento fallido.
+
+        Los IDs desconocidos (no autorizados) se cuentan en el LRU acotado
+        de desconocidos del tracker, no en la tabla de estado, de modo que
+        un flood desde cuentas aleatorias no crece la memoria ni la BD.
+
+        Args:
+            user_id: ID del usuario de Telegram.
+            known: False si el usuario no está autorizado (default: True).
+
+        Returns:
+            Intentos fallidos vigentes del usuario (estimado si known=False).
+        """
+        if not known:
+            return self._record_unknown(user_id)
+
+        self._record(SecurityStateChange(user_id, "failures", amount=1))
+        return self.failed_attempts[user_id]
+
+    def reset_failures(self, user_id: int) -> None:
+        """
+        Resetea los intentos fallidos de un usuario.
+
+        Args:
+            user_id: ID del usuario de Telegram.
+        """
+        if self.failed_attempts.get(user_id):
+            self._record(SecurityStateChange(user_id, "reset"))
+
+    def block(self, user_id: int, reason: str) -> None:
+        """
+        Bloquea un usuario.
+
+        Args:
+            user_id: ID del usuario de Telegram.
+            reason: Motivo del bloqueo.
+        """
+        self._record(SecurityStateChange(user_id, "block", reason=reason))
+
+    def unblock(self, user_id: int) -> None:
+        """
+        Desbloquea un usuario y resetea sus intentos fallidos.
+
+        Args:
+            user_id: ID del usuario de Telegram.
+        """
+        self._record(SecurityStateChange(user_id, "unblock"))
+
+    def start(self) -> None:
+        """Inicia la sincronización en segundo plano (no aplica en memoria)."""
+
+    async def stop(self) -> None:
+        """Detiene la sincronización en segundo plano (no aplica en memoria)."""
+
+
+class SQLSecurityStateStore(SecurityState):
+    """
+    Estado de seguridad persistido en la BD y compartido entre workers.
+
+    Attributes:
+        session_factory: Factory de sesiones de SQLAlchemy.
+        sync_interval: Segundos entre sincronizaciones con la BD.
+        retention: Antigüedad máxima de los eventos en el log de cambios.
+        commit_lag: Segundos que se espera un id faltante del log antes
+            de darlo por revertido.
+        worker_id: Identificador de este proceso en el log de cambios.
+    """
+
+    def __init__(
+        self,
+        session_factory: Callable[[], Session],
+        sync_interval: float = 2.0,
+        retention: timedelta = timedelta(days=1),
+        failed_attempts: Optional[FailedAttemptsTracker] = None,
+        commit_lag: float = 60.0
+    ):
+        """
+        Inicializa el store.
+
+        Args:
+            session_factory: Factory de sesiones (p. ej.
+                ContactsAPIClient.SessionLocal).
+            sync_interval: Segundos entre sincronizaciones (default: 2).
+            retention: Retención del log de cambios (default: 1 día).
+            failed_attempts: Tracker de intentos fallidos (opcional).
+            commit_lag: Segundos que se espera un id faltante del log
+                (una transacción aún sin confirmar) antes de darlo por
+                revertido (default: 60).
+
+        Example:
+            >>> store = SQLSecurityStateStore(contacts_client.SessionLocal)
+            >>> store.load()
+            >>> store.start()
+        """
+        super().__init__(failed_attempts)
+        self.session_factory = session_factory
+        self.sync_interval = sync_interval
+        self.retention = retention
+        self.commit_lag = commit_lag
+        self.worker_id = str(uuid4())
+        self._pending: List[SecurityStateChange] = []
+        # Intentos de IDs desconocidos por escribir, agrupados por ID
+        self._pending_unknown: "OrderedDict[int, int]" = OrderedDict()
+        self._pending_lock = threading.Lock()
+        # Todos los id <= _last_change_id ya se aplicaron (o se dieron por
+        # revertidos); por encima, los aplicados y los faltantes
+        self._last_change_id = 0
+        self._seen_change_ids: Set[int] = set()
+        self._missing_change_ids: Dict[int, float] = {}
+        self._wakeup: Optional[asyncio.Event] = None
+        self._task: Optional[asyncio.Task] = None
+
+    def _record(self, change: SecurityStateChange) -> None:
+        """Aplica el cambio en memoria y lo encola para persistirlo."""
+        self._apply(change)
+        with self._pending_lock:
+            self._pending.append(change)
+
+        # Los bloqueos se propagan sin esperar al siguiente ciclo
+        if change.event == "block" and self._wakeup is not None:
+            self._wakeup.set()
+
+    def _record_unknown(self, user_id: int) -> int:
+        """Cuenta el intento en memoria y lo encola agrupado por ID."""
+        count = self.failed_attempts.add_unknown(user_id)
+        with self._pending_lock:
+            self._queue_unknown(user_id, 1)
+        return count
+
+    def _queue_unknown(self, user_id: int, amount: int) -> None:
+        """Suma a los intentos pendientes de un ID (requiere _pending_lock)."""
+        pending = self._pending_unknown
+        pending[user_id] = pending.get(user_id, 0) + amount
+        pending.move_to_end(user_id)
+        # Acotado: en un flood se comparten los IDs más recientes
+        if len(pending) > self.failed_attempts.max_unknown_tracked:
+            pending.popitem(last=False)
+
+    def load(self) -> None:
+        """
+        Carga el snapshot completo desde la BD (al iniciar el proceso).
+
+        Raises:
+            SQLAlchemyError: Si falla la lectura.
+        """
+        now = datetime.utcnow()
+        failures_cutoff = now - timedelta(seconds=self.failed_attempts.ttl_seconds)
+
+        with self.session_factory() as db:
+            # Solo se cargan conteos vigentes (dentro del TTL); los más
+            # recientes quedan al final del LRU
+            rows = db.execute(
+                select(
+                    SecurityStateDB.user_id,
+                    SecurityStateDB.blocked,
+                    SecurityStateDB.failed_attempts,
+                    SecurityStateDB.updated_at
+                ).where(
+                    (SecurityStateDB.blocked.is_(True))
+                    | (
+                        (SecurityStateDB.failed_attempts > 0)
+                        & (SecurityStateDB.updated_at >= failures_cutoff)
+                    )
+                ).order_by(SecurityStateDB.updated_at)
+            ).all()
+            last_change_id = db.execute(
+                select(func.max(SecurityStateChangeDB.id))
+            ).scalar()
+            # Intentos de IDs desconocidos vigentes, los más recientes
+            last_failure = func.max(SecurityStateChangeDB.created_at)
+            unknown_rows = db.execute(
+                select(
+                    SecurityStateChangeDB.user_id,
+                    func.sum(SecurityStateChangeDB.amount),
+                    last_failure
+                )
+                .where(
+                    (SecurityStateChangeDB.event == "unknown_failures")
+                    & (SecurityStateChangeDB.created_at >= failures_cutoff)
+                )
+                .group_by(SecurityStateChangeDB.user_id)
+                .order_by(last_failure.desc())
+                .limit(self.failed_attempts.max_unknown_tracked)
+            ).all()
+
+        self.blocked_users.clear()
+        self.failed_attempts.clear()
+        for user_id, blocked, failed_attempts, updated_at in rows:
+            if blocked:
+                self.blocked_users.add(user_id)
+            if failed_attempts and updated_at >= failures_cutoff:
+                self.failed_attempts.set(
+                    user_id,
+                    failed_attempts,
+                    age_seconds=(now - updated_at).total_seconds()
+                )
+        for user_id, failed_attempts, updated_at in reversed(unknown_rows):
+            self.failed_attempts.set_unknown(
+                user_id,
+                failed_attempts,
+                age_seconds=(now - updated_at).total_seconds()
+            )
+        self._last_change_id = last_change_id or 0
+        self._seen_change_ids.clear()
+        self._missing_change_ids.clear()
+
+        logger.info(
+            "security_state_loaded",
+            blocked_users=len(self.blocked_users),
+            users_with_failures=len(self.failed_attempts),
+            unknown_ids_with_failures=len(unknown_rows)
+        )
+
+    @staticmethod
+    def _coalesce(changes: List[SecurityStateChange]) -> List[SecurityStateChange]:
+        """Une incrementos consecutivos del mismo usuario en uno solo."""
+        merged: List[SecurityStateChange] = []
+        open_failures: Dict[int, int] = {}
+
+        for change in changes:
+            index = open_failures.get(change.user_id)
+            if change.event == "failures" and index is not None:
+                previous = merged[index]
+                merged[index] = SecurityStateChange(
+                    change.user_id, "failures", amount=previous.amount + change.amount
+                )
+                continue
+
+            if change.event == "failures":
+                open_failures[change.user_id] = len(merged)
+            else:
+                open_failures.pop(change.user_id, None)
+            merged.append(change)
+
+        return merged
+
+    def _write(self, db: Session, change: SecurityStateChange) -> None:
+        """Aplica un evento a la tabla de estado y lo agrega al log."""
+        if change.event != "unknown_failures":
+            self._write_state(db, change)
+
+        db.add(SecurityStateChangeDB(
+            user_id=change.user_id,
+            event=change.event,
+            amount=change.amount,
+            reason=change.reason,
+            worker_id=self.worker_id
+        ))
+
+    def _write_state(self, db: Session, change: SecurityStateChange) -> None:
+        """Aplica un evento a la tabla de estado."""
+        values: Dict[str, object]
+        if change.event == "failures":
+            # Un conteo más viejo que el TTL ya no cuenta: se reinicia
+            cutoff = datetime.utcnow() - timedelta(
+                seconds=self.failed_attempts.ttl_seconds
+            )
+            values = {
+                "failed_attempts": case(
+                    (SecurityStateDB.updated_at < cutoff, change.amount),
+                    else_=SecurityStateDB.failed_attempts + change.amount
+                )
+            }
+        elif change.event == "reset":
+            values = {"failed_attempts": 0}
+        elif change.event == "block":
+            values = {"blocked": True, "reason": change.reason}
+        else:
+            values = {"blocked": False, "failed_attempts": 0, "reason": None}
+        values["updated_at"] = datetime.utcnow()
+
+        result = db.execute(
+            update(SecurityStateDB)
+            .where(SecurityStateDB.user_id == change.user_id)
+            .values(**values)
+        )
+
+        if result.rowcount == 0:
+            try:
+                with db.begin_nested():
+                    db.add(SecurityStateDB(
+                        user_id=change.user_id,
+                        blocked=change.event == "block",
+                        failed_attempts=change.amount,
+                        reason=change.reason
+                    ))
+            except IntegrityError:
+                # Otro worker insertó la fila al mismo tiempo
+                db.execute(
+                    update(SecurityStateDB)
+                    .where(SecurityStateDB.user_id == change.user_id)
+                    .values(**values)
+                )
+
+    def flush(self) -> int:
+        """
+        Persiste los eventos locales pendientes en una transacción.
+
+        Returns:
+            Número de eventos escritos.
+        """
+        with self._pending_lock:
+            pending, self._pending = self._pending, []
+            unknown, self._pending_unknown = self._pending_unknown, OrderedDict()
+        if not pending and not unknown:
+            return 0
+
+        changes = self._coalesce(pending) + [
+            SecurityStateChange(user_id, "unknown_failures", amount=amount)
+            for user_id, amount in unknown.items()
+        ]
+        try:
+            with self.session_factory() as db:
+                for change in changes:
+                    self._write(db, change)
+                db.commit()
+        except SQLAlchemyError:
+            # Se reintentan en la próxima sincronización
+            with self._pending_lock:
+                self._pending = pending + self._pending
+                for user_id, amount in unknown.items():
+                    self._queue_unknown(user_id, amount)
+            raise
+
+        return len(changes)
+
+    def _fetch_remote(self) -> List[SecurityStateChange]:
+        """
+        Lee del log los eventos de otros workers aún no aplicados.
+
+        Relee desde el primer id faltante: un evento con id menor que
+        otro ya leído se aplica igual cuando su transacción se confirma.
+        """
+        with self.session_factory() as db:
+            rows = db.execute(
+                select(
+                    SecurityStateChangeDB.id,
+                    SecurityStateChangeDB.user_id,
+                    SecurityStateChangeDB.event,
+                    SecurityStateChangeDB.amount,
+                    SecurityStateChangeDB.reason,
+                    SecurityStateChangeDB.worker_id
+                )
+                .where(SecurityStateChangeDB.id > self._last_change_id)
+                .order_by(SecurityStateChangeDB.id)
+            ).all()
+
+        changes = []
+        for change_id, user_id, event, amount, reason, worker_id in rows:
+            if change_id in self._seen_change_ids:
+                continue
+            self._seen_change_ids.add(change_id)
+            self._missing_change_ids.pop(change_id, None)
+            if worker_id != self.worker_id:
+                changes.append(SecurityStateChange(
+                    user_id, event, amount=amount, reason=reason, remote=True
+                ))
+
+        self._advance_last_change_id()
+        return changes
+
+    def _advance_last_change_id(self) -> None:
+        """Avanza _last_change_id hasta el primer id faltante que aún se espera."""
+        if not self._seen_change_ids:
+            return
+
+        now = monotonic()
+        highest = max(self._seen_change_ids)
+        for change_id in range(self._last_change_id + 1, highest):
+            if change_id not in self._seen_change_ids:
+                self._missing_change_ids.setdefault(change_id, now)
+
+        while self._last_change_id < highest:
+            next_id = self._last_change_id + 1
+            if next_id in self._seen_change_ids:
+                self._seen_change_ids.discard(next_id)
+            else:
+                missing_since = self._missing_change_ids.get(next_id, now)
+                if now - missing_since < self.commit_lag:
+                    break
+                # Nunca se confirmó (transacción revertida)
+                del self._missing_change_ids[next_id]
+            self._last_change_id = next_id
+
+    def refresh(self) -> int:
+        """
+        Aplica al snapshot los eventos de otros workers.
+
+        Returns:
+            Número de eventos remotos aplicados.
+        """
+        changes = self._fetch_remote()
+        for change in changes:
+            self._apply(change)
+        return len(changes)
+
+    def prune(self) -> int:
+        """
+        Elimina del log los eventos más antiguos que la retención.
+
+        Returns:
+            Número de eventos eliminados.
+        """
+        cutoff = datetime.utcnow() - self.retention
+        with self.session_factory() as db:
+            result = db.execute(
+                delete(SecurityStateChangeDB).where(
+                    SecurityStateChangeDB.created_at < cutoff
+                )
+            )
+            db.commit()
+        return result.rowcount
+
+    def sync(self) -> Tuple[int, int]:
+        """
+        Escribe los eventos locales y lee los remotos.
+
+        Returns:
+            Tupla (eventos escritos, eventos remotos aplicados).
+        """
+        return self.flush(), self.refresh()
+
+    async def _sync_loop(self) -> None:
+        """Sincroniza periódicamente o cuando hay un bloqueo nuevo."""
+        iterations = 0
+        while True:
+            try:
+                await asyncio.wait_for(self._wakeup.wait(), timeout=self.sync_interval)
+            except asyncio.TimeoutError:
+                pass
+            self._wakeup.clear()
+
+            try:
+                # La BD se consulta en un hilo; el snapshot solo se
+                # modifica desde el event loop
+                written = await asyncio.to_thread(self.flush)
+                changes = await asyncio.to_thread(self._fetch_remote)
+                for change in changes:
+                    self._apply(change)
+
+                applied = len(changes)
+                if written or applied:
+                    logger.debug(
+                        "security_state_synced",
+                        written=written,
+                        applied=applied
+                    )
+
+                iterations += 1
+                if iterations % 1000 == 0:
+                    await asyncio.to_thread(self.prune)
+            except SQLAlchemyError as e:
+                logger.error("security_state_sync_failed", error=str(e))
+
+    def start(self) -> None:
+        """Inicia la sincronización en segundo plano (requiere un event loop activo)."""
+        if self._task is None or self._task.done():
+            self._wakeup = asyncio.Event()
+            self._task = asyncio.create_task(self._sync_loop())
+            logger.info(
+                "security_state_sync_started",
+                worker_id=self.worker_id,
+                sync_interval=self.sync_interval
+            )
+
+    async def stop(self) -> None:
+        """Detiene la sincronización y persiste los eventos pendientes."""
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+            self._wakeup = None
+
+        try:
+            await asyncio.to_thread(self.flush)
+        except SQLAlchemyError as e:
+            logger.error("security_state_flush_failed", error=str(e))
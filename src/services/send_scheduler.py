@@ -0,0 +1,386 @@
+"""
+Planificador de envíos a la Bot API de Telegram.
+
+Telegram limita los envíos de un bot: unos 30 mensajes por segundo en
+total, alrededor de 1 por segundo en un mismo chat (con ráfagas cortas)
+y 20 por minuto en un grupo. Al excederlos responde 429 con un
+retry_after. Enviar cada mensaje en cuanto se genera hace que en los
+picos se pierdan envíos (o que cada llamada reintente por su cuenta).
+
+SendScheduler encola los envíos y los despacha respetando:
+
+- un token bucket global,
+- un token bucket por chat (más lento en grupos),
+- el retry_after de un 429: el chat se pausa y el envío se reintenta
+  sin perder su lugar,
+- prioridades entre chats: las confirmaciones salen antes que los
+  mensajes informativos. Dentro de un chat los envíos salen en orden.
+
+Expone la profundidad de la cola (gauge send_queue_depth) y la espera en
+cola y la latencia total de cada envío (send_queue_wait_seconds y
+send_latency_seconds).
+"""
+
+import asyncio
+import heapq
+import itertools
+from collections import deque
+from datetime import timedelta
+from enum import IntEnum
+from time import monotonic
+from typing import Any, Awaitable, Callable, Deque, Dict, List, Optional, Set, Tuple
+
+from telegram.error import RetryAfter
+
+from ..utils.logger import get_logger
+from ..utils.metrics import metrics
+
+logger = get_logger(__name__)
+
+# Cada cuánto se descartan los limitadores de chats inactivos (segundos)
+_PRUNE_INTERVAL = 60.0
+
+
+class SendPriority(IntEnum):
+    """Prioridad de un envío (menor valor = sale antes)."""
+
+    CONFIRMATION = 0
+    NOTIFICATION = 1
+    INFO = 2
+
+
+class TokenBucket:
+    """
+    Token bucket: `rate` tokens por segundo, hasta `capacity` acumulados.
+
+    Attributes:
+        rate: Tokens que se recuperan por segundo.
+        capacity: Máximo de tokens (tamaño de la ráfaga).
+    """
+
+    def __init__(self, rate: float, capacity: float):
+        """
+        Inicializa el bucket lleno.
+
+        Args:
+            rate: Tokens por segundo.
+            capacity: Máximo de tokens acumulados.
+
+        Example:
+            >>> bucket = TokenBucket(rate=30, capacity=30)
+            >>> bucket.delay(monotonic())
+            0.0
+        """
+        self.rate = rate
+        self.capacity = capacity
+        self._tokens = capacity
+        self._updated = monotonic()
+
+    def _refill(self, now: float) -> None:
+        if now > self._updated:
+            self._tokens = min(self.capacity, self._tokens + (now - self._updated) * self.rate)
+            self._updated = now
+
+    def delay(self, now: float) -> float:
+        """Segundos hasta que haya un token disponible (0 si ya lo hay)."""
+        self._refill(now)
+        if self._tokens >= 1:
+            return 0.0
+        return (1 - self._tokens) / self.rate
+
+    def consume(self, now: float) -> None:
+        """Toma un token (el llamador verificó antes con delay())."""
+        self._refill(now)
+        self._tokens -= 1
+
+    def is_full(self, now: float) -> bool:
+        """True si el bucket se recuperó por completo."""
+        self._refill(now)
+        return self._tokens >= self.capacity
+
+
+class _SendJob:
+    """Envío encolado."""
+
+    __slots__ = ("priority", "seq", "send", "future", "enqueued_at")
+
+    def __init__(self, priority, seq, send, future, enqueued_at):
+        self.priority = priority
+        self.seq = seq
+        self.send = send
+        self.future = future
+        self.enqueued_at = enqueued_at
+
+
+class _ChatQueue:
+    """Envíos pendientes y limitador de un chat."""
+
+    __slots__ = ("jobs", "bucket", "blocked_until", "busy", "scheduled")
+
+    def __init__(self, bucket: TokenBucket):
+        self.jobs: Deque[_SendJob] = deque()
+        self.bucket = bucket
+        self.blocked_until = 0.0
+        self.busy = False
+        self.scheduled = False
+
+
+def _retry_after_seconds(error: RetryAfter) -> float:
+    """retry_after del error en segundos (int o timedelta según la versión)."""
+    retry_after = error.retry_after
+    if isinstance(retry_after, timedelta):
+        return retry_after.total_seconds()
+    return float(retry_after)
+
+
+class SendScheduler:
+    """
+    Cola de envíos con límites global y por chat, y prioridades.
+
+    Attributes:
+        global_rate: Envíos por segundo en total.
+        chat_rate: Envíos por segundo en un chat privado.
+        chat_burst: Ráfaga permitida en un chat privado.
+        group_rate: Envíos por segundo en un grupo (chat_id negativo).
+        group_burst: Ráfaga permitida en un grupo.
+    """
+
+    def __init__(
+        self,
+        global_rate: float = 30.0,
+        chat_rate: float = 1.0,
+        chat_burst: int = 3,
+        group_rate: float = 20 / 60,
+        group_burst: int = 3
+    ):
+        """
+        Inicializa el planificador.
+
+        Args:
+            global_rate: Envíos por segundo en total (default: 30).
+            chat_rate: Envíos por segundo en un chat privado (default: 1).
+            chat_burst: Ráfaga en un chat privado (default: 3).
+            group_rate: Envíos por segundo en un grupo (default: 20 por
+                minuto).
+            group_burst: Ráfaga en un grupo (default: 3).
+
+        Example:
+            >>> scheduler = SendScheduler()
+            >>> scheduler.start()
+            >>> await scheduler.submit(
+            ...     chat_id,
+            ...     lambda: bot.send_message(chat_id=chat_id, text="Hola"),
+            ...     priority=SendPriority.CONFIRMATION
+            ... )
+        """
+        self.global_rate = global_rate
+        self.chat_rate = chat_rate
+        self.chat_burst = chat_burst
+        self.group_rate = group_rate
+        self.group_burst = group_burst
+
+        self._global = TokenBucket(global_rate, max(1.0, global_rate))
+        self._chats: Dict[int, _ChatQueue] = {}
+        # Chats con un envío listo: (prioridad, orden, chat_id)
+        self._ready: List[Tuple[int, int, int]] = []
+        # Chats esperando a su limitador o a un retry_after: (instante, orden, chat_id)
+        self._waiting: List[Tuple[float, int, int]] = []
+        self._seq = itertools.count()
+        self._depth = 0
+        self._wakeup: Optional[asyncio.Event] = None
+        self._task: Optional[asyncio.Task] = None
+        self._sending: Set[asyncio.Task] = set()
+        self._last_prune = monotonic()
+
+    @property
+    def queue_depth(self) -> int:
+        """Envíos encolados que todavía no empezaron."""
+        return self._depth
+
+    def _chat_queue(self, chat_id: int) -> _ChatQueue:
+        state = self._chats.get(chat_id)
+        if state is None:
+            if chat_id < 0:
+                bucket = TokenBucket(self.group_rate, self.group_burst)
+            else:
+                bucket = TokenBucket(self.chat_rate, self.chat_burst)
+            state = self._chats[chat_id] = _ChatQueue(bucket)
+        return state
+
+    def _set_depth(self, delta: int) -> None:
+        self._depth += delta
+        metrics.set_gauge("send_queue_depth", self._depth)
+
+    def _schedule(self, chat_id: int, state: _ChatQueue, now: float) -> None:
+        """Pone el chat en la cola de listos o de espera según su limitador."""
+        ready_at = max(state.blocked_until, now + state.bucket.delay(now))
+        if ready_at <= now:
+            head = state.jobs[0]
+            heapq.heappush(self._ready, (head.priority, head.seq, chat_id))
+        else:
+            heapq.heappush(self._waiting, (ready_at, next(self._seq), chat_id))
+        state.scheduled = True
+        if self._wakeup is not None:
+            self._wakeup.set()
+
+    def _release(self, chat_id: int, state: _ChatQueue, now: float) -> None:
+        """Reprograma el chat tras un envío, o lo olvida si quedó inactivo."""
+        if state.jobs:
+            self._schedule(chat_id, state, now)
+        elif state.blocked_until <= now and state.bucket.is_full(now):
+            del self._chats[chat_id]
+
+    def _prune(self, now: float) -> None:
+        """Descarta los limitadores de chats sin envíos que ya se recuperaron."""
+        self._last_prune = now
+        for chat_id, state in list(self._chats.items()):
+            if not state.jobs and not state.busy:
+                self._release(chat_id, state, now)
+
+    async def submit(
+        self,
+        chat_id: int,
+        send: Callable[[], Awaitable[Any]],
+        priority: SendPriority = SendPriority.INFO
+    ) -> Any:
+        """
+        Encola un envío y espera su resultado.
+
+        Args:
+            chat_id: Chat de destino (determina el limitador).
+            send: Función sin argumentos que hace la llamada a la Bot API
+                (se llama de nuevo si Telegram responde 429).
+            priority: Prioridad del envío (default: INFO).
+
+        Returns:
+            El resultado de la llamada.
+
+        Raises:
+            Exception: La que lance la llamada (salvo RetryAfter, que se
+                reintenta).
+        """
+        self.start()
+
+        now = monotonic()
+        future = asyncio.get_running_loop().create_future()
+        state = self._chat_queue(chat_id)
+        state.jobs.append(_SendJob(priority, next(self._seq), send, future, now))
+        self._set_depth(1)
+
+        if not state.busy and not state.scheduled:
+            self._schedule(chat_id, state, now)
+
+        return await future
+
+    async def _run(self, chat_id: int, state: _ChatQueue, job: _SendJob) -> None:
+        """Hace la llamada de un envío y resuelve su futuro."""
+        priority = job.priority.name.lower()
+        metrics.observe(
+            "send_queue_wait_seconds", monotonic() - job.enqueued_at, priority=priority
+        )
+
+        try:
+            result = await job.send()
+        except RetryAfter as e:
+            retry_after = _retry_after_seconds(e)
+            state.blocked_until = monotonic() + retry_after
+            # Vuelve al frente: el orden del chat se mantiene
+            state.jobs.appendleft(job)
+            self._set_depth(1)
+            metrics.increment("telegram_retry_after_total")
+            logger.warning("telegram_retry_after", chat_id=chat_id, retry_after=retry_after)
+        except Exception as e:
+            if not job.future.done():
+                job.future.set_exception(e)
+        else:
+            metrics.observe(
+                "send_latency_seconds", monotonic() - job.enqueued_at, priority=priority
+            )
+            if not job.future.done():
+                job.future.set_result(result)
+        finally:
+            state.busy = False
+            self._release(chat_id, state, monotonic())
+
+    async def _dispatch_loop(self) -> None:
+        """Despacha los envíos respetando límites y prioridades."""
+        while True:
+            now = monotonic()
+            while self._waiting and self._waiting[0][0] <= now:
+                _, _, chat_id = heapq.heappop(self._waiting)
+                state = self._chats[chat_id]
+                state.scheduled = False
+                self._schedule(chat_id, state, now)
+
+            if now - self._last_prune >= _PRUNE_INTERVAL:
+                self._prune(now)
+
+            if not self._ready:
+                timeout = self._waiting[0][0] - now if self._waiting else None
+                self._wakeup.clear()
+                try:
+                    await asyncio.wait_for(self._wakeup.wait(), timeout)
+                except asyncio.TimeoutError:
+                    pass
+                continue
+
+            delay = self._global.delay(now)
+            if delay > 0:
+                await asyncio.sleep(delay)
+                continue
+
+            _, _, chat_id = heapq.heappop(self._ready)
+            state = self._chats[chat_id]
+            state.scheduled = False
+            job = state.jobs.popleft()
+            self._set_depth(-1)
+
+            if job.future.done():
+                # El llamador dejó de esperar (timeout o cancelación)
+                self._release(chat_id, state, now)
+                continue
+
+            self._global.consume(now)
+            state.bucket.consume(now)
+            state.busy = True
+            task = asyncio.create_task(self._run(chat_id, state, job))
+            self._sending.add(task)
+            task.add_done_callback(self._sending.discard)
+
+    def start(self) -> None:
+        """Inicia el despacho en segundo plano (requiere un event loop activo)."""
+        if self._task is None or self._task.done():
+            self._wakeup = asyncio.Event()
+            self._task = asyncio.create_task(self._dispatch_loop())
+
+    async def stop(self, drain_timeout: float = 5.0) -> None:
+        """
+        Espera a que se vacíe la cola (hasta `drain_timeout`) y detiene el despacho.
+
+        Args:
+            drain_timeout: Segundos máximos de espera (default: 5).
+        """
+        if self._task is None:
+            return
+
+        deadline = monotonic() + drain_timeout
+        while (self._depth or self._sending) and monotonic() < deadline:
+            await asyncio.sleep(0.05)
+
+        self._task.cancel()
+        try:
+            await self._task
+        except asyncio.CancelledError:
+            pass
+        self._task = None
+
+        for state in self._chats.values():
+            for job in state.jobs:
+                job.future.cancel()
+        if self._depth:
+            logger.warning("send_queue_dropped", pending=self._depth)
+
+        self._chats.clear()
+        self._ready.clear()
+        self._waiting.clear()
+        self._set_depth(-self._depth)
@@ -5,21 +5,48 @@ Este módulo maneja la comunicación con Telegram, incluyendo
 envío de mensajes, vCards y botones inline.
 """
 
-from typing import Optional
+import hashlib
+from collections import OrderedDict
+from time import monotonic
+from typing import IO, Any, Awaitable, Callable, Iterable, Mapping, Optional, Tuple
 from io import BytesIO
 
 from telegram import Bot, Update, InlineKeyboardButton, InlineKeyboardMarkup
+from telegram.error import BadRequest, NetworkError, RetryAfter
 from telegram.ext import Application, CommandHandler, MessageHandler, filters, ContextTypes
 
+from .send_scheduler import SendPriority, SendScheduler
+from ..utils.deadline import Deadline, run_with_timeout
 from ..utils.logger import get_logger
+from ..utils.metrics import metrics
+from ..utils.retry import RetryPolicy
 from ..utils.helpers import (
     generate_vcard,
-    vcard_to_bytes,
+    vcard_bundle_to_file,
     normalize_phone_for_telegram
 )
 
 logger = get_logger(__name__)
 
+# Formas de entregar un contacto guardado
+CONTACT_DELIVERY_MODES = ("contact", "document", "both")
+
+
+def is_transient_telegram_error(error: BaseException) -> bool:
+    """
+    Indica si un error de Telegram es transitorio.
+
+    Args:
+        error: Excepción lanzada por python-telegram-bot.
+
+    Returns:
+        True para errores de red/timeout y RetryAfter (429).
+        BadRequest también hereda de NetworkError pero no se reintenta.
+    """
+    if isinstance(error, RetryAfter):
+        return True
+    return isinstance(error, NetworkError) and not isinstance(error, BadRequest)
+
 
 class TelegramService:
     """
@@ -28,28 +55,89 @@ class TelegramService:
     Attributes:
         bot_token: Token del bot de Telegram.
         bot: Instancia del bot de Telegram.
+        retry_policy: Política de reintentos para envíos.
+        timeout: Timeout por envío en segundos (incluye reintentos).
+        scheduler: Planificador de envíos (None = enviar directamente).
+        error_dedup_window: Segundos en los que un mismo mensaje de error
+            no se repite en un chat.
+        contact_delivery: Cómo se entrega un contacto guardado: "contact"
+            (sendContact), "document" (vCard .vcf) o "both".
+        file_id_cache_size: Archivos subidos cuyo file_id se recuerda
+            para reenviarlos sin volver a subirlos.
     """
 
-    def __init__(self, bot_token: str):
+    def __init__(
+        self,
+        bot_token: str,
+        retry_policy: Optional[RetryPolicy] = None,
+        timeout: float = 15.0,
+        scheduler: Optional[SendScheduler] = None,
+        error_dedup_window: float = 30.0,
+        contact_delivery: str = "contact",
+        file_id_cache_size: int = 1024
+    ):
         """
         Inicializa el servicio de Telegram.
 
         Args:
             bot_token: Token del bot de Telegram.
+            retry_policy: Política de reintentos para envíos (default: 3
+                intentos con backoff exponencial).
+            timeout: Timeout por envío en segundos (default: 15).
+            scheduler: Planificador que aplica los límites de Telegram
+                (default: None, cada envío sale inmediatamente).
+            error_dedup_window: Segundos en los que un mismo mensaje de
+                error no se repite en un chat (default: 30).
+            contact_delivery: "contact" para un mensaje de contacto nativo
+                (sin subir archivos), "document" para el vCard como
+                archivo .vcf o "both" (default: "contact").
+            file_id_cache_size: Máximo de file_id recordados, por hash
+                del contenido (default: 1024, 0 = no reutilizar).
+
+        Raises:
+            ValueError: Si `contact_delivery` no es un modo válido.
 
         Example:
             >>> service = TelegramService(bot_token="your-bot-token")
         """
         self.bot_token = bot_token
         self.bot = Bot(token=bot_token)
+        self.timeout = timeout
+        self.scheduler = scheduler
+        self.error_dedup_window = error_dedup_window
+        if contact_delivery not in CONTACT_DELIVERY_MODES:
+            raise ValueError(f"Modo de entrega de contactos inválido: {contact_delivery}")
+        self.contact_delivery = contact_delivery
+        # (chat_id, mensaje) -> instante del último envío
+        self._recent_errors: "OrderedDict[Tuple[int, str], float]" = OrderedDict()
+        # (nombre de archivo, SHA-256 del contenido) -> file_id de Telegram (LRU)
+        self.file_id_cache_size = file_id_cache_size
+        self._file_ids: "OrderedDict[Tuple[str, str], str]" = OrderedDict()
+        self.retry_policy = retry_policy or RetryPolicy(
+            name="telegram",
+            is_retryable=is_transient_telegram_error
+        )
 
         logger.info("telegram_service_initialized")
 
+    async def _send(
+        self,
+        chat_id: int,
+        priority: SendPriority,
+        call: Callable[[], Awaitable[Any]]
+    ) -> Any:
+        """Hace la llamada a la Bot API a través del planificador, si hay uno."""
+        if self.scheduler is None:
+            return await call()
+        return await self.scheduler.submit(chat_id, call, priority=priority)
+
     async def send_message(
         self,
         chat_id: int,
         text: str,
-        parse_mode: Optional[str] = None
+        parse_mode: Optional[str] = None,
+        deadline: Optional[Deadline] = None,
+        priority: SendPriority = SendPriority.NOTIFICATION
     ) -> bool:
         """
         Envía un mensaje de texto a un chat.
@@ -58,6 +146,8 @@ class TelegramService:
             chat_id: ID del chat de destino.
             text: Texto del mensaje.
             parse_mode: Modo de parseo (HTML, Markdown, etc).
+            deadline: Deadline de la solicitud (opcional).
+            priority: Prioridad en el planificador (default: NOTIFICATION).
 
         Returns:
             True si el mensaje se envió correctamente, False en caso contrario.
@@ -68,10 +158,21 @@ class TelegramService:
             True
         """
         try:
-            await self.bot.send_message(
-                chat_id=chat_id,
-                text=text,
-                parse_mode=parse_mode
+            await run_with_timeout(
+                self.retry_policy.call(
+                    self._send,
+                    chat_id,
+                    priority,
+                    lambda: self.bot.send_message(
+                        chat_id=chat_id,
+                        text=text,
+                        parse_mode=parse_mode
+                    ),
+                    deadline=deadline
+                ),
+                timeout=self.timeout,
+                deadline=deadline,
+                stage="telegram_send_message"
             )
 
             logger.info(
@@ -96,13 +197,15 @@ class TelegramService:
         nombre: str,
         telefono: str,
         quien_lo_recomendo: str,
-        confirmation_message: str
+        confirmation_message: str,
+        deadline: Optional[Deadline] = None
     ) -> bool:
         """
-        Envía un vCard para agregar automáticamente el contacto a la libreta.
+        Envía el contacto guardado para agregarlo a la libreta.
 
-        Esta es la forma más automática: al abrir el vCard en el teléfono,
-        automáticamente pregunta si desea agregarlo a contactos.
+        Según `contact_delivery` envía un mensaje de contacto nativo
+        (sendContact, con el vCard en el propio mensaje y sin subir
+        archivos), el vCard como documento .vcf, o ambos.
 
         Args:
             chat_id: ID del chat de destino.
@@ -110,6 +213,7 @@ class TelegramService:
             telefono: Teléfono del contacto (formato +57...).
             quien_lo_recomendo: Nombre del referido.
             confirmation_message: Mensaje de confirmación a mostrar.
+            deadline: Deadline de la solicitud (opcional).
 
         Returns:
             True si se envió correctamente, False en caso contrario.
@@ -125,18 +229,114 @@ class TelegramService:
             ... )
             True
         """
+        sent = True
+        if self.contact_delivery in ("contact", "both"):
+            sent = await self.send_native_contact(
+                chat_id, nombre, telefono, quien_lo_recomendo, deadline=deadline
+            )
+        if self.contact_delivery in ("document", "both"):
+            sent = await self.send_vcard_document(
+                chat_id, nombre, telefono, quien_lo_recomendo, deadline=deadline
+            ) and sent
+        return sent
+
+    async def send_native_contact(
+        self,
+        chat_id: int,
+        nombre: str,
+        telefono: str,
+        quien_lo_recomendo: str,
+        deadline: Optional[Deadline] = None
+    ) -> bool:
+        """
+        Envía un mensaje de contacto nativo de Telegram (sendContact).
+
+        Es un request liviano (sin multipart ni archivo): Telegram muestra
+        el contacto con el botón de agregarlo a la libreta. El vCard va en
+        el parámetro vcard para conservar la nota del referido.
+
+        Args:
+            chat_id: ID del chat de destino.
+            nombre: Nombre del contacto.
+            telefono: Teléfono del contacto (formato +57...).
+            quien_lo_recomendo: Nombre del referido.
+            deadline: Deadline de la solicitud (opcional).
+
+        Returns:
+            True si se envió correctamente, False en caso contrario.
+        """
+        first_name, _, last_name = nombre.partition(" ")
+
         try:
-            # Generar vCard
-            vcard_content = generate_vcard(nombre, telefono, quien_lo_recomendo)
-            vcard_bytes = vcard_to_bytes(vcard_content)
+            await run_with_timeout(
+                self.retry_policy.call(
+                    self._send,
+                    chat_id,
+                    SendPriority.CONFIRMATION,
+                    lambda: self.bot.send_contact(
+                        chat_id=chat_id,
+                        phone_number=normalize_phone_for_telegram(telefono),
+                        first_name=first_name,
+                        last_name=last_name or None,
+                        vcard=generate_vcard(nombre, telefono, quien_lo_recomendo)
+                    ),
+                    deadline=deadline
+                ),
+                timeout=self.timeout,
+                deadline=deadline,
+                stage="telegram_send_contact"
+            )
 
-            # Enviar el vCard como documento con nombre .vcf
-            # Cuando el usuario lo toca, automáticamente abre la opción de agregar a contactos
-            await self.bot.send_document(
+            logger.info("native_contact_sent", chat_id=chat_id, nombre=nombre)
+            return True
+
+        except Exception as e:
+            logger.error(
+                "failed_to_send_contact",
                 chat_id=chat_id,
-                document=vcard_bytes,
+                error=str(e)
+            )
+            return False
+
+    async def send_vcard_document(
+        self,
+        chat_id: int,
+        nombre: str,
+        telefono: str,
+        quien_lo_recomendo: str,
+        deadline: Optional[Deadline] = None
+    ) -> bool:
+        """
+        Envía el vCard del contacto como documento .vcf.
+
+        Al abrir el archivo en el teléfono pregunta si se desea agregar el
+        contacto. Es la llamada más pesada del flujo (sube un archivo en
+        un request multipart); si el mismo vCard ya se subió, se reenvía
+        por su file_id sin volver a subirlo.
+
+        Args:
+            chat_id: ID del chat de destino.
+            nombre: Nombre del contacto.
+            telefono: Teléfono del contacto (formato +57...).
+            quien_lo_recomendo: Nombre del referido.
+            deadline: Deadline de la solicitud (opcional).
+
+        Returns:
+            True si se envió correctamente, False en caso contrario.
+        """
+        try:
+            vcard_content = generate_vcard(nombre, telefono, quien_lo_recomendo).encode("utf-8")
+
+            # Enviar el vCard como documento con nombre .vcf
+            # Cuando el usuario lo toca, automáticamente abre la opción de agregar a contactos.
+            # Cada intento usa un buffer nuevo (el anterior ya fue leído)
+            await self._send_document(
+                chat_id,
+                digest=hashlib.sha256(vcard_content).hexdigest(),
+                open_document=lambda: BytesIO(vcard_content),
                 filename=f"{nombre.replace(' ', '_')}.vcf",
-                caption=f"📇 {nombre}\n☝️ Toca para agregar automáticamente a tus contactos"
+                caption=f"📇 {nombre}\n☝️ Toca para agregar automáticamente a tus contactos",
+                deadline=deadline
             )
 
             logger.info(
@@ -155,6 +355,139 @@ class TelegramService:
             )
             return False
 
+    async def send_vcard_bundle(
+        self,
+        chat_id: int,
+        contacts: Iterable[Mapping[str, str]],
+        filename: str = "contactos.vcf",
+        caption: Optional[str] = None,
+        priority: SendPriority = SendPriority.INFO,
+        deadline: Optional[Deadline] = None
+    ) -> bool:
+        """
+        Envía varios contactos en un solo archivo .vcf.
+
+        El archivo se genera en streaming (ver vcard_bundle_to_file) y, si
+        el mismo contenido ya se subió, se reenvía por su file_id.
+
+        Args:
+            chat_id: ID del chat de destino.
+            contacts: Contactos con nombre, telefono y quien_lo_recomendo.
+            filename: Nombre del archivo (default: "contactos.vcf").
+            caption: Texto del mensaje (default: la cantidad de contactos).
+            priority: Prioridad del envío (default: INFO).
+            deadline: Deadline de la solicitud (opcional).
+
+        Returns:
+            True si se envió correctamente, False en caso contrario.
+
+        Example:
+            >>> await service.send_vcard_bundle(123, contactos, filename="export.vcf")
+            True
+        """
+        bundle = vcard_bundle_to_file(contacts)
+
+        def rewind() -> IO[bytes]:
+            # Cada intento vuelve a leer el archivo desde el inicio
+            bundle.file.seek(0)
+            return bundle.file
+
+        try:
+            with bundle.file:
+                await self._send_document(
+                    chat_id,
+                    digest=bundle.digest,
+                    open_document=rewind,
+                    filename=filename,
+                    caption=caption or f"📇 {bundle.count} contactos",
+                    priority=priority,
+                    deadline=deadline
+                )
+
+            logger.info(
+                "vcard_bundle_sent",
+                chat_id=chat_id,
+                contacts=bundle.count,
+                size=bundle.size
+            )
+            return True
+
+        except Exception as e:
+            logger.error(
+                "failed_to_send_vcard_bundle",
+                chat_id=chat_id,
+                error=str(e)
+            )
+            return False
+
+    async def _send_document(
+        self,
+        chat_id: int,
+        digest: str,
+        open_document: Callable[[], IO[bytes]],
+        filename: str,
+        caption: str,
+        priority: SendPriority = SendPriority.CONFIRMATION,
+        deadline: Optional[Deadline] = None
+    ) -> None:
+        """
+        Envía un documento reutilizando el file_id si el contenido ya se subió.
+
+        Args:
+            chat_id: ID del chat de destino.
+            digest: SHA-256 del contenido del archivo.
+            open_document: Devuelve el archivo a subir (se llama en cada
+                intento de subida).
+            filename: Nombre del archivo.
+            caption: Texto del mensaje.
+            priority: Prioridad del envío (default: CONFIRMATION).
+            deadline: Deadline de la solicitud (opcional).
+
+        Raises:
+            Exception: El error del envío si fallan los reintentos.
+        """
+        key = (filename, digest)
+
+        async def send(document: Callable[[], Any]) -> Any:
+            return await run_with_timeout(
+                self.retry_policy.call(
+                    self._send,
+                    chat_id,
+                    priority,
+                    lambda: self.bot.send_document(
+                        chat_id=chat_id,
+                        document=document(),
+                        filename=filename,
+                        caption=caption
+                    ),
+                    deadline=deadline
+                ),
+                timeout=self.timeout,
+                deadline=deadline,
+                stage="telegram_send_document"
+            )
+
+        file_id = self._file_ids.get(key)
+        if file_id is not None:
+            self._file_ids.move_to_end(key)
+            try:
+                await send(lambda: file_id)
+                metrics.increment("telegram_file_id_cache_total", result="hit")
+                return
+            except BadRequest as e:
+                # Telegram ya no reconoce el file_id: se vuelve a subir
+                self._file_ids.pop(key, None)
+                logger.warning("cached_file_id_rejected", chat_id=chat_id, error=str(e))
+
+        metrics.increment("telegram_file_id_cache_total", result="miss")
+        message = await send(open_document)
+
+        document = getattr(message, "document", None)
+        if document is not None and self.file_id_cache_size > 0:
+            self._file_ids[key] = document.file_id
+            if len(self._file_ids) > self.file_id_cache_size:
+                self._file_ids.popitem(last=False)
+
     async def send_error_message(
         self,
         chat_id: int,
@@ -164,17 +497,34 @@ class TelegramService:
         """
         Envía un mensaje de error formateado al usuario.
 
+        Un error idéntico al enviado al mismo chat hace menos de
+        `error_dedup_window` segundos no se vuelve a enviar.
+
         Args:
             chat_id: ID del chat de destino.
             error: Mensaje de error principal.
             details: Detalles adicionales del error (opcional).
 
         Returns:
-            True si se envió correctamente, False en caso contrario.
+            True si se envió correctamente (o ya se había enviado), False
+            en caso contrario.
         """
         from ..utils.helpers import format_error_message
 
         message = format_error_message(error, details)
+
+        now = monotonic()
+        recent = self._recent_errors
+        while recent and next(iter(recent.values())) <= now - self.error_dedup_window:
+            recent.popitem(last=False)
+
+        key = (chat_id, message)
+        if key in recent:
+            metrics.increment("error_notifications_deduplicated_total")
+            logger.info("error_notification_deduplicated", chat_id=chat_id)
+            return True
+
+        recent[key] = now
         return await self.send_message(chat_id, message)
 
     async def get_bot_info(self) -> dict:
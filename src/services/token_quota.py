@@ -0,0 +1,436 @@
+"""
+Cuotas de tokens del LLM por usuario y globales.
+
+El rate limit cuenta mensajes, pero el costo del LLM depende de los
+tokens: un mensaje de 1000 caracteres cuesta mucho más que uno de 20.
+TokenQuota limita los tokens consumidos en un periodo (por defecto un
+día UTC) por usuario y para todo el despliegue:
+
+- Antes de llamar al LLM se reserva un estimado de tokens (reserve());
+  si no cabe en alguna de las cuotas la llamada no se hace.
+- Con la respuesta se ajusta la reserva al uso real que reporta la API
+  (settle()); si no hubo respuesta la reserva se devuelve.
+
+Las consultas usan contadores en memoria (sin I/O). Con
+SQLTokenQuotaStore los consumos se persisten como incrementos en la BD,
+así que sobreviven reinicios y se suman entre workers.
+"""
+
+import asyncio
+import threading
+from datetime import datetime
+from time import time
+from typing import Callable, Dict, NamedTuple, Optional, Tuple
+
+from sqlalchemy import BigInteger, Column, DateTime, Integer, delete, select, update
+from sqlalchemy.exc import IntegrityError, SQLAlchemyError
+from sqlalchemy.orm import Session
+
+from .contacts_api import Base
+from ..utils.logger import get_logger
+from ..utils.metrics import metrics
+
+logger = get_logger(__name__)
+
+# Fila con el consumo global (los user IDs de Telegram son positivos)
+GLOBAL_USER_ID = 0
+
+
+class TokenUsageDB(Base):
+    """
+    Tokens consumidos por usuario y periodo.
+
+    Tabla: llm_token_usage (user_id 0 = consumo global)
+    """
+    __tablename__ = "llm_token_usage"
+
+    user_id = Column(BigInteger, primary_key=True, autoincrement=False)
+    period = Column(Integer, primary_key=True, autoincrement=False)
+    tokens = Column(BigInteger, nullable=False, default=0)
+    updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
+
+
+class TokenReservation(NamedTuple):
+    """Tokens reservados para una llamada al LLM."""
+
+    user_id: int
+    tokens: int
+    period: int
+
+
+class QuotaDecision(NamedTuple):
+    """
+    Resultado de una verificación de cuota.
+
+    Attributes:
+        allowed: Si la llamada cabe en las cuotas.
+        scope: "user" o "global" si se rechazó.
+        retry_after: Segundos hasta que se renueva la cuota agotada.
+        reservation: Reserva a ajustar con settle() (si se reservó).
+    """
+
+    allowed: bool
+    scope: Optional[str] = None
+    retry_after: float = 0.0
+    reservation: Optional[TokenReservation] = None
+
+
+class TokenQuota:
+    """
+    Cuotas de tokens en memoria del proceso.
+
+    Es la implementación sin persistencia (un solo worker; los consumos
+    se pierden al reiniciar).
+
+    Attributes:
+        user_limit: Tokens por usuario en cada periodo (0 = sin límite).
+        global_limit: Tokens para todo el despliegue en cada periodo
+            (0 = sin límite).
+        period_seconds: Duración del periodo.
+    """
+
+    def __init__(
+        self,
+        user_limit: int = 0,
+        global_limit: int = 0,
+        period_seconds: float = 86400.0
+    ):
+        """
+        Inicializa las cuotas.
+
+        Args:
+            user_limit: Tokens por usuario y periodo (default: sin límite).
+            global_limit: Tokens globales por periodo (default: sin límite).
+            period_seconds: Duración del periodo (default: 1 día; los
+                periodos empiezan a las 00:00 UTC).
+
+        Example:
+            >>> quota = TokenQuota(user_limit=50000, global_limit=2000000)
+            >>> decision = quota.reserve(123, 500)
+            >>> decision.allowed
+            True
+            >>> quota.settle(decision.reservation, tokens_used=420)
+        """
+        self.user_limit = user_limit
+        self.global_limit = global_limit
+        self.period_seconds = period_seconds
+        self._period = int(time() // period_seconds)
+        self._used: Dict[int, int] = {}
+        self._global_used = 0
+
+    def _current_period(self) -> int:
+        """Periodo actual; al cambiar de periodo los contadores vuelven a 0."""
+        period = int(time() // self.period_seconds)
+        if period != self._period:
+            self._period = period
+            self._used = {}
+            self._global_used = 0
+        return period
+
+    def _charge(self, user_id: int, period: int, tokens: int) -> None:
+        """Suma (o resta) tokens al consumo del usuario y al global."""
+        if period != self._period:
+            return
+        self._used[user_id] = max(0, self._used.get(user_id, 0) + tokens)
+        self._global_used = max(0, self._global_used + tokens)
+
+    def usage(self, user_id: int) -> Tuple[int, int]:
+        """
+        Consumo en el periodo actual.
+
+        Args:
+            user_id: ID del usuario de Telegram.
+
+        Returns:
+            Tupla (tokens del usuario, tokens globales).
+        """
+        self._current_period()
+        return self._used.get(user_id, 0), self._global_used
+
+    def check(self, user_id: int, tokens: int) -> QuotaDecision:
+        """
+        Verifica si una llamada de `tokens` cabe en las cuotas (sin reservar).
+
+        Args:
+            user_id: ID del usuario de Telegram.
+            tokens: Tokens estimados de la llamada.
+
+        Returns:
+            QuotaDecision (sin reserva).
+        """
+        period = self._current_period()
+
+        scope = None
+        if self.global_limit and self._global_used + tokens > self.global_limit:
+            scope = "global"
+        elif self.user_limit and self._used.get(user_id, 0) + tokens > self.user_limit:
+            scope = "user"
+
+        if scope is None:
+            return QuotaDecision(True)
+
+        retry_after = (period + 1) * self.period_seconds - time()
+        return QuotaDecision(False, scope=scope, retry_after=max(0.0, retry_after))
+
+    def reserve(self, user_id: int, tokens: int) -> QuotaDecision:
+        """
+        Reserva tokens para una llamada si caben en las cuotas.
+
+        Args:
+            user_id: ID del usuario de Telegram.
+            tokens: Tokens estimados de la llamada.
+
+        Returns:
+            QuotaDecision; si allowed, `reservation` debe ajustarse con
+            settle() cuando termine la llamada.
+        """
+        decision = self.check(user_id, tokens)
+
+        if not decision.allowed:
+            metrics.increment("llm_quota_rejections_total", scope=decision.scope)
+            logger.warning(
+                "llm_quota_exceeded",
+                user_id=user_id,
+                scope=decision.scope,
+                estimated_tokens=tokens,
+                retry_after=round(decision.retry_after)
+            )
+            return decision
+
+        reservation = TokenReservation(user_id, tokens, self._period)
+        self._charge(user_id, reservation.period, tokens)
+        return decision._replace(reservation=reservation)
+
+    def settle(
+        self,
+        reservation: Optional[TokenReservation],
+        tokens_used: Optional[int]
+    ) -> None:
+        """
+        Reemplaza la reserva por el consumo real.
+
+        Args:
+            reservation: Reserva de reserve() (None no hace nada).
+            tokens_used: Tokens que reportó la API, o None si la llamada
+                no obtuvo respuesta (se devuelve la reserva).
+        """
+        if reservation is None:
+            return
+
+        actual = tokens_used or 0
+        if actual != reservation.tokens:
+            self._charge(reservation.user_id, reservation.period, actual - reservation.tokens)
+
+        if actual:
+            metrics.increment("llm_tokens_total", actual)
+
+    def load(self) -> None:
+        """Carga los consumos persistidos (no aplica en memoria)."""
+
+    def start(self) -> None:
+        """Inicia la sincronización en segundo plano (no aplica en memoria)."""
+
+    async def stop(self) -> None:
+        """Detiene la sincronización en segundo plano (no aplica en memoria)."""
+
+
+class SQLTokenQuotaStore(TokenQuota):
+    """
+    Cuotas de tokens persistidas en la BD y compartidas entre workers.
+
+    Cada consumo se aplica en memoria y se encola como incremento; un
+    ciclo en segundo plano escribe los incrementos y relee los totales
+    del periodo (que incluyen los de otros workers).
+
+    Attributes:
+        session_factory: Factory de sesiones de SQLAlchemy.
+        sync_interval: Segundos entre sincronizaciones.
+        retention_periods: Periodos de historial que se conservan.
+    """
+
+    def __init__(
+        self,
+        session_factory: Callable[[], Session],
+        user_limit: int = 0,
+        global_limit: int = 0,
+        period_seconds: float = 86400.0,
+        sync_interval: float = 5.0,
+        retention_periods: int = 31
+    ):
+        """
+        Inicializa el store.
+
+        Args:
+            session_factory: Factory de sesiones (p. ej.
+                ContactsAPIClient.SessionLocal).
+            user_limit: Tokens por usuario y periodo (default: sin límite).
+            global_limit: Tokens globales por periodo (default: sin límite).
+            period_seconds: Duración del periodo (default: 1 día).
+            sync_interval: Segundos entre sincronizaciones (default: 5).
+            retention_periods: Periodos de historial a conservar en la
+                tabla (default: 31).
+
+        Example:
+            >>> store = SQLTokenQuotaStore(contacts_client.SessionLocal, user_limit=50000)
+            >>> store.load()
+            >>> store.start()
+        """
+        super().__init__(user_limit, global_limit, period_seconds)
+        self.session_factory = session_factory
+        self.sync_interval = sync_interval
+        self.retention_periods = retention_periods
+        # (user_id, periodo) -> tokens aún no escritos en la BD
+        self._pending: Dict[Tuple[int, int], int] = {}
+        self._pending_lock = threading.Lock()
+        self._task: Optional[asyncio.Task] = None
+
+    def _charge(self, user_id: int, period: int, tokens: int) -> None:
+        """Aplica el consumo en memoria y lo encola para persistirlo."""
+        super()._charge(user_id, period, tokens)
+        with self._pending_lock:
+            for key in ((user_id, period), (GLOBAL_USER_ID, period)):
+                self._pending[key] = self._pending.get(key, 0) + tokens
+
+    def _write(self, db: Session, user_id: int, period: int, tokens: int) -> None:
+        """Suma un incremento a la fila del usuario y periodo."""
+        where = (TokenUsageDB.user_id == user_id) & (TokenUsageDB.period == period)
+        values = {"tokens": TokenUsageDB.tokens + tokens, "updated_at": datetime.utcnow()}
+
+        result = db.execute(update(TokenUsageDB).where(where).values(**values))
+        if result.rowcount == 0:
+            try:
+                with db.begin_nested():
+                    db.add(TokenUsageDB(user_id=user_id, period=period, tokens=tokens))
+            except IntegrityError:
+                # Otro worker insertó la fila al mismo tiempo
+                db.execute(update(TokenUsageDB).where(where).values(**values))
+
+    def flush(self) -> int:
+        """
+        Persiste los incrementos pendientes en una transacción.
+
+        Returns:
+            Número de filas actualizadas.
+        """
+        with self._pending_lock:
+            pending, self._pending = self._pending, {}
+        pending = {key: tokens for key, tokens in pending.items() if tokens}
+        if not pending:
+            return 0
+
+        try:
+            with self.session_factory() as db:
+                for (user_id, period), tokens in pending.items():
+                    self._write(db, user_id, period, tokens)
+                db.commit()
+        except SQLAlchemyError:
+            # Se reintentan en la próxima sincronización
+            with self._pending_lock:
+                for key, tokens in pending.items():
+                    self._pending[key] = self._pending.get(key, 0) + tokens
+            raise
+
+        return len(pending)
+
+    def _fetch_totals(self, period: int) -> Dict[int, int]:
+        """Lee los consumos persistidos de un periodo."""
+        with self.session_factory() as db:
+            rows = db.execute(
+                select(TokenUsageDB.user_id, TokenUsageDB.tokens)
+                .where(TokenUsageDB.period == period)
+            ).all()
+        return {user_id: tokens for user_id, tokens in rows}
+
+    def _apply_totals(self, period: int, totals: Dict[int, int]) -> None:
+        """Reemplaza los contadores por los totales de la BD más lo pendiente."""
+        if period != self._current_period():
+            return
+
+        with self._pending_lock:
+            pending = {
+                user_id: tokens
+                for (user_id, pending_period), tokens in self._pending.items()
+                if pending_period == period
+            }
+
+        used = {}
+        for user_id in totals.keys() | pending.keys():
+            if user_id != GLOBAL_USER_ID:
+                used[user_id] = totals.get(user_id, 0) + pending.get(user_id, 0)
+        self._used = used
+        self._global_used = totals.get(GLOBAL_USER_ID, 0) + pending.get(GLOBAL_USER_ID, 0)
+
+    def prune(self) -> int:
+        """
+        Elimina los consumos de periodos fuera de la retención.
+
+        Returns:
+            Número de filas eliminadas.
+        """
+        cutoff = self._period - self.retention_periods
+        with self.session_factory() as db:
+            result = db.execute(delete(TokenUsageDB).where(TokenUsageDB.period < cutoff))
+            db.commit()
+        return result.rowcount
+
+    def load(self) -> None:
+        """
+        Carga los consumos del periodo actual (al iniciar el proceso).
+
+        Raises:
+            SQLAlchemyError: Si falla la lectura.
+        """
+        period = self._current_period()
+        self._apply_totals(period, self._fetch_totals(period))
+        logger.info(
+            "token_quota_loaded",
+            period=period,
+            users=len(self._used),
+            global_tokens=self._global_used
+        )
+
+    async def _sync_loop(self) -> None:
+        """Escribe los incrementos y relee los totales periódicamente."""
+        iterations = 0
+        while True:
+            await asyncio.sleep(self.sync_interval)
+
+            try:
+                # La BD se consulta en un hilo; los contadores solo se
+                # modifican desde el event loop
+                await asyncio.to_thread(self.flush)
+                period = self._current_period()
+                totals = await asyncio.to_thread(self._fetch_totals, period)
+                self._apply_totals(period, totals)
+
+                iterations += 1
+                if iterations % 1000 == 0:
+                    await asyncio.to_thread(self.prune)
+            except SQLAlchemyError as e:
+                logger.error("token_quota_sync_failed", error=str(e))
+
+    def start(self) -> None:
+        """Inicia la sincronización en segundo plano (requiere un event loop activo)."""
+        if self._task is None or self._task.done():
+            self._task = asyncio.create_task(self._sync_loop())
+            logger.info(
+                "token_quota_sync_started",
+                sync_interval=self.sync_interval,
+                user_limit=self.user_limit,
+                global_limit=self.global_limit
+            )
+
+    async def stop(self) -> None:
+        """Detiene la sincronización y persiste los incrementos pendientes."""
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+        try:
+            await asyncio.to_thread(self.flush)
+        except SQLAlchemyError as e:
+            logger.error("token_quota_flush_failed", error=str(e))
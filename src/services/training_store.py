@@ -0,0 +1,95 @@
+"""
+Almacén de ejemplos de entrenamiento.
+
+Cada confirmación aceptada por el usuario es un ejemplo etiquetado:
+el texto del mensaje junto con el nombre, teléfono y referido correctos.
+Los ejemplos se guardan en un archivo JSONL (uno por línea) para
+entrenar el extractor local sin conexión.
+"""
+
+import json
+from datetime import datetime
+from pathlib import Path
+from typing import Dict, Any, Iterator
+
+from ..utils.logger import get_logger
+
+logger = get_logger(__name__)
+
+
+class TrainingExampleStore:
+    """
+    Almacén append-only de ejemplos etiquetados en formato JSONL.
+
+    Attributes:
+        path: Ruta del archivo JSONL.
+    """
+
+    def __init__(self, path: str):
+        """
+        Inicializa el almacén.
+
+        Args:
+            path: Ruta del archivo JSONL (se crea si no existe).
+
+        Example:
+            >>> store = TrainingExampleStore("data/training_examples.jsonl")
+        """
+        self.path = Path(path)
+
+    def add_example(self, text: str, contact: Dict[str, Any]) -> bool:
+        """
+        Agrega un ejemplo confirmado.
+
+        Args:
+            text: Texto del mensaje enviado al extractor.
+            contact: Datos confirmados (nombre, telefono, quien_lo_recomendo).
+
+        Returns:
+            True si se guardó, False en caso contrario.
+        """
+        record = {
+            "text": text,
+            "nombre": contact["nombre"],
+            "telefono": contact["telefono"],
+            "quien_lo_recomendo": contact["quien_lo_recomendo"],
+            "timestamp": datetime.utcnow().isoformat()
+        }
+
+        try:
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            with self.path.open("a", encoding="utf-8") as handle:
+                handle.write(json.dumps(record, ensure_ascii=False) + "\n")
+
+            logger.debug("training_example_saved", path=str(self.path))
+            return True
+
+        except OSError as e:
+            logger.warning(
+                "failed_to_save_training_example",
+                path=str(self.path),
+                error=str(e)
+            )
+            return False
+
+    def iter_examples(self) -> Iterator[Dict[str, Any]]:
+        """
+        Recorre los ejemplos guardados.
+
+        Las líneas corruptas se ignoran.
+
+        Yields:
+            dict con text, nombre, telefono y quien_lo_recomendo.
+        """
+        if not self.path.exists():
+            return
+
+        with self.path.open(encoding="utf-8") as handle:
+            for line in handle:
+                line = line.strip()
+                if not line:
+                    continue
+                try:
+                    yield json.loads(line)
+                except json.JSONDecodeError:
+                    logger.warning("invalid_training_example_line", path=str(self.path))
@@ -0,0 +1,323 @@
+"""
+Deduplicación de updates de Telegram por update_id.
+
+Telegram puede entregar el mismo update más de una vez: reintentos del
+webhook, o un reinicio sin drop_pending_updates antes de confirmar el
+offset. Procesarlo de nuevo significa otra extracción con el LLM y
+posiblemente un contacto guardado dos veces.
+
+UpdateDeduplicator recuerda los update_id vistos en una ventana de
+tiempo (acotada también en tamaño) y, por debajo de la ventana, usa una
+marca de agua: todo update_id menor o igual a la marca ya se procesó.
+Con SQLUpdateDeduplicator la marca de agua se persiste en la BD, así
+que un proceso nuevo descarta los updates que procesó el anterior.
+Un update se registra al empezar a procesarlo: si el proceso se cae a
+mitad de camino no se repite (a lo sumo una vez).
+
+Los updates no empiezan en orden de update_id (uno puede esperar el
+lock de su chat mientras empiezan otros posteriores), así que la marca
+persistida es la mayor por debajo de la cual todos empezaron: nunca
+pasa al menor update_id admitido que sigue esperando (`waiting`). Si
+el proceso se cae, Telegram vuelve a entregar ese update y no se
+descarta.
+
+Los update_id de Telegram son crecientes; un update viejo que llega
+por primera vez por debajo de la marca (solo si Telegram reintenta uno
+que el bot rechazó) se descarta como duplicado.
+"""
+
+import asyncio
+from collections import OrderedDict
+from datetime import datetime
+from time import monotonic
+from typing import Callable, Optional
+
+from sqlalchemy import BigInteger, Column, DateTime, Integer, case, select, update
+from sqlalchemy.exc import IntegrityError, SQLAlchemyError
+from sqlalchemy.orm import Session
+
+from .contacts_api import Base
+from ..utils.logger import get_logger
+from ..utils.metrics import metrics
+
+logger = get_logger(__name__)
+
+# Fila única de la tabla de estado
+_STATE_ROW_ID = 1
+
+
+class UpdateStateDB(Base):
+    """
+    Mayor update_id procesado (marca de agua).
+
+    Tabla: telegram_update_state
+    """
+    __tablename__ = "telegram_update_state"
+
+    id = Column(Integer, primary_key=True, autoincrement=False)
+    last_update_id = Column(BigInteger, nullable=False, default=0)
+    updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
+
+
+class UpdateDeduplicator:
+    """
+    Conjunto de update_id vistos con ventana de tiempo y tamaño acotado.
+
+    Es la implementación sin persistencia (la marca de agua se pierde al
+    reiniciar).
+
+    Attributes:
+        window_seconds: Tiempo que se recuerda cada update_id.
+        max_size: Máximo de update_id recordados.
+        floor: Marca de agua: los update_id menores o iguales son
+            duplicados aunque ya no estén en la ventana.
+    """
+
+    def __init__(self, window_seconds: float = 3600.0, max_size: int = 10000):
+        """
+        Inicializa el deduplicador.
+
+        Args:
+            window_seconds: Tiempo que se recuerda cada update_id
+                (default: 1 hora).
+            max_size: Máximo de update_id recordados (default: 10000).
+
+        Example:
+            >>> dedup = UpdateDeduplicator()
+            >>> dedup.is_duplicate(1001)
+            False
+            >>> dedup.is_duplicate(1001)
+            True
+        """
+        self.window_seconds = window_seconds
+        self.max_size = max_size
+        self.floor = 0
+        # update_id -> instante en que se vio (en orden de llegada)
+        self._seen: "OrderedDict[int, float]" = OrderedDict()
+        self._max_seen = 0
+
+    @property
+    def high_water_mark(self) -> int:
+        """Mayor update_id visto."""
+        return max(self._max_seen, self.floor)
+
+    def _evict(self, now: float) -> None:
+        """Saca de la ventana los update_id vencidos o que exceden el tamaño."""
+        seen = self._seen
+        cutoff = now - self.window_seconds
+        while seen:
+            update_id, seen_at = next(iter(seen.items()))
+            if seen_at >= cutoff and len(seen) <= self.max_size:
+                break
+            seen.popitem(last=False)
+            if update_id > self.floor:
+                self.floor = update_id
+
+    def is_duplicate(self, update_id: int) -> bool:
+        """
+        Indica si el update ya se vio y, si no, lo registra.
+
+        Args:
+            update_id: update_id del update de Telegram.
+
+        Returns:
+            True si es un duplicado (no debe procesarse).
+        """
+        now = monotonic()
+        self._evict(now)
+
+        if update_id <= self.floor or update_id in self._seen:
+            metrics.increment("duplicate_updates_total")
+            logger.info("duplicate_update_dropped", update_id=update_id)
+            return True
+
+        self._seen[update_id] = now
+        if update_id > self._max_seen:
+            self._max_seen = update_id
+        return False
+
+    def load(self) -> None:
+        """Carga la marca de agua persistida (no aplica en memoria)."""
+
+    def start(self) -> None:
+        """Inicia la persistencia en segundo plano (no aplica en memoria)."""
+
+    async def stop(self) -> None:
+        """Detiene la persistencia en segundo plano (no aplica en memoria)."""
+
+
+class SQLUpdateDeduplicator(UpdateDeduplicator):
+    """
+    Deduplicador con la marca de agua persistida en la BD.
+
+    La marca solo crece: con varios workers (webhook) cada uno escribe
+    el mayor update_id que vio y la BD conserva el máximo.
+
+    La marca persistida no pasa al menor update admitido que todavía no
+    empezó (`waiting`, p. ej.
+    ChatOrderedUpdateProcessor.lowest_waiting_update_id()).
+
+    Cada update nuevo despierta la tarea de escritura: la marca se
+    persiste en cuanto se registra el update, y los que llegan mientras
+    se escribe salen juntos en la escritura siguiente (por lotes).
+
+    Attributes:
+        session_factory: Factory de sesiones de SQLAlchemy.
+        waiting: Devuelve el menor update_id admitido que todavía no
+            empezó, o None si no hay ninguno.
+    """
+
+    def __init__(
+        self,
+        session_factory: Callable[[], Session],
+        window_seconds: float = 3600.0,
+        max_size: int = 10000,
+        waiting: Optional[Callable[[], Optional[int]]] = None
+    ):
+        """
+        Inicializa el deduplicador.
+
+        Args:
+            session_factory: Factory de sesiones (p. ej.
+                ContactsAPIClient.SessionLocal).
+            window_seconds: Tiempo que se recuerda cada update_id
+                (default: 1 hora).
+            max_size: Máximo de update_id recordados (default: 10000).
+            waiting: Menor update_id admitido que todavía no empezó
+                (default: ninguno; todos empiezan al admitirse).
+
+        Example:
+            >>> dedup = SQLUpdateDeduplicator(contacts_client.SessionLocal)
+            >>> dedup.load()
+            >>> dedup.start()
+        """
+        super().__init__(window_seconds, max_size)
+        self.session_factory = session_factory
+        self.waiting = waiting
+        self._persisted = 0
+        self._wakeup: Optional[asyncio.Event] = None
+        self._task: Optional[asyncio.Task] = None
+
+    def is_duplicate(self, update_id: int) -> bool:
+        """
+        Indica si el update ya se vio y, si no, lo registra.
+
+        Un update nuevo despierta la escritura de la marca de agua.
+
+        Args:
+            update_id: update_id del update de Telegram.
+
+        Returns:
+            True si es un duplicado (no debe procesarse).
+        """
+        duplicate = super().is_duplicate(update_id)
+        if not duplicate and self._wakeup is not None:
+            self._wakeup.set()
+        return duplicate
+
+    @property
+    def persistable_mark(self) -> int:
+        """Mayor update_id por debajo del cual todos los updates empezaron."""
+        mark = self.high_water_mark
+        lowest = self.waiting() if self.waiting is not None else None
+        if lowest is not None and lowest <= mark:
+            mark = lowest - 1
+        return mark
+
+    def load(self) -> None:
+        """
+        Carga la marca de agua (al iniciar el proceso).
+
+        Raises:
+            SQLAlchemyError: Si falla la lectura.
+        """
+        with self.session_factory() as db:
+            last_update_id = db.execute(
+                select(UpdateStateDB.last_update_id)
+                .where(UpdateStateDB.id == _STATE_ROW_ID)
+            ).scalar()
+
+        self._persisted = last_update_id or 0
+        self.floor = max(self.floor, self._persisted)
+        logger.info("update_high_water_mark_loaded", last_update_id=self._persisted)
+
+    def flush(self, mark: Optional[int] = None) -> bool:
+        """
+        Persiste la marca de agua si creció.
+
+        Args:
+            mark: Marca a persistir (default: `persistable_mark`). Se
+                calcula en el event loop, donde cambian los updates en
+                espera, y se pasa al hilo que escribe.
+
+        Returns:
+            True si se escribió.
+        """
+        if mark is None:
+            mark = self.persistable_mark
+        if mark <= self._persisted:
+            return False
+
+        values = {
+            "last_update_id": case(
+                (UpdateStateDB.last_update_id < mark, mark),
+                else_=UpdateStateDB.last_update_id
+            ),
+            "updated_at": datetime.utcnow()
+        }
+
+        with self.session_factory() as db:
+            result = db.execute(
+                update(UpdateStateDB)
+                .where(UpdateStateDB.id == _STATE_ROW_ID)
+                .values(**values)
+            )
+            if result.rowcount == 0:
+                try:
+                    with db.begin_nested():
+                        db.add(UpdateStateDB(id=_STATE_ROW_ID, last_update_id=mark))
+                except IntegrityError:
+                    # Otro worker creó la fila al mismo tiempo
+                    db.execute(
+                        update(UpdateStateDB)
+                        .where(UpdateStateDB.id == _STATE_ROW_ID)
+                        .values(**values)
+                    )
+            db.commit()
+
+        self._persisted = mark
+        return True
+
+    async def _flush_loop(self) -> None:
+        """Persiste la marca de agua cada vez que se registra un update."""
+        while True:
+            await self._wakeup.wait()
+            # Los updates que lleguen durante la escritura vuelven a
+            # despertar el loop y salen en la escritura siguiente
+            self._wakeup.clear()
+            try:
+                await asyncio.to_thread(self.flush, self.persistable_mark)
+            except SQLAlchemyError as e:
+                logger.error("update_high_water_mark_flush_failed", error=str(e))
+
+    def start(self) -> None:
+        """Inicia la persistencia en segundo plano (requiere un event loop activo)."""
+        if self._task is None or self._task.done():
+            self._wakeup = asyncio.Event()
+            self._task = asyncio.create_task(self._flush_loop())
+
+    async def stop(self) -> None:
+        """Detiene la persistencia y escribe la marca de agua final."""
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+            self._wakeup = None
+
+        try:
+            await asyncio.to_thread(self.flush, self.persistable_mark)
+        except SQLAlchemyError as e:
+            logger.error("update_high_water_mark_flush_failed", error=str(e))
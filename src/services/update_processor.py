@@ -0,0 +1,196 @@
+"""
+Procesamiento concurrente de updates con orden por chat.
+
+Por defecto python-telegram-bot procesa los updates de a uno: una
+extracción con el LLM de 30 segundos demora los mensajes de todos los
+demás usuarios. ChatOrderedUpdateProcessor procesa hasta `workers`
+updates a la vez, pero los de un mismo chat siguen en orden de llegada
+(un lock FIFO por chat), así que la confirmación de un contacto no se
+adelanta al mensaje que la generó.
+
+El lock del chat se toma antes que el cupo de worker: los updates que
+esperan a su chat no ocupan workers, y un usuario que envía muchos
+mensajes seguidos no bloquea a los demás.
+
+Por eso los updates no empiezan en orden de update_id: uno puede
+esperar a su chat mientras empiezan otros posteriores.
+`lowest_waiting_update_id` es el menor update_id admitido que todavía
+no empezó, para que la marca de agua del deduplicador no lo pase.
+"""
+
+import asyncio
+from contextlib import nullcontext
+from time import perf_counter
+from typing import Any, AsyncContextManager, Awaitable, Dict, List, Optional
+
+from telegram.ext import BaseUpdateProcessor
+
+from ..utils.logger import get_logger
+from ..utils.metrics import metrics
+
+logger = get_logger(__name__)
+
+
+class ChatOrderedUpdateProcessor(BaseUpdateProcessor):
+    """
+    Update processor concurrente que respeta el orden dentro de cada chat.
+
+    Attributes:
+        workers: Updates procesados a la vez como máximo.
+    """
+
+    def __init__(self, workers: int = 8, max_pending: Optional[int] = None):
+        """
+        Inicializa el processor.
+
+        Args:
+            workers: Updates procesados a la vez (default: 8).
+            max_pending: Updates admitidos a la vez, procesándose o
+                esperando a su chat (default: 128 por worker). Los que
+                exceden este número esperan sin medir su espera.
+
+        Raises:
+            ValueError: Si `workers` no es positivo.
+
+        Example:
+            >>> application = (
+            ...     Application.builder()
+            ...     .token(token)
+            ...     .concurrent_updates(ChatOrderedUpdateProcessor(workers=8))
+            ...     .build()
+            ... )
+        """
+        if workers < 1:
+            raise ValueError("workers debe ser un entero positivo")
+
+        # El semáforo de la clase base solo acota los updates admitidos;
+        # la concurrencia real la limita _workers, después del lock del chat
+        super().__init__(max_pending or workers * 128)
+        self.workers = workers
+        self._workers = asyncio.BoundedSemaphore(workers)
+        # chat_id -> [lock, updates del chat admitidos]
+        self._chats: Dict[int, List[Any]] = {}
+        self._active = 0
+        # update_id admitido y todavía sin empezar -> copias admitidas
+        self._waiting: Dict[int, int] = {}
+
+    def lowest_waiting_update_id(self) -> Optional[int]:
+        """Menor update_id admitido que todavía no empezó (None si no hay)."""
+        return min(self._waiting, default=None)
+
+    @staticmethod
+    def _chat_id(update: object) -> Optional[int]:
+        """Chat del update (o el usuario si no tiene chat); None si no tiene ninguno."""
+        chat = getattr(update, "effective_chat", None)
+        if chat is not None:
+            return chat.id
+        user = getattr(update, "effective_user", None)
+        return user.id if user is not None else None
+
+    def _chat_lock(self, chat_id: Optional[int]) -> AsyncContextManager:
+        """Lock del chat (se crea con el primer update pendiente del chat)."""
+        if chat_id is None:
+            return nullcontext()
+
+        entry = self._chats.get(chat_id)
+        if entry is None:
+            entry = self._chats[chat_id] = [asyncio.Lock(), 0]
+        entry[1] += 1
+        return entry[0]
+
+    def _release_chat(self, chat_id: Optional[int]) -> None:
+        """Libera la entrada del chat cuando no le quedan updates pendientes."""
+        if chat_id is None:
+            return
+
+        entry = self._chats[chat_id]
+        entry[1] -= 1
+        if entry[1] == 0:
+            del self._chats[chat_id]
+
+    def _started(self, update_id: Optional[int]) -> None:
+        """Saca una copia del update de los que esperan para empezar."""
+        count = self._waiting.get(update_id)
+        if count is None:
+            return
+        if count == 1:
+            del self._waiting[update_id]
+        else:
+            self._waiting[update_id] = count - 1
+
+    async def process_update(  # type: ignore[misc]
+        self,
+        update: object,
+        coroutine: Awaitable[Any]
+    ) -> None:
+        """
+        Admite el update: cuenta como en espera hasta que empieza.
+
+        Se registra antes del semáforo de la clase base, así que también
+        cuentan los updates que exceden `max_pending`.
+
+        Args:
+            update: Update a procesar.
+            coroutine: Corrutina que procesa el update.
+        """
+        update_id = getattr(update, "update_id", None)
+        if update_id is not None:
+            self._waiting[update_id] = self._waiting.get(update_id, 0) + 1
+
+        started = False
+
+        async def run() -> None:
+            nonlocal started
+            started = True
+            self._started(update_id)
+            await coroutine
+
+        runner = run()
+        try:
+            await super().process_update(update, runner)
+        finally:
+            if not started:
+                # Cancelado antes de empezar (p. ej. al detener la app)
+                runner.close()
+                if asyncio.iscoroutine(coroutine):
+                    coroutine.close()
+                self._started(update_id)
+
+    async def do_process_update(self, update: object, coroutine: Awaitable[Any]) -> None:
+        """
+        Procesa un update cuando su chat y un worker están libres.
+
+        Args:
+            update: Update a procesar.
+            coroutine: Corrutina que procesa el update.
+        """
+        admitted = perf_counter()
+        chat_id = self._chat_id(update)
+
+        try:
+            async with self._chat_lock(chat_id):
+                async with self._workers:
+                    queue_wait = perf_counter() - admitted
+                    metrics.observe("update_queue_wait_seconds", queue_wait)
+                    logger.info(
+                        "update_processing_started",
+                        update_id=getattr(update, "update_id", None),
+                        chat_id=chat_id,
+                        queue_wait_ms=round(queue_wait * 1000, 1)
+                    )
+
+                    self._active += 1
+                    metrics.set_gauge("updates_in_flight", self._active)
+                    try:
+                        await coroutine
+                    finally:
+                        self._active -= 1
+                        metrics.set_gauge("updates_in_flight", self._active)
+        finally:
+            self._release_chat(chat_id)
+
+    async def initialize(self) -> None:
+        """No requiere inicialización."""
+
+    async def shutdown(self) -> None:
+        """No requiere liberar recursos."""
@@ -0,0 +1,281 @@
+"""
+Servidor HTTP para recibir updates de Telegram por webhook.
+
+Con long polling el bot mantiene un request HTTPS abierto contra
+Telegram y cada update espera al siguiente ciclo de getUpdates; además
+solo un proceso puede consumir los updates. Con webhook Telegram hace un
+POST por update a una URL pública, que puede repartirse entre varios
+procesos detrás de un balanceador.
+
+El servidor es un HTTP/1.1 mínimo sobre asyncio (sin dependencias
+extra): acepta solo POST a la ruta configurada, verifica el header
+X-Telegram-Bot-Api-Secret-Token y responde 200 en cuanto el update
+queda encolado. Las conexiones se reutilizan (keep-alive), como hace
+Telegram.
+"""
+
+import asyncio
+import hmac
+import json
+from time import perf_counter
+from typing import Any, Awaitable, Callable, Dict, NamedTuple, Optional, Set
+
+from ..utils.logger import get_logger
+from ..utils.metrics import metrics
+
+logger = get_logger(__name__)
+
+SECRET_TOKEN_HEADER = "x-telegram-bot-api-secret-token"
+
+_REASONS = {
+    200: "OK",
+    400: "Bad Request",
+    403: "Forbidden",
+    404: "Not Found",
+    405: "Method Not Allowed",
+    413: "Payload Too Large",
+    500: "Internal Server Error",
+}
+
+
+class HTTPRequest(NamedTuple):
+    """Request HTTP recibido (headers en minúsculas)."""
+
+    method: str
+    path: str
+    headers: Dict[str, str]
+    body: bytes
+
+
+class RequestTooLarge(Exception):
+    """El cuerpo del request supera el máximo permitido."""
+
+
+async def read_request(
+    reader: asyncio.StreamReader,
+    max_body_bytes: int = 1 << 20
+) -> Optional[HTTPRequest]:
+    """
+    Lee un request HTTP/1.1 de la conexión.
+
+    Args:
+        reader: Stream de la conexión.
+        max_body_bytes: Tamaño máximo del cuerpo (default: 1 MiB).
+
+    Returns:
+        HTTPRequest, o None si el cliente cerró la conexión.
+
+    Raises:
+        RequestTooLarge: Si Content-Length supera `max_body_bytes`.
+        ValueError: Si el request está mal formado.
+    """
+    try:
+        head = await reader.readuntil(b"\r\n\r\n")
+    except asyncio.IncompleteReadError:
+        return None
+
+    lines = head.decode("latin-1").split("\r\n")
+    method, path, _ = lines[0].split(" ", 2)
+
+    headers = {}
+    for line in lines[1:]:
+        if line:
+            name, _, value = line.partition(":")
+            headers[name.strip().lower()] = value.strip()
+
+    length = int(headers.get("content-length", 0))
+    if length > max_body_bytes:
+        raise RequestTooLarge(length)
+    body = await reader.readexactly(length) if length else b""
+
+    return HTTPRequest(method, path, headers, body)
+
+
+async def write_response(
+    writer: asyncio.StreamWriter,
+    status: int,
+    body: bytes = b"",
+    content_type: str = "text/plain"
+) -> None:
+    """
+    Escribe una respuesta HTTP/1.1 (keep-alive).
+
+    Args:
+        writer: Stream de la conexión.
+        status: Código de estado.
+        body: Cuerpo de la respuesta (default: vacío).
+        content_type: Content-Type del cuerpo (default: text/plain).
+    """
+    head = (
+        f"HTTP/1.1 {status} {_REASONS.get(status, 'Unknown')}\r\n"
+        f"Content-Type: {content_type}\r\n"
+        f"Content-Length: {len(body)}\r\n"
+        "\r\n"
+    )
+    writer.write(head.encode("latin-1") + body)
+    await writer.drain()
+
+
+class WebhookServer:
+    """
+    Servidor de webhook de Telegram.
+
+    Attributes:
+        path: Ruta que recibe los updates (p. ej. "/telegram").
+        listen: Dirección en la que escucha.
+        port: Puerto en el que escucha.
+        max_body_bytes: Tamaño máximo de un update.
+        idle_timeout: Segundos que se mantiene abierta una conexión inactiva.
+    """
+
+    def __init__(
+        self,
+        handler: Callable[[Dict[str, Any]], Awaitable[None]],
+        secret_token: str,
+        path: str = "/telegram",
+        listen: str = "0.0.0.0",
+        port: int = 8443,
+        max_body_bytes: int = 1 << 20,
+        idle_timeout: float = 75.0
+    ):
+        """
+        Inicializa el servidor.
+
+        Args:
+            handler: Corrutina que recibe cada update (JSON ya parseado).
+                Debe solo encolarlo: Telegram espera la respuesta.
+            secret_token: Token que Telegram envía en cada request
+                (el mismo que se pasa a setWebhook).
+            path: Ruta que recibe los updates (default: "/telegram").
+            listen: Dirección en la que escucha (default: 0.0.0.0).
+            port: Puerto en el que escucha (default: 8443).
+            max_body_bytes: Tamaño máximo de un update (default: 1 MiB).
+            idle_timeout: Segundos de inactividad antes de cerrar una
+                conexión (default: 75).
+
+        Raises:
+            ValueError: Si `secret_token` está vacío.
+
+        Example:
+            >>> server = WebhookServer(handler, secret_token="s3cr3t", port=8443)
+            >>> await server.start()
+        """
+        if not secret_token:
+            raise ValueError("El webhook requiere un secret token")
+
+        self.handler = handler
+        self.path = path
+        self.listen = listen
+        self.port = port
+        self.max_body_bytes = max_body_bytes
+        self.idle_timeout = idle_timeout
+        self._secret_token = secret_token.encode()
+        self._server: Optional[asyncio.AbstractServer] = None
+        self._connections: Set[asyncio.StreamWriter] = set()
+
+    @property
+    def bound_port(self) -> Optional[int]:
+        """Puerto real en el que escucha (útil con port=0)."""
+        if self._server is None or not self._server.sockets:
+            return None
+        return self._server.sockets[0].getsockname()[1]
+
+    async def _dispatch(self, request: HTTPRequest) -> int:
+        """Valida el request y entrega el update; retorna el código HTTP."""
+        if request.path.split("?", 1)[0] != self.path:
+            return 404
+        if request.method != "POST":
+            return 405
+
+        token = request.headers.get(SECRET_TOKEN_HEADER, "").encode()
+        if not hmac.compare_digest(token, self._secret_token):
+            logger.warning("webhook_invalid_secret_token")
+            return 403
+
+        try:
+            update = json.loads(request.body)
+        except ValueError:
+            return 400
+        if not isinstance(update, dict):
+            return 400
+
+        try:
+            await self.handler(update)
+        except Exception as e:
+            # Telegram reintenta los updates que no reciben 2xx
+            logger.error(
+                "webhook_handler_failed",
+                update_id=update.get("update_id"),
+                error=str(e)
+            )
+            return 500
+        return 200
+
+    async def _handle_connection(
+        self,
+        reader: asyncio.StreamReader,
+        writer: asyncio.StreamWriter
+    ) -> None:
+        """Atiende los requests de una conexión hasta que se cierre."""
+        self._connections.add(writer)
+        try:
+            while True:
+                try:
+                    request = await asyncio.wait_for(
+                        read_request(reader, self.max_body_bytes),
+                        timeout=self.idle_timeout
+                    )
+                except RequestTooLarge:
+                    await write_response(writer, 413)
+                    break
+                except (ValueError, asyncio.LimitOverrunError):
+                    await write_response(writer, 400)
+                    break
+
+                if request is None:
+                    break
+
+                started = perf_counter()
+                status = await self._dispatch(request)
+                await write_response(writer, status)
+
+                metrics.increment("webhook_requests_total", status=status)
+                metrics.observe("webhook_request_seconds", perf_counter() - started)
+
+                if request.headers.get("connection", "").lower() == "close":
+                    break
+        except (asyncio.TimeoutError, ConnectionError, asyncio.IncompleteReadError):
+            pass
+        finally:
+            self._connections.discard(writer)
+            writer.close()
+            try:
+                await writer.wait_closed()
+            except ConnectionError:
+                pass
+
+    async def start(self) -> None:
+        """Empieza a escuchar (requiere un event loop activo)."""
+        if self._server is None:
+            self._server = await asyncio.start_server(
+                self._handle_connection,
+                host=self.listen,
+                port=self.port
+            )
+            logger.info(
+                "webhook_server_started",
+                listen=self.listen,
+                port=self.bound_port,
+                path=self.path
+            )
+
+    async def stop(self) -> None:
+        """Deja de aceptar conexiones y cierra el servidor."""
+        if self._server is not None:
+            self._server.close()
+            # Las conexiones keep-alive inactivas no se cierran solas
+            for writer in list(self._connections):
+                writer.close()
+            await self._server.wait_closed()
+            self._server = None
+            logger.info("webhook_server_stopped")
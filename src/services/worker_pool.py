@@ -0,0 +1,222 @@
+"""
+Pool acotado de workers para trabajo en segundo plano.
+
+Los handlers de Telegram responden al usuario de inmediato y delegan el
+trabajo lento (guardar el contacto, enviar el vCard, editar el mensaje)
+a este pool: `workers` tareas consumen una cola de hasta `max_pending`
+trabajos. Con la cola llena, submit() espera un lugar (backpressure
+hacia el update processor) en vez de acumular trabajo sin límite.
+
+Cada trabajo lleva su propio callback de error: si el trabajo falla, o
+si el pool se detiene antes de completarlo, el callback recibe la
+excepción para que el usuario siempre tenga una respuesta.
+
+Expone la profundidad de la cola y los workers ocupados (gauges
+worker_queue_depth y workers_busy), la espera en cola
+(worker_queue_wait_seconds) y el resultado de cada trabajo
+(worker_jobs_total), todo con la etiqueta pool.
+"""
+
+import asyncio
+from time import monotonic
+from typing import Any, Awaitable, Callable, List, Optional
+
+from ..utils.logger import get_logger
+from ..utils.metrics import metrics
+
+logger = get_logger(__name__)
+
+
+class _Job:
+    """Trabajo encolado."""
+
+    __slots__ = ("run", "on_error", "enqueued_at")
+
+    def __init__(self, run, on_error, enqueued_at):
+        self.run = run
+        self.on_error = on_error
+        self.enqueued_at = enqueued_at
+
+
+class WorkerPool:
+    """
+    Cola acotada de trabajos atendida por un número fijo de workers.
+
+    Attributes:
+        name: Nombre del pool (etiqueta de las métricas y los logs).
+        workers: Trabajos ejecutados a la vez como máximo.
+        max_pending: Trabajos encolados (sin empezar) como máximo.
+        error_timeout: Segundos máximos para el callback de error.
+    """
+
+    def __init__(
+        self,
+        name: str,
+        workers: int = 4,
+        max_pending: int = 256,
+        error_timeout: float = 10.0
+    ):
+        """
+        Inicializa el pool (los workers arrancan con start() o el primer submit()).
+
+        Args:
+            name: Nombre del pool.
+            workers: Trabajos ejecutados a la vez (default: 4).
+            max_pending: Trabajos encolados como máximo (default: 256).
+            error_timeout: Segundos máximos para el callback de error
+                (default: 10).
+
+        Raises:
+            ValueError: Si `workers` o `max_pending` no son positivos.
+
+        Example:
+            >>> pool = WorkerPool("confirmations", workers=4)
+            >>> await pool.submit(
+            ...     lambda: save_contact(contact),
+            ...     on_error=lambda error: notify_failure(chat_id, error)
+            ... )
+        """
+        if workers < 1 or max_pending < 1:
+            raise ValueError("workers y max_pending deben ser enteros positivos")
+
+        self.name = name
+        self.workers = workers
+        self.max_pending = max_pending
+        self.error_timeout = error_timeout
+
+        self._queue: "asyncio.Queue[_Job]" = asyncio.Queue(maxsize=max_pending)
+        self._tasks: List[asyncio.Task] = []
+        self._busy = 0
+
+    @property
+    def pending(self) -> int:
+        """Trabajos encolados que todavía no empezaron."""
+        return self._queue.qsize()
+
+    @property
+    def busy(self) -> int:
+        """Trabajos en ejecución."""
+        return self._busy
+
+    def _update_gauges(self) -> None:
+        metrics.set_gauge("worker_queue_depth", self._queue.qsize(), pool=self.name)
+        metrics.set_gauge("workers_busy", self._busy, pool=self.name)
+
+    async def submit(
+        self,
+        run: Callable[[], Awaitable[Any]],
+        on_error: Optional[Callable[[BaseException], Awaitable[Any]]] = None
+    ) -> None:
+        """
+        Encola un trabajo (espera si la cola está llena).
+
+        Args:
+            run: Función sin argumentos que hace el trabajo.
+            on_error: Se llama con la excepción si el trabajo falla o si
+                el pool se detiene antes de completarlo (opcional).
+        """
+        self.start()
+        await self._queue.put(_Job(run, on_error, monotonic()))
+        self._update_gauges()
+
+    async def _fail(self, job: _Job, error: BaseException) -> None:
+        """Registra el fallo de un trabajo y llama a su callback de error."""
+        metrics.increment("worker_jobs_total", pool=self.name, result="error")
+        logger.error(
+            "background_job_failed",
+            pool=self.name,
+            error=str(error),
+            error_type=type(error).__name__
+        )
+
+        if job.on_error is None:
+            return
+
+        try:
+            await asyncio.wait_for(job.on_error(error), timeout=self.error_timeout)
+        except Exception as e:
+            logger.error(
+                "background_job_error_handler_failed",
+                pool=self.name,
+                error=str(e),
+                error_type=type(e).__name__
+            )
+
+    async def _run(self, job: _Job) -> None:
+        """Ejecuta un trabajo; los errores van a su callback, nunca al worker."""
+        metrics.observe(
+            "worker_queue_wait_seconds", monotonic() - job.enqueued_at, pool=self.name
+        )
+        self._busy += 1
+        self._update_gauges()
+
+        try:
+            await job.run()
+        except asyncio.CancelledError as e:
+            # El pool se detuvo con el trabajo a medias: se avisa y se termina
+            await self._fail(job, e)
+            raise
+        except Exception as e:
+            await self._fail(job, e)
+        else:
+            metrics.increment("worker_jobs_total", pool=self.name, result="ok")
+        finally:
+            self._busy -= 1
+            self._update_gauges()
+
+    async def _worker(self) -> None:
+        """Consume la cola hasta que el pool se detenga."""
+        while True:
+            job = await self._queue.get()
+            try:
+                await self._run(job)
+            finally:
+                self._queue.task_done()
+
+    async def join(self) -> None:
+        """Espera a que se completen todos los trabajos encolados."""
+        await self._queue.join()
+
+    def start(self) -> None:
+        """Inicia los workers (requiere un event loop activo)."""
+        if self._tasks:
+            return
+        self._tasks = [
+            asyncio.create_task(self._worker()) for _ in range(self.workers)
+        ]
+
+    async def stop(self, drain_timeout: float = 10.0) -> None:
+        """
+        Espera a que se vacíe la cola (hasta `drain_timeout`) y detiene los workers.
+
+        Los trabajos que no terminan a tiempo se cancelan y reciben su
+        callback de error.
+
+        Args:
+            drain_timeout: Segundos máximos de espera (default: 10).
+        """
+        if not self._tasks:
+            return
+
+        try:
+            await asyncio.wait_for(self.join(), timeout=drain_timeout)
+        except asyncio.TimeoutError:
+            logger.warning(
+                "worker_pool_drain_timeout",
+                pool=self.name,
+                pending=self.pending,
+                busy=self._busy
+            )
+
+        tasks, self._tasks = self._tasks, []
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+
+        # Trabajos que no llegaron a empezar
+        while not self._queue.empty():
+            job = self._queue.get_nowait()
+            self._queue.task_done()
+            await self._fail(job, asyncio.CancelledError())
+
+        self._update_gauges()
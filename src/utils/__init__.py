@@ -2,10 +2,29 @@
 
 from .logger import configure_logging, get_logger, SecurityLogger
 from .rate_limiter import RateLimiter
+from .rate_limit_backend import (
+    RateLimitBackend,
+    RateLimitDecision,
+    MemoryRateLimitBackend,
+    RedisRateLimitBackend,
+    create_rate_limit_backend
+)
+from .phone import parse_phone, normalize_phone, normalize_phones, PhoneParseResult
+from .metrics import MetricsRegistry, metrics
+from .deadline import Deadline, DeadlineExceeded, run_with_timeout
+from .failure_tracker import CountMinSketch, FailedAttemptsTracker
+from .abuse_detector import AbuseDetector, AbuseFlag, SlidingCountMinSketch
+from .callback_data import CallbackCodec, ConfirmationCallback, InvalidCallbackData
+from .health import HealthMonitor, HealthStatus
+from .retry import RetryBudget, RetryPolicy, configure_retry_budget
 from .helpers import (
     DataSanitizer,
+    SanitizationResult,
     generate_vcard,
     vcard_to_bytes,
+    VCardBundle,
+    iter_vcards,
+    vcard_bundle_to_file,
     normalize_phone_for_telegram,
     format_contact_message,
     format_error_message,
@@ -17,9 +36,40 @@ __all__ = [
     "get_logger",
     "SecurityLogger",
     "RateLimiter",
+    "RateLimitBackend",
+    "RateLimitDecision",
+    "MemoryRateLimitBackend",
+    "RedisRateLimitBackend",
+    "create_rate_limit_backend",
+    "parse_phone",
+    "normalize_phone",
+    "normalize_phones",
+    "PhoneParseResult",
+    "MetricsRegistry",
+    "metrics",
+    "Deadline",
+    "DeadlineExceeded",
+    "run_with_timeout",
+    "CountMinSketch",
+    "FailedAttemptsTracker",
+    "AbuseDetector",
+    "AbuseFlag",
+    "SlidingCountMinSketch",
+    "CallbackCodec",
+    "ConfirmationCallback",
+    "InvalidCallbackData",
+    "HealthMonitor",
+    "HealthStatus",
+    "RetryBudget",
+    "RetryPolicy",
+    "configure_retry_budget",
     "DataSanitizer",
+    "SanitizationResult",
     "generate_vcard",
     "vcard_to_bytes",
+    "VCardBundle",
+    "iter_vcards",
+    "vcard_bundle_to_file",
     "normalize_phone_for_telegram",
     "format_contact_message",
     "format_error_message",
@@ -0,0 +1,340 @@
+"""
+Detección de abuso con sketches de memoria fija.
+
+SecurityLogger registra cada evento por separado; este módulo mantiene
+una vista agregada de quién está golpeando el bot. Cada tipo de evento
+(intentos no autorizados, rate limit excedido, patrones sospechosos...)
+se cuenta en un count-min sketch por sub-ventana: la suma de las
+sub-ventanas vigentes aproxima el conteo en una ventana deslizante, y
+las sub-ventanas viejas se vacían al rotar. Un top-k acotado guarda los
+candidatos a heavy hitter de cada tipo; sus conteos se releen del sketch
+cuando rota una sub-ventana, así que los candidatos que dejaron de
+generar eventos salen del top-k. El umbral se evalúa sobre el conteo
+del sketch: una clave que lo supera se marca aunque no estuviera entre
+los candidatos.
+
+Memoria: tipos * buckets * depth * width * 4 bytes + top_k entradas por
+tipo, independiente del número de claves distintas.
+"""
+
+from dataclasses import dataclass
+from time import monotonic
+from typing import Callable, Dict, Hashable, List, Optional, Tuple
+
+from .failure_tracker import CountMinSketch
+from .logger import get_logger
+from .metrics import metrics
+
+logger = get_logger(__name__)
+
+
+@dataclass(frozen=True)
+class AbuseFlag:
+    """
+    Clave que superó el umbral de su tipo de evento en la ventana.
+
+    Attributes:
+        kind: Tipo de evento ("unauthorized", "rate_limited", ...).
+        key: User ID o patrón marcado.
+        count: Eventos estimados en la ventana (nunca menor que el real).
+        window_seconds: Duración de la ventana.
+    """
+
+    kind: str
+    key: Hashable
+    count: int
+    window_seconds: float
+
+
+class SlidingCountMinSketch:
+    """
+    Count-min sketch sobre una ventana deslizante de sub-ventanas.
+
+    Attributes:
+        window_seconds: Duración de la ventana.
+        buckets: Número de sub-ventanas.
+    """
+
+    def __init__(
+        self,
+        window_seconds: float = 300.0,
+        buckets: int = 6,
+        width: int = 1024,
+        depth: int = 4
+    ):
+        """
+        Inicializa el sketch.
+
+        Args:
+            window_seconds: Duración de la ventana (default: 5 minutos).
+            buckets: Sub-ventanas; más buckets dan una ventana más precisa
+                a cambio de memoria (default: 6).
+            width: Contadores por fila de cada sketch (default: 1024).
+            depth: Filas de cada sketch (default: 4).
+        """
+        self.window_seconds = window_seconds
+        self.buckets = buckets
+        self._bucket_seconds = window_seconds / buckets
+        self._sketches = [CountMinSketch(width=width, depth=depth) for _ in range(buckets)]
+        self._current = int(monotonic() // self._bucket_seconds)
+
+    def _advance(self) -> CountMinSketch:
+        """Vacía las sub-ventanas expiradas y retorna la actual."""
+        index = int(monotonic() // self._bucket_seconds)
+        if index != self._current:
+            # Solo hace falta vaciar hasta `buckets` sub-ventanas
+            for step in range(max(self._current + 1, index - self.buckets + 1), index + 1):
+                self._sketches[step % self.buckets].clear()
+            self._current = index
+        return self._sketches[index % self.buckets]
+
+    def add(self, key: Hashable, amount: int = 1) -> int:
+        """
+        Suma a una clave en la sub-ventana actual.
+
+        Args:
+            key: Clave (user ID o patrón).
+            amount: Cantidad a sumar (default: 1).
+
+        Returns:
+            Conteo estimado de la clave en la ventana.
+        """
+        current = self._advance()
+        total = current.add(key, amount)
+        for sketch in self._sketches:
+            if sketch is not current:
+                total += sketch.estimate(key)
+        return total
+
+    def estimate(self, key: Hashable) -> int:
+        """
+        Conteo estimado de una clave en la ventana.
+
+        Args:
+            key: Clave (user ID o patrón).
+
+        Returns:
+            Conteo estimado (nunca menor que el real).
+        """
+        self._advance()
+        return sum(sketch.estimate(key) for sketch in self._sketches)
+
+    @property
+    def memory_bytes(self) -> int:
+        """Bytes usados por los contadores (fijo)."""
+        return sum(sketch.memory_bytes for sketch in self._sketches)
+
+
+class AbuseDetector:
+    """
+    Detector de claves que concentran eventos de abuso.
+
+    Attributes:
+        window_seconds: Duración de la ventana deslizante.
+        threshold: Eventos en la ventana para marcar una clave.
+        thresholds: Umbral específico por tipo de evento.
+        top_k: Candidatos a heavy hitter por tipo de evento.
+    """
+
+    def __init__(
+        self,
+        window_seconds: float = 300.0,
+        threshold: int = 20,
+        thresholds: Optional[Dict[str, int]] = None,
+        top_k: int = 32,
+        buckets: int = 6,
+        sketch_width: int = 1024,
+        sketch_depth: int = 4,
+        on_flag: Optional[Callable[[AbuseFlag], None]] = None
+    ):
+        """
+        Inicializa el detector.
+
+        Args:
+            window_seconds: Duración de la ventana (default: 5 minutos).
+            threshold: Umbral por defecto (default: 20 eventos).
+            thresholds: Umbrales por tipo de evento (opcional).
+            top_k: Candidatos a heavy hitter por tipo (default: 32).
+            buckets: Sub-ventanas de la ventana deslizante (default: 6).
+            sketch_width: Contadores por fila (default: 1024).
+            sketch_depth: Filas por sketch (default: 4).
+            on_flag: Función a llamar cuando se marca una clave (opcional).
+
+        Example:
+            >>> detector = AbuseDetector(window_seconds=60, threshold=10)
+            >>> for _ in range(10):
+            ...     flag = detector.record("rate_limited", 123)
+            >>> flag.key
+            123
+        """
+        self.window_seconds = window_seconds
+        self.threshold = threshold
+        self.thresholds = dict(thresholds or {})
+        self.top_k = top_k
+        self.on_flag = on_flag
+        self._buckets = buckets
+        self._sketch_width = sketch_width
+        self._sketch_depth = sketch_depth
+        self._sketches: Dict[str, SlidingCountMinSketch] = {}
+        # tipo -> {clave: [conteo estimado, instante en que se marcó o None]}
+        self._candidates: Dict[str, Dict[Hashable, list]] = {}
+        # tipo -> sub-ventana en la que se releyeron los conteos del top-k
+        self._refreshed: Dict[str, int] = {}
+
+    def _sketch(self, kind: str) -> SlidingCountMinSketch:
+        """Sketch del tipo de evento (se crea al primer evento)."""
+        sketch = self._sketches.get(kind)
+        if sketch is None:
+            sketch = SlidingCountMinSketch(
+                window_seconds=self.window_seconds,
+                buckets=self._buckets,
+                width=self._sketch_width,
+                depth=self._sketch_depth
+            )
+            self._sketches[kind] = sketch
+            self._candidates[kind] = {}
+        return sketch
+
+    def _refresh(self, kind: str) -> None:
+        """
+        Relee del sketch los conteos del top-k y saca los que llegaron a 0.
+
+        Los conteos guardados solo quedan viejos cuando rota una
+        sub-ventana (cada evento actualiza el de su clave), así que basta
+        releerlos una vez por sub-ventana.
+        """
+        sketch = self._sketches[kind]
+        if self._refreshed.get(kind) == sketch._current:
+            return
+        self._refreshed[kind] = sketch._current
+
+        candidates = self._candidates[kind]
+        for candidate in list(candidates):
+            count = sketch.estimate(candidate)
+            if count > 0:
+                candidates[candidate][0] = count
+            else:
+                del candidates[candidate]
+
+    def _track(
+        self,
+        kind: str,
+        key: Hashable,
+        count: int,
+        force: bool = False
+    ) -> Optional[list]:
+        """
+        Actualiza el top-k del tipo; retorna la entrada de la clave si quedó.
+
+        Con `force` (la clave superó el umbral) entra siempre, desplazando
+        al candidato más débil.
+        """
+        candidates = self._candidates[kind]
+        entry = candidates.get(key)
+        if entry is not None:
+            entry[0] = count
+            return entry
+
+        if len(candidates) >= self.top_k:
+            self._refresh(kind)
+
+        if len(candidates) >= self.top_k:
+            weakest = min(candidates, key=lambda candidate: candidates[candidate][0])
+            if candidates[weakest][0] >= count and not force:
+                return None
+            del candidates[weakest]
+
+        entry = [count, None]
+        candidates[key] = entry
+        return entry
+
+    def record(self, kind: str, key: Hashable, weight: int = 1) -> Optional[AbuseFlag]:
+        """
+        Registra un evento y marca la clave si supera el umbral.
+
+        Una clave se marca a lo sumo una vez por ventana.
+
+        Args:
+            kind: Tipo de evento.
+            key: User ID o patrón.
+            weight: Peso del evento (default: 1).
+
+        Returns:
+            AbuseFlag si la clave se marcó con este evento, o None.
+        """
+        count = self._sketch(kind).add(key, weight)
+        over_threshold = count >= self.thresholds.get(kind, self.threshold)
+        entry = self._track(kind, key, count, force=over_threshold)
+
+        if not over_threshold:
+            return None
+
+        now = monotonic()
+        if entry[1] is not None and now - entry[1] < self.window_seconds:
+            return None
+        entry[1] = now
+
+        flag = AbuseFlag(kind, key, count, self.window_seconds)
+        metrics.increment("abuse_flags_total", kind=kind)
+        logger.warning(
+            "abuse_detected",
+            kind=kind,
+            key=key,
+            count=count,
+            window_seconds=self.window_seconds
+        )
+
+        if self.on_flag is not None:
+            try:
+                self.on_flag(flag)
+            except Exception as e:
+                logger.warning("abuse_flag_handler_failed", error=str(e))
+
+        return flag
+
+    def estimate(self, kind: str, key: Hashable) -> int:
+        """
+        Eventos estimados de una clave en la ventana.
+
+        Args:
+            kind: Tipo de evento.
+            key: User ID o patrón.
+
+        Returns:
+            Conteo estimado (0 si el tipo no tiene eventos).
+        """
+        sketch = self._sketches.get(kind)
+        return sketch.estimate(key) if sketch is not None else 0
+
+    @property
+    def kinds(self) -> List[str]:
+        """Tipos de evento registrados hasta ahora."""
+        return sorted(self._sketches)
+
+    def heavy_hitters(self, kind: str, limit: int = 10) -> List[Tuple[Hashable, int]]:
+        """
+        Claves con más eventos en la ventana actual.
+
+        Args:
+            kind: Tipo de evento.
+            limit: Máximo de claves a retornar (default: 10).
+
+        Returns:
+            Lista de (clave, conteo estimado), de mayor a menor.
+        """
+        sketch = self._sketches.get(kind)
+        if sketch is None:
+            return []
+
+        current = [
+            (key, sketch.estimate(key))
+            for key in self._candidates[kind]
+        ]
+        current = [(key, count) for key, count in current if count > 0]
+        current.sort(key=lambda item: item[1], reverse=True)
+        return current[:limit]
+
+    @property
+    def memory_bytes(self) -> int:
+        """Bytes usados por los sketches (fijo por tipo de evento)."""
+        return sum(sketch.memory_bytes for sketch in self._sketches.values())
@@ -0,0 +1,239 @@
+"""
+callback_data firmado para los botones de confirmación.
+
+Telegram devuelve el callback_data del botón tal cual (máximo 64 bytes)
+en el CallbackQuery; cualquier cliente puede enviar uno arbitrario, así
+que se firma con HMAC y la firma incluye el user_id: un payload solo es
+válido para el usuario al que se le mostró.
+
+Hay dos formas de payload:
+
+- inline: los datos del contacto van en el propio callback_data. No
+  requiere estado, pero solo se usa si caben en 64 bytes.
+- referencia: el id de una confirmación en el store compartido
+  (PendingConfirmationStore en la BD).
+
+En ambas va el vencimiento, así que cualquier worker puede resolver
+la confirmación sin estado local.
+
+Formato (campos separados por "|"):
+
+    <acción><tipo><vencimiento base 36>|<campos...>|<firma>
+
+    acción: "c" (confirmar) o "x" (rechazar)
+    tipo: "i" (inline) o "r" (referencia)
+"""
+
+import base64
+import hashlib
+import hmac
+from dataclasses import dataclass
+from time import time
+from typing import Any, Dict, Optional
+
+# Límite de Telegram para callback_data (bytes en UTF-8)
+CALLBACK_DATA_MAX_BYTES = 64
+# Campos del contacto que viajan en un payload inline
+CONTACT_FIELDS = ("nombre", "telefono", "quien_lo_recomendo")
+
+_SEPARATOR = "|"
+_ACTIONS = {"confirm": "c", "reject": "x"}
+_ACTION_NAMES = {code: name for name, code in _ACTIONS.items()}
+_INLINE = "i"
+_REFERENCE = "r"
+
+
+class InvalidCallbackData(ValueError):
+    """El callback_data está mal formado, la firma no coincide o venció."""
+
+
+@dataclass(frozen=True)
+class ConfirmationCallback:
+    """
+    callback_data de confirmación decodificado y verificado.
+
+    Attributes:
+        action: "confirm" o "reject".
+        expires_at: Vencimiento (epoch, en segundos).
+        tag: Firma del payload (identifica al payload para usarlo una vez).
+        confirmation_id: Id en el store compartido (payload de referencia).
+        contact: Datos del contacto (payload inline de confirmación).
+    """
+
+    action: str
+    expires_at: int
+    tag: str
+    confirmation_id: Optional[str] = None
+    contact: Optional[Dict[str, str]] = None
+
+    @property
+    def is_reference(self) -> bool:
+        """True si el contacto está en el store compartido."""
+        return self.confirmation_id is not None
+
+
+def _to_base36(value: int) -> str:
+    digits = "0123456789abcdefghijklmnopqrstuvwxyz"
+    result = ""
+    while True:
+        value, remainder = divmod(value, 36)
+        result = digits[remainder] + result
+        if value == 0:
+            return result
+
+
+class CallbackCodec:
+    """
+    Codifica y verifica el callback_data de los botones de confirmación.
+
+    Todos los workers deben usar el mismo secreto.
+
+    Attributes:
+        tag_bytes: Bytes de la firma HMAC-SHA256 que se conservan.
+    """
+
+    def __init__(self, secret: str, tag_bytes: int = 6):
+        """
+        Inicializa el codec.
+
+        Args:
+            secret: Secreto compartido para la firma.
+            tag_bytes: Bytes de la firma que se conservan (default: 6,
+                8 caracteres en base64 url-safe).
+
+        Raises:
+            ValueError: Si `secret` está vacío.
+
+        Example:
+            >>> codec = CallbackCodec(secret="s3cr3t")
+            >>> data = codec.encode_reference("confirm", 123, "q3Xz_1Ab", expires_at)
+            >>> codec.decode(data, user_id=123).confirmation_id
+            'q3Xz_1Ab'
+        """
+        if not secret:
+            raise ValueError("El callback_data requiere un secreto de firma")
+
+        self._key = secret.encode()
+        self.tag_bytes = tag_bytes
+
+    def _tag(self, user_id: int, body: str) -> str:
+        """Firma de `body` para `user_id`."""
+        digest = hmac.new(
+            self._key,
+            f"{user_id}{_SEPARATOR}{body}".encode(),
+            hashlib.sha256
+        ).digest()
+        return base64.urlsafe_b64encode(digest[:self.tag_bytes]).decode().rstrip("=")
+
+    def _sign(self, user_id: int, action: str, kind: str, expires_at: int, fields) -> str:
+        """Arma el payload con la firma al final."""
+        if action not in _ACTIONS:
+            raise ValueError(f"Acción de callback desconocida: {action}")
+
+        body = _SEPARATOR.join(
+            [f"{_ACTIONS[action]}{kind}{_to_base36(expires_at)}", *fields]
+        )
+        return f"{body}{_SEPARATOR}{self._tag(user_id, body)}"
+
+    def encode_reference(
+        self,
+        action: str,
+        user_id: int,
+        confirmation_id: str,
+        expires_at: int
+    ) -> str:
+        """
+        Payload que referencia una confirmación del store compartido.
+
+        Args:
+            action: "confirm" o "reject".
+            user_id: Usuario al que se le muestra el botón.
+            confirmation_id: Id de la confirmación pendiente.
+            expires_at: Vencimiento (epoch, en segundos).
+
+        Returns:
+            callback_data firmado.
+        """
+        return self._sign(user_id, action, _REFERENCE, expires_at, [confirmation_id])
+
+    def encode_inline(
+        self,
+        action: str,
+        user_id: int,
+        contact: Dict[str, Any],
+        expires_at: int
+    ) -> Optional[str]:
+        """
+        Payload con los datos del contacto, si caben en 64 bytes.
+
+        El rechazo no necesita los datos: su payload siempre cabe.
+
+        Args:
+            action: "confirm" o "reject".
+            user_id: Usuario al que se le muestra el botón.
+            contact: Datos del contacto.
+            expires_at: Vencimiento (epoch, en segundos).
+
+        Returns:
+            callback_data firmado, o None si el contacto no cabe (o tiene
+            campos que no se pueden codificar).
+        """
+        fields = []
+        if action == "confirm":
+            if set(contact) - set(CONTACT_FIELDS):
+                return None
+            for name in CONTACT_FIELDS:
+                value = contact.get(name)
+                if not isinstance(value, str) or not value or _SEPARATOR in value:
+                    return None
+                fields.append(value)
+
+        data = self._sign(user_id, action, _INLINE, expires_at, fields)
+        if len(data.encode()) > CALLBACK_DATA_MAX_BYTES:
+            return None
+        return data
+
+    def decode(self, data: str, user_id: int) -> ConfirmationCallback:
+        """
+        Verifica y decodifica un callback_data.
+
+        Args:
+            data: callback_data recibido en el CallbackQuery.
+            user_id: Usuario que presionó el botón.
+
+        Returns:
+            ConfirmationCallback.
+
+        Raises:
+            InvalidCallbackData: Si está mal formado, la firma no
+                coincide (otro usuario o datos alterados) o venció.
+        """
+        body, _, tag = data.rpartition(_SEPARATOR)
+        if not body or not hmac.compare_digest(tag, self._tag(user_id, body)):
+            raise InvalidCallbackData("firma inválida")
+
+        header, *fields = body.split(_SEPARATOR)
+        action = _ACTION_NAMES.get(header[:1])
+        kind = header[1:2]
+        try:
+            expires_at = int(header[2:], 36)
+        except ValueError:
+            raise InvalidCallbackData("vencimiento inválido")
+
+        if action is None:
+            raise InvalidCallbackData("acción inválida")
+        if expires_at <= time():
+            raise InvalidCallbackData("vencido")
+
+        if kind == _REFERENCE and len(fields) == 1:
+            return ConfirmationCallback(action, expires_at, tag, confirmation_id=fields[0])
+
+        if kind == _INLINE:
+            if action == "reject" and not fields:
+                return ConfirmationCallback(action, expires_at, tag)
+            if len(fields) == len(CONTACT_FIELDS):
+                return ConfirmationCallback(
+                    action, expires_at, tag, contact=dict(zip(CONTACT_FIELDS, fields))
+                )
+
+        raise InvalidCallbackData("payload inválido")
@@ -0,0 +1,146 @@
+"""
+Deadlines por solicitud.
+
+Este módulo implementa un deadline que se crea al recibir un mensaje y
+se propaga por todo el pipeline (SecurityAgent, GeminiService,
+PersistenceAgent). Cada etapa usa solo el tiempo restante y falla de
+inmediato cuando el presupuesto ya se agotó.
+"""
+
+import asyncio
+from time import monotonic
+from typing import Any, Awaitable, Optional
+
+from .logger import get_logger
+
+logger = get_logger(__name__)
+
+
+class DeadlineExceeded(asyncio.TimeoutError):
+    """El deadline de la solicitud se agotó antes o durante una etapa."""
+
+
+class Deadline:
+    """
+    Deadline absoluto de una solicitud.
+
+    Attributes:
+        budget: Presupuesto total en segundos.
+        expires_at: Instante de expiración (reloj monotónico).
+    """
+
+    def __init__(self, budget: float):
+        """
+        Inicializa el deadline.
+
+        Args:
+            budget: Segundos disponibles desde ahora.
+
+        Example:
+            >>> deadline = Deadline(25)
+            >>> await deadline.run(service.call(), cap=10, stage="llm")
+        """
+        self.budget = budget
+        self.expires_at = monotonic() + budget
+
+    def remaining(self) -> float:
+        """
+        Segundos restantes (0 si ya expiró).
+
+        Returns:
+            Tiempo restante en segundos.
+        """
+        return max(0.0, self.expires_at - monotonic())
+
+    @property
+    def expired(self) -> bool:
+        """Indica si el deadline ya se agotó."""
+        return monotonic() >= self.expires_at
+
+    def timeout(self, cap: Optional[float] = None, stage: str = "") -> float:
+        """
+        Timeout para la siguiente etapa.
+
+        Args:
+            cap: Timeout máximo propio de la etapa (opcional).
+            stage: Nombre de la etapa (para logs).
+
+        Returns:
+            El menor entre el tiempo restante y `cap`.
+
+        Raises:
+            DeadlineExceeded: Si ya no queda tiempo.
+        """
+        remaining = self.remaining()
+        if remaining <= 0:
+            logger.warning("deadline_exceeded", stage=stage, budget=self.budget)
+            raise DeadlineExceeded(f"Deadline agotado antes de {stage or 'la etapa'}")
+        return remaining if cap is None else min(cap, remaining)
+
+    async def run(
+        self,
+        awaitable: Awaitable[Any],
+        cap: Optional[float] = None,
+        stage: str = ""
+    ) -> Any:
+        """
+        Ejecuta un awaitable con el tiempo restante.
+
+        Args:
+            awaitable: Corrutina o future a ejecutar.
+            cap: Timeout máximo propio de la etapa (opcional).
+            stage: Nombre de la etapa (para logs).
+
+        Returns:
+            El resultado del awaitable.
+
+        Raises:
+            DeadlineExceeded: Si no queda tiempo o se agota durante la etapa.
+        """
+        try:
+            timeout = self.timeout(cap, stage)
+        except DeadlineExceeded:
+            # Evitar el warning de corrutina nunca esperada
+            if asyncio.iscoroutine(awaitable):
+                awaitable.close()
+            raise
+
+        try:
+            return await asyncio.wait_for(awaitable, timeout=timeout)
+        except asyncio.TimeoutError as e:
+            if isinstance(e, DeadlineExceeded):
+                raise
+            logger.warning(
+                "stage_timeout",
+                stage=stage,
+                timeout=round(timeout, 3),
+                deadline_remaining=round(self.remaining(), 3)
+            )
+            raise DeadlineExceeded(f"Timeout en {stage or 'la etapa'}") from e
+
+
+async def run_with_timeout(
+    awaitable: Awaitable[Any],
+    timeout: float,
+    deadline: Optional[Deadline] = None,
+    stage: str = ""
+) -> Any:
+    """
+    Ejecuta un awaitable con el timeout de la etapa y el deadline (si hay).
+
+    Args:
+        awaitable: Corrutina o future a ejecutar.
+        timeout: Timeout propio de la etapa en segundos.
+        deadline: Deadline de la solicitud (opcional).
+        stage: Nombre de la etapa (para logs).
+
+    Returns:
+        El resultado del awaitable.
+
+    Raises:
+        asyncio.TimeoutError: Si se agota el timeout o el deadline
+            (DeadlineExceeded es subclase).
+    """
+    if deadline is not None:
+        return await deadline.run(awaitable, cap=timeout, stage=stage)
+    return await asyncio.wait_for(awaitable, timeout=timeout)
@@ -0,0 +1,372 @@
+"""
+Conteo acotado de intentos fallidos.
+
+Este módulo reemplaza el `defaultdict(int)` de intentos fallidos, que
+crecía con cada user ID que alguna vez escribió al bot y nunca olvidaba
+un conteo. La memoria queda acotada por construcción:
+
+- Usuarios conocidos (autorizados): conteo exacto en un LRU de
+  capacidad fija, con TTL por entrada y decaimiento (el conteo se
+  reduce a la mitad por cada `half_life` sin fallas nuevas).
+- IDs desconocidos: conteo exacto en un segundo LRU acotado
+  (max_unknown_tracked) con el mismo TTL y decaimiento, más un
+  count-min sketch de tamaño fijo (depth x width contadores de 32 bits)
+  que se envejece dividiendo todos los contadores a la mitad cada
+  `half_life`. El sketch nunca subestima, pero con un flood se llena de
+  conteos falsos: sirve como estimado, no para decidir un bloqueo, que
+  siempre se basa en el conteo exacto.
+
+Techo de memoria: max_tracked + max_unknown_tracked entradas de los LRU
++ 4 * depth * width bytes del sketch, independiente del número de IDs
+distintos.
+"""
+
+import random
+from array import array
+from collections import OrderedDict
+from time import monotonic
+from typing import List, Optional
+
+from .logger import get_logger
+
+logger = get_logger(__name__)
+
+_MAX_COUNTER = 0xFFFFFFFF
+
+
+class CountMinSketch:
+    """
+    Count-min sketch con actualización conservadora y envejecimiento.
+
+    Las posiciones de cada fila se derivan de dos hashes de la clave
+    (doble hashing de Kirsch-Mitzenmacher), así que cada operación
+    calcula solo dos hashes sin importar `depth`.
+
+    Attributes:
+        width: Contadores por fila.
+        depth: Número de filas (funciones hash independientes).
+    """
+
+    def __init__(self, width: int = 65536, depth: int = 4, seed: int = 0):
+        """
+        Inicializa el sketch.
+
+        Args:
+            width: Contadores por fila (default: 65536).
+            depth: Filas (default: 4).
+            seed: Semilla de las funciones hash (default: 0).
+        """
+        self.width = width
+        self.depth = depth
+        rng = random.Random(seed)
+        self._seeds = (rng.getrandbits(32), rng.getrandbits(32))
+        self._rows: List[array] = [array("I", bytes(4 * width)) for _ in range(depth)]
+
+    def _indexes(self, key: int) -> List[int]:
+        """Posición de la clave en cada fila."""
+        width = self.width
+        h1 = hash((self._seeds[0], key)) % width
+        # h2 impar: recorre posiciones distintas en cada fila
+        h2 = (hash((self._seeds[1], key)) | 1) % width
+        indexes = []
+        for _ in self._rows:
+            indexes.append(h1)
+            h1 = (h1 + h2) % width
+        return indexes
+
+    def add(self, key: int, amount: int = 1) -> int:
+        """
+        Suma a una clave (actualización conservadora).
+
+        Args:
+            key: Clave entera (user ID).
+            amount: Cantidad a sumar (default: 1).
+
+        Returns:
+            Nuevo estimado de la clave.
+        """
+        indexes = self._indexes(key)
+        rows = self._rows
+        estimate = _MAX_COUNTER
+        for row, index in zip(rows, indexes):
+            value = row[index]
+            if value < estimate:
+                estimate = value
+        target = min(estimate + amount, _MAX_COUNTER)
+
+        # Solo se elevan los contadores que quedan por debajo del nuevo
+        # estimado: reduce la sobrestimación sin perder la garantía
+        for row, index in zip(rows, indexes):
+            if row[index] < target:
+                row[index] = target
+
+        return target
+
+    def estimate(self, key: int) -> int:
+        """
+        Estimado del conteo de una clave (nunca menor que el real).
+
+        Args:
+            key: Clave entera (user ID).
+
+        Returns:
+            Conteo estimado.
+        """
+        estimate = _MAX_COUNTER
+        for row, index in zip(self._rows, self._indexes(key)):
+            value = row[index]
+            if value < estimate:
+                estimate = value
+        return estimate
+
+    def halve(self, times: int = 1) -> None:
+        """
+        Divide todos los contadores por 2**times (envejecimiento).
+
+        Args:
+            times: Veces a dividir por 2 (default: 1).
+        """
+        if times <= 0:
+            return
+        for i, row in enumerate(self._rows):
+            self._rows[i] = array("I", [value >> times for value in row])
+
+    def clear(self) -> None:
+        """Pone todos los contadores en cero."""
+        self._rows = [array("I", bytes(4 * self.width)) for _ in range(self.depth)]
+
+    @property
+    def memory_bytes(self) -> int:
+        """Bytes usados por los contadores (fijo)."""
+        return sum(row.itemsize * len(row) for row in self._rows)
+
+
+class FailedAttemptsTracker:
+    """
+    Intentos fallidos por usuario con memoria acotada, TTL y decaimiento.
+
+    Se usa como un mapeo de solo lectura: `tracker[user_id]` retorna el
+    conteo exacto vigente (0 si no hay) sin crear entradas.
+
+    Attributes:
+        max_tracked: Capacidad del LRU de conteos exactos.
+        max_unknown_tracked: Capacidad del LRU de IDs desconocidos.
+        ttl_seconds: Segundos sin fallas tras los que se olvida un conteo.
+        half_life_seconds: Segundos sin fallas para reducir un conteo a la mitad.
+        sketch: Count-min sketch para IDs desconocidos.
+    """
+
+    def __init__(
+        self,
+        max_tracked: int = 10_000,
+        ttl_seconds: float = 86_400,
+        half_life_seconds: float = 21_600,
+        sketch_width: int = 65536,
+        sketch_depth: int = 4,
+        max_unknown_tracked: Optional[int] = None
+    ):
+        """
+        Inicializa el tracker.
+
+        Args:
+            max_tracked: Capacidad del LRU (default: 10000).
+            ttl_seconds: TTL de cada conteo (default: 24 horas).
+            half_life_seconds: Vida media del conteo (default: 6 horas).
+            sketch_width: Contadores por fila del sketch (default: 65536).
+            sketch_depth: Filas del sketch (default: 4).
+            max_unknown_tracked: Capacidad del LRU de IDs desconocidos
+                (default: igual a max_tracked).
+
+        Example:
+            >>> tracker = FailedAttemptsTracker(max_tracked=1000)
+            >>> tracker.add(123)
+            1
+            >>> tracker.add_unknown(999)
+            1
+        """
+        self.max_tracked = max_tracked
+        self.max_unknown_tracked = (
+            max_tracked if max_unknown_tracked is None else max_unknown_tracked
+        )
+        self.ttl_seconds = ttl_seconds
+        self.half_life_seconds = half_life_seconds
+        self.sketch = CountMinSketch(width=sketch_width, depth=sketch_depth)
+        # user_id -> [conteo, instante de la última falla]
+        self._entries: "OrderedDict[int, list]" = OrderedDict()
+        # IDs desconocidos: mismo formato, LRU aparte para que un flood
+        # no desplace los conteos de usuarios autorizados
+        self._unknown: "OrderedDict[int, list]" = OrderedDict()
+        self._sketch_aged_at = monotonic()
+
+    def _decayed(self, entry: list, now: float) -> int:
+        """Conteo vigente de una entrada (0 si expiró)."""
+        count, updated_at = entry
+        elapsed = now - updated_at
+        if elapsed >= self.ttl_seconds:
+            return 0
+        return count >> int(elapsed // self.half_life_seconds)
+
+    def __getitem__(self, user_id: int) -> int:
+        """Conteo exacto vigente (0 si no hay); no crea entradas."""
+        entry = self._entries.get(user_id)
+        if entry is None:
+            return 0
+        return self._decayed(entry, monotonic())
+
+    def get(self, user_id: int, default: Optional[int] = None) -> Optional[int]:
+        """Conteo exacto vigente, o `default` si no hay."""
+        return self[user_id] or default
+
+    def __contains__(self, user_id: int) -> bool:
+        """Indica si hay un conteo vigente para el usuario."""
+        return self[user_id] > 0
+
+    def __len__(self) -> int:
+        """Entradas en el LRU (incluye las expiradas aún no barridas)."""
+        return len(self._entries)
+
+    def _add_exact(
+        self,
+        entries: "OrderedDict[int, list]",
+        capacity: int,
+        user_id: int,
+        amount: int
+    ) -> int:
+        """Suma a un conteo exacto de un LRU y lo retorna."""
+        now = monotonic()
+        entry = entries.get(user_id)
+
+        if entry is None:
+            entries[user_id] = [amount, now]
+            if len(entries) > capacity:
+                entries.popitem(last=False)
+            return amount
+
+        entry[0] = self._decayed(entry, now) + amount
+        entry[1] = now
+        entries.move_to_end(user_id)
+        return entry[0]
+
+    def add(self, user_id: int, amount: int = 1) -> int:
+        """
+        Suma intentos fallidos a un usuario conocido (conteo exacto).
+
+        Args:
+            user_id: ID del usuario de Telegram.
+            amount: Intentos a sumar (default: 1).
+
+        Returns:
+            Conteo vigente tras sumar.
+        """
+        return self._add_exact(self._entries, self.max_tracked, user_id, amount)
+
+    def set(self, user_id: int, count: int, age_seconds: float = 0.0) -> None:
+        """
+        Fija el conteo de un usuario (p. ej. al cargar desde la BD).
+
+        Args:
+            user_id: ID del usuario de Telegram.
+            count: Conteo a fijar.
+            age_seconds: Antigüedad de la última falla en segundos.
+        """
+        self._entries[user_id] = [count, monotonic() - max(0.0, age_seconds)]
+        self._entries.move_to_end(user_id)
+        if len(self._entries) > self.max_tracked:
+            self._entries.popitem(last=False)
+
+    def add_unknown(self, user_id: int, amount: int = 1) -> int:
+        """
+        Suma intentos fallidos a un ID desconocido.
+
+        Actualiza el conteo exacto del LRU de desconocidos y el sketch.
+
+        Args:
+            user_id: ID de Telegram no autorizado.
+            amount: Intentos a sumar (default: 1).
+
+        Returns:
+            Conteo exacto vigente tras sumar (desde que el ID entró al
+            LRU: uno desplazado por un flood vuelve a empezar).
+        """
+        now = monotonic()
+        periods = int((now - self._sketch_aged_at) // self.half_life_seconds)
+        if periods:
+            self.sketch.halve(min(periods, 32))
+            self._sketch_aged_at += periods * self.half_life_seconds
+
+        self.sketch.add(user_id, amount)
+        return self._add_exact(self._unknown, self.max_unknown_tracked, user_id, amount)
+
+    def set_unknown(self, user_id: int, count: int, age_seconds: float = 0.0) -> None:
+        """
+        Fija el conteo de un ID desconocido (p. ej. al cargar desde la BD).
+
+        Args:
+            user_id: ID de Telegram no autorizado.
+            count: Conteo a fijar.
+            age_seconds: Antigüedad de la última falla en segundos.
+        """
+        self._unknown[user_id] = [count, monotonic() - max(0.0, age_seconds)]
+        self._unknown.move_to_end(user_id)
+        if len(self._unknown) > self.max_unknown_tracked:
+            self._unknown.popitem(last=False)
+
+    def unknown_count(self, user_id: int) -> int:
+        """
+        Conteo exacto vigente de un ID desconocido (0 si no hay).
+
+        Args:
+            user_id: ID de Telegram.
+
+        Returns:
+            Conteo exacto; no crea entradas.
+        """
+        entry = self._unknown.get(user_id)
+        if entry is None:
+            return 0
+        return self._decayed(entry, monotonic())
+
+    def estimate_unknown(self, user_id: int) -> int:
+        """
+        Conteo estimado de un ID desconocido (sketch; puede sobrestimar).
+
+        Args:
+            user_id: ID de Telegram.
+
+        Returns:
+            Conteo estimado.
+        """
+        return self.sketch.estimate(user_id)
+
+    def pop(self, user_id: int, default: Optional[int] = None) -> Optional[int]:
+        """Elimina el conteo exacto de un usuario (conocido o no) y lo retorna."""
+        unknown = self._unknown.pop(user_id, None)
+        entry = self._entries.pop(user_id, unknown)
+        if entry is None:
+            return default
+        return self._decayed(entry, monotonic())
+
+    def clear(self) -> None:
+        """Elimina todos los conteos (exactos y del sketch)."""
+        self._entries.clear()
+        self._unknown.clear()
+        self.sketch.clear()
+
+    def sweep(self) -> int:
+        """
+        Elimina las entradas expiradas o decaídas a cero.
+
+        Returns:
+            Número de entradas eliminadas.
+        """
+        now = monotonic()
+        removed = 0
+        for entries in (self._entries, self._unknown):
+            expired = [
+                user_id for user_id, entry in entries.items()
+                if self._decayed(entry, now) == 0
+            ]
+            for user_id in expired:
+                del entries[user_id]
+            removed += len(expired)
+        return removed
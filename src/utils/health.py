@@ -0,0 +1,183 @@
+"""
+Monitor de salud de los componentes.
+
+Este módulo ejecuta probes livianos de cada dependencia (Telegram, LLM,
+base de datos) de forma concurrente, cada uno con su propio timeout, y
+guarda el último resultado. Un refresco en segundo plano mantiene la
+caché al día para que /health responda sin esperar a la red.
+"""
+
+import asyncio
+from dataclasses import dataclass
+from datetime import datetime, timezone
+from time import monotonic
+from typing import Awaitable, Callable, Dict, Optional
+
+from .logger import get_logger
+from .metrics import metrics
+
+logger = get_logger(__name__)
+
+Probe = Callable[[], Awaitable[bool]]
+
+
+@dataclass(frozen=True)
+class HealthStatus:
+    """
+    Resultado de un probe de salud.
+
+    Attributes:
+        healthy: True si el componente respondió correctamente.
+        latency_ms: Duración del probe en milisegundos.
+        checked_at: Momento (UTC) en que se ejecutó el probe.
+        error: Descripción del fallo (None si healthy).
+    """
+
+    healthy: bool
+    latency_ms: float
+    checked_at: datetime
+    error: Optional[str] = None
+
+
+class HealthMonitor:
+    """
+    Ejecuta y cachea probes de salud.
+
+    Attributes:
+        probes: Probes registrados por nombre de componente.
+        timeout: Timeout por probe en segundos.
+        refresh_interval: Segundos entre refrescos en segundo plano.
+        max_age: Antigüedad máxima de la caché antes de refrescar a demanda.
+    """
+
+    def __init__(
+        self,
+        probes: Dict[str, Probe],
+        timeout: float = 5.0,
+        refresh_interval: float = 30.0,
+        max_age: Optional[float] = None
+    ):
+        """
+        Inicializa el monitor.
+
+        Args:
+            probes: Diccionario nombre -> corrutina que retorna bool.
+            timeout: Timeout por probe en segundos (default: 5).
+            refresh_interval: Intervalo del refresco en segundos (default: 30).
+            max_age: Antigüedad máxima aceptable de la caché (default:
+                2 x refresh_interval).
+
+        Example:
+            >>> monitor = HealthMonitor({"database": client.health_check})
+            >>> monitor.start()
+            >>> statuses = await monitor.get_status()
+        """
+        self.probes = dict(probes)
+        self.timeout = timeout
+        self.refresh_interval = refresh_interval
+        self.max_age = max_age if max_age is not None else 2 * refresh_interval
+        self._statuses: Dict[str, HealthStatus] = {}
+        self._refreshed_at: Optional[float] = None
+        self._refresh_lock = asyncio.Lock()
+        self._task: Optional[asyncio.Task] = None
+
+    async def _run_probe(self, name: str, probe: Probe) -> HealthStatus:
+        """Ejecuta un probe con timeout y mide su latencia."""
+        started = monotonic()
+        error = None
+
+        try:
+            healthy = bool(await asyncio.wait_for(probe(), timeout=self.timeout))
+            if not healthy:
+                error = "probe_failed"
+        except asyncio.TimeoutError:
+            healthy = False
+            error = f"timeout ({self.timeout}s)"
+        except Exception as e:
+            healthy = False
+            error = f"{type(e).__name__}: {e}"
+
+        latency = monotonic() - started
+        metrics.observe("health_check_seconds", latency, component=name)
+        metrics.set_gauge("health_check_up", 1 if healthy else 0, component=name)
+
+        return HealthStatus(
+            healthy=healthy,
+            latency_ms=round(latency * 1000, 1),
+            checked_at=datetime.now(timezone.utc),
+            error=error
+        )
+
+    async def check_all(self) -> Dict[str, HealthStatus]:
+        """
+        Ejecuta todos los probes en paralelo y actualiza la caché.
+
+        Returns:
+            Diccionario nombre -> HealthStatus.
+        """
+        # Si ya hay un refresco en curso, se reutiliza su resultado
+        if self._refresh_lock.locked():
+            async with self._refresh_lock:
+                return dict(self._statuses)
+
+        async with self._refresh_lock:
+            names = list(self.probes)
+            results = await asyncio.gather(
+                *(self._run_probe(name, self.probes[name]) for name in names)
+            )
+            self._statuses = dict(zip(names, results))
+            self._refreshed_at = monotonic()
+
+        logger.info(
+            "health_checks_completed",
+            **{
+                name: status.healthy
+                for name, status in self._statuses.items()
+            }
+        )
+
+        return dict(self._statuses)
+
+    async def get_status(self) -> Dict[str, HealthStatus]:
+        """
+        Retorna el último resultado, refrescando solo si la caché es vieja.
+
+        Returns:
+            Diccionario nombre -> HealthStatus.
+        """
+        if (
+            self._refreshed_at is None
+            or monotonic() - self._refreshed_at > self.max_age
+        ):
+            return await self.check_all()
+        return dict(self._statuses)
+
+    async def _refresh_loop(self) -> None:
+        """Refresca la caché periódicamente."""
+        while True:
+            try:
+                await self.check_all()
+            except Exception as e:
+                logger.error("health_refresh_failed", error=str(e))
+            await asyncio.sleep(self.refresh_interval)
+
+    def start(self) -> None:
+        """Inicia el refresco en segundo plano (requiere un event loop activo)."""
+        if self._task is None or self._task.done():
+            self._task = asyncio.create_task(self._refresh_loop())
+            logger.info(
+                "health_monitor_started",
+                components=list(self.probes),
+                refresh_interval=self.refresh_interval
+            )
+
+    async def stop(self) -> None:
+        """Detiene el refresco en segundo plano."""
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+            logger.info("health_monitor_stopped")
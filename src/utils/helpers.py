@@ -6,13 +6,26 @@ Este módulo contiene funciones helper utilizadas en todo el sistema.
 
 import re
 import html
-from typing import Optional
+import hashlib
+from tempfile import SpooledTemporaryFile
+from typing import IO, Dict, Iterable, Iterator, Mapping, NamedTuple, Optional, Tuple
 from io import BytesIO
 
 from .logger import get_logger
 
 logger = get_logger(__name__)
 
+# Coincidencia de DataSanitizer: (inicio, fin, índice del patrón)
+_Match = Tuple[int, int, int]
+
+
+class SanitizationResult(NamedTuple):
+    """Resultado de inspeccionar un texto de entrada."""
+
+    text: str
+    safe: bool
+    pattern: Optional[str] = None
+
 
 class DataSanitizer:
     """
@@ -20,6 +33,10 @@ class DataSanitizer:
 
     Implementa sanitización de inputs siguiendo guías de OWASP
     para prevenir inyección de código y otros ataques.
+
+    Los patrones se buscan con una regex precompilada de aperturas, de
+    modo que detectar y remover recorre el texto una sola vez, en tiempo
+    lineal aun ante entradas adversariales.
     """
 
     # Patrones peligrosos a detectar
@@ -34,6 +51,157 @@ class DataSanitizer:
         r'<embed',                   # embeds
     ]
 
+    MAX_LENGTH = 1000
+
+    # Regex de aperturas: el primer punto donde puede empezar cada patrón
+    # (grupo pN = patrón N; en los de largo fijo es la coincidencia
+    # completa). Empieza con la clase de los primeros caracteres de todos
+    # los patrones para que el motor salte en C hasta un candidato; cada
+    # rama verifica con un lookbehind el carácter ya consumido. Una
+    # alternancia directa de los patrones prueba todas las ramas en cada
+    # posición y resulta más lenta que un re.search por patrón.
+    #
+    # El cierre de los patrones 0, 2, 3 y 4 se busca aparte (_complete):
+    # con muchas aperturas sin cierre en una línea, una regex recorre el
+    # resto de la línea desde cada una y es cuadrática (ver
+    # scripts/bench_adversarial.py). Si desde una apertura no hay cierre,
+    # tampoco lo hay desde las siguientes del mismo patrón en la misma
+    # línea (o palabra, para el 2), así que esas se descartan sin recorrer.
+    # `{{` solo se prueba al inicio de una secuencia de llaves: si hay
+    # coincidencia dentro de la secuencia, también la hay desde su inicio.
+    _START_RE = re.compile(
+        r"[<jJoO${]"
+        r"(?:(?<=<)(?i:(?P<p0>script)|(?P<p5>iframe)|(?P<p6>object)|(?P<p7>embed))"
+        r"|(?<=[jJ])(?P<p1>(?i:avascript:))"
+        r"|(?<=[oO])(?P<p2>(?i:n)\w)"
+        r"|(?<=\$)(?P<p3>\{)"
+        r"|(?<=\{)(?<!\{\{)(?P<p4>\{))"
+    )
+    _TAG_END_RE = re.compile(r"[>\n]")
+    _SCRIPT_END_RE = re.compile(r"(?i)</script>")
+    _HANDLER_TAIL_RE = re.compile(r"\w++\s*+")
+
+    @classmethod
+    def _complete(cls, text: str, start: "re.Match", index: int) -> Tuple[int, int]:
+        """
+        Busca el cierre de un patrón desde su apertura.
+
+        Returns:
+            (fin de la coincidencia o -1, posición hasta la que ninguna
+            apertura del mismo patrón puede coincidir).
+        """
+        if index in (1, 5, 6, 7):
+            return start.end(), 0
+
+        begin = start.start()
+        if index == 2:
+            # `on\w+\s*=`: los `on` siguientes de la palabra llegan al mismo final
+            tail = cls._HANDLER_TAIL_RE.match(text, begin + 2)
+            if text.startswith("=", tail.end()):
+                return tail.end() + 1, 0
+            return -1, tail.end()
+
+        line_end = text.find("\n", begin)
+        if line_end < 0:
+            line_end = len(text)
+
+        if index == 0:
+            # `.*?>` equivale al primer `>` (si hay coincidencia con uno
+            # posterior también la hay con el primero)
+            tag_end = cls._TAG_END_RE.search(text, start.end(), line_end + 1)
+            if tag_end is not None and tag_end.group() == ">":
+                close = cls._SCRIPT_END_RE.search(text, tag_end.end(), line_end)
+                if close is not None:
+                    return close.end(), 0
+            return -1, line_end
+
+        closer = "}" if index == 3 else "}}"
+        close = text.find(closer, begin + 2, line_end)
+        if close >= 0:
+            return close + len(closer), 0
+        return -1, line_end
+
+    @classmethod
+    def _matches(cls, text: str) -> Iterator[_Match]:
+        """
+        Coincidencias de DANGEROUS_PATTERNS en orden y sin solaparse.
+
+        Equivale a re.finditer con la alternancia de los patrones; cada
+        coincidencia es (inicio, fin, índice del patrón).
+        """
+        # Patrón -> posición hasta la que sus aperturas no pueden coincidir
+        dead_until: Dict[int, int] = {}
+        pos = 0
+
+        while True:
+            start = cls._START_RE.search(text, pos)
+            if start is None:
+                return
+
+            begin = start.start()
+            index = int(start.lastgroup[1:])
+            if begin >= dead_until.get(index, 0):
+                end, horizon = cls._complete(text, start, index)
+                if end >= 0:
+                    yield begin, end, index
+                    pos = end
+                    continue
+                dead_until[index] = horizon
+            pos = begin + 1
+
+    @classmethod
+    def inspect(cls, text: str) -> SanitizationResult:
+        """
+        Sanitiza el texto y verifica si contiene patrones peligrosos.
+
+        El texto seguro (el caso común) se recorre una sola vez; si hay
+        una coincidencia, la remoción continúa desde esa posición sin
+        volver a recorrer el prefijo.
+
+        Args:
+            text: Texto a inspeccionar.
+
+        Returns:
+            SanitizationResult con el texto sanitizado, el veredicto y el
+            primer patrón detectado (None si es seguro).
+
+        Example:
+            >>> DataSanitizer.inspect("<script>alert('xss')</script>Juan")
+            SanitizationResult(text='Juan', safe=False, pattern='<script.*?>.*?</script>')
+        """
+        if not text:
+            return SanitizationResult("", True)
+
+        matches = cls._matches(text)
+        first = next(matches, None)
+        if first is None:
+            return SanitizationResult(cls._finish(text), True)
+
+        pattern = cls._log_match(first[2], text)
+        pieces = [text[:first[0]]]
+        last = first[1]
+        for start, end, _ in matches:
+            pieces.append(text[last:start])
+            last = end
+        pieces.append(text[last:])
+        return SanitizationResult(cls._finish("".join(pieces)), False, pattern)
+
+    @classmethod
+    def _log_match(cls, index: int, text: str) -> str:
+        """Registra el patrón detectado y lo retorna."""
+        pattern = cls.DANGEROUS_PATTERNS[index]
+        logger.warning(
+            "dangerous_pattern_detected",
+            pattern=pattern,
+            text_preview=text[:50]
+        )
+        return pattern
+
+    @classmethod
+    def _finish(cls, text: str) -> str:
+        """HTML escape (previene XSS) y límite de longitud (previene DoS)."""
+        return html.escape(text)[:cls.MAX_LENGTH].strip()
+
     @classmethod
     def sanitize(cls, text: str) -> str:
         """
@@ -49,20 +217,7 @@ class DataSanitizer:
             >>> DataSanitizer.sanitize("<script>alert('xss')</script>Juan")
             "Juan"
         """
-        if not text:
-            return ""
-
-        # HTML escape para prevenir XSS
-        sanitized = html.escape(text)
-
-        # Remover patrones peligrosos
-        for pattern in cls.DANGEROUS_PATTERNS:
-            sanitized = re.sub(pattern, '', sanitized, flags=re.IGNORECASE)
-
-        # Limitar longitud para prevenir DoS
-        sanitized = sanitized[:1000]
-
-        return sanitized.strip()
+        return cls.inspect(text).text
 
     @classmethod
     def is_safe(cls, text: str) -> bool:
@@ -78,14 +233,10 @@ class DataSanitizer:
         if not text:
             return True
 
-        for pattern in cls.DANGEROUS_PATTERNS:
-            if re.search(pattern, text, re.IGNORECASE):
-                logger.warning(
-                    "dangerous_pattern_detected",
-                    pattern=pattern,
-                    text_preview=text[:50]
-                )
-                return False
+        match = next(cls._matches(text), None)
+        if match is not None:
+            cls._log_match(match[2], text)
+            return False
 
         return True
 
@@ -146,6 +297,83 @@ def vcard_to_bytes(vcard: str) -> BytesIO:
     return BytesIO(vcard.encode('utf-8'))
 
 
+class VCardBundle(NamedTuple):
+    """Archivo vCard con varios contactos listo para enviar."""
+
+    file: IO[bytes]
+    digest: str
+    count: int
+    size: int
+
+
+def iter_vcards(contacts: Iterable[Mapping[str, str]]) -> Iterator[bytes]:
+    """
+    Genera un archivo vCard con varios contactos, una entrada a la vez.
+
+    Cada entrada se codifica a medida que se consume el iterable, sin
+    armar el archivo completo en memoria. Concatenar lo generado da un
+    .vcf válido con todas las entradas.
+
+    Args:
+        contacts: Contactos con nombre, telefono y quien_lo_recomendo.
+
+    Yields:
+        Una entrada vCard en UTF-8 (terminada en salto de línea).
+
+    Example:
+        >>> contacts = [{"nombre": "Juan", "telefono": "+573001234567",
+        ...              "quien_lo_recomendo": "María"}]
+        >>> b"".join(iter_vcards(contacts)).count(b"BEGIN:VCARD")
+        1
+    """
+    for contact in contacts:
+        vcard = generate_vcard(
+            contact["nombre"],
+            contact["telefono"],
+            contact["quien_lo_recomendo"]
+        )
+        yield (vcard + "\n").encode("utf-8")
+
+
+def vcard_bundle_to_file(
+    contacts: Iterable[Mapping[str, str]],
+    max_memory: int = 1024 * 1024
+) -> VCardBundle:
+    """
+    Escribe un vCard de varios contactos en un archivo temporal.
+
+    Las entradas se escriben a medida que se generan (el archivo pasa a
+    disco si supera `max_memory`) y el hash del contenido se calcula en
+    la misma pasada, para reutilizar el archivo ya subido a Telegram.
+
+    Args:
+        contacts: Contactos con nombre, telefono y quien_lo_recomendo.
+        max_memory: Bytes que se mantienen en memoria antes de pasar a
+            disco (default: 1 MB).
+
+    Returns:
+        VCardBundle con el archivo (posicionado al inicio), el SHA-256
+        del contenido, la cantidad de contactos y el tamaño en bytes.
+
+    Example:
+        >>> bundle = vcard_bundle_to_file(contacts)
+        >>> with bundle.file:
+        ...     await bot.send_document(chat_id, bundle.file, filename="contactos.vcf")
+    """
+    file = SpooledTemporaryFile(max_size=max_memory)
+    digest = hashlib.sha256()
+    count = size = 0
+
+    for entry in iter_vcards(contacts):
+        file.write(entry)
+        digest.update(entry)
+        count += 1
+        size += len(entry)
+
+    file.seek(0)
+    return VCardBundle(file=file, digest=digest.hexdigest(), count=count, size=size)
+
+
 def normalize_phone_for_telegram(telefono: str) -> str:
     """
     Normaliza teléfono para el botón de compartir de Telegram.
@@ -0,0 +1,145 @@
+"""
+Métricas en memoria del proceso.
+
+Este módulo implementa un registro simple de contadores, gauges y
+tiempos con etiquetas, consultable con el comando /metrics del bot.
+"""
+
+import threading
+from typing import Dict, Any, Tuple
+
+LabelKey = Tuple[Tuple[str, str], ...]
+MetricKey = Tuple[str, LabelKey]
+
+
+def _key(name: str, labels: Dict[str, Any]) -> MetricKey:
+    """Construye la clave interna de una métrica con etiquetas."""
+    return name, tuple(sorted((k, str(v)) for k, v in labels.items()))
+
+
+def _format_key(key: MetricKey) -> str:
+    """Formatea una clave como name{label=value,...}."""
+    name, labels = key
+    if not labels:
+        return name
+    rendered = ",".join(f"{k}={v}" for k, v in labels)
+    return f"{name}{{{rendered}}}"
+
+
+class MetricsRegistry:
+    """
+    Registro de métricas en memoria.
+
+    Los tiempos se resumen como count/sum/max para que la memoria no
+    crezca con el número de observaciones.
+
+    Attributes:
+        counters: Contadores acumulados por métrica y etiquetas.
+        gauges: Último valor registrado por métrica y etiquetas.
+        timings: Resumen (count, sum, max) por métrica y etiquetas.
+    """
+
+    def __init__(self):
+        """Inicializa el registro vacío."""
+        self._lock = threading.Lock()
+        self.counters: Dict[MetricKey, float] = {}
+        self.gauges: Dict[MetricKey, float] = {}
+        self.timings: Dict[MetricKey, list] = {}
+
+    def increment(self, name: str, value: float = 1, **labels: Any) -> None:
+        """
+        Incrementa un contador.
+
+        Args:
+            name: Nombre de la métrica.
+            value: Cantidad a sumar (default: 1).
+            **labels: Etiquetas de la métrica.
+
+        Example:
+            >>> metrics.increment("retry_attempts_total", operation="gemini")
+        """
+        key = _key(name, labels)
+        with self._lock:
+            self.counters[key] = self.counters.get(key, 0) + value
+
+    def set_gauge(self, name: str, value: float, **labels: Any) -> None:
+        """
+        Registra el valor actual de un gauge.
+
+        Args:
+            name: Nombre de la métrica.
+            value: Valor actual.
+            **labels: Etiquetas de la métrica.
+        """
+        key = _key(name, labels)
+        with self._lock:
+            self.gauges[key] = value
+
+    def observe(self, name: str, value: float, **labels: Any) -> None:
+        """
+        Registra una observación de tiempo (en segundos).
+
+        Args:
+            name: Nombre de la métrica.
+            value: Valor observado.
+            **labels: Etiquetas de la métrica.
+        """
+        key = _key(name, labels)
+        with self._lock:
+            summary = self.timings.get(key)
+            if summary is None:
+                self.timings[key] = [1, value, value]
+            else:
+                summary[0] += 1
+                summary[1] += value
+                if value > summary[2]:
+                    summary[2] = value
+
+    def get_counter(self, name: str, **labels: Any) -> float:
+        """
+        Obtiene el valor de un contador.
+
+        Args:
+            name: Nombre de la métrica.
+            **labels: Etiquetas de la métrica.
+
+        Returns:
+            Valor acumulado (0 si no existe).
+        """
+        return self.counters.get(_key(name, labels), 0)
+
+    def snapshot(self) -> Dict[str, Dict[str, Any]]:
+        """
+        Devuelve una copia legible de todas las métricas.
+
+        Returns:
+            dict con counters, gauges y timings (count, avg, max).
+        """
+        with self._lock:
+            return {
+                "counters": {
+                    _format_key(key): value for key, value in self.counters.items()
+                },
+                "gauges": {
+                    _format_key(key): value for key, value in self.gauges.items()
+                },
+                "timings": {
+                    _format_key(key): {
+                        "count": count,
+                        "avg": total / count,
+                        "max": maximum
+                    }
+                    for key, (count, total, maximum) in self.timings.items()
+                },
+            }
+
+    def reset(self) -> None:
+        """Elimina todas las métricas registradas."""
+        with self._lock:
+            self.counters.clear()
+            self.gauges.clear()
+            self.timings.clear()
+
+
+# Registro global de métricas
+metrics = MetricsRegistry()
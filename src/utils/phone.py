@@ -0,0 +1,294 @@
+"""
+Normalización de teléfonos a formato E.164.
+
+Este módulo centraliza la normalización de números telefónicos que
+antes se repetía en el modelo, el validador y el servicio de extracción.
+Usa tablas precompiladas de prefijos de país con reglas de longitud
+por país y recorre el texto una sola vez, sin expresiones regulares.
+"""
+
+from dataclasses import dataclass
+from typing import Dict, Iterable, List, NamedTuple, Optional, Tuple
+
+from .logger import get_logger
+
+logger = get_logger(__name__)
+
+
+# Código de país por defecto (Colombia)
+DEFAULT_COUNTRY_CODE = "57"
+
+# Límites generales de dígitos (E.164 permite hasta 15)
+MIN_DIGITS = 10
+MAX_DIGITS = 15
+
+
+@dataclass(frozen=True)
+class CountryRule:
+    """
+    Regla de longitud del número nacional de un país.
+
+    Attributes:
+        iso: Código ISO 3166-1 alfa-2.
+        min_length: Longitud mínima del número nacional.
+        max_length: Longitud máxima del número nacional.
+    """
+
+    iso: str
+    min_length: int
+    max_length: int
+
+
+# Códigos de país -> regla de longitud del número nacional.
+# Los códigos E.164 no son prefijo unos de otros, por lo que basta
+# probar los primeros 1, 2 y 3 dígitos.
+COUNTRY_RULES: Dict[str, CountryRule] = {
+    "1": CountryRule("US", 10, 10),
+    "7": CountryRule("RU", 10, 10),
+    "33": CountryRule("FR", 9, 9),
+    "34": CountryRule("ES", 9, 9),
+    "39": CountryRule("IT", 6, 11),
+    "44": CountryRule("GB", 9, 10),
+    "49": CountryRule("DE", 6, 13),
+    "51": CountryRule("PE", 8, 9),
+    "52": CountryRule("MX", 10, 10),
+    "53": CountryRule("CU", 6, 8),
+    "54": CountryRule("AR", 10, 11),
+    "55": CountryRule("BR", 10, 11),
+    "56": CountryRule("CL", 9, 9),
+    "57": CountryRule("CO", 10, 10),
+    "58": CountryRule("VE", 10, 10),
+    "351": CountryRule("PT", 9, 9),
+    "502": CountryRule("GT", 8, 8),
+    "503": CountryRule("SV", 8, 8),
+    "504": CountryRule("HN", 8, 8),
+    "505": CountryRule("NI", 8, 8),
+    "506": CountryRule("CR", 8, 8),
+    "507": CountryRule("PA", 7, 8),
+    "591": CountryRule("BO", 8, 8),
+    "593": CountryRule("EC", 8, 9),
+    "595": CountryRule("PY", 9, 9),
+    "598": CountryRule("UY", 8, 8),
+}
+
+# Tablas precompiladas a partir de COUNTRY_RULES:
+# código -> longitudes válidas del número nacional
+_NATIONAL_LENGTHS: Dict[str, frozenset] = {
+    code: frozenset(range(rule.min_length, rule.max_length + 1))
+    for code, rule in COUNTRY_RULES.items()
+}
+# código -> dígitos totales de un número escrito con código pero sin '+'
+_FULL_LENGTHS: Dict[str, int] = {
+    code: len(code) + rule.max_length
+    for code, rule in COUNTRY_RULES.items()
+}
+
+_ASCII_DIGITS = frozenset("0123456789")
+
+
+class PhoneParseResult(NamedTuple):
+    """
+    Resultado de normalizar un teléfono.
+
+    Attributes:
+        e164: Número en formato +<código><número> (mejor esfuerzo aun
+            si el número no es válido).
+        country_code: Código de país detectado o asumido.
+        national_number: Número nacional sin código de país.
+        digit_count: Dígitos escritos originalmente.
+        error: Mensaje de error si el número no es válido, None si es válido.
+    """
+
+    e164: str
+    country_code: str
+    national_number: str
+    digit_count: int
+    error: Optional[str] = None
+
+    @property
+    def is_valid(self) -> bool:
+        """Indica si el número cumple las reglas de longitud."""
+        return self.error is None
+
+
+# Constructor directo de tuplas (evita el __new__ con keywords de NamedTuple)
+_new_result = tuple.__new__
+
+
+def _split_digits(value: str) -> Tuple[bool, str]:
+    """
+    Separa el texto en (tiene_prefijo_mas, dígitos).
+
+    El '+' solo cuenta si aparece antes del primer dígito.
+    """
+    # Camino rápido: sin separadores comunes, el texto solo tiene
+    # dígitos ASCII con '+' opcional al inicio (el caso habitual)
+    compact = (
+        value.replace(" ", "")
+        .replace("-", "")
+        .replace(".", "")
+        .replace("(", "")
+        .replace(")", "")
+    )
+    if compact.isdigit() and compact.isascii():
+        return False, compact
+    if compact[:1] == "+":
+        digits = compact[1:]
+        if digits.isdigit() and digits.isascii():
+            return True, digits
+
+    # Camino general: una pasada carácter a carácter
+    has_plus = False
+    collected = []
+    for ch in value:
+        if ch in _ASCII_DIGITS:
+            collected.append(ch)
+        elif ch == "+" and not collected:
+            has_plus = True
+    return has_plus, "".join(collected)
+
+
+def _match_country(digits: str) -> Optional[str]:
+    """Busca el código de país al inicio de los dígitos."""
+    for size in (1, 2, 3):
+        prefix = digits[:size]
+        if prefix in COUNTRY_RULES:
+            return prefix
+    return None
+
+
+def _country_length_error(country_code: str) -> str:
+    """Mensaje de error para un número con longitud inválida en su país."""
+    rule = COUNTRY_RULES[country_code]
+    expected = (
+        str(rule.min_length) if rule.min_length == rule.max_length
+        else f"{rule.min_length}-{rule.max_length}"
+    )
+    return (
+        f"El teléfono no es válido para {rule.iso} (+{country_code}): "
+        f"se esperaban {expected} dígitos sin el código de país"
+    )
+
+
+def parse_phone(
+    value: str,
+    default_country_code: str = DEFAULT_COUNTRY_CODE
+) -> PhoneParseResult:
+    """
+    Normaliza un número de teléfono a E.164 y valida su longitud.
+
+    Reglas:
+    - Con '+' inicial, los primeros dígitos son el código de país.
+    - Sin '+', se asume el país por defecto; si los dígitos ya empiezan
+      por ese código y sobran exactamente sus dígitos, se reconoce
+      (p. ej. "573001234567" -> "+573001234567").
+    - Los dígitos escritos deben estar entre 10 y 15, y el número
+      nacional debe cumplir la regla del país cuando éste es conocido.
+
+    Args:
+        value: Número de teléfono en cualquier formato.
+        default_country_code: Código de país sin '+' (default: "57").
+
+    Returns:
+        PhoneParseResult con el número normalizado y el error (si aplica).
+
+    Example:
+        >>> parse_phone("300 123 4567").e164
+        '+573001234567'
+        >>> parse_phone("+57 315-789-4561").e164
+        '+573157894561'
+    """
+    has_plus, digits = _split_digits(value or "")
+    digit_count = len(digits)
+
+    if has_plus:
+        country_code = _match_country(digits) or ""
+        national = digits[len(country_code):]
+    else:
+        country_code = default_country_code
+        national = digits
+        if (
+            digit_count == _FULL_LENGTHS.get(country_code)
+            and digits.startswith(country_code)
+        ):
+            national = digits[len(country_code):]
+
+    error = None
+    if digit_count < MIN_DIGITS:
+        error = (
+            f"El teléfono debe tener al menos {MIN_DIGITS} dígitos "
+            f"(encontrados: {digit_count})"
+        )
+    elif digit_count > MAX_DIGITS:
+        error = (
+            f"El teléfono no puede tener más de {MAX_DIGITS} dígitos "
+            f"(encontrados: {digit_count})"
+        )
+    else:
+        lengths = _NATIONAL_LENGTHS.get(country_code)
+        if lengths is not None and len(national) not in lengths:
+            error = _country_length_error(country_code)
+
+    return _new_result(
+        PhoneParseResult,
+        ("+" + country_code + national, country_code, national, digit_count, error)
+    )
+
+
+def normalize_phone(
+    value: str,
+    default_country_code: str = DEFAULT_COUNTRY_CODE
+) -> str:
+    """
+    Normaliza un teléfono a E.164.
+
+    Args:
+        value: Número de teléfono en cualquier formato.
+        default_country_code: Código de país sin '+' (default: "57").
+
+    Returns:
+        Número normalizado.
+
+    Raises:
+        ValueError: Si el número no cumple las reglas de longitud.
+
+    Example:
+        >>> normalize_phone("300-123-4567")
+        '+573001234567'
+    """
+    result = parse_phone(value, default_country_code)
+    if result.error:
+        raise ValueError(result.error)
+    return result.e164
+
+
+def normalize_phones(
+    values: Iterable[str],
+    default_country_code: str = DEFAULT_COUNTRY_CODE
+) -> List[PhoneParseResult]:
+    """
+    Normaliza un lote de teléfonos (p. ej. para importaciones).
+
+    Args:
+        values: Números de teléfono en cualquier formato.
+        default_country_code: Código de país sin '+' (default: "57").
+
+    Returns:
+        Lista de PhoneParseResult en el mismo orden de entrada.
+    """
+    # Los valores repetidos (frecuentes en importaciones) se parsean una vez
+    cache: Dict[str, PhoneParseResult] = {}
+    results = []
+    for value in values:
+        result = cache.get(value)
+        if result is None:
+            result = cache[value] = parse_phone(value, default_country_code)
+        results.append(result)
+
+    logger.debug(
+        "phones_normalized",
+        total=len(results),
+        invalid=sum(1 for result in results if result.error)
+    )
+
+    return results
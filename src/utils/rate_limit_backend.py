@@ -0,0 +1,344 @@
+"""
+Backends de rate limiting.
+
+Este módulo permite elegir dónde vive el estado del rate limiter:
+- "memory": en el proceso (RateLimiter GCRA), para un solo worker.
+- "redis": en un servidor con protocolo Redis, compartido por todos los
+  workers. Cada verificación es un script Lua atómico que implementa el
+  mismo GCRA con el reloj del servidor, y las verificaciones
+  concurrentes se agrupan en un pipeline para no sumar un round trip
+  por mensaje.
+"""
+
+import asyncio
+from abc import ABC, abstractmethod
+from typing import Any, List, NamedTuple, Optional, Sequence, Tuple
+
+from .logger import get_logger
+from .rate_limiter import RateLimiter
+
+logger = get_logger(__name__)
+
+
+class RateLimitDecision(NamedTuple):
+    """
+    Resultado de verificar el rate limit de una clave.
+
+    Attributes:
+        allowed: True si el request está permitido.
+        remaining: Requests disponibles después de esta verificación.
+        retry_after: Segundos hasta que se libere un cupo (0 si allowed).
+    """
+
+    allowed: bool
+    remaining: int
+    retry_after: float
+
+
+class RateLimitBackend(ABC):
+    """
+    Interfaz de los backends de rate limiting.
+
+    Attributes:
+        max_requests: Número máximo de requests permitidos por ventana.
+        window_seconds: Duración de la ventana en segundos.
+    """
+
+    def __init__(self, max_requests: int, window_seconds: int):
+        """
+        Inicializa los parámetros comunes.
+
+        Args:
+            max_requests: Máximo de requests por ventana.
+            window_seconds: Duración de la ventana en segundos.
+        """
+        self.max_requests = max_requests
+        self.window_seconds = window_seconds
+
+    async def check(self, key: Any) -> RateLimitDecision:
+        """
+        Verifica (y consume) un cupo para una clave.
+
+        Args:
+            key: Identificador a limitar (p. ej. user_id).
+
+        Returns:
+            RateLimitDecision.
+        """
+        return (await self.check_many([key]))[0]
+
+    @abstractmethod
+    async def check_many(self, keys: Sequence[Any]) -> List[RateLimitDecision]:
+        """
+        Verifica un lote de claves con un solo acceso al almacenamiento.
+
+        Args:
+            keys: Identificadores a limitar (pueden repetirse).
+
+        Returns:
+            Una decisión por clave, en el mismo orden.
+        """
+
+    @abstractmethod
+    async def reset(self, key: Any) -> None:
+        """
+        Restaura todos los cupos de una clave.
+
+        Args:
+            key: Identificador a resetear.
+        """
+
+    def start(self) -> None:
+        """Inicia tareas en segundo plano del backend (si las tiene)."""
+
+    async def stop(self) -> None:
+        """Detiene tareas en segundo plano y libera recursos."""
+
+
+class MemoryRateLimitBackend(RateLimitBackend):
+    """
+    Backend en memoria del proceso.
+
+    Attributes:
+        limiter: RateLimiter GCRA subyacente.
+    """
+
+    def __init__(self, max_requests: int = 10, window_seconds: int = 60):
+        """
+        Inicializa el backend en memoria.
+
+        Args:
+            max_requests: Máximo de requests por ventana (default: 10).
+            window_seconds: Duración de la ventana en segundos (default: 60).
+        """
+        super().__init__(max_requests, window_seconds)
+        self.limiter = RateLimiter(
+            max_requests=max_requests,
+            window_seconds=window_seconds
+        )
+
+    async def check_many(self, keys: Sequence[Any]) -> List[RateLimitDecision]:
+        """Verifica un lote de claves en memoria."""
+        limiter = self.limiter
+        decisions = []
+        for key in keys:
+            allowed = limiter.is_allowed(key)
+            decisions.append(RateLimitDecision(
+                allowed,
+                limiter.get_remaining_requests(key),
+                0.0 if allowed else limiter.get_time_until_reset(key)
+            ))
+        return decisions
+
+    async def reset(self, key: Any) -> None:
+        """Restaura los cupos de una clave."""
+        self.limiter.reset_user(key)
+
+    def start(self) -> None:
+        """Inicia el barrido de usuarios inactivos."""
+        self.limiter.start()
+
+    async def stop(self) -> None:
+        """Detiene el barrido de usuarios inactivos."""
+        await self.limiter.stop()
+
+
+# GCRA atómico en microsegundos con el reloj del servidor (TIME), de modo
+# que todos los workers compartan el mismo reloj. Los valores se formatean
+# con %d porque redis.call convierte los números de Lua con solo 14
+# dígitos significativos. La clave expira cuando ya no guarda consumo,
+# así que Redis elimina solo a los usuarios inactivos.
+GCRA_SCRIPT = """
+local emission = tonumber(ARGV[1])
+local window = tonumber(ARGV[2])
+local time = redis.call('TIME')
+local now = tonumber(time[1]) * 1000000 + tonumber(time[2])
+local tat = tonumber(redis.call('GET', KEYS[1]))
+if not tat or tat < now then
+    tat = now
+end
+local new_tat = tat + emission
+if new_tat - now > window then
+    return {0, 0, new_tat - window - now}
+end
+local ttl_ms = math.ceil((new_tat - now) / 1000)
+redis.call('SET', KEYS[1], string.format('%d', new_tat), 'PX', ttl_ms)
+return {1, math.floor((window - (new_tat - now)) / emission), 0}
+"""
+
+
+class RedisRateLimitBackend(RateLimitBackend):
+    """
+    Backend compartido sobre un servidor con protocolo Redis.
+
+    Las llamadas concurrentes a `check` dentro del mismo ciclo del event
+    loop se agrupan en un único pipeline (un round trip para todas).
+
+    Attributes:
+        client: Cliente asíncrono de Redis (redis.asyncio o compatible).
+        prefix: Prefijo de las claves en Redis.
+    """
+
+    def __init__(
+        self,
+        client: Any,
+        max_requests: int = 10,
+        window_seconds: int = 60,
+        prefix: str = "ratelimit:"
+    ):
+        """
+        Inicializa el backend Redis.
+
+        Args:
+            client: Cliente asíncrono (p. ej. redis.asyncio.Redis).
+            max_requests: Máximo de requests por ventana (default: 10).
+            window_seconds: Duración de la ventana en segundos (default: 60).
+            prefix: Prefijo de las claves (default: "ratelimit:").
+
+        Example:
+            >>> client = redis.asyncio.Redis.from_url("redis://localhost")
+            >>> backend = RedisRateLimitBackend(client, max_requests=10)
+            >>> decision = await backend.check(123)
+        """
+        super().__init__(max_requests, window_seconds)
+        self.client = client
+        self.prefix = prefix
+        self._script = client.register_script(GCRA_SCRIPT)
+        self._args = (
+            int(window_seconds * 1_000_000 / max_requests),
+            int(window_seconds * 1_000_000),
+        )
+        self._pending: List[Tuple[Any, asyncio.Future]] = []
+        self._flush_scheduled = False
+
+        logger.info(
+            "redis_rate_limit_backend_initialized",
+            max_requests=max_requests,
+            window_seconds=window_seconds,
+            prefix=prefix
+        )
+
+    def _key(self, key: Any) -> str:
+        """Clave de Redis para un identificador."""
+        return f"{self.prefix}{key}"
+
+    @staticmethod
+    def _decision(raw: Sequence[Any]) -> RateLimitDecision:
+        """Convierte la respuesta del script en RateLimitDecision."""
+        allowed, remaining, retry_after_us = raw
+        return RateLimitDecision(
+            bool(int(allowed)),
+            int(remaining),
+            int(retry_after_us) / 1_000_000
+        )
+
+    async def check(self, key: Any) -> RateLimitDecision:
+        """
+        Verifica un cupo; se agrupa con otras verificaciones concurrentes.
+
+        Args:
+            key: Identificador a limitar.
+
+        Returns:
+            RateLimitDecision.
+        """
+        future = asyncio.get_running_loop().create_future()
+        self._pending.append((key, future))
+
+        if not self._flush_scheduled:
+            self._flush_scheduled = True
+            asyncio.get_running_loop().call_soon(self._schedule_flush)
+
+        return await future
+
+    def _schedule_flush(self) -> None:
+        """Lanza el envío del lote acumulado en este ciclo del loop."""
+        asyncio.ensure_future(self._flush())
+
+    async def _flush(self) -> None:
+        """Envía las verificaciones pendientes en un solo pipeline."""
+        pending, self._pending = self._pending, []
+        self._flush_scheduled = False
+
+        try:
+            decisions = await self.check_many([key for key, _ in pending])
+        except Exception as e:
+            for _, future in pending:
+                if not future.done():
+                    future.set_exception(e)
+            return
+
+        for (_, future), decision in zip(pending, decisions):
+            if not future.done():
+                future.set_result(decision)
+
+    async def check_many(self, keys: Sequence[Any]) -> List[RateLimitDecision]:
+        """
+        Verifica un lote de claves en un solo round trip (pipeline).
+
+        Args:
+            keys: Identificadores a limitar.
+
+        Returns:
+            Una decisión por clave, en el mismo orden.
+        """
+        if not keys:
+            return []
+
+        # transaction=False: cada script ya es atómico y así el lote
+        # funciona también con claves en distintos slots de un cluster
+        async with self.client.pipeline(transaction=False) as pipe:
+            for key in keys:
+                await self._script(
+                    keys=[self._key(key)],
+                    args=self._args,
+                    client=pipe
+                )
+            results = await pipe.execute()
+
+        return [self._decision(raw) for raw in results]
+
+    async def reset(self, key: Any) -> None:
+        """Restaura los cupos de una clave."""
+        await self.client.delete(self._key(key))
+        logger.info("rate_limit_reset", key=key)
+
+    async def stop(self) -> None:
+        """Cierra la conexión con Redis."""
+        await self.client.aclose()
+
+
+def create_rate_limit_backend(
+    backend: str,
+    max_requests: int,
+    window_seconds: int,
+    redis_url: Optional[str] = None
+) -> RateLimitBackend:
+    """
+    Crea el backend de rate limiting configurado.
+
+    Args:
+        backend: "memory" o "redis".
+        max_requests: Máximo de requests por ventana.
+        window_seconds: Duración de la ventana en segundos.
+        redis_url: URL del servidor Redis (requerida para "redis").
+
+    Returns:
+        Instancia de RateLimitBackend.
+
+    Raises:
+        ValueError: Si el backend no existe o falta la URL de Redis.
+    """
+    if backend == "memory":
+        return MemoryRateLimitBackend(max_requests, window_seconds)
+
+    if backend == "redis":
+        if not redis_url:
+            raise ValueError("REDIS_URL es requerida para RATE_LIMIT_BACKEND=redis")
+
+        import redis.asyncio as redis_asyncio
+
+        client = redis_asyncio.Redis.from_url(redis_url)
+        return RedisRateLimitBackend(client, max_requests, window_seconds)
+
+    raise ValueError(f"Backend de rate limiting desconocido: {backend}")
@@ -1,36 +1,58 @@
 """
 Sistema de rate limiting.
 
-Este módulo implementa un rate limiter basado en ventana deslizante
-para controlar la frecuencia de requests por usuario.
+Este módulo implementa un rate limiter GCRA (Generic Cell Rate
+Algorithm) para controlar la frecuencia de requests por usuario.
+Cada usuario ocupa un solo float (su "theoretical arrival time"), por
+lo que cada verificación es O(1) en tiempo y memoria, y los usuarios
+inactivos se eliminan en segundo plano.
 """
 
-from collections import defaultdict
-from time import time
-from typing import Dict, List
+import asyncio
+from time import monotonic
+from typing import Dict, Optional
 
 from .logger import get_logger
 
 logger = get_logger(__name__)
 
+# Margen para el redondeo de floats: con un reloj grande, (ahora + ventana)
+# - ahora puede dar apenas más que la ventana y rechazar el último cupo
+_TOLERANCE = 1e-6
+
 
 class RateLimiter:
     """
-    Rate limiter basado en ventana deslizante.
+    Rate limiter GCRA.
+
+    Permite ráfagas de hasta `max_requests` y repone un cupo cada
+    `window_seconds / max_requests` segundos. Un usuario sin entrada
+    (o con la entrada vencida) tiene todos sus cupos disponibles.
 
     Attributes:
         max_requests: Número máximo de requests permitidos por ventana.
         window_seconds: Duración de la ventana en segundos.
-        requests: Diccionario que almacena timestamps de requests por usuario.
+        emission_interval: Segundos necesarios para reponer un cupo.
+        tat: Theoretical arrival time por usuario (reloj monotónico).
     """
 
-    def __init__(self, max_requests: int = 10, window_seconds: int = 60):
+    def __init__(
+        self,
+        max_requests: int = 10,
+        window_seconds: int = 60,
+        eviction_interval: Optional[float] = None,
+        eviction_batch_size: int = 10_000
+    ):
         """
         Inicializa el rate limiter.
 
         Args:
             max_requests: Máximo de requests por ventana (default: 10).
             window_seconds: Duración de la ventana en segundos (default: 60).
+            eviction_interval: Segundos entre barridos de usuarios
+                inactivos (default: window_seconds).
+            eviction_batch_size: Entradas revisadas por paso del barrido
+                antes de ceder el event loop (default: 10000).
 
         Example:
             >>> limiter = RateLimiter(max_requests=10, window_seconds=60)
@@ -39,12 +61,17 @@ class RateLimiter:
         """
         self.max_requests = max_requests
         self.window_seconds = window_seconds
-        self.requests: Dict[int, List[float]] = defaultdict(list)
+        self.emission_interval = window_seconds / max_requests
+        self.eviction_interval = eviction_interval or window_seconds
+        self.eviction_batch_size = eviction_batch_size
+        self.tat: Dict[int, float] = {}
+        self._eviction_task: Optional[asyncio.Task] = None
 
         logger.info(
             "rate_limiter_initialized",
             max_requests=max_requests,
-            window_seconds=window_seconds
+            window_seconds=window_seconds,
+            algorithm="gcra"
         )
 
     def is_allowed(self, user_id: int) -> bool:
@@ -66,63 +93,43 @@ class RateLimiter:
             >>> limiter.is_allowed(123)  # Tercera llamada (excede límite)
             False
         """
-        now = time()
-        window_start = now - self.window_seconds
-
-        # Limpiar requests antiguos fuera de la ventana
-        self.requests[user_id] = [
-            timestamp
-            for timestamp in self.requests[user_id]
-            if timestamp > window_start
-        ]
-
-        # Verificar si se excede el límite
-        if len(self.requests[user_id]) >= self.max_requests:
+        now = monotonic()
+        tat = self.tat.get(user_id, now)
+        if tat < now:
+            tat = now
+
+        new_tat = tat + self.emission_interval
+        if new_tat - now > self.window_seconds + _TOLERANCE:
             logger.debug(
                 "rate_limit_exceeded",
                 user_id=user_id,
-                current_requests=len(self.requests[user_id]),
                 max_requests=self.max_requests
             )
             return False
 
-        # Registrar nuevo request
-        self.requests[user_id].append(now)
-
-        logger.debug(
-            "rate_limit_check",
-            user_id=user_id,
-            current_requests=len(self.requests[user_id]),
-            max_requests=self.max_requests,
-            allowed=True
-        )
-
+        self.tat[user_id] = new_tat
         return True
 
     def get_remaining_requests(self, user_id: int) -> int:
         """
         Obtiene el número de requests restantes para un usuario.
 
+        No crea entradas para usuarios desconocidos.
+
         Args:
             user_id: ID del usuario de Telegram.
 
         Returns:
-            Número de requests restantes en la ventana actual.
+            Número de requests disponibles en este momento.
         """
-        now = time()
-        window_start = now - self.window_seconds
+        tat = self.tat.get(user_id)
+        if tat is None:
+            return self.max_requests
 
-        # Limpiar requests antiguos
-        self.requests[user_id] = [
-            timestamp
-            for timestamp in self.requests[user_id]
-            if timestamp > window_start
-        ]
+        used = max(0.0, tat - monotonic())
+        remaining = int((self.window_seconds - used + _TOLERANCE) // self.emission_interval)
 
-        current_count = len(self.requests[user_id])
-        remaining = max(0, self.max_requests - current_count)
-
-        return remaining
+        return max(0, min(self.max_requests, remaining))
 
     def reset_user(self, user_id: int) -> None:
         """
@@ -131,25 +138,86 @@ class RateLimiter:
         Args:
             user_id: ID del usuario de Telegram.
         """
-        if user_id in self.requests:
-            del self.requests[user_id]
+        if self.tat.pop(user_id, None) is not None:
             logger.info("rate_limit_reset", user_id=user_id)
 
     def get_time_until_reset(self, user_id: int) -> float:
         """
-        Obtiene el tiempo en segundos hasta que se resetee el límite.
+        Obtiene el tiempo en segundos hasta que se libere un cupo.
 
         Args:
             user_id: ID del usuario de Telegram.
 
         Returns:
-            Segundos hasta que expire el request más antiguo.
+            Segundos hasta que se permita el siguiente request (0 si ya
+            hay cupo).
         """
-        if user_id not in self.requests or not self.requests[user_id]:
+        tat = self.tat.get(user_id)
+        if tat is None:
             return 0.0
 
-        now = time()
-        oldest_request = min(self.requests[user_id])
-        time_until_reset = (oldest_request + self.window_seconds) - now
+        allowed_at = tat + self.emission_interval - self.window_seconds
+        return max(0.0, allowed_at - monotonic())
+
+    def evict_expired(self) -> int:
+        """
+        Elimina de una sola vez a los usuarios sin requests pendientes.
+
+        Una entrada vencida (tat <= ahora) equivale a no tener entrada.
 
-        return max(0.0, time_until_reset)
+        Returns:
+            Número de entradas eliminadas.
+        """
+        now = monotonic()
+        expired = [user_id for user_id, tat in self.tat.items() if tat <= now]
+        for user_id in expired:
+            del self.tat[user_id]
+        return len(expired)
+
+    async def _evict_incrementally(self) -> int:
+        """Barrido por lotes que cede el event loop entre lotes."""
+        user_ids = list(self.tat)
+        evicted = 0
+
+        for start in range(0, len(user_ids), self.eviction_batch_size):
+            now = monotonic()
+            for user_id in user_ids[start:start + self.eviction_batch_size]:
+                tat = self.tat.get(user_id)
+                # Se vuelve a leer: el usuario pudo hacer un request
+                # mientras el barrido estaba suspendido
+                if tat is not None and tat <= now:
+                    del self.tat[user_id]
+                    evicted += 1
+            await asyncio.sleep(0)
+
+        return evicted
+
+    async def _eviction_loop(self) -> None:
+        """Ejecuta barridos periódicos."""
+        while True:
+            await asyncio.sleep(self.eviction_interval)
+            try:
+                evicted = await self._evict_incrementally()
+                if evicted:
+                    logger.debug(
+                        "rate_limiter_evicted",
+                        evicted=evicted,
+                        tracked_users=len(self.tat)
+                    )
+            except Exception as e:
+                logger.error("rate_limiter_eviction_failed", error=str(e))
+
+    def start(self) -> None:
+        """Inicia el barrido en segundo plano (requiere un event loop activo)."""
+        if self._eviction_task is None or self._eviction_task.done():
+            self._eviction_task = asyncio.create_task(self._eviction_loop())
+
+    async def stop(self) -> None:
+        """Detiene el barrido en segundo plano."""
+        if self._eviction_task is not None:
+            self._eviction_task.cancel()
+            try:
+                await self._eviction_task
+            except asyncio.CancelledError:
+                pass
+            self._eviction_task = None
@@ -0,0 +1,284 @@
+"""
+Política de reintentos con backoff exponencial y presupuesto global.
+
+Este módulo envuelve tenacity para reintentar fallas transitorias
+(5xx del LLM, desconexiones de la BD, errores de red de Telegram) con
+backoff exponencial y jitter. Un presupuesto global limita la proporción
+de reintentos respecto a las llamadas originales, de modo que durante
+una caída los reintentos no multipliquen la carga.
+"""
+
+import inspect
+import threading
+from time import monotonic
+from typing import Any, Callable, Optional
+
+from tenacity import (
+    AsyncRetrying,
+    RetryCallState,
+    stop_after_attempt,
+    wait_random_exponential,
+)
+
+from .deadline import Deadline
+from .logger import get_logger
+from .metrics import metrics
+
+logger = get_logger(__name__)
+
+
+class RetryBudget:
+    """
+    Presupuesto de reintentos tipo token bucket.
+
+    Cada llamada original deposita `ratio` tokens y cada reintento
+    consume uno. Además se repone `min_per_second` tokens por segundo
+    para permitir reintentos con poco tráfico.
+
+    Attributes:
+        ratio: Reintentos permitidos por llamada original (ej. 0.2 = 20%).
+        min_per_second: Reintentos por segundo siempre permitidos.
+        max_tokens: Tope de tokens acumulables.
+    """
+
+    def __init__(
+        self,
+        ratio: float = 0.2,
+        min_per_second: float = 1.0,
+        max_tokens: float = 10.0
+    ):
+        """
+        Inicializa el presupuesto.
+
+        Args:
+            ratio: Reintentos por llamada original (default: 0.2).
+            min_per_second: Reposición mínima por segundo (default: 1.0).
+            max_tokens: Tope de tokens acumulables (default: 10).
+        """
+        self.ratio = ratio
+        self.min_per_second = min_per_second
+        self.max_tokens = max_tokens
+        self._tokens = max_tokens
+        self._updated_at = monotonic()
+        self._lock = threading.Lock()
+
+    def _refill(self) -> None:
+        """Repone tokens según el tiempo transcurrido."""
+        now = monotonic()
+        elapsed = now - self._updated_at
+        self._updated_at = now
+        self._tokens = min(
+            self.max_tokens,
+            self._tokens + elapsed * self.min_per_second
+        )
+
+    def record_request(self) -> None:
+        """Registra una llamada original (deposita `ratio` tokens)."""
+        with self._lock:
+            self._refill()
+            self._tokens = min(self.max_tokens, self._tokens + self.ratio)
+
+    def try_acquire(self) -> bool:
+        """
+        Intenta consumir un token para un reintento.
+
+        Returns:
+            True si el reintento está permitido.
+        """
+        with self._lock:
+            self._refill()
+            if self._tokens >= 1.0:
+                self._tokens -= 1.0
+                return True
+            return False
+
+    @property
+    def available(self) -> float:
+        """Tokens disponibles actualmente."""
+        with self._lock:
+            self._refill()
+            return self._tokens
+
+
+# Presupuesto global compartido por todas las políticas
+retry_budget = RetryBudget()
+
+
+def configure_retry_budget(
+    ratio: float,
+    min_per_second: float,
+    max_tokens: float = 10.0
+) -> RetryBudget:
+    """
+    Reconfigura el presupuesto global de reintentos.
+
+    Args:
+        ratio: Reintentos permitidos por llamada original.
+        min_per_second: Reposición mínima por segundo.
+        max_tokens: Tope de tokens acumulables.
+
+    Returns:
+        El presupuesto global actualizado.
+    """
+    global retry_budget
+    retry_budget = RetryBudget(
+        ratio=ratio,
+        min_per_second=min_per_second,
+        max_tokens=max_tokens
+    )
+    return retry_budget
+
+
+class RetryPolicy:
+    """
+    Política de reintentos para una operación.
+
+    Attributes:
+        name: Nombre de la operación (etiqueta de métricas y logs).
+        is_retryable: Función que indica si una excepción es transitoria.
+        max_attempts: Intentos totales (incluido el primero).
+        base_delay: Multiplicador del backoff exponencial en segundos.
+        max_delay: Espera máxima entre intentos en segundos.
+    """
+
+    def __init__(
+        self,
+        name: str,
+        is_retryable: Callable[[BaseException], bool],
+        max_attempts: int = 3,
+        base_delay: float = 0.2,
+        max_delay: float = 5.0,
+        budget: Optional[RetryBudget] = None
+    ):
+        """
+        Inicializa la política.
+
+        Args:
+            name: Nombre de la operación.
+            is_retryable: Función que indica si una excepción es transitoria.
+            max_attempts: Intentos totales (default: 3).
+            base_delay: Multiplicador del backoff en segundos (default: 0.2).
+            max_delay: Espera máxima en segundos (default: 5.0).
+            budget: Presupuesto de reintentos (default: el global).
+
+        Example:
+            >>> policy = RetryPolicy("llm", is_retryable=is_transient_llm_error)
+            >>> response = await policy.call(client.create, prompt)
+        """
+        self.name = name
+        self.is_retryable = is_retryable
+        self.max_attempts = max_attempts
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+        self._budget = budget
+        self._jitter = wait_random_exponential(multiplier=base_delay, max=max_delay)
+
+    @property
+    def budget(self) -> RetryBudget:
+        """Presupuesto usado por la política."""
+        return self._budget or retry_budget
+
+    def _should_retry(
+        self,
+        retry_state: RetryCallState,
+        deadline: Optional[Deadline] = None
+    ) -> bool:
+        """Decide si reintentar: error transitorio, tiempo y presupuesto disponibles."""
+        error = retry_state.outcome.exception()
+        if error is None or not self.is_retryable(error):
+            return False
+
+        # En el último intento no se gasta presupuesto
+        if retry_state.attempt_number >= self.max_attempts:
+            return False
+
+        # Sin tiempo para esperar y reintentar, se falla de inmediato
+        if deadline is not None and deadline.remaining() <= self.base_delay:
+            metrics.increment("retry_deadline_exhausted_total", operation=self.name)
+            logger.warning(
+                "retry_skipped_deadline",
+                operation=self.name,
+                error_type=type(error).__name__
+            )
+            return False
+
+        if not self.budget.try_acquire():
+            metrics.increment("retry_budget_exhausted_total", operation=self.name)
+            logger.warning(
+                "retry_budget_exhausted",
+                operation=self.name,
+                error_type=type(error).__name__
+            )
+            return False
+
+        return True
+
+    def _wait(
+        self,
+        retry_state: RetryCallState,
+        deadline: Optional[Deadline] = None
+    ) -> float:
+        """Espera antes del siguiente intento (respeta retry_after y el deadline)."""
+        error = retry_state.outcome.exception() if retry_state.outcome else None
+        retry_after = getattr(error, "retry_after", None)
+        if isinstance(retry_after, (int, float)) and retry_after > 0:
+            wait = float(retry_after)
+        else:
+            wait = self._jitter(retry_state)
+        if deadline is not None:
+            wait = min(wait, deadline.remaining())
+        return wait
+
+    def _before_sleep(self, retry_state: RetryCallState) -> None:
+        """Registra el reintento en métricas y logs."""
+        error = retry_state.outcome.exception()
+        metrics.increment("retry_attempts_total", operation=self.name)
+        logger.warning(
+            "retrying_operation",
+            operation=self.name,
+            attempt=retry_state.attempt_number,
+            wait_seconds=round(retry_state.next_action.sleep, 3),
+            error_type=type(error).__name__,
+            error=str(error)
+        )
+
+    async def call(
+        self,
+        func: Callable[..., Any],
+        *args: Any,
+        deadline: Optional[Deadline] = None,
+        **kwargs: Any
+    ) -> Any:
+        """
+        Ejecuta una función aplicando la política.
+
+        Acepta funciones síncronas y asíncronas. La última excepción se
+        relanza si se agotan los intentos, el presupuesto o el deadline.
+
+        Args:
+            func: Función a ejecutar.
+            *args: Argumentos posicionales de la función.
+            deadline: Deadline de la solicitud; no se reintenta ni se
+                espera más allá de él (opcional).
+            **kwargs: Argumentos nombrados de la función.
+
+        Returns:
+            El resultado de la función.
+        """
+        self.budget.record_request()
+        metrics.increment("retry_policy_calls_total", operation=self.name)
+
+        retrying = AsyncRetrying(
+            stop=stop_after_attempt(self.max_attempts),
+            wait=lambda retry_state: self._wait(retry_state, deadline),
+            retry=lambda retry_state: self._should_retry(retry_state, deadline),
+            before_sleep=self._before_sleep,
+            reraise=True
+        )
+
+        async for attempt in retrying:
+            with attempt:
+                result = func(*args, **kwargs)
+                if inspect.isawaitable(result):
+                    result = await result
+        return result
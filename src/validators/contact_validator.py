@@ -7,6 +7,7 @@ antes de persistirlos.
 
 from typing import Dict, Any, List
 from ..utils.logger import get_logger
+from ..utils.phone import parse_phone
 
 logger = get_logger(__name__)
 
@@ -169,21 +170,12 @@ class ContactValidator:
         Returns:
             dict con valid y error (si aplica).
         """
-        import re
+        result = parse_phone(telefono)
 
-        # Remover todo excepto dígitos y +
-        digits_only = re.sub(r'[^\d]', '', telefono)
-
-        if len(digits_only) < 10:
-            return {
-                "valid": False,
-                "error": f"El teléfono debe tener al menos 10 dígitos (encontrados: {len(digits_only)})"
-            }
-
-        if len(digits_only) > 15:
+        if result.error:
             return {
                 "valid": False,
-                "error": f"El teléfono no puede tener más de 15 dígitos (encontrados: {len(digits_only)})"
+                "error": result.error
             }
 
         return {"valid": True}
@@ -71,6 +71,20 @@ class MessageValidator:
 
         text = message.get("text", "")
 
+        # Validar longitud máxima primero: es O(1) y acota el trabajo
+        # de todas las validaciones y etapas posteriores
+        if len(text) > self.max_length:
+            logger.warning(
+                "message_too_long",
+                user_id=message.get("user_id"),
+                length=len(text),
+                max_length=self.max_length
+            )
+            return {
+                "valid": False,
+                "error": f"El mensaje es muy largo. Máximo {self.max_length} caracteres."
+            }
+
         # Validar que el texto no esté vacío
         if not text or not text.strip():
             logger.warning(
@@ -95,19 +109,6 @@ class MessageValidator:
                 "error": f"El mensaje es muy corto. Mínimo {self.min_length} caracteres."
             }
 
-        # Validar longitud máxima
-        if len(text) > self.max_length:
-            logger.warning(
-                "message_too_long",
-                user_id=message.get("user_id"),
-                length=len(text),
-                max_length=self.max_length
-            )
-            return {
-                "valid": False,
-                "error": f"El mensaje es muy largo. Máximo {self.max_length} caracteres."
-            }
-
         logger.debug(
             "message_validation_passed",
             user_id=message.get("user_id"),
@@ -0,0 +1,286 @@
+"""
+Tests unitarios para el detector de abuso.
+"""
+
+import pytest
+
+from src.agents.security_agent import SecurityAgent
+from src.utils import abuse_detector as abuse_detector_module
+from src.utils.abuse_detector import AbuseDetector, SlidingCountMinSketch
+
+
+class FakeClock:
+    """Reloj monotónico controlable."""
+
+    def __init__(self):
+        self.now = 1000.0
+
+    def __call__(self):
+        return self.now
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    """Reemplaza monotonic() del módulo por un reloj controlable."""
+    fake = FakeClock()
+    monkeypatch.setattr(abuse_detector_module, "monotonic", fake)
+    return fake
+
+
+class TestSlidingCountMinSketch:
+    """Tests para SlidingCountMinSketch."""
+
+    def test_should_count_events_within_window(self, clock):
+        """Verifica que los eventos de las sub-ventanas vigentes se suman."""
+        # Arrange
+        sketch = SlidingCountMinSketch(window_seconds=60, buckets=6)
+
+        # Act
+        for _ in range(3):
+            sketch.add(123)
+            clock.now += 10
+
+        # Assert
+        assert sketch.estimate(123) == 3
+
+    def test_should_expire_old_events(self, clock):
+        """Verifica que los eventos fuera de la ventana dejan de contar."""
+        # Arrange
+        sketch = SlidingCountMinSketch(window_seconds=60, buckets=6)
+        sketch.add(123, amount=5)
+        clock.now += 30
+        sketch.add(123)
+
+        # Act
+        clock.now += 35
+        partly_expired = sketch.estimate(123)
+        clock.now += 3600
+        expired = sketch.estimate(123)
+
+        # Assert
+        assert partly_expired == 1
+        assert expired == 0
+
+    def test_should_keep_memory_fixed(self, clock):
+        """Verifica que la memoria no crece con el número de claves."""
+        # Arrange
+        sketch = SlidingCountMinSketch(width=256, depth=4, buckets=6)
+        before = sketch.memory_bytes
+
+        # Act
+        for key in range(10_000):
+            sketch.add(key)
+
+        # Assert
+        assert sketch.memory_bytes == before == 6 * 4 * 256 * 4
+
+
+class TestAbuseDetector:
+    """Tests para AbuseDetector."""
+
+    def test_should_flag_key_at_threshold_once_per_window(self, clock):
+        """Verifica que una clave se marca al llegar al umbral y una sola vez por ventana."""
+        # Arrange
+        detector = AbuseDetector(window_seconds=60, threshold=5)
+
+        # Act
+        flags = [detector.record("rate_limited", 123) for _ in range(10)]
+        clock.now += 120
+        next_window = [detector.record("rate_limited", 123) for _ in range(5)]
+
+        # Assert
+        marked = [flag for flag in flags if flag is not None]
+        assert len(marked) == 1
+        assert flags[4] is marked[0]
+        assert marked[0].key == 123 and marked[0].count == 5
+        assert next_window[-1] is not None
+
+    def test_should_apply_threshold_per_kind(self, clock):
+        """Verifica que cada tipo de evento puede tener su propio umbral."""
+        # Arrange
+        detector = AbuseDetector(threshold=100, thresholds={"suspicious": 2})
+
+        # Act
+        flags = [
+            detector.record("suspicious", 1),
+            detector.record("suspicious", 1),
+            detector.record("rate_limited", 1),
+        ]
+
+        # Assert
+        assert flags[0] is None
+        assert flags[1] is not None
+        assert flags[2] is None
+
+    def test_should_keep_heavy_hitters_among_many_distinct_keys(self, clock):
+        """Verifica que el top-k retiene a los que más eventos generan entre muchas claves."""
+        # Arrange
+        detector = AbuseDetector(threshold=10_000, top_k=8)
+        for key in range(5000):
+            detector.record("unauthorized", key)
+            if key % 10 == 0:
+                detector.record("unauthorized", 7)
+                detector.record("unauthorized", 9)
+
+        # Act
+        hitters = detector.heavy_hitters("unauthorized", limit=2)
+
+        # Assert
+        assert [key for key, _ in hitters] in ([7, 9], [9, 7])
+        assert all(count >= 501 for _, count in hitters)
+        assert len(detector._candidates["unauthorized"]) <= 8
+
+    def test_should_expire_heavy_hitters_with_window(self, clock):
+        """Verifica que las claves sin eventos en la ventana dejan de aparecer."""
+        # Arrange
+        detector = AbuseDetector(window_seconds=60)
+        detector.record("blocked", 123)
+
+        # Act
+        clock.now += 120
+
+        # Assert
+        assert detector.heavy_hitters("blocked") == []
+        assert detector.heavy_hitters("unknown_kind") == []
+
+    def test_should_flag_new_key_after_window_rollover(self, clock):
+        """Verifica que candidatos viejos no impiden marcar una clave nueva."""
+        # Arrange
+        detector = AbuseDetector(window_seconds=60, threshold=10, top_k=4)
+        for key in range(4):
+            for _ in range(30):
+                detector.record("rate_limited", key)
+        clock.now += 120
+
+        # Act
+        flags = [detector.record("rate_limited", 99) for _ in range(25)]
+
+        # Assert
+        assert [flag.key for flag in flags if flag is not None] == [99]
+        assert detector.heavy_hitters("rate_limited") == [(99, 25)]
+        assert set(detector._candidates["rate_limited"]) == {99}
+
+    def test_should_flag_key_over_threshold_with_full_top_k(self, clock):
+        """Verifica que el umbral se evalúa sobre el sketch y no sobre el top-k."""
+        # Arrange
+        detector = AbuseDetector(window_seconds=60, threshold=5, top_k=2)
+        for key in (1, 2):
+            for _ in range(20):
+                detector.record("rate_limited", key)
+
+        # Act
+        flags = [detector.record("rate_limited", 3) for _ in range(5)]
+
+        # Assert
+        assert flags[-1] is not None and flags[-1].key == 3
+        assert 3 in detector._candidates["rate_limited"]
+        assert len(detector._candidates["rate_limited"]) == 2
+
+    def test_should_contain_on_flag_errors(self, clock):
+        """Verifica que un error del callback no interrumpe el registro."""
+        # Arrange
+        def explode(flag):
+            raise RuntimeError("boom")
+
+        detector = AbuseDetector(threshold=1, on_flag=explode)
+
+        # Act
+        flag = detector.record("suspicious", 1)
+
+        # Assert
+        assert flag is not None
+
+
+class TestSecurityAgentAbuse:
+    """Tests para la integración con SecurityAgent."""
+
+    def _message(self, user_id, text="Juan Pérez 3001234567 ref María"):
+        return {"text": text, "user_id": user_id, "chat_id": user_id, "username": "u"}
+
+    @pytest.mark.asyncio
+    async def test_should_flag_rate_limited_user_without_blocking(self, mock_gemini_service):
+        """Verifica que sin la política de bloqueo el usuario solo se marca."""
+        # Arrange
+        detector = AbuseDetector(threshold=3)
+        agent = SecurityAgent(
+            gemini_service=mock_gemini_service,
+            allowed_users=[123],
+            max_requests=1,
+            abuse_detector=detector,
+            checks=("origin", "rate_limit")
+        )
+        agent.local_extractor = None
+        mock_gemini_service.extract_contact_info.return_value = {
+            "success": False, "error": "x"
+        }
+
+        # Act
+        for _ in range(5):
+            await agent.process_request(self._message(123))
+
+        # Assert
+        assert detector.estimate("rate_limited", 123) == 4
+        assert detector.heavy_hitters("rate_limited")[0][0] == 123
+        assert 123 not in agent.blocked_users
+
+    @pytest.mark.asyncio
+    async def test_should_block_heavy_hitters_with_auto_block_policy(self, mock_gemini_service):
+        """Verifica que con la política activa el usuario marcado se bloquea."""
+        # Arrange
+        agent = SecurityAgent(
+            gemini_service=mock_gemini_service,
+            allowed_users=[123],
+            max_failed_attempts=100,
+            abuse_detector=AbuseDetector(threshold=3),
+            auto_block_abusers=True
+        )
+
+        # Act
+        rejected = [
+            await agent.process_request(self._message(123, "<script>x</script>"))
+            for _ in range(3)
+        ]
+        result = await agent.process_request(self._message(123))
+
+        # Assert
+        assert all(r["error_type"] == "suspicious_input" for r in rejected)
+        assert 123 in agent.blocked_users
+        assert result["error_type"] == "unauthorized"
+
+    def test_should_only_observe_unauthorized_events(self, mock_gemini_service):
+        """Verifica que "unauthorized" no dispara el bloqueo automático."""
+        # Arrange
+        agent = SecurityAgent(
+            gemini_service=mock_gemini_service,
+            allowed_users=[123],
+            abuse_detector=AbuseDetector(threshold=1),
+            auto_block_abusers=True
+        )
+
+        # Act
+        flag = agent._record_abuse("unauthorized", 123)
+
+        # Assert
+        assert flag is not None
+        assert "unauthorized" not in SecurityAgent.AUTO_BLOCK_KINDS
+        assert 123 not in agent.blocked_users
+
+    @pytest.mark.asyncio
+    async def test_should_track_repeated_pattern_across_users(self, mock_gemini_service):
+        """Verifica que un mismo patrón enviado por usuarios distintos se acumula."""
+        # Arrange
+        detector = AbuseDetector(threshold=100)
+        agent = SecurityAgent(
+            gemini_service=mock_gemini_service,
+            allowed_users=[1, 2, 3],
+            abuse_detector=detector
+        )
+
+        # Act
+        for user_id in (1, 2, 3):
+            await agent.process_request(self._message(user_id, "javascript:alert(1)"))
+
+        # Assert
+        pattern, count = detector.heavy_hitters("suspicious_pattern")[0]
+        assert "javascript" in pattern
+        assert count == 3
@@ -0,0 +1,118 @@
+"""
+Tests unitarios para la whitelist recargable.
+"""
+
+import asyncio
+
+import pytest
+
+from src.agents.security_agent import SecurityAgent
+from src.services.allowlist import Allowlist, SQLAllowlistStore
+from src.services.contacts_api import ContactsAPIClient
+from src.services.gemini_service import GeminiService
+
+
+@pytest.fixture
+def session_factory(tmp_path):
+    """Base de datos SQLite con las tablas creadas."""
+    client = ContactsAPIClient(database_url=f"sqlite:///{tmp_path}/allowlist.db")
+    client.create_tables()
+    return client.SessionLocal
+
+
+class TestAllowlist:
+    """Tests para la whitelist en memoria."""
+
+    def test_should_swap_snapshot_on_changes(self):
+        """Verifica que cada cambio reemplaza el frozenset en lugar de mutarlo."""
+        # Arrange
+        allowlist = Allowlist([1])
+        before = allowlist.users
+
+        # Act
+        allowlist.add(2)
+        allowlist.remove(1)
+
+        # Assert
+        assert before == frozenset({1})
+        assert allowlist.users == frozenset({2})
+        assert isinstance(allowlist.users, frozenset)
+        assert 2 in allowlist and 1 not in allowlist
+
+
+class TestSQLAllowlistStore:
+    """Tests para la whitelist persistida."""
+
+    def test_should_seed_only_an_empty_table(self, session_factory):
+        """Verifica que la configuración solo puebla la tabla la primera vez."""
+        # Arrange
+        first = SQLAllowlistStore(session_factory, seed=[1, 2])
+        first.load()
+        first.remove(2)
+
+        # Act
+        second = SQLAllowlistStore(session_factory, seed=[1, 2, 3])
+        second.load()
+
+        # Assert
+        assert second.users == frozenset({1})
+
+    def test_should_show_changes_to_other_worker_after_reload(self, session_factory):
+        """Verifica que un cambio en un worker llega a otro al verificar la versión."""
+        # Arrange
+        worker_a = SQLAllowlistStore(session_factory, seed=[1])
+        worker_b = SQLAllowlistStore(session_factory)
+        worker_a.load()
+        worker_b.load()
+
+        # Act
+        worker_a.add(42, username="nuevo")
+        before_reload = 42 in worker_b
+        reloaded = worker_b.reload()
+
+        # Assert
+        assert 42 in worker_a
+        assert not before_reload
+        assert reloaded is True
+        assert 42 in worker_b
+        assert worker_b.reload() is False
+
+    @pytest.mark.asyncio
+    async def test_should_reload_on_notify_without_waiting(self, session_factory):
+        """Verifica que notify() recarga de inmediato sin esperar al intervalo."""
+        # Arrange
+        admin = SQLAllowlistStore(session_factory)
+        worker = SQLAllowlistStore(session_factory, refresh_interval=3600)
+        worker.load()
+        worker.start()
+
+        # Act
+        admin.add(7)
+        worker.notify()
+        for _ in range(100):
+            if 7 in worker:
+                break
+            await asyncio.sleep(0.01)
+        await worker.stop()
+
+        # Assert
+        assert 7 in worker
+
+    def test_should_authorize_agent_with_current_snapshot(self, session_factory):
+        """Verifica que SecurityAgent autoriza con el snapshot vigente, sin reiniciar."""
+        # Arrange
+        store = SQLAllowlistStore(session_factory)
+        store.load()
+        agent = SecurityAgent(
+            gemini_service=GeminiService(api_key="test-key"),
+            allowlist=store
+        )
+        assert agent._validate_origin(5)["valid"] is False
+
+        # Act
+        SQLAllowlistStore(session_factory).add(5)
+        store.reload()
+
+        # Assert
+        assert agent._validate_origin(5)["valid"] is True
+        assert agent.allowed_users == frozenset({5})
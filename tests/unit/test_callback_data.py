@@ -0,0 +1,156 @@
+"""
+Tests unitarios para el callback_data firmado.
+"""
+
+import pytest
+
+from src.utils import callback_data as callback_data_module
+from src.utils.callback_data import (
+    CALLBACK_DATA_MAX_BYTES,
+    CallbackCodec,
+    InvalidCallbackData
+)
+
+SHORT_CONTACT = {
+    "nombre": "Juan Pérez",
+    "telefono": "+573001234567",
+    "quien_lo_recomendo": "María"
+}
+LONG_CONTACT = {
+    "nombre": "Juan Sebastián Pérez García",
+    "telefono": "+573001234567",
+    "quien_lo_recomendo": "María Fernanda López Rodríguez"
+}
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    """Fija time() del módulo."""
+    now = [1_700_000_000.0]
+    monkeypatch.setattr(callback_data_module, "time", lambda: now[0])
+    return now
+
+
+@pytest.fixture
+def codec():
+    """Codec con un secreto fijo."""
+    return CallbackCodec(secret="s3cr3t")
+
+
+class TestCallbackCodec:
+    """Tests para la codificación y verificación."""
+
+    def test_should_round_trip_short_contact_inline(self, clock, codec):
+        """Verifica que un contacto corto viaja completo en el callback_data."""
+        # Arrange
+        data = codec.encode_inline("confirm", 123, SHORT_CONTACT, 1_700_000_900)
+
+        # Act
+        callback = codec.decode(data, user_id=123)
+
+        # Assert
+        assert len(data.encode()) <= CALLBACK_DATA_MAX_BYTES
+        assert callback.action == "confirm"
+        assert callback.contact == SHORT_CONTACT
+        assert not callback.is_reference
+
+    def test_should_not_encode_inline_when_too_long(self, clock, codec):
+        """Verifica que si no cabe en 64 bytes se debe usar una referencia."""
+        # Act
+        data = codec.encode_inline("confirm", 123, LONG_CONTACT, 1_700_000_900)
+
+        # Assert
+        assert data is None
+
+    def test_should_not_encode_unknown_fields_or_separator_inline(self, clock, codec):
+        """Verifica que campos extra o con el separador no se codifican inline."""
+        # Act
+        with_extra = codec.encode_inline(
+            "confirm", 123, {**SHORT_CONTACT, "extra": "x"}, 1_700_000_900
+        )
+        with_separator = codec.encode_inline(
+            "confirm", 123, {**SHORT_CONTACT, "nombre": "A|B"}, 1_700_000_900
+        )
+
+        # Assert
+        assert with_extra is None
+        assert with_separator is None
+
+    def test_should_not_carry_contact_on_reject(self, clock, codec):
+        """Verifica que el rechazo no necesita los datos del contacto."""
+        # Arrange
+        data = codec.encode_inline("reject", 123, LONG_CONTACT, 1_700_000_900)
+
+        # Act
+        callback = codec.decode(data, user_id=123)
+
+        # Assert
+        assert callback.action == "reject"
+        assert callback.contact is None
+
+    def test_should_round_trip_reference(self, clock, codec):
+        """Verifica que una referencia lleva el id del store."""
+        # Arrange
+        data = codec.encode_reference("confirm", 123, "q3Xz_1Ab", 1_700_000_900)
+
+        # Act
+        callback = codec.decode(data, user_id=123)
+
+        # Assert
+        assert callback.is_reference
+        assert callback.confirmation_id == "q3Xz_1Ab"
+
+    def test_should_decode_in_other_worker_with_same_secret(self, clock, codec):
+        """Verifica que sin estado local otro proceso con el mismo secreto la verifica."""
+        # Arrange
+        data = codec.encode_reference("confirm", 123, "q3Xz_1Ab", 1_700_000_900)
+
+        # Act
+        callback = CallbackCodec(secret="s3cr3t").decode(data, 123)
+
+        # Assert
+        assert callback.confirmation_id == "q3Xz_1Ab"
+        with pytest.raises(InvalidCallbackData):
+            CallbackCodec(secret="otro").decode(data, 123)
+
+    def test_should_reject_other_user(self, clock, codec):
+        """Verifica que la firma incluye el user_id."""
+        # Arrange
+        data = codec.encode_inline("confirm", 123, SHORT_CONTACT, 1_700_000_900)
+
+        # Act & Assert
+        with pytest.raises(InvalidCallbackData):
+            codec.decode(data, user_id=999)
+
+    def test_should_reject_tampered_data(self, clock, codec):
+        """Verifica que alterar cualquier campo invalida la firma."""
+        # Arrange
+        data = codec.encode_inline("confirm", 123, SHORT_CONTACT, 1_700_000_900)
+
+        # Act & Assert
+        with pytest.raises(InvalidCallbackData):
+            codec.decode(data.replace("María", "Mario"), user_id=123)
+        with pytest.raises(InvalidCallbackData):
+            codec.decode("x" + data[1:], user_id=123)
+
+    def test_should_reject_expired(self, clock, codec):
+        """Verifica que pasado el vencimiento el botón ya no vale."""
+        # Arrange
+        data = codec.encode_reference("confirm", 123, "q3Xz_1Ab", 1_700_000_900)
+        clock[0] += 901
+
+        # Act & Assert
+        with pytest.raises(InvalidCallbackData):
+            codec.decode(data, user_id=123)
+
+    def test_should_reject_legacy_format(self, clock, codec):
+        """Verifica que el formato anterior sin firma no se acepta."""
+        # Act & Assert
+        with pytest.raises(InvalidCallbackData):
+            codec.decode("confirm_123_456", user_id=123)
+
+    def test_should_reject_empty_secret(self):
+        """Verifica que un secreto vacío es un error de configuración."""
+        # Act & Assert
+        with pytest.raises(ValueError):
+            CallbackCodec(secret="")
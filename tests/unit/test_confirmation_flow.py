@@ -0,0 +1,357 @@
+"""
+Tests del flujo de confirmación: llamadas a la Bot API por contacto.
+"""
+
+import asyncio
+import os
+from time import time
+from types import SimpleNamespace
+from unittest.mock import AsyncMock, MagicMock
+
+import pytest
+
+# main carga la configuración al importarse
+os.environ.setdefault("TELEGRAM_BOT_TOKEN", "123456:test")
+os.environ.setdefault("GEMINI_API_KEY", "test")
+
+import main  # noqa: E402
+from src.agents.persistence_agent import PersistenceAgent  # noqa: E402
+from src.services.pending_store import PendingConfirmationStore  # noqa: E402
+from src.services.send_scheduler import SendScheduler  # noqa: E402
+from src.services.telegram_service import TelegramService  # noqa: E402
+from src.services.worker_pool import WorkerPool  # noqa: E402
+from src.utils.callback_data import CallbackCodec  # noqa: E402
+
+USER_ID = 123
+CHAT_ID = 456
+TEXT = "Juan Pérez 3001234567 ref María"
+SHORT_CONTACT = {
+    "nombre": "Juan Pérez",
+    "telefono": "+573001234567",
+    "quien_lo_recomendo": "María"
+}
+LONG_CONTACT = {
+    "nombre": "Juan Sebastián Pérez García",
+    "telefono": "+573001234567",
+    "quien_lo_recomendo": "María Fernanda López Rodríguez"
+}
+
+
+class BotAPI:
+    """Registra cada llamada a la Bot API por nombre de método."""
+
+    def __init__(self):
+        self.calls = []
+
+    def method(self, name):
+        async def call(*args, **kwargs):
+            self.calls.append(name)
+            return True
+        return call
+
+
+@pytest.fixture
+def api():
+    """Bot API simulada que registra las llamadas."""
+    return BotAPI()
+
+
+@pytest.fixture
+async def orchestrator(api):
+    """Orquestador con servicios reales y la Bot API y la BD simuladas."""
+    scheduler = SendScheduler(global_rate=1000, chat_rate=1000, chat_burst=10)
+    telegram_service = TelegramService(bot_token="123456:test", scheduler=scheduler)
+    telegram_service.bot = SimpleNamespace(
+        send_message=api.method("sendMessage"),
+        send_document=api.method("sendDocument"),
+        send_contact=api.method("sendContact")
+    )
+
+    contacts_client = MagicMock()
+    contacts_client.save_contact = AsyncMock(
+        return_value={"success": True, "contact_id": "abc-123"}
+    )
+    contacts_client.save_to_legacy_api = AsyncMock()
+
+    orchestrator = main.ContactsOrchestrator.__new__(main.ContactsOrchestrator)
+    orchestrator.send_scheduler = scheduler
+    orchestrator.confirmation_workers = WorkerPool("confirmations", workers=2)
+    orchestrator.telegram_service = telegram_service
+    orchestrator.persistence_agent = PersistenceAgent(contacts_client, telegram_service)
+    orchestrator.pending_store = PendingConfirmationStore()
+    orchestrator.callback_codec = CallbackCodec(secret="test")
+    orchestrator.training_store = MagicMock()
+
+    yield orchestrator
+    await orchestrator.confirmation_workers.stop(drain_timeout=1)
+    await scheduler.stop(drain_timeout=0)
+
+
+async def press(orchestrator, api, contact, action="confirm", wait=True):
+    """Crea los botones de un contacto y presiona uno (y espera el guardado)."""
+    keyboard = await orchestrator._confirmation_keyboard(USER_ID, CHAT_ID, contact, TEXT)
+    confirm_button, reject_button = keyboard.inline_keyboard[0]
+    button = confirm_button if action == "confirm" else reject_button
+
+    query = SimpleNamespace(
+        data=button.callback_data,
+        from_user=SimpleNamespace(id=USER_ID),
+        message=SimpleNamespace(
+            chat_id=CHAT_ID,
+            reply_to_message=SimpleNamespace(text=TEXT)
+        ),
+        answer=api.method("answerCallbackQuery"),
+        edit_message_text=api.method("editMessageText")
+    )
+    await orchestrator.handle_confirmation(SimpleNamespace(callback_query=query), None)
+    if wait:
+        await orchestrator.confirmation_workers.join()
+    return query
+
+
+class TestConfirmationBotAPICalls:
+    """Llamadas a la Bot API por contacto confirmado."""
+
+    @pytest.mark.asyncio
+    @pytest.mark.parametrize("contact", [SHORT_CONTACT, LONG_CONTACT], ids=["inline", "reference"])
+    async def test_should_take_three_calls_per_confirmed_contact(self, orchestrator, api, contact):
+        """Verifica que solo se usan el aviso del botón, el contacto nativo y una edición."""
+        # Act
+        await press(orchestrator, api, contact)
+
+        # Assert
+        assert api.calls == ["answerCallbackQuery", "sendContact", "editMessageText"]
+        orchestrator.training_store.add_example.assert_called_once_with(
+            text=TEXT, contact=contact
+        )
+
+    @pytest.mark.asyncio
+    async def test_should_report_failed_save_once(self, orchestrator, api):
+        """Verifica que un error se informa solo en la edición del mensaje (sin mensajes extra)."""
+        # Arrange
+        orchestrator.persistence_agent.contacts_client.save_contact.return_value = {
+            "success": False,
+            "error": "timeout"
+        }
+
+        # Act
+        await press(orchestrator, api, SHORT_CONTACT)
+
+        # Assert
+        assert api.calls == ["answerCallbackQuery", "editMessageText"]
+
+    @pytest.mark.asyncio
+    async def test_should_take_two_calls_on_reject(self, orchestrator, api):
+        """Verifica que rechazar no guarda ni envía nada más."""
+        # Act
+        await press(orchestrator, api, SHORT_CONTACT, action="reject")
+
+        # Assert
+        assert api.calls == ["answerCallbackQuery", "editMessageText"]
+
+    @pytest.mark.asyncio
+    async def test_should_only_answer_second_press(self, orchestrator, api):
+        """Verifica que un segundo clic sobre el mismo botón no vuelve a guardar."""
+        # Arrange
+        keyboard = await orchestrator._confirmation_keyboard(
+            USER_ID, CHAT_ID, SHORT_CONTACT, TEXT
+        )
+        data = keyboard.inline_keyboard[0][0].callback_data
+        callback = orchestrator.callback_codec.decode(data, USER_ID)
+        await orchestrator.pending_store.claim(callback.tag, USER_ID, callback.expires_at)
+        query = SimpleNamespace(
+            data=data,
+            from_user=SimpleNamespace(id=USER_ID),
+            message=SimpleNamespace(chat_id=CHAT_ID, reply_to_message=None),
+            answer=api.method("answerCallbackQuery"),
+            edit_message_text=api.method("editMessageText")
+        )
+
+        # Act
+        await orchestrator.handle_confirmation(SimpleNamespace(callback_query=query), None)
+
+        # Assert
+        assert api.calls == ["answerCallbackQuery"]
+
+
+class TestBackgroundConfirmation:
+    """Tests para el guardado en segundo plano de los contactos confirmados."""
+
+    @pytest.mark.asyncio
+    async def test_should_answer_button_before_saving(self, orchestrator, api):
+        """Verifica que el handler responde sin esperar la BD y el mensaje se edita al terminar."""
+        # Arrange
+        release = asyncio.Event()
+
+        async def slow_save(contact, deadline=None, mirror_legacy=True):
+            await release.wait()
+            return {"success": True, "contact_id": "abc-123"}
+
+        orchestrator.persistence_agent.contacts_client.save_contact = slow_save
+
+        # Act
+        await press(orchestrator, api, SHORT_CONTACT, wait=False)
+        calls_before_save = list(api.calls)
+        release.set()
+        await orchestrator.confirmation_workers.join()
+
+        # Assert
+        assert calls_before_save == ["answerCallbackQuery"]
+        assert api.calls == ["answerCallbackQuery", "sendContact", "editMessageText"]
+
+    @pytest.mark.asyncio
+    async def test_should_fall_back_to_error_message(self, orchestrator, api):
+        """Verifica que si no se puede editar el mensaje el error llega en un mensaje aparte."""
+        # Arrange
+        async def edit_fails(**kwargs):
+            api.calls.append("editMessageText")
+            raise RuntimeError("message to edit not found")
+
+        # Act
+        query = await press(orchestrator, api, SHORT_CONTACT, wait=False)
+        query.edit_message_text = edit_fails
+        await orchestrator.confirmation_workers.join()
+
+        # Assert
+        assert api.calls == [
+            "answerCallbackQuery",
+            "sendContact",
+            "editMessageText",
+            "editMessageText",
+            "sendMessage"
+        ]
+
+    @pytest.mark.asyncio
+    async def test_should_mirror_legacy_while_notifying(self, orchestrator, api):
+        """Verifica que la copia a la API legacy y el envío del contacto van en paralelo."""
+        # Arrange
+        legacy_started = asyncio.Event()
+        contact_sent = asyncio.Event()
+
+        async def save_to_legacy_api(contact, deadline=None):
+            legacy_started.set()
+            await contact_sent.wait()
+
+        async def send_contact(**kwargs):
+            await legacy_started.wait()
+            api.calls.append("sendContact")
+            contact_sent.set()
+
+        orchestrator.persistence_agent.contacts_client.save_to_legacy_api = save_to_legacy_api
+        orchestrator.telegram_service.bot.send_contact = send_contact
+
+        # Act
+        await asyncio.wait_for(press(orchestrator, api, SHORT_CONTACT), timeout=2)
+
+        # Assert
+        assert api.calls == ["answerCallbackQuery", "sendContact", "editMessageText"]
+
+
+class TestErrorNotificationDedup:
+    """Tests para la deduplicación de mensajes de error."""
+
+    @pytest.mark.asyncio
+    async def test_should_send_same_error_once(self, api):
+        """Verifica que el mismo error al mismo chat dentro de la ventana se envía una vez."""
+        # Arrange
+        service = TelegramService(bot_token="123456:test")
+        service.bot = SimpleNamespace(send_message=api.method("sendMessage"))
+
+        # Act
+        first = await service.send_error_message(CHAT_ID, "No se pudo guardar")
+        second = await service.send_error_message(CHAT_ID, "No se pudo guardar")
+        await service.send_error_message(CHAT_ID + 1, "No se pudo guardar")
+
+        # Assert
+        assert first
+        assert second
+        assert api.calls == ["sendMessage", "sendMessage"]
+
+    @pytest.mark.asyncio
+    async def test_should_send_same_error_again_after_window(self, api, monkeypatch):
+        """Verifica que pasada la ventana el error se vuelve a enviar."""
+        # Arrange
+        from src.services import telegram_service as telegram_service_module
+
+        now = [time()]
+        monkeypatch.setattr(telegram_service_module, "monotonic", lambda: now[0])
+        service = TelegramService(bot_token="123456:test", error_dedup_window=30)
+        service.bot = SimpleNamespace(send_message=api.method("sendMessage"))
+
+        # Act
+        await service.send_error_message(CHAT_ID, "No se pudo guardar")
+        now[0] += 31
+        await service.send_error_message(CHAT_ID, "No se pudo guardar")
+
+        # Assert
+        assert api.calls == ["sendMessage", "sendMessage"]
+
+
+class TestContactDelivery:
+    """Tests para los modos de entrega del contacto guardado."""
+
+    def _service(self, api, mode):
+        service = TelegramService(bot_token="123456:test", contact_delivery=mode)
+        sent = {}
+
+        def record(name):
+            async def call(**kwargs):
+                api.calls.append(name)
+                sent[name] = kwargs
+                return True
+            return call
+
+        service.bot = SimpleNamespace(
+            send_contact=record("sendContact"),
+            send_document=record("sendDocument")
+        )
+        return service, sent
+
+    async def _deliver(self, service):
+        return await service.send_contact_with_vcard_and_button(
+            chat_id=CHAT_ID,
+            nombre="Juan Pérez García",
+            telefono="+573001234567",
+            quien_lo_recomendo="María",
+            confirmation_message="Contacto guardado"
+        )
+
+    @pytest.mark.asyncio
+    async def test_should_upload_nothing_for_native_contact(self, api):
+        """Verifica que sendContact lleva el teléfono sin + y el vCard como texto."""
+        # Arrange
+        service, sent = self._service(api, "contact")
+
+        # Act
+        delivered = await self._deliver(service)
+
+        # Assert
+        assert delivered
+        assert api.calls == ["sendContact"]
+        contact = sent["sendContact"]
+        assert contact["phone_number"] == "573001234567"
+        assert (contact["first_name"], contact["last_name"]) == ("Juan", "Pérez García")
+        assert "NOTE:Recomendado por: María" in contact["vcard"]
+
+    @pytest.mark.asyncio
+    @pytest.mark.parametrize(
+        "mode, calls",
+        [("document", ["sendDocument"]), ("both", ["sendContact", "sendDocument"])]
+    )
+    async def test_should_keep_document_modes(self, api, mode, calls):
+        """Verifica que el vCard como archivo queda como opción."""
+        # Arrange
+        service, _ = self._service(api, mode)
+
+        # Act
+        delivered = await self._deliver(service)
+
+        # Assert
+        assert delivered
+        assert api.calls == calls
+
+    def test_should_reject_invalid_mode(self):
+        """Verifica que un modo de entrega desconocido es un error de configuración."""
+        # Act & Assert
+        with pytest.raises(ValueError):
+            TelegramService(bot_token="123456:test", contact_delivery="fax")
@@ -0,0 +1,233 @@
+"""
+Tests unitarios para la propagación de deadlines.
+"""
+
+import asyncio
+import time
+from unittest.mock import AsyncMock, MagicMock
+
+import pytest
+
+from src.agents.persistence_agent import PersistenceAgent
+from src.agents.security_agent import SecurityAgent
+from src.services.contacts_api import ContactsAPIClient
+from src.services.gemini_service import GeminiService
+from src.utils.deadline import Deadline, DeadlineExceeded, run_with_timeout
+from src.utils.retry import RetryBudget, RetryPolicy
+
+
+class TransientError(Exception):
+    """Error transitorio de prueba."""
+
+
+class TestDeadline:
+    """Tests para Deadline."""
+
+    def test_should_never_report_negative_remaining_time(self):
+        """Verifica que el tiempo restante nunca es negativo."""
+        # Arrange
+        fresh = Deadline(10)
+        spent = Deadline(0)
+
+        # Act
+        fresh_remaining = fresh.remaining()
+        spent_remaining = spent.remaining()
+
+        # Assert
+        assert fresh_remaining > 9
+        assert not fresh.expired
+        assert spent_remaining == 0
+        assert spent.expired
+
+    def test_should_cap_stage_timeout(self):
+        """Verifica que el timeout de la etapa es el menor entre restante y cap."""
+        # Arrange
+        deadline = Deadline(10)
+
+        # Act
+        short = deadline.timeout(cap=2)
+        long = deadline.timeout(cap=60)
+
+        # Assert
+        assert short == 2
+        assert long <= 10
+
+    def test_should_raise_when_deadline_is_spent(self):
+        """Verifica que sin tiempo restante se falla de inmediato."""
+        # Arrange
+        deadline = Deadline(0)
+
+        # Act & Assert
+        with pytest.raises(DeadlineExceeded):
+            deadline.timeout(stage="llm")
+
+    @pytest.mark.asyncio
+    async def test_should_fail_fast_without_starting_stage(self):
+        """Verifica que con el deadline agotado la etapa ni siquiera empieza."""
+        # Arrange
+        work = AsyncMock(return_value="ok")
+
+        # Act & Assert
+        with pytest.raises(DeadlineExceeded):
+            await Deadline(0).run(work(), stage="db")
+
+    @pytest.mark.asyncio
+    async def test_should_convert_stage_timeout(self):
+        """Verifica que un timeout durante la etapa se reporta como DeadlineExceeded."""
+        # Arrange
+        deadline = Deadline(0.05)
+
+        # Act & Assert
+        with pytest.raises(DeadlineExceeded):
+            await deadline.run(asyncio.sleep(1), stage="slow")
+
+    @pytest.mark.asyncio
+    async def test_should_be_caught_as_timeout_error(self):
+        """Verifica que los manejadores existentes de asyncio.TimeoutError lo capturan."""
+        # Arrange
+        deadline = Deadline(0.05)
+
+        # Act & Assert
+        with pytest.raises(asyncio.TimeoutError):
+            await run_with_timeout(asyncio.sleep(1), timeout=5, deadline=deadline)
+
+    @pytest.mark.asyncio
+    async def test_should_apply_stage_timeout_without_deadline(self):
+        """Verifica que sin deadline se aplica solo el timeout de la etapa."""
+        # Arrange
+        work = asyncio.sleep(0, result="ok")
+
+        # Act
+        result = await run_with_timeout(work, timeout=1)
+
+        # Assert
+        assert result == "ok"
+
+
+class TestRetryWithDeadline:
+    """Tests para RetryPolicy con deadline."""
+
+    @pytest.mark.asyncio
+    async def test_should_not_retry_when_deadline_nearly_spent(self):
+        """Verifica que no se reintenta si no queda tiempo para esperar."""
+        # Arrange
+        policy = RetryPolicy(
+            "test",
+            is_retryable=lambda e: isinstance(e, TransientError),
+            max_attempts=5,
+            base_delay=0.5,
+            budget=RetryBudget(max_tokens=100)
+        )
+        func = AsyncMock(side_effect=TransientError("falla"))
+
+        # Act & Assert
+        with pytest.raises(TransientError):
+            await policy.call(func, deadline=Deadline(0.1))
+        assert func.await_count == 1
+
+    def test_should_cap_wait_by_deadline(self):
+        """Verifica que la espera entre intentos nunca supera el tiempo restante."""
+        # Arrange
+        policy = RetryPolicy(
+            "test",
+            is_retryable=lambda e: True,
+            base_delay=0.001,
+            max_delay=0.001,
+            budget=RetryBudget(max_tokens=100)
+        )
+        retry_state = MagicMock()
+        retry_state.outcome.exception.return_value = MagicMock(retry_after=30)
+
+        # Act
+        wait = policy._wait(retry_state, Deadline(1))
+
+        # Assert
+        assert wait <= 1
+
+
+class TestPipelineDeadline:
+    """Tests de propagación del deadline entre agentes."""
+
+    @pytest.fixture
+    def security_agent(self):
+        """SecurityAgent con Gemini real pero sin red."""
+        gemini = GeminiService(api_key="test-key", timeout=30)
+        gemini._call_openai_async = AsyncMock()
+        return SecurityAgent(gemini_service=gemini, allowed_users=[123456789])
+
+    @pytest.mark.asyncio
+    async def test_should_skip_llm_when_deadline_is_spent(
+        self,
+        security_agent,
+        sample_telegram_message
+    ):
+        """Verifica que con el deadline agotado no se llama al LLM."""
+        # Arrange
+        deadline = Deadline(0)
+
+        # Act
+        result = await security_agent.process_request(
+            sample_telegram_message,
+            deadline=deadline
+        )
+
+        # Assert
+        assert result["success"] is False
+        assert result["error_type"] == "deadline_exceeded"
+        security_agent.gemini_service._call_openai_async.assert_not_awaited()
+        assert security_agent.failed_attempts[123456789] == 0
+
+    @pytest.mark.asyncio
+    async def test_should_bound_slow_llm_by_deadline(
+        self,
+        security_agent,
+        sample_telegram_message
+    ):
+        """Verifica que el LLM se corta con el tiempo restante, no con su timeout propio."""
+        # Arrange
+        async def slow(prompt):
+            await asyncio.sleep(5)
+
+        security_agent.gemini_service._call_openai_async = slow
+        loop = asyncio.get_running_loop()
+        started = loop.time()
+
+        # Act
+        result = await security_agent.process_request(
+            sample_telegram_message,
+            deadline=Deadline(0.1)
+        )
+
+        # Assert
+        assert loop.time() - started < 1
+        assert result["error_type"] == "deadline_exceeded"
+
+    @pytest.mark.asyncio
+    async def test_should_bound_slow_database_by_deadline(self, tmp_path, sample_contact_data):
+        """Verifica que el guardado se corta con el deadline y el usuario recibe el error."""
+        # Arrange
+        client = ContactsAPIClient(database_url=f"sqlite:///{tmp_path}/contacts.db")
+        client.create_tables()
+
+        def slow_insert(contact):
+            time.sleep(0.5)
+            return contact.id
+
+        client._insert_contact = slow_insert
+        telegram = MagicMock()
+        telegram.send_error_message = AsyncMock(return_value=True)
+        telegram.send_contact_with_vcard_and_button = AsyncMock(return_value=True)
+        agent = PersistenceAgent(client, telegram)
+
+        # Act
+        result = await agent.save_and_notify(
+            sample_contact_data,
+            chat_id=1,
+            deadline=Deadline(0.05)
+        )
+
+        # Assert
+        assert result["success"] is False
+        assert result["error_type"] == "timeout"
+        telegram.send_error_message.assert_awaited_once()
+        telegram.send_contact_with_vcard_and_button.assert_not_awaited()
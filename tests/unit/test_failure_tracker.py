@@ -0,0 +1,172 @@
+"""
+Tests unitarios para el conteo acotado de intentos fallidos.
+"""
+
+import pytest
+
+from src.utils import failure_tracker as failure_tracker_module
+from src.utils.failure_tracker import CountMinSketch, FailedAttemptsTracker
+
+
+class FakeClock:
+    """Reloj monotónico controlable."""
+
+    def __init__(self):
+        self.now = 1000.0
+
+    def __call__(self):
+        return self.now
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    """Reemplaza monotonic() del módulo por un reloj controlable."""
+    fake = FakeClock()
+    monkeypatch.setattr(failure_tracker_module, "monotonic", fake)
+    return fake
+
+
+class TestCountMinSketch:
+    """Tests para CountMinSketch."""
+
+    def test_should_never_underestimate(self):
+        """Verifica que el estimado es siempre mayor o igual al conteo real."""
+        # Arrange
+        sketch = CountMinSketch(width=64, depth=3)
+
+        # Act
+        for key in range(500):
+            sketch.add(key, amount=key % 4 + 1)
+
+        # Assert
+        assert all(sketch.estimate(key) >= key % 4 + 1 for key in range(500))
+
+    def test_should_be_exact_without_collisions(self):
+        """Verifica que con pocas claves el estimado es exacto."""
+        # Arrange
+        sketch = CountMinSketch()
+
+        # Act
+        for _ in range(5):
+            sketch.add(123456789)
+
+        # Assert
+        assert sketch.estimate(123456789) == 5
+        assert sketch.estimate(987654321) == 0
+
+    def test_should_halve_counts_with_fixed_memory(self):
+        """Verifica que envejecer divide los conteos y la memoria no depende de las claves."""
+        # Arrange
+        sketch = CountMinSketch(width=1024, depth=4)
+        before = sketch.memory_bytes
+        for key in range(10_000):
+            sketch.add(key)
+        sketch.add(1, amount=7)
+
+        # Act
+        sketch.halve()
+
+        # Assert
+        assert sketch.estimate(1) >= 4
+        assert sketch.memory_bytes == before == 4 * 1024 * 4
+
+
+class TestFailedAttemptsTracker:
+    """Tests para FailedAttemptsTracker."""
+
+    def test_should_not_create_entries_on_lookups(self, clock):
+        """Verifica que consultar no crea entradas (a diferencia del defaultdict)."""
+        # Arrange
+        tracker = FailedAttemptsTracker()
+
+        # Act
+        count = tracker[1]
+        entry = tracker.get(1)
+
+        # Assert
+        assert count == 0
+        assert entry is None
+        assert 1 not in tracker
+        assert len(tracker) == 0
+
+    def test_should_bound_lru_capacity(self, clock):
+        """Verifica que nunca hay más de max_tracked conteos exactos."""
+        # Arrange
+        tracker = FailedAttemptsTracker(max_tracked=100)
+
+        # Act
+        for user_id in range(1000):
+            tracker.add(user_id)
+
+        # Assert
+        assert len(tracker) == 100
+        assert tracker[999] == 1
+        assert tracker[0] == 0
+
+    def test_should_decay_counts_and_expire_with_ttl(self, clock):
+        """Verifica que el conteo se reduce a la mitad por vida media y expira con el TTL."""
+        # Arrange
+        tracker = FailedAttemptsTracker(ttl_seconds=100, half_life_seconds=30)
+        for _ in range(8):
+            tracker.add(1)
+
+        # Act
+        clock.now += 30
+        after_one_half_life = tracker[1]
+        clock.now += 30
+        after_two_half_lives = tracker[1]
+        after_add = tracker.add(1)
+        clock.now += 100
+        expired = tracker[1]
+        swept = tracker.sweep()
+
+        # Assert
+        assert (after_one_half_life, after_two_half_lives, after_add) == (4, 2, 3)
+        assert expired == 0
+        assert swept == 1
+        assert len(tracker) == 0
+
+    def test_should_decay_count_loaded_with_age(self, clock):
+        """Verifica que un conteo cargado con antigüedad ya viene decaído."""
+        # Arrange
+        tracker = FailedAttemptsTracker(ttl_seconds=100, half_life_seconds=30)
+
+        # Act
+        tracker.set(1, 8, age_seconds=31)
+
+        # Assert
+        assert tracker[1] == 4
+
+    def test_should_count_unknown_ids_in_sketch(self, clock):
+        """Verifica que los IDs desconocidos no ocupan entradas de conocidos y envejecen."""
+        # Arrange
+        tracker = FailedAttemptsTracker(half_life_seconds=30)
+
+        # Act
+        for _ in range(4):
+            tracker.add_unknown(666)
+        estimate = tracker.estimate_unknown(666)
+        clock.now += 61
+        aged = tracker.add_unknown(666)
+
+        # Assert
+        assert estimate == 4
+        assert len(tracker) == 0
+        assert aged == 2
+
+    def test_should_keep_unknown_counts_exact_and_bounded(self, clock):
+        """Verifica que un sketch saturado no infla el conteo exacto y el LRU no crece."""
+        # Arrange
+        tracker = FailedAttemptsTracker(
+            max_unknown_tracked=100, sketch_width=64, sketch_depth=2
+        )
+        for user_id in range(5000):
+            tracker.add_unknown(user_id)
+
+        # Act
+        count = tracker.add_unknown(10_000_001)
+
+        # Assert
+        assert tracker.estimate_unknown(10_000_001) > 1
+        assert count == 1
+        assert len(tracker._unknown) == 100
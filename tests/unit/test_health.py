@@ -0,0 +1,129 @@
+"""
+Tests unitarios para el monitor de salud.
+"""
+
+import asyncio
+
+import pytest
+
+from src.services.contacts_api import ContactsAPIClient
+from src.utils.health import HealthMonitor
+
+
+def make_probe(result=True, delay=0.0, calls=None):
+    """Crea un probe de prueba que cuenta sus llamadas."""
+    async def probe():
+        if calls is not None:
+            calls.append(1)
+        await asyncio.sleep(delay)
+        if isinstance(result, Exception):
+            raise result
+        return result
+    return probe
+
+
+class TestHealthMonitor:
+    """Tests para HealthMonitor."""
+
+    @pytest.mark.asyncio
+    async def test_should_run_probes_concurrently(self):
+        """Verifica que el tiempo total es el del probe más lento, no la suma."""
+        # Arrange
+        monitor = HealthMonitor({
+            "a": make_probe(delay=0.2),
+            "b": make_probe(delay=0.2),
+            "c": make_probe(delay=0.2),
+        })
+        loop = asyncio.get_running_loop()
+        started = loop.time()
+
+        # Act
+        statuses = await monitor.check_all()
+
+        # Assert
+        assert loop.time() - started < 0.5
+        assert all(status.healthy for status in statuses.values())
+        assert all(status.latency_ms >= 150 for status in statuses.values())
+
+    @pytest.mark.asyncio
+    async def test_should_isolate_slow_and_failing_probes(self):
+        """Verifica que un probe lento o que falla no afecta a los demás."""
+        # Arrange
+        monitor = HealthMonitor(
+            {
+                "slow": make_probe(delay=1),
+                "broken": make_probe(result=RuntimeError("caído")),
+                "down": make_probe(result=False),
+                "ok": make_probe(),
+            },
+            timeout=0.05
+        )
+
+        # Act
+        statuses = await monitor.check_all()
+
+        # Assert
+        assert statuses["slow"].error.startswith("timeout")
+        assert "caído" in statuses["broken"].error
+        assert statuses["down"].error == "probe_failed"
+        assert statuses["ok"].healthy
+        assert statuses["ok"].error is None
+
+    @pytest.mark.asyncio
+    async def test_should_serve_status_from_cache(self):
+        """Verifica que mientras la caché es reciente no se vuelven a ejecutar probes."""
+        # Arrange
+        calls = []
+        monitor = HealthMonitor({"a": make_probe(calls=calls)}, refresh_interval=60)
+
+        # Act
+        await monitor.get_status()
+        await monitor.get_status()
+
+        # Assert
+        assert len(calls) == 1
+
+    @pytest.mark.asyncio
+    async def test_should_share_refresh_between_concurrent_requests(self):
+        """Verifica que varios /health simultáneos comparten una sola ronda de probes."""
+        # Arrange
+        calls = []
+        monitor = HealthMonitor({"a": make_probe(delay=0.05, calls=calls)})
+
+        # Act
+        await asyncio.gather(*(monitor.get_status() for _ in range(5)))
+
+        # Assert
+        assert len(calls) == 1
+
+    @pytest.mark.asyncio
+    async def test_should_refresh_cache_in_background(self):
+        """Verifica que el refresco en segundo plano llena la caché."""
+        # Arrange
+        calls = []
+        monitor = HealthMonitor({"a": make_probe(calls=calls)}, refresh_interval=0.01)
+
+        # Act
+        monitor.start()
+        await asyncio.sleep(0.05)
+        await monitor.stop()
+
+        # Assert
+        assert len(calls) >= 2
+        assert (await monitor.get_status())["a"].healthy
+
+
+class TestServiceHealthChecks:
+    """Tests para los probes de los servicios."""
+
+    @pytest.mark.asyncio
+    async def test_should_report_healthy_database(self, tmp_path):
+        """Verifica que SELECT 1 funciona sobre una conexión real."""
+        # Arrange
+        client = ContactsAPIClient(database_url=f"sqlite:///{tmp_path}/health.db")
+
+        # Act
+        healthy = await client.health_check()
+
+        # Assert
+        assert healthy is True
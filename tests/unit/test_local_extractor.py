@@ -0,0 +1,135 @@
+"""
+Tests unitarios para el extractor local y el almacén de ejemplos.
+"""
+
+import pytest
+
+from src.services.local_extractor import (
+    LocalContactExtractor,
+    align_example,
+    tokenize,
+    LABEL_NOMBRE,
+    LABEL_TELEFONO,
+    LABEL_REFERIDO,
+)
+from src.services.training_store import TrainingExampleStore
+
+
+NOMBRES = ["Juan Pérez", "Ana María Rodríguez", "Carlos Ruiz", "Luisa Gómez", "Pedro Martínez"]
+REFERIDOS = ["María López", "Andrea", "Pablo Díaz", "Laura"]
+PLANTILLAS = [
+    "{n} {p} recomendado por {r}",
+    "{n}\n{p}\nMe lo recomendó {r}",
+    "{n} {p} ref {r}",
+    "{n} tel {p} de parte de {r}",
+]
+TELEFONOS = ["3001234567", "315 789 4561", "320-555-1234", "3109876543"]
+
+
+def _examples():
+    """Genera ejemplos etiquetados combinando plantillas."""
+    examples = []
+    for i, plantilla in enumerate(PLANTILLAS):
+        for j, nombre in enumerate(NOMBRES):
+            referido = REFERIDOS[(i + j) % len(REFERIDOS)]
+            telefono = TELEFONOS[(i * 3 + j) % len(TELEFONOS)]
+            digits = "".join(ch for ch in telefono if ch.isdigit())
+            examples.append({
+                "text": plantilla.format(n=nombre, p=telefono, r=referido),
+                "nombre": nombre,
+                "telefono": "+57" + digits,
+                "quien_lo_recomendo": referido,
+            })
+    return examples
+
+
+class TestAlignExample:
+    """Tests para la alineación de ejemplos con el texto."""
+
+    def test_should_label_every_field(self):
+        """Verifica que se etiquetan nombre, teléfono y referido."""
+        # Arrange
+        text = "Juan Pérez 300 123 4567 recomendado por María"
+        contact = {
+            "nombre": "Juan Pérez",
+            "telefono": "+573001234567",
+            "quien_lo_recomendo": "María",
+        }
+
+        # Act
+        labels = align_example(text, contact)
+        tokens = [token for token, _, _ in tokenize(text)]
+
+        # Assert
+        assert labels[tokens.index("Juan")] == LABEL_NOMBRE
+        assert labels[tokens.index("123")] == LABEL_TELEFONO
+        assert labels[tokens.index("María")] == LABEL_REFERIDO
+
+    def test_should_return_none_when_field_not_in_text(self):
+        """Verifica que un ejemplo no alineable se descarta."""
+        # Act
+        labels = align_example(
+            "Juan 3001234567 ref María",
+            {"nombre": "Pedro", "telefono": "+573001234567", "quien_lo_recomendo": "María"}
+        )
+
+        # Assert
+        assert labels is None
+
+
+class TestLocalContactExtractor:
+    """Tests para LocalContactExtractor."""
+
+    @pytest.fixture
+    def extractor(self):
+        """Fixture con un extractor entrenado."""
+        extractor = LocalContactExtractor(min_confidence=0.5)
+        extractor.train(_examples())
+        return extractor
+
+    def test_should_return_none_when_not_trained(self):
+        """Verifica que un extractor sin pesos no extrae nada."""
+        # Act & Assert
+        assert LocalContactExtractor().extract("Juan 3001234567 ref María") is None
+
+    def test_should_extract_contact_from_known_format(self, extractor):
+        """Verifica extracción con un formato visto en entrenamiento."""
+        # Act
+        result = extractor.extract("Sofía Castro 3204567890 recomendado por Laura")
+
+        # Assert
+        assert result["nombre"] == "Sofía Castro"
+        assert result["telefono"] == "+573204567890"
+        assert result["quien_lo_recomendo"] == "Laura"
+        assert 0 < result["confidence"] <= 1
+
+    def test_should_keep_weights_after_save_and_load(self, extractor, tmp_path):
+        """Verifica que el modelo guardado produce las mismas predicciones."""
+        # Arrange
+        path = tmp_path / "model.json"
+        text = "Juan Pérez 3001234567 ref Andrea"
+
+        # Act
+        extractor.save(str(path))
+        loaded = LocalContactExtractor.load(str(path), min_confidence=0.5)
+
+        # Assert
+        assert loaded.extract(text) == extractor.extract(text)
+
+
+class TestTrainingExampleStore:
+    """Tests para TrainingExampleStore."""
+
+    def test_should_append_and_read_examples(self, tmp_path, sample_contact_data):
+        """Verifica que los ejemplos guardados se pueden leer."""
+        # Arrange
+        store = TrainingExampleStore(str(tmp_path / "examples.jsonl"))
+
+        # Act
+        store.add_example("Juan Pérez 3001234567 recomendado por María López", sample_contact_data)
+        examples = list(store.iter_examples())
+
+        # Assert
+        assert len(examples) == 1
+        assert examples[0]["nombre"] == "Juan Pérez"
+        assert examples[0]["text"].startswith("Juan Pérez")
@@ -0,0 +1,284 @@
+"""
+Tests unitarios para el store de confirmaciones pendientes.
+"""
+
+import pytest
+
+from src.services import pending_store as pending_store_module
+from src.services.contacts_api import ContactsAPIClient
+from src.services.pending_store import (
+    PendingConfirmation,
+    PendingConfirmationStore,
+    SQLPendingConfirmationStore,
+    create_pending_store
+)
+
+CONTACT = {
+    "nombre": "Juan Pérez",
+    "telefono": "+573001234567",
+    "quien_lo_recomendo": "María López"
+}
+TEXT = "Juan Pérez 3001234567 ref María López"
+
+
+class FakeClock:
+    """Reloj de pared controlable."""
+
+    def __init__(self):
+        self.now = 1_700_000_000.0
+
+    def __call__(self):
+        return self.now
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    """Reemplaza time() del módulo por un reloj controlable."""
+    fake = FakeClock()
+    monkeypatch.setattr(pending_store_module, "time", fake)
+    return fake
+
+
+@pytest.fixture
+def session_factory(tmp_path):
+    """Base de datos SQLite con las tablas creadas."""
+    client = ContactsAPIClient(database_url=f"sqlite:///{tmp_path}/pending.db")
+    client.create_tables()
+    return client.SessionLocal
+
+
+class TestPendingConfirmation:
+    """Tests para la serialización compacta."""
+
+    def test_should_round_trip_through_dumps_and_loads(self):
+        """Verifica que loads() reconstruye lo que serializa dumps()."""
+        # Arrange
+        pending = PendingConfirmation("abc", 1, 2, CONTACT, TEXT, 100)
+
+        # Act
+        restored = PendingConfirmation.loads(
+            pending.dumps(), id="abc", user_id=1, chat_id=2, expires_at=100
+        )
+
+        # Assert
+        assert restored == pending
+
+    def test_should_dump_compact_payload(self):
+        """Verifica que se serializa sin espacios y con los acentos sin escapar."""
+        # Arrange
+        pending = PendingConfirmation("abc", 1, 2, CONTACT, TEXT, 100)
+
+        # Act
+        payload = pending.dumps()
+
+        # Assert
+        assert ", " not in payload and ": " not in payload
+        assert "Pérez" in payload
+
+
+class TestPendingConfirmationStore:
+    """Tests para el store en memoria."""
+
+    @pytest.mark.asyncio
+    async def test_should_return_pending_only_once(self, clock):
+        """Verifica que una confirmación se retira una sola vez."""
+        # Arrange
+        store = PendingConfirmationStore()
+        pending = await store.add(123, 456, CONTACT, TEXT)
+
+        # Act
+        first = await store.take(pending.id, 123)
+        second = await store.take(pending.id, 123)
+
+        # Assert
+        assert len(pending.id) <= 16
+        assert first == pending
+        assert second is None
+
+    @pytest.mark.asyncio
+    async def test_should_keep_several_pending_per_user(self, clock):
+        """Verifica que un mensaje nuevo no pisa la confirmación anterior."""
+        # Arrange
+        store = PendingConfirmationStore()
+        first = await store.add(123, 456, CONTACT, TEXT)
+        second = await store.add(123, 456, {**CONTACT, "nombre": "Ana"}, TEXT)
+
+        # Act
+        taken_first = await store.take(first.id, 123)
+        taken_second = await store.take(second.id, 123)
+
+        # Assert
+        assert taken_first.contact == CONTACT
+        assert taken_second.contact["nombre"] == "Ana"
+
+    @pytest.mark.asyncio
+    async def test_should_not_let_other_user_take(self, clock):
+        """Verifica que el botón solo funciona para el usuario que envió el contacto."""
+        # Arrange
+        store = PendingConfirmationStore()
+        pending = await store.add(123, 456, CONTACT, TEXT)
+
+        # Act
+        taken_by_other = await store.take(pending.id, 999)
+
+        # Assert
+        assert taken_by_other is None
+        assert await store.take(pending.id, 123) == pending
+
+    @pytest.mark.asyncio
+    async def test_should_not_return_expired(self, clock):
+        """Verifica que pasado el TTL la confirmación ya no vale."""
+        # Arrange
+        store = PendingConfirmationStore(ttl_seconds=60)
+        pending = await store.add(123, 456, CONTACT, TEXT)
+
+        # Act
+        clock.now += 61
+        taken = await store.take(pending.id, 123)
+
+        # Assert
+        assert taken is None
+
+    @pytest.mark.asyncio
+    async def test_should_sweep_only_expired(self, clock):
+        """Verifica que el barrido elimina solo las vencidas."""
+        # Arrange
+        store = PendingConfirmationStore(ttl_seconds=60)
+        await store.add(1, 1, CONTACT, TEXT)
+        clock.now += 30
+        fresh = await store.add(2, 2, CONTACT, TEXT)
+
+        # Act
+        clock.now += 40
+        swept = store.sweep()
+
+        # Assert
+        assert swept == 1
+        assert len(store) == 1
+        assert await store.take(fresh.id, 2) == fresh
+
+    @pytest.mark.asyncio
+    async def test_should_evict_oldest_over_max_size(self, clock):
+        """Verifica que al exceder el máximo se descartan las más viejas."""
+        # Arrange
+        store = PendingConfirmationStore(max_size=2)
+        oldest = await store.add(1, 1, CONTACT, TEXT)
+        await store.add(2, 2, CONTACT, TEXT)
+
+        # Act
+        await store.add(3, 3, CONTACT, TEXT)
+
+        # Assert
+        assert len(store) == 2
+        assert await store.take(oldest.id, 1) is None
+
+    @pytest.mark.asyncio
+    async def test_should_claim_once_until_swept(self, clock):
+        """Verifica que una firma se reclama una vez y el barrido la olvida al vencer."""
+        # Arrange
+        store = PendingConfirmationStore()
+        expires_at = int(clock.now) + 60
+
+        # Act
+        first = await store.claim("J3nTcFpQ", 123, expires_at)
+        second = await store.claim("J3nTcFpQ", 123, expires_at)
+        clock.now += 61
+        store.sweep()
+        after_sweep = await store.claim("J3nTcFpQ", 123, expires_at + 60)
+
+        # Assert
+        assert first
+        assert not second
+        assert after_sweep
+
+
+class TestSQLPendingConfirmationStore:
+    """Tests para el store en la BD."""
+
+    @pytest.mark.asyncio
+    async def test_should_keep_pending_after_restart(self, clock, session_factory):
+        """Verifica que una confirmación creada antes de reiniciar se puede retirar después."""
+        # Arrange
+        store = SQLPendingConfirmationStore(session_factory)
+        pending = await store.add(123, 456, CONTACT, TEXT)
+
+        # Act
+        restarted = SQLPendingConfirmationStore(session_factory)
+        taken = await restarted.take(pending.id, 123)
+
+        # Assert
+        assert taken == pending
+        assert await store.take(pending.id, 123) is None
+
+    @pytest.mark.asyncio
+    async def test_should_not_let_other_user_take(self, clock, session_factory):
+        """Verifica que otro usuario no retira (ni borra) la confirmación."""
+        # Arrange
+        store = SQLPendingConfirmationStore(session_factory)
+        pending = await store.add(123, 456, CONTACT, TEXT)
+
+        # Act
+        taken_by_other = await store.take(pending.id, 999)
+
+        # Assert
+        assert taken_by_other is None
+        assert await store.take(pending.id, 123) == pending
+
+    @pytest.mark.asyncio
+    async def test_should_sweep_expired_rows(self, clock, session_factory):
+        """Verifica que el barrido borra de la tabla las vencidas."""
+        # Arrange
+        store = SQLPendingConfirmationStore(session_factory, ttl_seconds=60)
+        expired = await store.add(1, 1, CONTACT, TEXT)
+        clock.now += 30
+        await store.add(2, 2, CONTACT, TEXT)
+
+        # Act
+        clock.now += 40
+        swept = store.sweep()
+
+        # Assert
+        assert swept == 1
+        assert len(store) == 1
+        assert await store.take(expired.id, 1) is None
+
+    @pytest.mark.asyncio
+    async def test_should_share_claim_between_workers(self, clock, session_factory):
+        """Verifica que un botón inline no se puede usar otra vez desde otro worker."""
+        # Arrange
+        first = SQLPendingConfirmationStore(session_factory)
+        second = SQLPendingConfirmationStore(session_factory)
+        expires_at = int(clock.now) + 60
+
+        # Act
+        claimed = await first.claim("J3nTcFpQ", 123, expires_at)
+        claimed_again = await second.claim("J3nTcFpQ", 123, expires_at)
+        in_memory = len(first)
+        clock.now += 61
+        swept = first.sweep()
+
+        # Assert
+        assert claimed
+        assert not claimed_again
+        assert in_memory == 0
+        assert swept == 1
+
+
+class TestCreatePendingStore:
+    """Tests para la selección del backend."""
+
+    def test_should_create_each_backend(self, session_factory):
+        """Verifica que cada backend crea su implementación."""
+        # Act
+        memory = create_pending_store("memory")
+        database = create_pending_store("database", session_factory)
+
+        # Assert
+        assert type(memory) is PendingConfirmationStore
+        assert isinstance(database, SQLPendingConfirmationStore)
+
+    def test_should_reject_unknown_backend(self):
+        """Verifica que un backend desconocido es un error de configuración."""
+        # Act & Assert
+        with pytest.raises(ValueError):
+            create_pending_store("redis")
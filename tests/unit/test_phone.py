@@ -0,0 +1,91 @@
+"""
+Tests unitarios para la normalización de teléfonos.
+"""
+
+import re
+
+import pytest
+
+from src.utils.phone import parse_phone, normalize_phone, normalize_phones
+
+
+def legacy_normalize(value):
+    """Implementación anterior (regex) usada como referencia."""
+    cleaned = re.sub(r"[^\d+]", "", value)
+    if not cleaned.startswith("+"):
+        cleaned = "+57" + cleaned
+    return cleaned
+
+
+COLOMBIAN_NUMBERS = [
+    "3001234567",
+    "300 123 4567",
+    "300-123-4567",
+    "300.123.4567",
+    "(300) 123 4567",
+    "+57 300 123 4567",
+    "+573157894561",
+    "+57 315-789-4561",
+    "601 234 5678",
+    " 320 555 1234 ",
+]
+
+
+class TestParsePhone:
+    """Tests para parse_phone y normalize_phone."""
+
+    @pytest.mark.parametrize("value", COLOMBIAN_NUMBERS)
+    def test_should_match_legacy_behavior_for_colombian_numbers(self, value):
+        """Verifica que los números colombianos se normalizan igual que antes."""
+        # Act
+        result = parse_phone(value)
+
+        # Assert
+        assert result.is_valid
+        assert result.e164 == legacy_normalize(value)
+        assert result.country_code == "57"
+
+    def test_should_recognize_country_code_without_plus(self):
+        """Verifica que 57 + 10 dígitos no duplica el código de país."""
+        # Act & Assert
+        assert normalize_phone("57 300 123 4567") == "+573001234567"
+
+    def test_should_detect_other_country_codes(self):
+        """Verifica detección de códigos de país distintos a Colombia."""
+        # Act
+        result = parse_phone("+1 (212) 555-1234")
+
+        # Assert
+        assert result.e164 == "+12125551234"
+        assert result.country_code == "1"
+        assert result.is_valid
+
+    def test_should_reject_wrong_length_for_country(self):
+        """Verifica la regla de longitud por país."""
+        # Act
+        result = parse_phone("+57 300 123 45678")
+
+        # Assert
+        assert not result.is_valid
+        assert "CO" in result.error
+
+    def test_should_reject_too_few_digits(self):
+        """Verifica el mínimo de 10 dígitos."""
+        # Act & Assert
+        with pytest.raises(ValueError, match="10 dígitos"):
+            normalize_phone("12345")
+
+    def test_should_reject_too_many_digits(self):
+        """Verifica el máximo de 15 dígitos."""
+        # Act & Assert
+        with pytest.raises(ValueError, match="15 dígitos"):
+            normalize_phone("1234567890123456")
+
+    def test_should_normalize_batch_in_order(self):
+        """Verifica la API por lotes."""
+        # Act
+        results = normalize_phones(["3001234567", "123", "+573157894561"])
+
+        # Assert
+        assert [result.is_valid for result in results] == [True, False, True]
+        assert results[2].e164 == "+573157894561"
@@ -0,0 +1,160 @@
+"""
+Tests unitarios para los backends de rate limiting.
+"""
+
+import asyncio
+
+import fakeredis
+import pytest
+
+from src.utils.rate_limit_backend import (
+    MemoryRateLimitBackend,
+    RedisRateLimitBackend,
+    create_rate_limit_backend,
+)
+
+
+@pytest.fixture
+def redis_server():
+    """Servidor Redis en proceso (compartido por varios clientes)."""
+    return fakeredis.FakeServer()
+
+
+def make_redis_backend(server, max_requests=3, window_seconds=60):
+    """Backend Redis con un cliente propio, como un worker distinto."""
+    return RedisRateLimitBackend(
+        fakeredis.FakeAsyncRedis(server=server),
+        max_requests=max_requests,
+        window_seconds=window_seconds
+    )
+
+
+class TestMemoryBackend:
+    """Tests para MemoryRateLimitBackend."""
+
+    @pytest.mark.asyncio
+    async def test_should_consume_block_and_reset(self):
+        """Verifica que consume cupos, bloquea y se resetea."""
+        # Arrange
+        backend = MemoryRateLimitBackend(max_requests=2, window_seconds=60)
+
+        # Act
+        decisions = await backend.check_many([1, 1, 1])
+        await backend.reset(1)
+
+        # Assert
+        assert [d.allowed for d in decisions] == [True, True, False]
+        assert decisions[0].remaining == 1
+        assert decisions[2].retry_after > 0
+        assert (await backend.check(1)).allowed
+
+
+class TestRedisBackend:
+    """Tests para RedisRateLimitBackend."""
+
+    @pytest.mark.asyncio
+    async def test_should_share_limit_between_workers(self, redis_server):
+        """Verifica que dos workers comparten el mismo cupo por usuario."""
+        # Arrange
+        worker_a = make_redis_backend(redis_server)
+        worker_b = make_redis_backend(redis_server)
+
+        # Act
+        results = [
+            (await worker_a.check(1)).allowed,
+            (await worker_b.check(1)).allowed,
+            (await worker_a.check(1)).allowed,
+            (await worker_b.check(1)).allowed,
+        ]
+
+        # Assert
+        assert results == [True, True, True, False]
+        assert (await worker_b.check(2)).allowed
+
+    @pytest.mark.asyncio
+    async def test_should_decide_like_memory_backend(self, redis_server):
+        """Verifica que el script Lua decide igual que el GCRA en memoria."""
+        # Arrange
+        keys = [1, 2, 1, 1, 3, 1, 2]
+        redis_backend = make_redis_backend(redis_server)
+        memory_backend = MemoryRateLimitBackend(max_requests=3, window_seconds=60)
+
+        # Act
+        redis_decisions = await redis_backend.check_many(keys)
+        memory_decisions = await memory_backend.check_many(keys)
+
+        # Assert
+        assert [(d.allowed, d.remaining) for d in redis_decisions] == [
+            (d.allowed, d.remaining) for d in memory_decisions
+        ]
+        assert redis_decisions[5].retry_after == pytest.approx(20, abs=0.5)
+
+    @pytest.mark.asyncio
+    async def test_should_send_concurrent_checks_in_one_pipeline(self, redis_server):
+        """Verifica que las verificaciones concurrentes viajan en un solo pipeline."""
+        # Arrange
+        backend = make_redis_backend(redis_server, max_requests=10)
+        batches = []
+        original = backend.check_many
+
+        async def spy(keys):
+            batches.append(list(keys))
+            return await original(keys)
+
+        backend.check_many = spy
+
+        # Act
+        decisions = await asyncio.gather(*(backend.check(i % 2) for i in range(6)))
+
+        # Assert
+        assert batches == [[0, 1, 0, 1, 0, 1]]
+        assert all(d.allowed for d in decisions)
+
+    @pytest.mark.asyncio
+    async def test_should_expire_idle_keys(self, redis_server):
+        """Verifica que las claves expiran cuando ya no guardan consumo."""
+        # Arrange
+        backend = make_redis_backend(redis_server, max_requests=3, window_seconds=60)
+
+        # Act
+        await backend.check(1)
+        ttl_ms = await backend.client.pttl("ratelimit:1")
+
+        # Assert
+        assert 0 < ttl_ms <= 20_000
+
+    @pytest.mark.asyncio
+    async def test_should_delete_shared_key_on_reset(self, redis_server):
+        """Verifica que reset elimina la clave compartida."""
+        # Arrange
+        backend = make_redis_backend(redis_server, max_requests=1)
+        await backend.check(1)
+        assert not (await backend.check(1)).allowed
+
+        # Act
+        await backend.reset(1)
+
+        # Assert
+        assert (await backend.check(1)).allowed
+
+
+class TestFactory:
+    """Tests para create_rate_limit_backend."""
+
+    def test_should_default_to_memory_backend(self):
+        """Verifica que el backend por defecto es en memoria."""
+        # Act
+        backend = create_rate_limit_backend("memory", 10, 60)
+
+        # Assert
+        assert isinstance(backend, MemoryRateLimitBackend)
+
+    @pytest.mark.parametrize("backend, redis_url", [
+        ("memcached", None),
+        ("redis", ""),
+    ])
+    def test_should_reject_unknown_backend_or_missing_url(self, backend, redis_url):
+        """Verifica que un backend desconocido o sin URL se rechaza."""
+        # Act & Assert
+        with pytest.raises(ValueError):
+            create_rate_limit_backend(backend, 10, 60, redis_url=redis_url)
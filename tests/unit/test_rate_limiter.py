@@ -0,0 +1,150 @@
+"""
+Tests unitarios para el rate limiter GCRA.
+"""
+
+import pytest
+
+from src.utils import rate_limiter as rate_limiter_module
+from src.utils.rate_limiter import RateLimiter
+
+
+class FakeClock:
+    """Reloj monotónico controlable."""
+
+    def __init__(self):
+        self.now = 1000.0
+
+    def __call__(self):
+        return self.now
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    """Reemplaza monotonic() del módulo por un reloj controlable."""
+    fake = FakeClock()
+    monkeypatch.setattr(rate_limiter_module, "monotonic", fake)
+    return fake
+
+
+class TestRateLimiter:
+    """Tests para RateLimiter."""
+
+    def test_should_allow_burst_then_block(self, clock):
+        """Verifica que permite max_requests seguidos y bloquea el siguiente."""
+        # Arrange
+        limiter = RateLimiter(max_requests=3, window_seconds=60)
+
+        # Act
+        burst = [limiter.is_allowed(1) for _ in range(4)]
+
+        # Assert
+        assert burst == [True, True, True, False]
+        assert limiter.is_allowed(2)
+
+    def test_should_refill_one_slot_per_interval(self, clock):
+        """Verifica que cada window/max_requests segundos se repone un cupo."""
+        # Arrange
+        limiter = RateLimiter(max_requests=3, window_seconds=60)
+        for _ in range(3):
+            limiter.is_allowed(1)
+
+        # Act
+        time_until_reset = limiter.get_time_until_reset(1)
+        clock.now += 19.9
+        early = limiter.is_allowed(1)
+        clock.now += 0.1
+        refilled = limiter.is_allowed(1)
+
+        # Assert
+        assert time_until_reset == pytest.approx(20)
+        assert not early
+        assert refilled
+        assert not limiter.is_allowed(1)
+
+    def test_should_allow_last_slot_despite_float_rounding(self, clock):
+        """Verifica que el redondeo de (ahora + ventana) - ahora no rechaza el último cupo."""
+        # Arrange
+        clock.now = 8143.556
+        limiter = RateLimiter(max_requests=1, window_seconds=60)
+
+        # Act
+        first = limiter.is_allowed(1)
+
+        # Assert
+        assert (clock.now + 60.0) - clock.now > 60
+        assert first
+        assert not limiter.is_allowed(1)
+
+    def test_should_report_remaining_requests(self, clock):
+        """Verifica que los cupos restantes bajan con cada request y se reponen."""
+        # Arrange
+        limiter = RateLimiter(max_requests=3, window_seconds=60)
+        initial = limiter.get_remaining_requests(1)
+
+        # Act
+        limiter.is_allowed(1)
+        limiter.is_allowed(1)
+        after_two = limiter.get_remaining_requests(1)
+        clock.now += 60
+
+        # Assert
+        assert initial == 3
+        assert after_two == 1
+        assert limiter.get_remaining_requests(1) == 3
+
+    def test_should_not_create_entries_on_queries(self, clock):
+        """Verifica que consultar a un usuario desconocido no ocupa memoria."""
+        # Arrange
+        limiter = RateLimiter()
+
+        # Act
+        limiter.get_remaining_requests(1)
+        limiter.get_time_until_reset(1)
+        limiter.reset_user(1)
+
+        # Assert
+        assert limiter.tat == {}
+
+    def test_should_restore_slots_on_reset(self, clock):
+        """Verifica que reset_user restaura todos los cupos."""
+        # Arrange
+        limiter = RateLimiter(max_requests=1, window_seconds=60)
+        limiter.is_allowed(1)
+        assert not limiter.is_allowed(1)
+
+        # Act
+        limiter.reset_user(1)
+
+        # Assert
+        assert limiter.is_allowed(1)
+
+    def test_should_evict_only_expired_users(self, clock):
+        """Verifica que solo se eliminan los usuarios sin cupos consumidos."""
+        # Arrange
+        limiter = RateLimiter(max_requests=2, window_seconds=60)
+        limiter.is_allowed(1)
+        clock.now += 50
+        limiter.is_allowed(2)
+
+        # Act
+        evicted = limiter.evict_expired()
+
+        # Assert
+        assert evicted == 1
+        assert list(limiter.tat) == [2]
+
+    @pytest.mark.asyncio
+    async def test_should_evict_every_expired_entry_in_batches(self, clock):
+        """Verifica que el barrido por lotes elimina todas las entradas vencidas."""
+        # Arrange
+        limiter = RateLimiter(max_requests=2, window_seconds=60, eviction_batch_size=7)
+        for user_id in range(50):
+            limiter.is_allowed(user_id)
+        clock.now += 31
+
+        # Act
+        evicted = await limiter._evict_incrementally()
+
+        # Assert
+        assert evicted == 50
+        assert limiter.tat == {}
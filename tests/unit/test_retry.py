@@ -0,0 +1,137 @@
+"""
+Tests unitarios para la política de reintentos y las métricas.
+"""
+
+import pytest
+
+from src.utils.metrics import MetricsRegistry, metrics
+from src.utils.retry import RetryBudget, RetryPolicy
+
+
+class TransientError(Exception):
+    """Error transitorio de prueba."""
+
+
+def is_transient(error):
+    """Predicado de prueba."""
+    return isinstance(error, TransientError)
+
+
+class Flaky:
+    """Función que falla N veces antes de responder."""
+
+    def __init__(self, failures, error=TransientError):
+        self.failures = failures
+        self.error = error
+        self.calls = 0
+
+    async def __call__(self):
+        self.calls += 1
+        if self.calls <= self.failures:
+            raise self.error("falla")
+        return "ok"
+
+
+class TestRetryPolicy:
+    """Tests para RetryPolicy."""
+
+    @pytest.fixture
+    def policy(self):
+        """Política con esperas mínimas y presupuesto amplio."""
+        return RetryPolicy(
+            name="test",
+            is_retryable=is_transient,
+            max_attempts=3,
+            base_delay=0.001,
+            max_delay=0.001,
+            budget=RetryBudget(ratio=1.0, min_per_second=0, max_tokens=10)
+        )
+
+    @pytest.mark.asyncio
+    async def test_should_retry_transient_errors_until_success(self, policy):
+        """Verifica que los errores transitorios se reintentan."""
+        # Arrange
+        func = Flaky(failures=2)
+        before = metrics.get_counter("retry_attempts_total", operation="test")
+
+        # Act
+        result = await policy.call(func)
+
+        # Assert
+        assert result == "ok"
+        assert func.calls == 3
+        assert metrics.get_counter("retry_attempts_total", operation="test") == before + 2
+
+    @pytest.mark.asyncio
+    async def test_should_not_retry_permanent_errors(self, policy):
+        """Verifica que los errores no transitorios se relanzan de inmediato."""
+        # Arrange
+        func = Flaky(failures=1, error=ValueError)
+
+        # Act & Assert
+        with pytest.raises(ValueError):
+            await policy.call(func)
+        assert func.calls == 1
+
+    @pytest.mark.asyncio
+    async def test_should_stop_when_budget_exhausted(self):
+        """Verifica que sin presupuesto no hay reintentos."""
+        # Arrange
+        policy = RetryPolicy(
+            name="test_budget",
+            is_retryable=is_transient,
+            max_attempts=5,
+            base_delay=0.001,
+            budget=RetryBudget(ratio=0, min_per_second=0, max_tokens=0)
+        )
+        func = Flaky(failures=3)
+
+        # Act & Assert
+        with pytest.raises(TransientError):
+            await policy.call(func)
+        assert func.calls == 1
+        assert metrics.get_counter("retry_budget_exhausted_total", operation="test_budget") >= 1
+
+    @pytest.mark.asyncio
+    async def test_should_support_sync_functions(self, policy):
+        """Verifica que se aceptan funciones síncronas."""
+        # Act & Assert
+        assert await policy.call(lambda value: value * 2, 21) == 42
+
+
+class TestRetryBudget:
+    """Tests para RetryBudget."""
+
+    def test_should_allow_retries_proportional_to_requests(self):
+        """Verifica que cada llamada deposita `ratio` tokens."""
+        # Arrange
+        budget = RetryBudget(ratio=0.5, min_per_second=0, max_tokens=10)
+        budget._tokens = 0
+
+        # Act
+        budget.record_request()
+        budget.record_request()
+
+        # Assert
+        assert budget.try_acquire() is True
+        assert budget.try_acquire() is False
+
+
+class TestMetricsRegistry:
+    """Tests para MetricsRegistry."""
+
+    def test_should_summarize_timings(self):
+        """Verifica el resumen count/avg/max de tiempos."""
+        # Arrange
+        registry = MetricsRegistry()
+
+        # Act
+        registry.observe("latency_seconds", 0.1, stage="db")
+        registry.observe("latency_seconds", 0.3, stage="db")
+        snapshot = registry.snapshot()
+
+        # Assert
+        timing = snapshot["timings"]["latency_seconds{stage=db}"]
+        assert timing["count"] == 2
+        assert timing["avg"] == pytest.approx(0.2)
+        assert timing["max"] == 0.3
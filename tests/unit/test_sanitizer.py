@@ -0,0 +1,165 @@
+"""
+Tests unitarios para DataSanitizer y la extracción de JSON del LLM.
+"""
+
+import random
+import re
+
+import pytest
+
+from src.services.gemini_service import GeminiService
+from src.utils.helpers import DataSanitizer, SanitizationResult
+
+
+SAFE_MESSAGES = [
+    "Juan Pérez 3001234567 recomendado por María López",
+    "Contacto: Ana Ruiz, tel +57 315-789-4561, me lo pasó Carlos",
+    "Plomero 300 123 4567 (lo recomendó mi mamá) <3",
+    "Precio $50 {aprox}",
+]
+
+UNSAFE_MESSAGES = [
+    "<script>alert('xss')</script>Juan",
+    "javascript:alert(1)",
+    "<img src=x onerror=alert(1)>",
+    "Hola ${7*7}",
+    "{{ config }} Juan",
+    "<iframe src=//evil>",
+    "<OBJECT data=x>",
+    "<embed src=x>",
+]
+
+
+def legacy_is_safe(text: str) -> bool:
+    """Verificación anterior: un re.search por patrón."""
+    return not any(
+        re.search(pattern, text, re.IGNORECASE)
+        for pattern in DataSanitizer.DANGEROUS_PATTERNS
+    )
+
+
+def reference_regex() -> "re.Pattern[str]":
+    """Alternación de los patrones peligrosos, en su orden."""
+    return re.compile(
+        "|".join(f"(?:{pattern})" for pattern in DataSanitizer.DANGEROUS_PATTERNS),
+        re.IGNORECASE
+    )
+
+
+class TestDataSanitizer:
+    """Tests para DataSanitizer."""
+
+    @pytest.mark.parametrize("text", SAFE_MESSAGES + UNSAFE_MESSAGES)
+    def test_should_match_per_pattern_verdict(self, text):
+        """Verifica que el veredicto combinado coincide con revisar cada patrón por separado."""
+        # Act
+        result = DataSanitizer.inspect(text)
+
+        # Assert
+        assert result.safe == legacy_is_safe(text)
+        assert DataSanitizer.is_safe(text) == result.safe
+
+    @pytest.mark.parametrize("text", SAFE_MESSAGES)
+    def test_should_only_escape_safe_text(self, text):
+        """Verifica que el texto seguro solo se escapa y recorta."""
+        # Act
+        result = DataSanitizer.inspect(text)
+
+        # Assert
+        assert result == SanitizationResult(
+            text=DataSanitizer.sanitize(text), safe=True, pattern=None
+        )
+        assert "<" not in result.text
+
+    def test_should_strip_dangerous_patterns(self):
+        """Verifica que todas las coincidencias se remueven y se reporta la primera."""
+        # Arrange
+        text = "<script>x</script>Juan ${a} {{b}} onclick= fin"
+
+        # Act
+        result = DataSanitizer.inspect(text)
+
+        # Assert
+        assert result.safe is False
+        assert result.pattern == DataSanitizer.DANGEROUS_PATTERNS[0]
+        assert result.text == "Juan    fin"
+
+    def test_should_truncate_output(self):
+        """Verifica que la salida se limita a MAX_LENGTH caracteres."""
+        # Arrange
+        text = "a" * 5000
+
+        # Act
+        result = DataSanitizer.inspect(text)
+
+        # Assert
+        assert len(result.text) == DataSanitizer.MAX_LENGTH
+
+    def test_should_accept_empty_text(self):
+        """Verifica que el texto vacío es seguro."""
+        # Act
+        result = DataSanitizer.inspect("")
+
+        # Assert
+        assert result == SanitizationResult("", True)
+        assert DataSanitizer.is_safe("")
+
+    def test_should_match_alternation_of_patterns(self):
+        """Verifica que la regex combinada encuentra las mismas coincidencias que los patrones."""
+        # Arrange
+        reference = reference_regex()
+        pieces = [
+            "<", ">", "script", "SCRIPT", "</script>", "iframe", "Object", "embed",
+            "javascript:", "JavaScript:", "on", "ON", "click", " ", "=", "$", "{",
+            "}", "a", "ó", "\n",
+        ]
+        rng = random.Random(7)
+        texts = [
+            "".join(rng.choice(pieces) for _ in range(rng.randint(1, 12)))
+            for _ in range(3000)
+        ]
+
+        # Act
+        mismatches = [
+            text for text in texts
+            if [(start, end) for start, end, _ in DataSanitizer._matches(text)]
+            != [m.span() for m in reference.finditer(text)]
+        ]
+
+        # Assert
+        assert mismatches == []
+
+    @pytest.mark.parametrize("piece", ["{{}", "${", "${{", "<script>", "on", "onx ", "{"])
+    def test_should_match_reference_on_unclosed_openers(self, piece):
+        """Verifica que descartar aperturas sin cierre no cambia las coincidencias."""
+        # Arrange
+        text = piece * (600 // len(piece)) + "\n" + piece * 3 + "}}</script>="
+
+        # Act
+        actual = [(start, end) for start, end, _ in DataSanitizer._matches(text)]
+
+        # Assert
+        assert actual == [m.span() for m in reference_regex().finditer(text)]
+
+
+class TestLLMJsonExtraction:
+    """Tests para la extracción de JSON de la respuesta del LLM."""
+
+    @pytest.mark.parametrize("response,expected", [
+        ('{"nombre": "Juan"}', {"nombre": "Juan"}),
+        ('```json\n{"nombre": "Juan"}\n```', {"nombre": "Juan"}),
+        ('Claro: {"nombre": "Juan"} listo', {"nombre": "Juan"}),
+        ('texto {"a": 1} y {"b": 2}', {"a": 1}),
+        ("{" * 4096, None),
+        ("sin json", None),
+    ])
+    def test_should_follow_previous_regex_semantics(self, response, expected):
+        """Verifica que la extracción de JSON sigue la semántica de la regex anterior."""
+        # Arrange
+        service = GeminiService(api_key="test")
+
+        # Act
+        result = service._parse_json_response(response)
+
+        # Assert
+        assert result == expected
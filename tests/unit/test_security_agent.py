@@ -2,10 +2,15 @@
 Tests unitarios para SecurityAgent.
 """
 
+import fakeredis
 import pytest
-from unittest.mock import AsyncMock
+from unittest.mock import AsyncMock, MagicMock
 
 from src.agents.security_agent import SecurityAgent
+from src.services.security_state import SecurityState
+from src.utils.failure_tracker import FailedAttemptsTracker
+from src.utils.metrics import metrics
+from src.utils.rate_limit_backend import RedisRateLimitBackend
 
 
 class TestSecurityAgent:
@@ -147,3 +152,214 @@ class TestSecurityAgent:
         assert result["success"] is False
         assert result["error_type"] == "unauthorized"
         assert "bloqueado" in result["error"].lower()
+
+    @pytest.mark.asyncio
+    async def test_should_use_local_extractor_when_confident(
+        self,
+        mock_gemini_service,
+        sample_telegram_message
+    ):
+        """Verifica que no se llama a Gemini si el extractor local es confiable."""
+        # Arrange
+        local_extractor = MagicMock()
+        local_extractor.extract.return_value = {
+            "nombre": "Juan Pérez",
+            "telefono": "+573001234567",
+            "quien_lo_recomendo": "María López",
+            "confidence": 0.99
+        }
+        local_extractor.is_confident.return_value = True
+        agent = SecurityAgent(
+            gemini_service=mock_gemini_service,
+            allowed_users=[123456789],
+            local_extractor=local_extractor
+        )
+
+        # Act
+        result = await agent.process_request(sample_telegram_message)
+
+        # Assert
+        assert result["success"] is True
+        assert result["extractor"] == "local"
+        mock_gemini_service.extract_contact_info.assert_not_called()
+
+
+class TestUnknownIdFlood:
+    """Tests para un flood de IDs desconocidos."""
+
+    @pytest.fixture
+    def agent(self, mock_gemini_service):
+        """Agente con un sketch chico, para que el flood lo sature."""
+        tracker = FailedAttemptsTracker(max_tracked=1000, sketch_width=64, sketch_depth=2)
+        return SecurityAgent(
+            gemini_service=mock_gemini_service,
+            allowed_users=[123456789],
+            max_failed_attempts=3,
+            security_state=SecurityState(tracker)
+        )
+
+    def test_should_not_block_first_time_ids_during_flood(self, agent):
+        """Verifica que blocked_users no crece y un ID nuevo no se bloquea al primer mensaje."""
+        # Arrange
+        for user_id in range(1_000_000, 1_005_000):
+            agent._validate_origin(user_id)
+
+        # Act
+        first_messages = [
+            agent._validate_origin(user_id)["error"]
+            for user_id in range(2_000_000, 2_001_000)
+        ]
+
+        # Assert
+        # El sketch quedó saturado: estimaría un bloqueo para cualquier ID
+        assert agent.failed_attempts.estimate_unknown(3_000_000) >= 3
+        assert len(agent.blocked_users) == 0
+        assert len(agent.failed_attempts._unknown) <= 1000
+        assert not any(error.startswith("Usuario bloqueado") for error in first_messages)
+
+    def test_should_let_unknown_id_in_after_allowlisting(self, agent):
+        """Verifica que un ID que insistió sin autorización entra al agregarlo a la whitelist."""
+        # Arrange
+        for _ in range(5):
+            agent._validate_origin(42)
+        assert agent._validate_origin(42)["error"].startswith("Usuario bloqueado")
+
+        # Act
+        agent.add_user(42)
+
+        # Assert
+        assert agent._validate_origin(42) == {"valid": True}
+
+
+class TestSecurityPipeline:
+    """Tests para el orden y la configuración del pipeline."""
+
+    @pytest.mark.asyncio
+    async def test_should_not_consume_rate_limit_on_rejected_messages(
+        self,
+        mock_gemini_service,
+        sample_telegram_message,
+        mock_gemini_response_success
+    ):
+        """Verifica que un mensaje inválido se rechaza antes de consultar el rate limit."""
+        # Arrange
+        mock_gemini_service.extract_contact_info.return_value = mock_gemini_response_success
+        agent = SecurityAgent(
+            gemini_service=mock_gemini_service,
+            allowed_users=[123456789],
+            max_requests=1
+        )
+        agent.rate_limit_backend.check = AsyncMock(
+            wraps=agent.rate_limit_backend.check
+        )
+
+        # Act
+        suspicious = await agent.process_request(
+            {**sample_telegram_message, "text": "Juan <script>x</script>"}
+        )
+        valid = await agent.process_request(sample_telegram_message)
+
+        # Assert
+        assert suspicious["error_type"] == "suspicious_input"
+        assert valid["success"] is True
+        agent.rate_limit_backend.check.assert_awaited_once()
+
+    @pytest.mark.asyncio
+    async def test_should_follow_configured_order(
+        self,
+        mock_gemini_service,
+        sample_telegram_message
+    ):
+        """Verifica que con rate_limit primero el rate limit se aplica antes del formato."""
+        # Arrange
+        agent = SecurityAgent(
+            gemini_service=mock_gemini_service,
+            allowed_users=[123456789],
+            max_requests=1,
+            checks=["origin", "rate_limit", "message_format", "content"]
+        )
+        short = {**sample_telegram_message, "text": "Hi"}
+
+        # Act
+        first = await agent.process_request(short)
+        second = await agent.process_request(short)
+
+        # Assert
+        assert agent.pipeline.names[:2] == ("origin", "rate_limit")
+        assert first["error_type"] == "invalid_message_format"
+        assert second["error_type"] == "rate_limit_exceeded"
+
+    @pytest.mark.parametrize("checks", [
+        ["message_format", "content"],
+        ["origin", "unknown"],
+        ["origin", "origin"],
+    ])
+    def test_should_reject_invalid_checks(self, mock_gemini_service, checks):
+        """Verifica que sin 'origin', con nombres desconocidos o repetidos es un error."""
+        # Act & Assert
+        with pytest.raises(ValueError):
+            SecurityAgent(
+                gemini_service=mock_gemini_service,
+                allowed_users=[123456789],
+                checks=checks
+            )
+
+
+class TestRateLimitBackendFailure:
+    """Tests para la política ante fallas del backend del rate limiting."""
+
+    @pytest.fixture
+    def broken_backend(self):
+        """Backend Redis con el servidor caído (conexión rechazada)."""
+        server = fakeredis.FakeServer()
+        server.connected = False
+        return RedisRateLimitBackend(fakeredis.FakeAsyncRedis(server=server))
+
+    @pytest.mark.asyncio
+    async def test_should_let_request_through_when_failing_open(
+        self,
+        mock_gemini_service,
+        sample_telegram_message,
+        mock_gemini_response_success,
+        broken_backend
+    ):
+        """Verifica que con fail-open el usuario recibe respuesta aunque Redis falle."""
+        # Arrange
+        agent = SecurityAgent(
+            gemini_service=mock_gemini_service,
+            allowed_users=[123456789],
+            rate_limit_backend=broken_backend
+        )
+        agent.gemini_service.extract_contact_info.return_value = mock_gemini_response_success
+        errors = metrics.get_counter("rate_limit_backend_errors_total")
+
+        # Act
+        result = await agent.process_request(sample_telegram_message)
+
+        # Assert
+        assert result["success"] is True
+        assert metrics.get_counter("rate_limit_backend_errors_total") == errors + 1
+
+    @pytest.mark.asyncio
+    async def test_should_reject_request_when_failing_closed(
+        self,
+        mock_gemini_service,
+        sample_telegram_message,
+        broken_backend
+    ):
+        """Verifica que con fail-closed el usuario recibe un rechazo explícito."""
+        # Arrange
+        agent = SecurityAgent(
+            gemini_service=mock_gemini_service,
+            allowed_users=[123456789],
+            rate_limit_backend=broken_backend,
+            rate_limit_fail_open=False
+        )
+
+        # Act
+        result = await agent.process_request(sample_telegram_message)
+
+        # Assert
+        assert result["success"] is False
+        assert result["error_type"] == "rate_limit_unavailable"
+        agent.gemini_service.extract_contact_info.assert_not_called()
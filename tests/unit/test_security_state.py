@@ -0,0 +1,271 @@
+"""
+Tests unitarios para el estado de seguridad compartido.
+"""
+
+import pytest
+
+from src.agents.security_agent import SecurityAgent
+from src.services.contacts_api import ContactsAPIClient
+from src.services.gemini_service import GeminiService
+from src.services.security_state import (
+    SecurityState,
+    SecurityStateChangeDB,
+    SecurityStateDB,
+    SQLSecurityStateStore
+)
+from src.utils.failure_tracker import FailedAttemptsTracker
+
+
+@pytest.fixture
+def session_factory(tmp_path):
+    """Base de datos SQLite con las tablas creadas."""
+    client = ContactsAPIClient(database_url=f"sqlite:///{tmp_path}/state.db")
+    client.create_tables()
+    return client.SessionLocal
+
+
+def commit_change(session_factory, change_id, user_id, event="block"):
+    """Confirma en el log un evento de otro worker con un id dado."""
+    with session_factory() as db:
+        db.add(SecurityStateChangeDB(
+            id=change_id, user_id=user_id, event=event, worker_id="other"
+        ))
+        db.commit()
+
+
+def make_agent(state, max_failed_attempts=3):
+    """SecurityAgent sin usuarios autorizados."""
+    return SecurityAgent(
+        gemini_service=GeminiService(api_key="test-key"),
+        allowed_users=[],
+        max_failed_attempts=max_failed_attempts,
+        security_state=state
+    )
+
+
+class TestSecurityState:
+    """Tests para el estado en memoria."""
+
+    def test_should_apply_and_notify_changes(self):
+        """Verifica que los cambios se aplican y se notifican a los suscriptores."""
+        # Arrange
+        state = SecurityState()
+        events = []
+        state.subscribe(lambda change: events.append(change.event))
+
+        # Act
+        counts = [state.record_failure(1), state.record_failure(1)]
+        state.block(1, reason="test")
+        state.unblock(1)
+        state.reset_failures(2)  # sin intentos: no genera evento
+
+        # Assert
+        assert counts == [1, 2]
+        assert events == ["failures", "failures", "block", "unblock"]
+        assert 1 not in state.blocked_users
+        assert state.failed_attempts.get(1) is None
+
+
+class TestSQLSecurityStateStore:
+    """Tests para el estado persistido y compartido."""
+
+    def test_should_keep_block_after_restart(self, session_factory):
+        """Verifica que un bloqueo persiste y se carga al reiniciar."""
+        # Arrange
+        store = SQLSecurityStateStore(session_factory)
+        agent = make_agent(store)
+        agent.block_user(666)
+        store.flush()
+
+        # Act
+        restarted = SQLSecurityStateStore(session_factory)
+        restarted.load()
+
+        # Assert
+        assert 666 in restarted.blocked_users
+        assert 666 in make_agent(restarted).blocked_users
+
+    def test_should_sum_failures_across_workers(self, session_factory):
+        """Verifica que los intentos de usuarios conocidos se suman entre workers."""
+        # Arrange
+        worker_a = SQLSecurityStateStore(session_factory)
+        worker_b = SQLSecurityStateStore(session_factory)
+
+        # Act
+        worker_a.record_failure(7)
+        worker_a.record_failure(7)
+        worker_b.record_failure(7)
+        worker_a.sync()
+        worker_b.sync()
+        worker_a.sync()
+
+        # Assert
+        assert worker_a.failed_attempts[7] == 3
+        assert worker_b.failed_attempts[7] == 3
+
+    def test_should_share_block_across_workers(self, session_factory):
+        """Verifica que un bloqueo decidido en un worker llega a los demás."""
+        # Arrange
+        worker_a = SQLSecurityStateStore(session_factory)
+        worker_b = SQLSecurityStateStore(session_factory)
+        agent_a = make_agent(worker_a)
+        agent_b = make_agent(worker_b)
+
+        # Act
+        agent_a.block_user(666)
+        worker_a.sync()
+        worker_b.sync()
+        result = agent_b._validate_origin(666)
+
+        # Assert
+        assert 666 in agent_a.blocked_users
+        assert result["error"].startswith("Usuario bloqueado")
+
+    def test_should_bound_unknown_failures_written_per_flush(self, session_factory):
+        """Verifica que un flood de IDs desconocidos escribe acotado y fuera de la tabla de estado."""
+        # Arrange
+        store = SQLSecurityStateStore(
+            session_factory,
+            failed_attempts=FailedAttemptsTracker(max_tracked=100)
+        )
+        agent = make_agent(store, max_failed_attempts=100)
+
+        # Act
+        for user_id in range(1000, 1500):
+            agent._validate_origin(user_id)
+        written = store.flush()
+
+        # Assert
+        assert written == 100
+        assert len(store.failed_attempts) == 0
+        with session_factory() as db:
+            assert db.query(SecurityStateDB).count() == 0
+
+    def test_should_block_repeated_unknown_id_without_blocked_users(self, session_factory):
+        """Verifica que un ID desconocido que insiste se bloquea sin entrar a blocked_users."""
+        # Arrange
+        store = SQLSecurityStateStore(session_factory)
+        agent = make_agent(store)
+
+        # Act
+        results = [agent._validate_origin(666)["error"] for _ in range(4)]
+        store.flush()
+
+        # Assert
+        assert results[-1].startswith("Usuario bloqueado")
+        assert not results[0].startswith("Usuario bloqueado")
+        assert 666 not in store.blocked_users
+        with session_factory() as db:
+            assert db.query(SecurityStateDB).count() == 0
+
+    def test_should_share_unknown_failures_across_workers(self, session_factory):
+        """Verifica que otro worker no da intentos nuevos a un ID desconocido."""
+        # Arrange
+        worker_a = SQLSecurityStateStore(session_factory)
+        worker_b = SQLSecurityStateStore(session_factory)
+        agent_a = make_agent(worker_a)
+        agent_b = make_agent(worker_b)
+        for _ in range(3):
+            agent_a._validate_origin(666)
+        worker_a.sync()
+
+        # Act
+        worker_b.sync()
+        result = agent_b._validate_origin(666)
+
+        # Assert
+        assert result["error"].startswith("Usuario bloqueado")
+        assert worker_b.failed_attempts.unknown_count(666) == 4
+
+    def test_should_keep_unknown_failures_after_restart(self, session_factory):
+        """Verifica que un reinicio no da intentos nuevos a un ID desconocido."""
+        # Arrange
+        store = SQLSecurityStateStore(session_factory)
+        agent = make_agent(store)
+        for _ in range(3):
+            agent._validate_origin(666)
+        store.flush()
+
+        # Act
+        restarted = SQLSecurityStateStore(session_factory)
+        restarted.load()
+        result = make_agent(restarted)._validate_origin(666)
+
+        # Assert
+        assert result["error"].startswith("Usuario bloqueado")
+        assert 666 not in restarted.blocked_users
+
+    def test_should_notify_remote_changes(self, session_factory):
+        """Verifica que los cambios de otros workers llegan marcados como remotos."""
+        # Arrange
+        worker_a = SQLSecurityStateStore(session_factory)
+        worker_b = SQLSecurityStateStore(session_factory)
+        received = []
+        worker_b.subscribe(received.append)
+
+        # Act
+        worker_a.block(42, reason="manual_block")
+        worker_a.flush()
+        worker_b.refresh()
+        notified = [(c.user_id, c.event, c.remote) for c in received]
+        worker_b.unblock(42)
+        worker_b.flush()
+        worker_a.refresh()
+
+        # Assert
+        assert notified == [(42, "block", True)]
+        assert 42 not in worker_a.blocked_users
+
+    def test_should_validate_origin_without_io(self, session_factory):
+        """Verifica que _validate_origin no consulta la BD."""
+        # Arrange
+        calls = []
+
+        def counting_factory():
+            calls.append(1)
+            return session_factory()
+
+        store = SQLSecurityStateStore(counting_factory)
+        agent = make_agent(store, max_failed_attempts=100)
+        agent.add_user(1)
+
+        # Act
+        for _ in range(10):
+            agent._validate_origin(1)
+            agent._validate_origin(2)
+
+        # Assert
+        assert calls == []
+
+    def test_should_apply_change_committed_out_of_order(self, session_factory):
+        """Verifica que un id menor confirmado después de uno mayor no se pierde."""
+        # Arrange
+        store = SQLSecurityStateStore(session_factory)
+        store.load()
+
+        # Act
+        commit_change(session_factory, 2, user_id=20)
+        first = store.refresh()
+        commit_change(session_factory, 1, user_id=10)
+        second = store.refresh()
+        # Los ya aplicados no se repiten al releer
+        again = store.refresh()
+
+        # Assert
+        assert (first, second, again) == (1, 1, 0)
+        assert store.blocked_users == {10, 20}
+        assert store._last_change_id == 2
+
+    def test_should_give_up_missing_change_after_commit_lag(self, session_factory):
+        """Verifica que un id que nunca aparece (transacción revertida) no frena la lectura."""
+        # Arrange
+        store = SQLSecurityStateStore(session_factory, commit_lag=0)
+        store.load()
+
+        # Act
+        commit_change(session_factory, 2, user_id=20)
+        store.refresh()
+
+        # Assert
+        assert store._last_change_id == 2
+        assert not store._seen_change_ids and not store._missing_change_ids
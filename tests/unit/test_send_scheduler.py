@@ -0,0 +1,225 @@
+"""
+Tests unitarios para el planificador de envíos a Telegram.
+"""
+
+import asyncio
+from time import monotonic
+from types import SimpleNamespace
+
+import pytest
+from telegram.error import BadRequest, RetryAfter
+
+from src.services.send_scheduler import SendPriority, SendScheduler, TokenBucket
+from src.services.telegram_service import TelegramService
+from src.utils.metrics import metrics
+
+
+class FakeBot:
+    """Registra los envíos (chat, texto, instante)."""
+
+    def __init__(self):
+        self.sent = []
+
+    def send(self, chat_id, text):
+        async def call():
+            self.sent.append((chat_id, text, monotonic()))
+            return text
+        return call
+
+
+@pytest.fixture
+async def scheduler():
+    """Planificador sin límites efectivos; se detiene al terminar."""
+    scheduler = SendScheduler(global_rate=1000, chat_rate=1000, chat_burst=10)
+    yield scheduler
+    await scheduler.stop(drain_timeout=0)
+
+
+class TestTokenBucket:
+    """Tests para el token bucket."""
+
+    def test_should_allow_burst_then_rate(self):
+        """Verifica que permite la ráfaga y después un token cada 1/rate segundos."""
+        # Arrange
+        bucket = TokenBucket(rate=10, capacity=2)
+        now = monotonic()
+
+        # Act
+        burst_delays = []
+        for _ in range(2):
+            burst_delays.append(bucket.delay(now))
+            bucket.consume(now)
+
+        # Assert
+        assert burst_delays == [0, 0]
+        assert bucket.delay(now) == pytest.approx(0.1)
+        assert bucket.delay(now + 0.1) == pytest.approx(0, abs=1e-9)
+
+
+class TestSendScheduler:
+    """Tests para el despacho de envíos."""
+
+    @pytest.mark.asyncio
+    async def test_should_return_result(self, scheduler):
+        """Verifica que submit() devuelve el resultado de la llamada."""
+        # Arrange
+        bot = FakeBot()
+
+        # Act
+        result = await scheduler.submit(1, bot.send(1, "hola"))
+
+        # Assert
+        assert result == "hola"
+
+    @pytest.mark.asyncio
+    async def test_should_propagate_errors(self, scheduler):
+        """Verifica que los errores que no son 429 llegan al llamador."""
+        # Arrange
+        async def fail():
+            raise BadRequest("Chat not found")
+
+        # Act & Assert
+        with pytest.raises(BadRequest):
+            await scheduler.submit(1, fail)
+
+    @pytest.mark.asyncio
+    async def test_should_limit_rate_per_chat(self):
+        """Verifica que pasada la ráfaga un chat recibe como máximo chat_rate envíos por segundo."""
+        # Arrange
+        scheduler = SendScheduler(global_rate=1000, chat_rate=20, chat_burst=2)
+        bot = FakeBot()
+
+        # Act
+        await asyncio.gather(*(scheduler.submit(1, bot.send(1, str(i))) for i in range(6)))
+        await scheduler.stop()
+
+        # Assert
+        times = [sent_at for _, _, sent_at in bot.sent]
+        # 2 de ráfaga y 4 más a 20/s: al menos 0.2 s
+        assert times[-1] - times[0] >= 0.18
+        assert [text for _, text, _ in bot.sent] == [str(i) for i in range(6)]
+
+    @pytest.mark.asyncio
+    async def test_should_not_block_other_chats_on_chat_limit(self):
+        """Verifica que un chat limitado no demora a los demás."""
+        # Arrange
+        scheduler = SendScheduler(global_rate=1000, chat_rate=5, chat_burst=1)
+        bot = FakeBot()
+        slow = [
+            asyncio.ensure_future(scheduler.submit(1, bot.send(1, str(i))))
+            for i in range(3)
+        ]
+        await asyncio.sleep(0)
+
+        # Act
+        started = monotonic()
+        await scheduler.submit(2, bot.send(2, "otro"))
+        other_latency = monotonic() - started
+        await asyncio.gather(*slow)
+        await scheduler.stop()
+
+        # Assert
+        assert other_latency < 0.1
+
+    @pytest.mark.asyncio
+    async def test_should_send_confirmations_first(self):
+        """Verifica que con la cola llena las confirmaciones salen antes que lo informativo."""
+        # Arrange
+        scheduler = SendScheduler(global_rate=20, chat_rate=1000, chat_burst=10)
+        bot = FakeBot()
+        # Agotar el bucket global para que se acumule la cola
+        scheduler._global._tokens = 0
+        info = [
+            scheduler.submit(chat_id, bot.send(chat_id, "info"), SendPriority.INFO)
+            for chat_id in range(1, 4)
+        ]
+        confirmation = scheduler.submit(
+            9, bot.send(9, "confirmación"), SendPriority.CONFIRMATION
+        )
+
+        # Act
+        await asyncio.gather(*info, confirmation)
+        await scheduler.stop()
+
+        # Assert
+        assert bot.sent[0][1] == "confirmación"
+
+    @pytest.mark.asyncio
+    async def test_should_pause_chat_and_retry_on_retry_after(self, scheduler):
+        """Verifica que un 429 pausa el chat durante retry_after y el envío se reintenta en orden."""
+        # Arrange
+        bot = FakeBot()
+        attempts = []
+
+        async def flooded():
+            attempts.append(monotonic())
+            if len(attempts) == 1:
+                raise RetryAfter(0.2)
+            return "ok"
+
+        # Act
+        first = asyncio.ensure_future(scheduler.submit(1, flooded))
+        second = asyncio.ensure_future(scheduler.submit(1, bot.send(1, "después")))
+        first_result = await first
+        second_result = await second
+
+        # Assert
+        assert first_result == "ok"
+        assert second_result == "después"
+        assert attempts[1] - attempts[0] >= 0.19
+        assert bot.sent[0][2] >= attempts[1]
+
+    @pytest.mark.asyncio
+    async def test_should_expose_queue_depth_and_latency(self):
+        """Verifica que la profundidad de la cola y la latencia quedan en las métricas."""
+        # Arrange
+        scheduler = SendScheduler(global_rate=1000, chat_rate=10, chat_burst=1)
+        bot = FakeBot()
+        pending = [scheduler.submit(1, bot.send(1, str(i))) for i in range(3)]
+
+        # Act
+        tasks = [asyncio.ensure_future(call) for call in pending]
+        await asyncio.sleep(0)
+        depth_while_queued = scheduler.queue_depth
+        await asyncio.gather(*tasks)
+        await scheduler.stop()
+
+        # Assert
+        assert depth_while_queued == 3
+        assert scheduler.queue_depth == 0
+        assert metrics.snapshot()["gauges"]["send_queue_depth"] == 0
+        assert any(
+            name.startswith("send_latency_seconds")
+            for name in metrics.snapshot()["timings"]
+        )
+
+
+class TestTelegramServiceScheduler:
+    """Tests para los envíos de TelegramService a través del planificador."""
+
+    @pytest.mark.asyncio
+    async def test_should_send_message_through_scheduler(self, monkeypatch):
+        """Verifica que send_message encola la llamada con su prioridad."""
+        # Arrange
+        submitted = []
+
+        class RecordingScheduler(SendScheduler):
+            async def submit(self, chat_id, send, priority=SendPriority.INFO):
+                submitted.append((chat_id, priority))
+                return await send()
+
+        service = TelegramService(bot_token="123:abc", scheduler=RecordingScheduler())
+        sent = []
+
+        async def send_message(**kwargs):
+            sent.append(kwargs)
+
+        monkeypatch.setattr(service, "bot", SimpleNamespace(send_message=send_message))
+
+        # Act
+        result = await service.send_message(42, "hola")
+
+        # Assert
+        assert result
+        assert submitted == [(42, SendPriority.NOTIFICATION)]
+        assert sent[0]["text"] == "hola"
@@ -0,0 +1,148 @@
+"""
+Tests de la detención del orquestador.
+"""
+
+import asyncio
+import os
+import signal
+from types import SimpleNamespace
+from unittest.mock import AsyncMock
+
+import pytest
+
+# main carga la configuración al importarse
+os.environ.setdefault("TELEGRAM_BOT_TOKEN", "123456:test")
+os.environ.setdefault("GEMINI_API_KEY", "test")
+
+import main  # noqa: E402
+from src.services.worker_pool import WorkerPool  # noqa: E402
+
+COMPONENTS = [
+    "send_scheduler",
+    "security_state",
+    "token_quota",
+    "update_deduplicator",
+    "pending_store",
+    "allowlist",
+    "rate_limit_backend",
+    "health_monitor",
+]
+
+
+class Component:
+    """Componente en segundo plano que registra su detención."""
+
+    def __init__(self, name, stopped, fails=False):
+        self.name = name
+        self.stopped = stopped
+        self.fails = fails
+
+    def start(self):
+        pass
+
+    def notify(self):
+        pass
+
+    async def stop(self):
+        self.stopped.append(self.name)
+        if self.fails:
+            raise RuntimeError(f"{self.name} down")
+
+
+class Application:
+    """Application de PTB reducida a su ciclo de vida."""
+
+    def __init__(self, stopped):
+        self.stopped = stopped
+        self.updater = None
+        self.initialize = AsyncMock()
+        self.start = AsyncMock()
+
+    async def stop(self):
+        self.stopped.append("application")
+
+
+@pytest.fixture
+def stopped():
+    """Orden en que se detienen los componentes."""
+    return []
+
+
+@pytest.fixture
+def orchestrator(stopped):
+    """Orquestador con componentes simulados y el pool de confirmaciones real."""
+    orchestrator = main.ContactsOrchestrator.__new__(main.ContactsOrchestrator)
+    for name in COMPONENTS:
+        setattr(orchestrator, name, Component(name, stopped))
+    orchestrator.security_agent = SimpleNamespace(
+        rate_limit_backend=orchestrator.rate_limit_backend
+    )
+    orchestrator.confirmation_workers = WorkerPool("confirmations", workers=1)
+    orchestrator.application = Application(stopped)
+    orchestrator.webhook_server = None
+    orchestrator.telegram_service = SimpleNamespace(
+        get_bot_info=AsyncMock(return_value={"id": 1, "username": "test_bot"})
+    )
+    orchestrator._start_receiving_updates = AsyncMock()
+    return orchestrator
+
+
+async def wait_running(orchestrator):
+    """Deja correr run() hasta que quede esperando la señal de parada."""
+    task = asyncio.create_task(orchestrator.run())
+    for _ in range(100):
+        if orchestrator.confirmation_workers._tasks:
+            break
+        await asyncio.sleep(0.01)
+    return task
+
+
+class TestShutdown:
+    """Tests para la detención ordenada."""
+
+    @pytest.mark.asyncio
+    async def test_should_stop_every_component_when_run_is_cancelled(self, orchestrator, stopped):
+        """Verifica que con asyncio.run, Ctrl+C llega como cancelación e igual se detiene todo."""
+        # Arrange
+        task = await wait_running(orchestrator)
+        saved = []
+
+        async def save():
+            await asyncio.sleep(0.05)
+            saved.append(True)
+
+        await orchestrator.confirmation_workers.submit(save)
+
+        # Act & Assert
+        task.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await task
+        assert stopped == ["application"] + COMPONENTS
+        assert saved == [True]
+        assert not orchestrator.confirmation_workers._tasks
+
+    @pytest.mark.asyncio
+    async def test_should_stop_the_bot_on_sigterm(self, orchestrator, stopped):
+        """Verifica que SIGTERM detiene la aplicación y todos los componentes."""
+        # Arrange
+        task = await wait_running(orchestrator)
+
+        # Act
+        os.kill(os.getpid(), signal.SIGTERM)
+        await asyncio.wait_for(task, timeout=2)
+
+        # Assert
+        assert stopped == ["application"] + COMPONENTS
+
+    @pytest.mark.asyncio
+    async def test_should_not_skip_the_rest_when_a_step_fails(self, orchestrator, stopped):
+        """Verifica que si un componente falla al detenerse se siguen deteniendo los demás."""
+        # Arrange
+        orchestrator.security_state.fails = True
+        orchestrator.webhook_server = Component("webhook_server", stopped)
+
+        # Act
+        await orchestrator.shutdown()
+
+        # Assert
+        assert stopped == ["webhook_server", "application"] + COMPONENTS
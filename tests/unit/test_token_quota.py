@@ -0,0 +1,325 @@
+"""
+Tests unitarios para las cuotas de tokens del LLM.
+"""
+
+import asyncio
+from types import SimpleNamespace
+
+import httpx
+import pytest
+from openai import APITimeoutError
+
+from src.agents.security_agent import SecurityAgent
+from src.services import token_quota as token_quota_module
+from src.services.contacts_api import ContactsAPIClient
+from src.services.gemini_service import GeminiService, is_transient_llm_error
+from src.services.token_quota import SQLTokenQuotaStore, TokenQuota
+from src.utils.deadline import Deadline
+from src.utils.retry import RetryBudget, RetryPolicy
+
+
+class FakeClock:
+    """Reloj de pared controlable."""
+
+    def __init__(self):
+        self.now = 86400.0 * 20000 + 3600
+
+    def __call__(self):
+        return self.now
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    """Reemplaza time() del módulo por un reloj controlable."""
+    fake = FakeClock()
+    monkeypatch.setattr(token_quota_module, "time", fake)
+    return fake
+
+
+@pytest.fixture
+def session_factory(tmp_path):
+    """Base de datos SQLite con las tablas creadas."""
+    client = ContactsAPIClient(database_url=f"sqlite:///{tmp_path}/quota.db")
+    client.create_tables()
+    return client.SessionLocal
+
+
+class TestTokenQuota:
+    """Tests para las cuotas en memoria."""
+
+    def test_should_replace_reservation_with_actual_usage(self, clock):
+        """Verifica que la reserva se reemplaza por los tokens reales."""
+        # Arrange
+        quota = TokenQuota(user_limit=1000)
+
+        # Act
+        decision = quota.reserve(1, 300)
+        reserved = quota.usage(1)
+        quota.settle(decision.reservation, tokens_used=120)
+
+        # Assert
+        assert decision.allowed
+        assert reserved == (300, 300)
+        assert quota.usage(1) == (120, 120)
+
+    def test_should_refund_reservation_without_usage(self, clock):
+        """Verifica que sin tokens consumidos la reserva se devuelve."""
+        # Arrange
+        quota = TokenQuota(user_limit=1000)
+        reservation = quota.reserve(1, 300).reservation
+
+        # Act
+        quota.settle(reservation, tokens_used=None)
+
+        # Assert
+        assert quota.usage(1) == (0, 0)
+
+    def test_should_apply_user_limit_per_user(self, clock):
+        """Verifica que agotar la cuota de un usuario no afecta a otro."""
+        # Arrange
+        quota = TokenQuota(user_limit=500)
+        quota.settle(quota.reserve(1, 400).reservation, tokens_used=400)
+
+        # Act
+        decision = quota.reserve(1, 200)
+
+        # Assert
+        assert not decision.allowed
+        assert decision.scope == "user"
+        assert decision.retry_after == pytest.approx(86400 - 3600)
+        assert quota.reserve(2, 200).allowed
+
+    def test_should_sum_every_user_in_global_limit(self, clock):
+        """Verifica que la cuota global suma a todos los usuarios."""
+        # Arrange
+        quota = TokenQuota(user_limit=1000, global_limit=500)
+        quota.reserve(1, 300)
+
+        # Act
+        decision = quota.reserve(2, 300)
+
+        # Assert
+        assert not decision.allowed
+        assert decision.scope == "global"
+
+    def test_should_allow_everything_without_limits(self, clock):
+        """Verifica que con límites en 0 todo se permite."""
+        # Arrange
+        quota = TokenQuota()
+
+        # Act
+        decision = quota.reserve(1, 10 ** 9)
+
+        # Assert
+        assert decision.allowed
+
+    def test_should_reset_usage_in_new_period(self, clock):
+        """Verifica que al empezar un periodo nuevo las cuotas se renuevan."""
+        # Arrange
+        quota = TokenQuota(user_limit=500)
+        reservation = quota.reserve(1, 500).reservation
+        assert not quota.check(1, 1).allowed
+
+        # Act
+        clock.now += 86400
+        renewed = quota.check(1, 500)
+        # Ajustar una reserva del periodo anterior no toca el actual
+        quota.settle(reservation, tokens_used=100)
+
+        # Assert
+        assert renewed.allowed
+        assert quota.usage(1) == (0, 0)
+
+
+class TestSQLTokenQuotaStore:
+    """Tests para las cuotas persistidas."""
+
+    def test_should_keep_usage_after_restart(self, clock, session_factory):
+        """Verifica que los consumos escritos se cargan en un proceso nuevo."""
+        # Arrange
+        store = SQLTokenQuotaStore(session_factory, user_limit=1000)
+        store.settle(store.reserve(1, 300).reservation, tokens_used=250)
+        store.flush()
+
+        # Act
+        restarted = SQLTokenQuotaStore(session_factory, user_limit=1000)
+        restarted.load()
+
+        # Assert
+        assert restarted.usage(1) == (250, 250)
+        assert not restarted.check(1, 800).allowed
+
+    def test_should_share_usage_between_workers(self, clock, session_factory):
+        """Verifica que los totales releídos incluyen lo de otros workers y lo pendiente."""
+        # Arrange
+        first = SQLTokenQuotaStore(session_factory, global_limit=1000)
+        second = SQLTokenQuotaStore(session_factory, global_limit=1000)
+        first.settle(first.reserve(1, 400).reservation, tokens_used=400)
+        first.flush()
+        second.reserve(2, 100)
+
+        # Act
+        period = second._current_period()
+        second._apply_totals(period, second._fetch_totals(period))
+
+        # Assert
+        assert second.usage(2) == (100, 500)
+        assert not second.check(2, 600).allowed
+
+    def test_should_prune_old_periods(self, clock, session_factory):
+        """Verifica que los periodos fuera de la retención se eliminan."""
+        # Arrange
+        store = SQLTokenQuotaStore(session_factory, retention_periods=2)
+        store.reserve(1, 100)
+        store.flush()
+        clock.now += 86400 * 3
+        store._current_period()
+
+        # Act
+        pruned = store.prune()
+
+        # Assert
+        assert pruned == 2
+
+
+class TestSecurityAgentQuota:
+    """Tests para la verificación de cuota en SecurityAgent."""
+
+    def _message(self):
+        return {"text": "Juan Pérez 3001234567 ref María", "user_id": 123, "chat_id": 1}
+
+    @pytest.mark.asyncio
+    async def test_should_charge_reported_tokens(
+        self, clock, mock_gemini_service, mock_gemini_response_success
+    ):
+        """Verifica que se cobran los tokens que reporta la API, no el estimado."""
+        # Arrange
+        quota = TokenQuota(user_limit=1000)
+        mock_gemini_service.estimate_tokens.return_value = 300
+        mock_gemini_service.extract_contact_info.return_value = {
+            **mock_gemini_response_success,
+            "tokens_used": 180
+        }
+        agent = SecurityAgent(
+            gemini_service=mock_gemini_service,
+            allowed_users=[123],
+            token_quota=quota
+        )
+
+        # Act
+        result = await agent.process_request(self._message())
+
+        # Assert
+        assert result["success"]
+        assert quota.usage(123) == (180, 180)
+
+    @pytest.mark.asyncio
+    async def test_should_skip_llm_call_over_quota(self, clock, mock_gemini_service):
+        """Verifica que sin cuota no se llama al LLM."""
+        # Arrange
+        quota = TokenQuota(user_limit=200)
+        mock_gemini_service.estimate_tokens.return_value = 300
+        agent = SecurityAgent(
+            gemini_service=mock_gemini_service,
+            allowed_users=[123],
+            token_quota=quota
+        )
+
+        # Act
+        result = await agent.process_request(self._message())
+
+        # Assert
+        assert result["error_type"] == "quota_exceeded"
+        mock_gemini_service.extract_contact_info.assert_not_called()
+
+
+class TestGeminiTokenUsage:
+    """Tests para el cobro de tokens de llamadas sin respuesta y reintentos."""
+
+    def _message(self):
+        return {"text": "Juan Pérez 3001234567 ref María", "user_id": 123, "chat_id": 1}
+
+    @pytest.fixture
+    def gemini(self):
+        """GeminiService real sin red, con reintentos inmediatos."""
+        return GeminiService(
+            api_key="test-key",
+            retry_policy=RetryPolicy(
+                "llm",
+                is_retryable=is_transient_llm_error,
+                base_delay=0.001,
+                max_delay=0.001,
+                budget=RetryBudget()
+            )
+        )
+
+    @staticmethod
+    def _response(total_tokens):
+        """Respuesta de OpenAI con un contacto y el uso reportado."""
+        content = '{"nombre": "Juan Pérez", "telefono": "3001234567", "quien_lo_recomendo": "María"}'
+        return SimpleNamespace(
+            choices=[SimpleNamespace(message=SimpleNamespace(content=content))],
+            usage=SimpleNamespace(total_tokens=total_tokens)
+        )
+
+    @pytest.mark.asyncio
+    async def test_should_charge_estimate_when_call_times_out(self, clock, gemini):
+        """Verifica que una llamada enviada que se corta por el deadline cobra el estimado."""
+        # Arrange
+        async def slow(prompt):
+            await asyncio.sleep(5)
+
+        gemini._call_openai_async = slow
+        quota = TokenQuota(user_limit=10000)
+        agent = SecurityAgent(gemini_service=gemini, allowed_users=[123], token_quota=quota)
+        estimate = gemini.estimate_tokens(self._message()["text"])
+
+        # Act
+        result = await agent.process_request(self._message(), deadline=Deadline(0.1))
+
+        # Assert
+        assert result["error_type"] == "deadline_exceeded"
+        assert quota.usage(123) == (estimate, estimate)
+
+    @pytest.mark.asyncio
+    async def test_should_sum_usage_across_retries(self, clock, gemini):
+        """Verifica que se suman el intento sin respuesta y el uso del reintento."""
+        # Arrange
+        attempts = []
+
+        async def flaky(prompt):
+            attempts.append(prompt)
+            if len(attempts) == 1:
+                raise APITimeoutError(request=httpx.Request("POST", "https://api.openai.com"))
+            return self._response(180)
+
+        gemini._call_openai_async = flaky
+        quota = TokenQuota(user_limit=10000)
+        agent = SecurityAgent(gemini_service=gemini, allowed_users=[123], token_quota=quota)
+        estimate = gemini.estimate_tokens(self._message()["text"])
+
+        # Act
+        result = await agent.process_request(self._message())
+
+        # Assert
+        assert result["success"] is True
+        assert len(attempts) == 2
+        assert quota.usage(123) == (estimate + 180, estimate + 180)
+
+    @pytest.mark.asyncio
+    async def test_should_refund_when_api_fails_fast(self, clock, gemini):
+        """Verifica que un error de la API sin generación devuelve la reserva."""
+        # Arrange
+        async def rejected(prompt):
+            raise ValueError("400 bad request")
+
+        gemini._call_openai_async = rejected
+        quota = TokenQuota(user_limit=10000)
+        agent = SecurityAgent(gemini_service=gemini, allowed_users=[123], token_quota=quota)
+
+        # Act
+        result = await agent.process_request(self._message())
+
+        # Assert
+        assert result["error_type"] == "extraction_failed"
+        assert quota.usage(123) == (0, 0)
@@ -0,0 +1,216 @@
+"""
+Tests unitarios para la deduplicación de updates.
+"""
+
+import asyncio
+from types import SimpleNamespace
+
+import pytest
+
+from src.services import update_dedup as update_dedup_module
+from src.services.contacts_api import ContactsAPIClient
+from src.services.update_dedup import SQLUpdateDeduplicator, UpdateDeduplicator
+from src.services.update_processor import ChatOrderedUpdateProcessor
+
+
+class FakeClock:
+    """Reloj monotónico controlable."""
+
+    def __init__(self):
+        self.now = 1000.0
+
+    def __call__(self):
+        return self.now
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    """Reemplaza monotonic() del módulo por un reloj controlable."""
+    fake = FakeClock()
+    monkeypatch.setattr(update_dedup_module, "monotonic", fake)
+    return fake
+
+
+@pytest.fixture
+def session_factory(tmp_path):
+    """Base de datos SQLite con las tablas creadas."""
+    client = ContactsAPIClient(database_url=f"sqlite:///{tmp_path}/updates.db")
+    client.create_tables()
+    return client.SessionLocal
+
+
+class TestUpdateDeduplicator:
+    """Tests para el deduplicador en memoria."""
+
+    def test_should_drop_second_delivery(self, clock):
+        """Verifica que el mismo update_id se procesa una sola vez."""
+        # Arrange
+        dedup = UpdateDeduplicator()
+
+        # Act
+        first = dedup.is_duplicate(10)
+        second = dedup.is_duplicate(10)
+
+        # Assert
+        assert not first
+        assert second
+
+    def test_should_accept_out_of_order_updates_within_window(self, clock):
+        """Verifica que dentro de la ventana el orden de llegada no importa."""
+        # Arrange
+        dedup = UpdateDeduplicator()
+
+        # Act
+        first_delivery = [dedup.is_duplicate(12), dedup.is_duplicate(11)]
+        redelivery = [dedup.is_duplicate(12), dedup.is_duplicate(11)]
+
+        # Assert
+        assert first_delivery == [False, False]
+        assert redelivery == [True, True]
+
+    def test_should_cover_expired_entries_with_floor(self, clock):
+        """Verifica que al salir de la ventana los update_id quedan cubiertos por la marca."""
+        # Arrange
+        dedup = UpdateDeduplicator(window_seconds=60)
+        dedup.is_duplicate(10)
+
+        # Act
+        clock.now += 120
+        duplicate = dedup.is_duplicate(11)
+
+        # Assert
+        assert not duplicate
+        assert len(dedup._seen) == 1
+        assert dedup.floor == 10
+        assert dedup.is_duplicate(10)
+
+    def test_should_bound_size(self, clock):
+        """Verifica que el registro no supera max_size."""
+        # Arrange
+        dedup = UpdateDeduplicator(max_size=100)
+
+        # Act
+        for update_id in range(1, 1001):
+            dedup.is_duplicate(update_id)
+
+        # Assert
+        assert len(dedup._seen) <= 101
+        assert dedup.is_duplicate(5)
+        assert dedup.high_water_mark == 1000
+
+
+class TestSQLUpdateDeduplicator:
+    """Tests para la marca de agua persistida."""
+
+    def test_should_keep_high_water_mark_after_restart(self, clock, session_factory):
+        """Verifica que un proceso nuevo descarta los updates que procesó el anterior."""
+        # Arrange
+        dedup = SQLUpdateDeduplicator(session_factory)
+        dedup.load()
+        for update_id in (100, 101, 102):
+            dedup.is_duplicate(update_id)
+
+        # Act
+        written = dedup.flush()
+        rewritten = dedup.flush()
+        restarted = SQLUpdateDeduplicator(session_factory)
+        restarted.load()
+
+        # Assert
+        assert written
+        assert not rewritten
+        assert restarted.is_duplicate(101)
+        assert restarted.is_duplicate(102)
+        assert not restarted.is_duplicate(103)
+
+    def test_should_never_decrease_high_water_mark(self, clock, session_factory):
+        """Verifica que un worker con una marca menor no pisa la de otro."""
+        # Arrange
+        first = SQLUpdateDeduplicator(session_factory)
+        second = SQLUpdateDeduplicator(session_factory)
+        first.is_duplicate(500)
+        second.is_duplicate(300)
+
+        # Act
+        first.flush()
+        second.flush()
+        restarted = SQLUpdateDeduplicator(session_factory)
+        restarted.load()
+
+        # Assert
+        assert restarted.floor == 500
+
+    @pytest.mark.asyncio
+    async def test_should_persist_mark_when_update_is_registered(self, clock, session_factory):
+        """Verifica que la marca se escribe al registrar el update, sin esperar un timer."""
+        # Arrange
+        dedup = SQLUpdateDeduplicator(session_factory)
+        dedup.load()
+        dedup.start()
+
+        # Act
+        try:
+            dedup.is_duplicate(700)
+            for _ in range(100):
+                if dedup._persisted == 700:
+                    break
+                await asyncio.sleep(0.01)
+            restarted = SQLUpdateDeduplicator(session_factory)
+            restarted.load()
+        finally:
+            await dedup.stop()
+
+        # Assert
+        assert restarted.floor == 700
+
+    @pytest.mark.asyncio
+    async def test_should_not_persist_past_update_waiting_for_its_chat(
+        self, clock, session_factory
+    ):
+        """Verifica que un update que espera su chat no queda bajo la marca tras una caída."""
+        # Arrange
+        processor = ChatOrderedUpdateProcessor(workers=4)
+        dedup = SQLUpdateDeduplicator(
+            session_factory, waiting=processor.lowest_waiting_update_id
+        )
+        dedup.load()
+        release = asyncio.Event()
+
+        async def handle(update_id, blocking=False):
+            # Como drop_duplicate_update (grupo -1) al empezar el update
+            dedup.is_duplicate(update_id)
+            if blocking:
+                await release.wait()
+
+        def make_update(update_id, chat_id):
+            return SimpleNamespace(
+                update_id=update_id,
+                effective_chat=SimpleNamespace(id=chat_id),
+                effective_user=None
+            )
+
+        tasks = [
+            asyncio.create_task(processor.process_update(make_update(10, 1), handle(10, True))),
+            asyncio.create_task(processor.process_update(make_update(11, 1), handle(11))),
+            asyncio.create_task(processor.process_update(make_update(12, 2), handle(12))),
+        ]
+        for _ in range(100):
+            if 12 in dedup._seen:
+                break
+            await asyncio.sleep(0.01)
+
+        # Act
+        dedup.flush(dedup.persistable_mark)
+        restarted = SQLUpdateDeduplicator(session_factory)
+        restarted.load()
+
+        # Assert
+        assert dedup.high_water_mark == 12
+        assert processor.lowest_waiting_update_id() == 11
+        assert restarted.floor == 10
+        assert not restarted.is_duplicate(11)
+
+        release.set()
+        await asyncio.gather(*tasks)
+        assert processor.lowest_waiting_update_id() is None
+        assert dedup.persistable_mark == 12
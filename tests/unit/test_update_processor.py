@@ -0,0 +1,149 @@
+"""
+Tests unitarios para el procesamiento concurrente de updates.
+"""
+
+import asyncio
+from types import SimpleNamespace
+
+import pytest
+
+from src.services.update_processor import ChatOrderedUpdateProcessor
+from src.utils.metrics import metrics
+
+
+def make_update(update_id, chat_id):
+    """Update mínimo con chat."""
+    return SimpleNamespace(
+        update_id=update_id,
+        effective_chat=SimpleNamespace(id=chat_id),
+        effective_user=None
+    )
+
+
+class TestChatOrderedUpdateProcessor:
+    """Tests para ChatOrderedUpdateProcessor."""
+
+    async def _run(self, processor, jobs):
+        """Procesa (update, corrutina) en el orden dado, como la Application."""
+        await asyncio.gather(*(
+            processor.process_update(update, coroutine) for update, coroutine in jobs
+        ))
+
+    @pytest.mark.asyncio
+    async def test_should_process_same_chat_in_order(self):
+        """Verifica que los updates de un chat no se solapan y respetan el orden."""
+        # Arrange
+        processor = ChatOrderedUpdateProcessor(workers=4)
+        events = []
+
+        async def handle(update_id, delay):
+            events.append(("start", update_id))
+            await asyncio.sleep(delay)
+            events.append(("end", update_id))
+
+        # Act
+        await self._run(processor, [
+            (make_update(1, chat_id=7), handle(1, 0.03)),
+            (make_update(2, chat_id=7), handle(2, 0.0)),
+            (make_update(3, chat_id=7), handle(3, 0.01)),
+        ])
+
+        # Assert
+        assert events == [
+            ("start", 1), ("end", 1),
+            ("start", 2), ("end", 2),
+            ("start", 3), ("end", 3),
+        ]
+        assert processor._chats == {}
+
+    @pytest.mark.asyncio
+    async def test_should_run_different_chats_concurrently(self):
+        """Verifica que chats distintos se procesan a la vez hasta `workers`."""
+        # Arrange
+        processor = ChatOrderedUpdateProcessor(workers=2)
+        running = 0
+        peak = 0
+
+        async def handle():
+            nonlocal running, peak
+            running += 1
+            peak = max(peak, running)
+            await asyncio.sleep(0.02)
+            running -= 1
+
+        # Act
+        await self._run(processor, [
+            (make_update(i, chat_id=i), handle()) for i in range(6)
+        ])
+
+        # Assert
+        assert peak == 2
+
+    @pytest.mark.asyncio
+    async def test_should_not_starve_other_chats_behind_busy_chat(self):
+        """Verifica que los updates que esperan a su chat no ocupan workers."""
+        # Arrange
+        processor = ChatOrderedUpdateProcessor(workers=2)
+        finished = []
+
+        async def handle(name, delay):
+            await asyncio.sleep(delay)
+            finished.append(name)
+
+        jobs = [(make_update(i, chat_id=1), handle(f"busy-{i}", 0.02)) for i in range(5)]
+        jobs.append((make_update(99, chat_id=2), handle("other", 0.0)))
+
+        # Act
+        await self._run(processor, jobs)
+
+        # Assert
+        assert finished.index("other") <= 1
+
+    @pytest.mark.asyncio
+    async def test_should_report_queue_wait(self):
+        """Verifica que la espera en cola de cada update se registra."""
+        # Arrange
+        processor = ChatOrderedUpdateProcessor(workers=1)
+
+        async def handle():
+            await asyncio.sleep(0.01)
+
+        before = metrics.snapshot()["timings"].get("update_queue_wait_seconds", {}).get("count", 0)
+
+        # Act
+        await self._run(processor, [(make_update(i, chat_id=i), handle()) for i in range(3)])
+
+        # Assert
+        timing = metrics.snapshot()["timings"]["update_queue_wait_seconds"]
+        assert timing["count"] == before + 3
+        assert timing["max"] >= 0.015
+
+    @pytest.mark.asyncio
+    async def test_should_forget_waiting_update_when_cancelled(self):
+        """Verifica que un update cancelado antes de empezar deja de contar como en espera."""
+        # Arrange
+        processor = ChatOrderedUpdateProcessor(workers=1)
+        release = asyncio.Event()
+        first = asyncio.create_task(
+            processor.process_update(make_update(1, chat_id=1), release.wait())
+        )
+        second = asyncio.create_task(
+            processor.process_update(make_update(2, chat_id=1), asyncio.sleep(0))
+        )
+        await asyncio.sleep(0.01)
+        assert processor.lowest_waiting_update_id() == 2
+
+        # Act
+        second.cancel()
+        await asyncio.gather(second, return_exceptions=True)
+
+        # Assert
+        assert processor.lowest_waiting_update_id() is None
+        release.set()
+        await first
+
+    def test_should_require_positive_workers(self):
+        """Verifica que workers debe ser positivo."""
+        # Act & Assert
+        with pytest.raises(ValueError):
+            ChatOrderedUpdateProcessor(workers=0)
@@ -57,6 +57,22 @@ class TestMessageValidator:
         assert result["valid"] is False
         assert "corto" in result["error"].lower()
 
+    def test_should_reject_long_message_before_other_checks(self, validator):
+        """Verifica que la longitud máxima se revisa antes que el contenido."""
+        # Arrange
+        message = {
+            "text": " " * (validator.max_length + 1),
+            "user_id": 123,
+            "chat_id": 456
+        }
+
+        # Act
+        result = validator.validate(message)
+
+        # Assert
+        assert result["valid"] is False
+        assert "largo" in result["error"].lower()
+
     def test_should_reject_message_without_required_fields(self, validator):
         """Verifica rechazo de mensaje sin campos requeridos."""
         # Arrange
@@ -0,0 +1,185 @@
+"""
+Tests unitarios para los vCard de varios contactos y la reutilización de file_id.
+"""
+
+import hashlib
+from types import SimpleNamespace
+
+import pytest
+from telegram.error import BadRequest
+
+from src.services.telegram_service import TelegramService
+from src.utils.helpers import iter_vcards, vcard_bundle_to_file
+
+CONTACTS = [
+    {"nombre": "Juan Pérez", "telefono": "+573001234567", "quien_lo_recomendo": "María"},
+    {"nombre": "Ana Gómez", "telefono": "+573109876543", "quien_lo_recomendo": "Pedro"},
+]
+
+
+class FakeBot:
+    """Registra los documentos enviados y devuelve un file_id por subida."""
+
+    def __init__(self, rejected=()):
+        self.documents = []
+        self.rejected = set(rejected)
+
+    async def send_document(self, chat_id, document, filename, caption):
+        if isinstance(document, str):
+            self.documents.append(document)
+            if document in self.rejected:
+                raise BadRequest("Wrong file identifier/http url specified")
+            return SimpleNamespace(document=SimpleNamespace(file_id=document))
+
+        content = document.read()
+        self.documents.append(content)
+        file_id = "F" + hashlib.sha256(content).hexdigest()[:8]
+        return SimpleNamespace(document=SimpleNamespace(file_id=file_id))
+
+
+def service_with(bot, **kwargs):
+    """TelegramService que entrega documentos a través del bot simulado."""
+    service = TelegramService(bot_token="123456:test", contact_delivery="document", **kwargs)
+    service.bot = bot
+    return service
+
+
+class TestVCardBundle:
+    """Tests para el vCard de varios contactos."""
+
+    def test_should_generate_vcards_lazily(self):
+        """Verifica que cada entrada se genera al consumirla."""
+        # Arrange
+        def contacts():
+            yield CONTACTS[0]
+            raise AssertionError("se leyó más de lo necesario")
+
+        # Act
+        entry = next(iter_vcards(contacts()))
+
+        # Assert
+        assert entry.startswith(b"BEGIN:VCARD") and entry.endswith(b"END:VCARD\n")
+
+    def test_should_bundle_all_entries_with_content_hash(self):
+        """Verifica que el archivo lleva todas las entradas, su tamaño y su hash."""
+        # Act
+        bundle = vcard_bundle_to_file(iter(CONTACTS))
+        with bundle.file:
+            content = bundle.file.read()
+
+        # Assert
+        assert content.count(b"BEGIN:VCARD") == bundle.count == 2
+        assert bundle.size == len(content)
+        assert bundle.digest == hashlib.sha256(content).hexdigest()
+        assert "Ana Gómez" in content.decode("utf-8")
+
+    def test_should_spill_bundle_to_disk(self):
+        """Verifica que por encima de max_memory el archivo pasa a disco."""
+        # Act
+        bundle = vcard_bundle_to_file(CONTACTS * 50, max_memory=256)
+        with bundle.file:
+            rolled = bundle.file._rolled
+            content = bundle.file.read()
+
+        # Assert
+        assert rolled
+        assert content.count(b"BEGIN:VCARD") == 100
+
+
+class TestFileIdReuse:
+    """Tests para el reenvío de archivos ya subidos."""
+
+    @pytest.mark.asyncio
+    async def test_should_upload_same_vcard_once(self):
+        """Verifica que el mismo vCard se sube una vez y después se reenvía por file_id."""
+        # Arrange
+        bot = FakeBot()
+        service = service_with(bot)
+
+        # Act
+        sent = [await service.send_vcard_document(1, **CONTACTS[0]) for _ in range(3)]
+
+        # Assert
+        assert all(sent)
+        upload, *resends = bot.documents
+        assert isinstance(upload, bytes)
+        assert len(resends) == 2 and all(isinstance(doc, str) for doc in resends)
+
+    @pytest.mark.asyncio
+    async def test_should_upload_different_content(self):
+        """Verifica que un vCard con otro contenido se sube de nuevo."""
+        # Arrange
+        bot = FakeBot()
+        service = service_with(bot)
+
+        # Act
+        await service.send_vcard_document(1, **CONTACTS[0])
+        await service.send_vcard_document(1, **{**CONTACTS[0], "quien_lo_recomendo": "Luis"})
+
+        # Assert
+        assert all(isinstance(doc, bytes) for doc in bot.documents)
+
+    @pytest.mark.asyncio
+    async def test_should_upload_again_on_rejected_file_id(self):
+        """Verifica que si Telegram no reconoce el file_id se vuelve a subir el archivo."""
+        # Arrange
+        bot = FakeBot()
+        service = service_with(bot)
+        await service.send_vcard_document(1, **CONTACTS[0])
+        bot.rejected.add(next(iter(service._file_ids.values())))
+
+        # Act
+        sent = await service.send_vcard_document(1, **CONTACTS[0])
+
+        # Assert
+        assert sent
+        assert [type(doc) for doc in bot.documents] == [bytes, str, bytes]
+
+    @pytest.mark.asyncio
+    async def test_should_evict_oldest_file_id(self):
+        """Verifica que la caché de file_id descarta el menos reciente."""
+        # Arrange
+        bot = FakeBot()
+        service = service_with(bot, file_id_cache_size=1)
+
+        # Act
+        await service.send_vcard_document(1, **CONTACTS[0])
+        await service.send_vcard_document(1, **CONTACTS[1])
+        await service.send_vcard_document(1, **CONTACTS[0])
+
+        # Assert
+        assert all(isinstance(doc, bytes) for doc in bot.documents)
+        assert len(service._file_ids) == 1
+
+    @pytest.mark.asyncio
+    async def test_should_reuse_bundle_by_content(self):
+        """Verifica que el mismo export se reenvía por file_id y uno distinto se sube."""
+        # Arrange
+        bot = FakeBot()
+        service = service_with(bot)
+
+        # Act
+        sent = [
+            await service.send_vcard_bundle(1, CONTACTS),
+            await service.send_vcard_bundle(2, iter(CONTACTS)),
+            await service.send_vcard_bundle(1, CONTACTS[:1]),
+        ]
+
+        # Assert
+        assert all(sent)
+        assert [type(doc) for doc in bot.documents] == [bytes, str, bytes]
+        assert bot.documents[0].count(b"BEGIN:VCARD") == 2
+
+    @pytest.mark.asyncio
+    async def test_should_always_upload_with_cache_disabled(self):
+        """Verifica que con la caché desactivada cada envío sube el archivo."""
+        # Arrange
+        bot = FakeBot()
+        service = service_with(bot, file_id_cache_size=0)
+
+        # Act
+        await service.send_vcard_document(1, **CONTACTS[0])
+        await service.send_vcard_document(1, **CONTACTS[0])
+
+        # Assert
+        assert all(isinstance(doc, bytes) for doc in bot.documents)
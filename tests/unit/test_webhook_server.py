@@ -0,0 +1,146 @@
+"""
+Tests unitarios para el servidor del webhook.
+"""
+
+import asyncio
+
+import httpx
+import pytest
+
+from src.services.webhook_server import WebhookServer
+
+SECRET = "s3cr3t-token"
+
+
+@pytest.fixture
+async def server():
+    """Servidor en un puerto libre que guarda los updates recibidos."""
+    received = []
+
+    async def handler(update):
+        if update.get("update_id") == -1:
+            raise RuntimeError("boom")
+        received.append(update)
+
+    webhook = WebhookServer(handler, secret_token=SECRET, listen="127.0.0.1", port=0)
+    webhook.received = received
+    await webhook.start()
+    yield webhook
+    await webhook.stop()
+
+
+def _url(server, path="/telegram"):
+    return f"http://127.0.0.1:{server.bound_port}{path}"
+
+
+def _headers(secret=SECRET):
+    return {"X-Telegram-Bot-Api-Secret-Token": secret}
+
+
+class TestWebhookServer:
+    """Tests para WebhookServer."""
+
+    @pytest.mark.asyncio
+    async def test_should_deliver_updates_over_one_connection(self, server):
+        """Verifica que los updates válidos se entregan y la conexión se reutiliza."""
+        # Arrange
+        statuses = []
+
+        # Act
+        async with httpx.AsyncClient() as client:
+            for update_id in (1, 2, 3):
+                response = await client.post(
+                    _url(server), json={"update_id": update_id}, headers=_headers()
+                )
+                statuses.append(response.status_code)
+
+        # Assert
+        assert statuses == [200, 200, 200]
+        assert [update["update_id"] for update in server.received] == [1, 2, 3]
+
+    @pytest.mark.asyncio
+    @pytest.mark.parametrize("secret", ["", "wrong-token"])
+    async def test_should_reject_invalid_secret(self, server, secret):
+        """Verifica que sin el secret token correcto el update se descarta."""
+        # Act
+        async with httpx.AsyncClient() as client:
+            response = await client.post(
+                _url(server), json={"update_id": 1}, headers=_headers(secret)
+            )
+
+        # Assert
+        assert response.status_code == 403
+        assert server.received == []
+
+    @pytest.mark.asyncio
+    async def test_should_reject_wrong_path_method_and_body(self, server):
+        """Verifica que ruta, método y cuerpo inválidos tienen su código de error."""
+        # Act
+        async with httpx.AsyncClient() as client:
+            wrong_path = await client.post(_url(server, "/other"), json={}, headers=_headers())
+            wrong_method = await client.get(_url(server), headers=_headers())
+            bad_json = await client.post(_url(server), content=b"{", headers=_headers())
+            not_object = await client.post(_url(server), json=[1], headers=_headers())
+
+        # Assert
+        assert wrong_path.status_code == 404
+        assert wrong_method.status_code == 405
+        assert bad_json.status_code == 400
+        assert not_object.status_code == 400
+
+    @pytest.mark.asyncio
+    async def test_should_reject_oversized_body(self):
+        """Verifica que un cuerpo mayor al máximo se rechaza sin leerlo."""
+        # Arrange
+        async def handler(update):
+            raise AssertionError("no debería llamarse")
+
+        webhook = WebhookServer(
+            handler, secret_token=SECRET, listen="127.0.0.1", port=0, max_body_bytes=16
+        )
+        await webhook.start()
+
+        # Act
+        try:
+            async with httpx.AsyncClient() as client:
+                response = await client.post(
+                    _url(webhook), json={"update_id": 1, "padding": "x" * 64}, headers=_headers()
+                )
+        finally:
+            await webhook.stop()
+
+        # Assert
+        assert response.status_code == 413
+
+    @pytest.mark.asyncio
+    async def test_should_return_500_on_handler_error(self, server):
+        """Verifica que si el handler falla, Telegram recibe 500 y reintenta."""
+        # Act
+        async with httpx.AsyncClient() as client:
+            response = await client.post(
+                _url(server), json={"update_id": -1}, headers=_headers()
+            )
+
+        # Assert
+        assert response.status_code == 500
+
+    @pytest.mark.asyncio
+    async def test_should_close_idle_connections_on_stop(self, server):
+        """Verifica que detener el servidor no espera a las conexiones keep-alive."""
+        # Act
+        async with httpx.AsyncClient() as client:
+            await client.post(_url(server), json={"update_id": 1}, headers=_headers())
+            await asyncio.wait_for(server.stop(), timeout=2)
+
+        # Assert
+        assert server.bound_port is None
+
+    def test_should_require_secret_token(self):
+        """Verifica que el webhook no se puede levantar sin secret token."""
+        # Arrange
+        async def handler(update):
+            pass
+
+        # Act & Assert
+        with pytest.raises(ValueError):
+            WebhookServer(handler, secret_token="")
@@ -0,0 +1,169 @@
+"""
+Tests unitarios para el pool de workers en segundo plano.
+"""
+
+import asyncio
+
+import pytest
+
+from src.services.worker_pool import WorkerPool
+from src.utils.metrics import metrics
+
+
+@pytest.fixture
+async def pool():
+    """Pool de dos workers con cola de dos; se detiene al terminar."""
+    pool = WorkerPool("test", workers=2, max_pending=2)
+    yield pool
+    await pool.stop(drain_timeout=0)
+
+
+class TestWorkerPool:
+    """Tests para la ejecución de trabajos."""
+
+    @pytest.mark.asyncio
+    async def test_should_run_at_most_workers_at_once(self, pool):
+        """Verifica que nunca corren más trabajos que workers y el resto espera en la cola."""
+        # Arrange
+        running = []
+        peak = []
+        release = asyncio.Event()
+
+        async def job():
+            running.append(1)
+            peak.append(len(running))
+            await release.wait()
+            running.pop()
+
+        # Act
+        for _ in range(4):
+            await pool.submit(job)
+        await asyncio.sleep(0.01)
+        busy, pending = pool.busy, pool.pending
+        release.set()
+        await pool.join()
+
+        # Assert
+        assert busy == 2
+        assert pending == 2
+        assert max(peak) == 2
+
+    @pytest.mark.asyncio
+    async def test_should_wait_on_submit_when_queue_is_full(self, pool):
+        """Verifica que con la cola llena submit() espera un lugar (backpressure)."""
+        # Arrange
+        release = asyncio.Event()
+
+        async def job():
+            await release.wait()
+
+        for _ in range(4):
+            await pool.submit(job)
+        await asyncio.sleep(0.01)
+
+        # Act
+        blocked = asyncio.ensure_future(pool.submit(job))
+        await asyncio.sleep(0.01)
+        blocked_while_full = not blocked.done()
+        release.set()
+        await asyncio.wait_for(blocked, timeout=1)
+        await pool.join()
+
+        # Assert
+        assert blocked_while_full
+
+    @pytest.mark.asyncio
+    async def test_should_call_on_error_on_failure(self, pool):
+        """Verifica que un trabajo que falla entrega su error a on_error."""
+        # Arrange
+        errors = []
+
+        async def job():
+            raise RuntimeError("db down")
+
+        async def on_error(error):
+            errors.append(error)
+
+        # Act
+        await pool.submit(job, on_error=on_error)
+        await pool.join()
+
+        # Assert
+        assert [str(error) for error in errors] == ["db down"]
+        assert metrics.get_counter("worker_jobs_total", pool="test", result="error") >= 1
+
+    @pytest.mark.asyncio
+    async def test_should_keep_workers_running_when_error_handler_fails(self, pool):
+        """Verifica que un on_error que falla no detiene a los workers."""
+        # Arrange
+        done = []
+
+        async def job():
+            raise RuntimeError("db down")
+
+        async def on_error(error):
+            raise RuntimeError("telegram down")
+
+        async def ok():
+            done.append(True)
+
+        # Act
+        await pool.submit(job, on_error=on_error)
+        await pool.submit(ok)
+        await pool.join()
+
+        # Assert
+        assert done == [True]
+
+
+class TestWorkerPoolStop:
+    """Tests para la detención del pool."""
+
+    @pytest.mark.asyncio
+    async def test_should_drain_queue_on_stop(self):
+        """Verifica que stop() termina los trabajos encolados en orden."""
+        # Arrange
+        pool = WorkerPool("test", workers=1)
+        done = []
+
+        async def job(i):
+            await asyncio.sleep(0.01)
+            done.append(i)
+
+        for i in range(3):
+            await pool.submit(lambda i=i: job(i))
+
+        # Act
+        await pool.stop()
+
+        # Assert
+        assert done == [0, 1, 2]
+
+    @pytest.mark.asyncio
+    async def test_should_report_unfinished_jobs_on_stop(self):
+        """Verifica que los trabajos que no terminan antes del timeout reciben su error."""
+        # Arrange
+        pool = WorkerPool("test", workers=1)
+        errors = []
+
+        async def stuck():
+            await asyncio.Event().wait()
+
+        async def on_error(error):
+            errors.append(type(error))
+
+        await pool.submit(stuck, on_error=on_error)
+        await pool.submit(stuck, on_error=on_error)
+
+        # Act
+        await pool.stop(drain_timeout=0.05)
+
+        # Assert
+        assert errors == [asyncio.CancelledError, asyncio.CancelledError]
+        assert pool.busy == 0 and pool.pending == 0
+
+    def test_should_reject_invalid_size(self):
+        """Verifica que un pool sin workers es un error de configuración."""
+        # Act & Assert
+        with pytest.raises(ValueError):
+            WorkerPool("test", workers=0)